@@ -8,18 +8,25 @@ Provides:
 - Health checks and monitoring
 - Query logging and metrics
 - Transaction management (ACID)
+- Opt-in read-through caching of SELECT results
 """
 
 import asyncio
+import hashlib
 import logging
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 from contextlib import asynccontextmanager
 
+from ...performance.cache import QueryCache
+from ...performance.sql_tables import (
+    cacheable_read, fingerprint, normalize_table, referenced_tables, volatile_functions
+)
+
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +63,37 @@ class TransactionError(DatabaseError):
     pass
 
 
+@dataclass
+class ResultCachePolicy:
+    """Which SELECT results a client caches, and for how long
+
+    TTLs are in seconds; None or 0 means "do not cache". A query listed
+    in query_ttls (written as any instance of it; literals do not matter)
+    uses that TTL. Otherwise the shortest TTL of its tables in table_ttls
+    applies, then default_ttl. Queries that read no table (``SELECT
+    now()``) or call volatile functions are only cached when listed in
+    query_ttls; locking reads and SELECT ... INTO are never cached.
+    """
+    default_ttl: Optional[float] = 60.0
+    table_ttls: Dict[str, Optional[float]] = field(default_factory=dict)
+    query_ttls: Dict[str, Optional[float]] = field(default_factory=dict)
+    max_entries: int = 1000
+    max_memory_mb: float = 64.0
+
+    def __post_init__(self) -> None:
+        self.table_ttls = {normalize_table(t): ttl for t, ttl in self.table_ttls.items()}
+        self.query_ttls = {fingerprint(q)[0]: ttl for q, ttl in self.query_ttls.items()}
+
+    def ttl_for(self, query_fingerprint: str, tables: FrozenSet[str]) -> Optional[float]:
+        """TTL for the results of a query (None or 0 = do not cache)"""
+        if query_fingerprint in self.query_ttls:
+            return self.query_ttls[query_fingerprint]
+        if not tables:
+            return None
+        ttls = [self.table_ttls[t] or 0 for t in tables if t in self.table_ttls]
+        return min(ttls) if ttls else self.default_ttl
+
+
 @dataclass
 class DatabaseConfig:
     """Database connection configuration"""
@@ -86,6 +124,9 @@ class DatabaseConfig:
     ssl_key: Optional[str] = None
     ssl_ca: Optional[str] = None
 
+    # Read-through result cache (None = disabled)
+    result_cache: Optional[ResultCachePolicy] = None
+
     # Additional parameters
     extra_params: Dict[str, Any] = field(default_factory=dict)
 
@@ -100,6 +141,9 @@ class QueryMetrics:
     success: bool
     error: Optional[str] = None
     query_type: Optional[str] = None
+    # Whether the result cache answered (None = query not cacheable)
+    cache_hit: Optional[bool] = None
+    fingerprint: Optional[str] = None
 
 
 @dataclass
@@ -235,6 +279,14 @@ class BaseDatabaseClient(ABC):
     - Health checks
     - Query logging and metrics
     - Transaction management
+
+    With ``config.result_cache`` set, ``execute`` serves SELECT results
+    from ``query_cache``, keyed by the query fingerprint, its literals and
+    the bound parameters. Writes made through ``execute`` invalidate the
+    cached results of the tables they change, also when a QueryCache is
+    assigned to ``query_cache`` by hand. Statements run directly on a
+    ``transaction()`` connection bypass this; call
+    ``query_cache.invalidate_tables`` after committing them.
     """
 
     def __init__(self, config: DatabaseConfig, name: str = "database"):
@@ -250,6 +302,17 @@ class BaseDatabaseClient(ABC):
         self._total_execution_time = 0.0
         self._last_query_metrics: List[QueryMetrics] = []
         self._max_metrics = 100  # Keep last 100 queries
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # Optional QueryCache kept consistent with writes
+        self.query_cache: Optional[Any] = None
+        policy = config.result_cache
+        if policy is not None:
+            self.query_cache = QueryCache(
+                ttl=policy.default_ttl,
+                config={'max_size': policy.max_entries, 'max_memory_mb': policy.max_memory_mb}
+            )
 
         logger.info(f"Created {self.__class__.__name__} for '{name}'")
 
@@ -313,6 +376,10 @@ class BaseDatabaseClient(ABC):
         """
         pass
 
+    def _acquire_connection(self):
+        """Context manager lending a pooled connection to execute()"""
+        return self._pool.acquire()
+
     @abstractmethod
     async def _get_ping_query(self) -> str:
         """Get database-specific ping query for health checks"""
@@ -335,16 +402,34 @@ class BaseDatabaseClient(ABC):
         Returns:
             Dictionary with columns, rows, rowcount, and metrics
         """
+        start_time = time.time()
+        plan = self._cache_plan(query, params)
+        if plan is not None:
+            key, _, _, query_fingerprint = plan
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                execution_time = time.time() - start_time
+                self._record_metrics(
+                    query=query,
+                    execution_time=execution_time,
+                    rows_affected=cached['rowcount'],
+                    success=True,
+                    cache_hit=True,
+                    query_fingerprint=query_fingerprint
+                )
+                # Callers may change the rows list; the cached one stays intact
+                return {**cached, 'rows': list(cached['rows']),
+                        'execution_time': execution_time, 'cached': True}
+
         if not self._initialized:
             await self.initialize()
 
-        start_time = time.time()
         attempt = 0
         last_error = None
 
         while attempt < self.config.max_retries if retry else 1:
             try:
-                async with self._pool.acquire() as conn:
+                async with self._acquire_connection() as conn:
                     columns, rows, rowcount = await self._execute_impl(conn, query, params)
 
                     execution_time = time.time() - start_time
@@ -354,16 +439,29 @@ class BaseDatabaseClient(ABC):
                         query=query,
                         execution_time=execution_time,
                         rows_affected=rowcount,
-                        success=True
+                        success=True,
+                        cache_hit=False if plan is not None else None,
+                        query_fingerprint=plan[3] if plan is not None else None
                     )
+                    self._invalidate_cache(query)
 
-                    return {
+                    result = {
                         'columns': columns,
                         'rows': rows,
                         'rowcount': rowcount,
                         'execution_time': execution_time,
                         'query_type': self._get_query_type(query),
                     }
+                    if plan is not None:
+                        key, ttl, tables, _ = plan
+                        self.query_cache.set(key, {
+                            'columns': columns,
+                            'rows': list(rows),
+                            'rowcount': rowcount,
+                            'query_type': result['query_type'],
+                        }, ttl=ttl, tables=tables)
+                        result['cached'] = False
+                    return result
 
             except Exception as e:
                 last_error = e
@@ -503,13 +601,59 @@ class BaseDatabaseClient(ABC):
         # Default implementation - override if needed
         pass
 
+    def _cache_plan(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]]
+    ) -> Optional[Tuple[str, float, FrozenSet[str], str]]:
+        """Cache key, TTL, tables and fingerprint of a cacheable query
+
+        Only plain queries are cached: locking reads, SELECT ... INTO and
+        queries calling volatile functions (sequences, clocks, locks) run
+        every time, unless a query is listed in the policy's query_ttls.
+
+        Returns:
+            None unless the result cache is enabled and the policy caches
+            this read-only query
+        """
+        policy = self.config.result_cache
+        if policy is None or self.query_cache is None:
+            return None
+        if not cacheable_read(query):
+            return None
+        tables = referenced_tables(query)
+        if tables is None:
+            return None
+        query_fingerprint, literals = fingerprint(query)
+        if query_fingerprint not in policy.query_ttls and volatile_functions(query):
+            return None
+        ttl = policy.ttl_for(query_fingerprint, tables)
+        if not ttl:
+            return None
+
+        bound = sorted(params.items()) if isinstance(params, dict) else params
+        digest = hashlib.sha256(repr((literals, bound)).encode()).hexdigest()
+        return f"{query_fingerprint}#{digest}", ttl, tables, query_fingerprint
+
+    def _invalidate_cache(self, query: str) -> None:
+        """Drop cached results made stale by a successful statement."""
+        if self.query_cache is None:
+            return
+        try:
+            self.query_cache.invalidate_write(query)
+        except Exception as e:
+            logger.error(f"Query cache invalidation failed, clearing cache: {e}")
+            self.query_cache.invalidate_tables(None)
+
     def _record_metrics(
         self,
         query: str,
         execution_time: float,
         rows_affected: int,
         success: bool,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        cache_hit: Optional[bool] = None,
+        query_fingerprint: Optional[str] = None
     ) -> None:
         """Record query execution metrics"""
         self._query_count += 1
@@ -517,6 +661,10 @@ class BaseDatabaseClient(ABC):
             self._error_count += 1
         else:
             self._total_execution_time += execution_time
+        if cache_hit is True:
+            self._cache_hits += 1
+        elif cache_hit is False:
+            self._cache_misses += 1
 
         metrics = QueryMetrics(
             query=query[:100],  # Truncate long queries
@@ -525,7 +673,9 @@ class BaseDatabaseClient(ABC):
             timestamp=datetime.utcnow(),
             success=success,
             error=error,
-            query_type=self._get_query_type(query)
+            query_type=self._get_query_type(query),
+            cache_hit=cache_hit,
+            fingerprint=query_fingerprint
         )
 
         self._last_query_metrics.append(metrics)
@@ -569,4 +719,8 @@ class BaseDatabaseClient(ABC):
             'avg_execution_time': self._get_avg_execution_time(),
             'pool_stats': self._pool.stats if self._pool else {},
             'recent_queries': self._last_query_metrics[-10:],  # Last 10 queries
+            'cache_hits': self._cache_hits,
+            'cache_misses': self._cache_misses,
+            'cache_hit_rate': self._cache_hits / max(1, self._cache_hits + self._cache_misses),
+            'result_cache': self.query_cache.get_statistics() if self.query_cache else {},
         }
@@ -9,7 +9,6 @@ Production-ready MySQL connectivity with:
 - Health checks and monitoring
 """
 
-import asyncio
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -214,80 +213,9 @@ class MySQLClient(BaseDatabaseClient):
             if cursor:
                 await cursor.close()
 
-    async def execute(
-        self,
-        query: str,
-        params: Optional[Dict[str, Any]] = None,
-        retry: bool = True
-    ) -> Dict[str, Any]:
-        """
-        Execute MySQL query using pool
-
-        Overrides base execute to use aiomysql pool directly
-        """
-        if not self._initialized:
-            await self.initialize()
-
-        import time
-        start_time = time.time()
-        attempt = 0
-        last_error = None
-
-        while attempt < self.config.max_retries if retry else 1:
-            try:
-                async with self._aiomysql_pool.acquire() as conn:
-                    columns, rows, rowcount = await self._execute_impl(conn, query, params)
-
-                    execution_time = time.time() - start_time
-
-                    # Record metrics
-                    self._record_metrics(
-                        query=query,
-                        execution_time=execution_time,
-                        rows_affected=rowcount,
-                        success=True
-                    )
-
-                    return {
-                        'columns': columns,
-                        'rows': rows,
-                        'rowcount': rowcount,
-                        'execution_time': execution_time,
-                        'query_type': self._get_query_type(query),
-                    }
-
-            except Exception as e:
-                last_error = e
-                attempt += 1
-
-                if attempt < self.config.max_retries and retry:
-                    delay = self.config.retry_delay * (self.config.retry_backoff ** (attempt - 1))
-                    logger.warning(
-                        f"Query failed (attempt {attempt}/{self.config.max_retries}), "
-                        f"retrying in {delay}s: {e}"
-                    )
-                    await asyncio.sleep(delay)
-                else:
-                    execution_time = time.time() - start_time
-                    self._record_metrics(
-                        query=query,
-                        execution_time=execution_time,
-                        rows_affected=0,
-                        success=False,
-                        error=str(e)
-                    )
-
-                    raise QueryError(
-                        f"Query execution failed after {attempt} attempts: {e}",
-                        error_code="QUERY_FAILED",
-                        original_error=e
-                    )
-
-        raise QueryError(
-            f"Query execution failed: {last_error}",
-            error_code="QUERY_FAILED",
-            original_error=last_error
-        )
+    def _acquire_connection(self):
+        """Lend a connection from the aiomysql pool"""
+        return self._aiomysql_pool.acquire()
 
     async def _get_ping_query(self) -> str:
         """Get MySQL-specific ping query"""
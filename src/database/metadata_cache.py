@@ -9,14 +9,18 @@ import json
 import logging
 import pickle
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 import hashlib
+import time
 
 import numpy as np
 
-from ..vector.store import VectorDatabase
+from ..vector.lexical import LexicalIndex, reciprocal_rank_fusion
+from ..vector.persistence import MANIFEST_FILE, read_attachment
+from ..vector.shards import ShardedVectorIndex
+from ..vector.store import IngestStats, VectorDatabase, VectorEntry
 
 # FAISS is now required
 try:
@@ -43,6 +47,7 @@ class TableMetadata:
     row_count: Optional[int] = None
     size_bytes: Optional[int] = None
     last_updated: Optional[datetime] = None
+    fingerprint: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -56,7 +61,8 @@ class TableMetadata:
             'foreign_keys': self.foreign_keys,
             'row_count': self.row_count,
             'size_bytes': self.size_bytes,
-            'last_updated': self.last_updated.isoformat() if self.last_updated else None
+            'last_updated': self.last_updated.isoformat() if self.last_updated else None,
+            'fingerprint': self.fingerprint
         }
 
     @classmethod
@@ -67,6 +73,32 @@ class TableMetadata:
         return cls(**data)
 
 
+def table_fingerprint(table_info: Dict[str, Any]) -> str:
+    """
+    Hash the structural definition of a table.
+
+    Covers schema, name, comment, columns (names, types, comments, keys),
+    indexes and foreign keys; volatile statistics such as row_count and
+    size_bytes are excluded so they never trigger re-embedding.
+
+    Args:
+        table_info: Table entry from database metadata
+
+    Returns:
+        Hex digest identifying the table definition
+    """
+    definition = {
+        'schema': table_info.get('schema', 'public'),
+        'name': table_info.get('name', ''),
+        'description': table_info.get('description', ''),
+        'columns': table_info.get('columns', []),
+        'indexes': table_info.get('indexes', []),
+        'foreign_keys': table_info.get('foreign_keys', []),
+    }
+    encoded = json.dumps(definition, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
 @dataclass
 class ColumnMetadata:
     """Metadata for a database column."""
@@ -109,34 +141,80 @@ class DatabaseMetadataCache:
     Intelligent cache for database metadata with semantic search capabilities.
 
     Features:
+    - Hybrid search: exact and trigram name matching answer most lookups
+      without embedding; vector search covers semantic queries, merged by
+      reciprocal rank fusion
     - FAISS-based vector search for tables and columns
+    - One vector shard per connection, loaded on first search and evicted
+      under a memory budget
     - Persistent disk storage
     - Automatic indexing of MCP database metadata
     - Fast lookup and semantic search
     """
 
-    def __init__(self, cache_dir: str, dimension: int = 384):
+    def __init__(
+        self,
+        cache_dir: str,
+        dimension: int = 384,
+        ingest_batch_size: int = 1024,
+        memory_budget_bytes: Optional[int] = None,
+        search_workers: int = 4,
+        lexical_confidence: float = 0.5,
+        embedding_service: Optional[Any] = None
+    ):
         """
         Initialize metadata cache.
 
         Args:
             cache_dir: Directory for cache storage
             dimension: Embedding dimension (default 384 for sentence transformers)
+            ingest_batch_size: Objects embedded and indexed per bulk append
+            memory_budget_bytes: Estimated memory allowed for loaded vector
+                shards; least recently searched connections are saved and
+                unloaded beyond it (None for no limit)
+            search_workers: Threads searching connection shards in parallel
+            lexical_confidence: Trigram similarity of the best fuzzy name
+                match above which a search skips the vector index
+            embedding_service: Shared EmbeddingService (anything with
+                encode_async(texts)) producing dimension-sized embeddings; objects
+                and queries are embedded through it, batched with other
+                callers. Without one, deterministic hash vectors are used.
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
         self.dimension = dimension
+        self.ingest_batch_size = ingest_batch_size
+        self.lexical_confidence = lexical_confidence
+        self.embedding_service = embedding_service
+        # Shards embedded by another model are rebuilt when loaded
+        model = getattr(embedding_service, 'model', None)
+        self.embedder = (
+            'hash' if embedding_service is None
+            else getattr(model, 'cache_namespace', None) or type(model or embedding_service).__name__
+        )
 
-        # Vector database for semantic search (FAISS required)
-        self.vector_db = VectorDatabase(dimension=dimension, use_faiss=True)
+        # Per-connection vector shards for semantic search (FAISS required)
+        self.shards = ShardedVectorIndex(
+            dimension,
+            store_dir=self.shards_dir,
+            memory_budget_bytes=memory_budget_bytes,
+            max_workers=search_workers,
+            attachments=self._shard_attachments,
+            partition_keys=('table_name',)
+        )
 
         # Metadata storage
         self.tables: Dict[str, TableMetadata] = {}  # key: connection_id:schema.table
         self.columns: Dict[str, ColumnMetadata] = {}  # key: connection_id:schema.table.column
 
+        # Name indexes for the exact and fuzzy search paths
+        self.table_names = LexicalIndex()
+        self.column_names = LexicalIndex()
+
         # Track cache state
         self.last_refresh: Dict[str, datetime] = {}  # connection_id -> timestamp
+        self.search_paths = {'exact': 0, 'lexical': 0, 'semantic': 0}
 
         logger.info(f"Initialized DatabaseMetadataCache with FAISS (dimension={dimension})")
 
@@ -148,6 +226,27 @@ class DatabaseMetadataCache:
         """Create unique key for column."""
         return f"{connection_id}:{schema}.{table_name}.{column_name}"
 
+    def _add_table_name(self, table_key: str, table: TableMetadata) -> None:
+        """Index a table name for exact and fuzzy lookup."""
+        self.table_names.add(
+            table_key,
+            table.name,
+            aliases=(f"{table.schema}.{table.name}",),
+            metadata={'connection_id': table.connection_id}
+        )
+
+    def _add_column_name(self, column_key: str, column: ColumnMetadata) -> None:
+        """Index a column name for exact and fuzzy lookup."""
+        self.column_names.add(
+            column_key,
+            column.name,
+            aliases=(
+                f"{column.table_name}.{column.name}",
+                f"{column.schema}.{column.table_name}.{column.name}"
+            ),
+            metadata={'connection_id': column.connection_id, 'table_name': column.table_name}
+        )
+
     def _text_to_vector(self, text: str) -> np.ndarray:
         """
         Convert text to embedding vector.
@@ -182,6 +281,96 @@ class DatabaseMetadataCache:
 
         return vector
 
+    async def _texts_to_vectors(self, texts: List[str]) -> np.ndarray:
+        """
+        Convert a batch of texts to an embedding matrix.
+
+        Texts are encoded on the embedding service's workers, so the event
+        loop keeps running while a schema is embedded.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            float32 matrix of shape (len(texts), dimension)
+
+        Raises:
+            ValueError: If the embedding service returns another dimension
+        """
+        if self.embedding_service is not None and texts:
+            vectors = np.array(
+                await self.embedding_service.encode_async(texts), dtype=np.float32, ndmin=2
+            )
+            if vectors.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Embedding service returned {vectors.shape[1]}-dimensional vectors, "
+                    f"cache dimension is {self.dimension}"
+                )
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            np.divide(vectors, norms, out=vectors, where=norms > 0)
+            return vectors
+
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            vectors[i] = self._text_to_vector(text)
+        return vectors
+
+    async def _ingest(
+        self,
+        connection_id: str,
+        objects: List[Tuple[str, str, str, Dict[str, Any]]]
+    ) -> IngestStats:
+        """
+        Embed and index (key, text, object_type, metadata) tuples in batches.
+
+        Args:
+            connection_id: Connection whose shard receives the objects
+            objects: Objects to index
+
+        Returns:
+            Ingestion statistics
+        """
+        stats = IngestStats()
+        for start in range(0, len(objects), self.ingest_batch_size):
+            batch = objects[start:start + self.ingest_batch_size]
+
+            embed_start = time.perf_counter()
+            vectors = await self._texts_to_vectors([text for _, text, _, _ in batch])
+            embed_seconds = time.perf_counter() - embed_start
+
+            with self.shards.writing(connection_id) as shard:
+                batch_stats = shard.add_objects(
+                    [key for key, _, _, _ in batch],
+                    vectors,
+                    [object_type for _, _, object_type, _ in batch],
+                    [metadata for _, _, _, metadata in batch]
+                )
+                shard.ingest_stats.embed_seconds += embed_seconds
+            batch_stats.embed_seconds = embed_seconds
+            stats.merge(batch_stats)
+
+        return stats
+
+    def _ingest_entries(self, entries: List[VectorEntry]) -> None:
+        """
+        Add already embedded entries to the shards of their connections.
+
+        Args:
+            entries: Entries with a connection_id in their metadata
+        """
+        by_connection: Dict[str, List[VectorEntry]] = {}
+        for entry in entries:
+            by_connection.setdefault(entry.metadata.get('connection_id', ''), []).append(entry)
+
+        for connection_id, shard_entries in by_connection.items():
+            with self.shards.writing(connection_id) as shard:
+                shard.add_objects(
+                    [entry.id for entry in shard_entries],
+                    np.vstack([entry.vector for entry in shard_entries]),
+                    [entry.object_type for entry in shard_entries],
+                    [entry.metadata for entry in shard_entries]
+                )
+
     async def index_database(self, connection_id: str, metadata: Dict[str, Any]) -> None:
         """
         Index database metadata for semantic search.
@@ -192,103 +381,151 @@ class DatabaseMetadataCache:
         """
         logger.info(f"Indexing database metadata for connection: {connection_id}")
 
-        tables = metadata.get('tables', [])
         indexed_tables = 0
         indexed_columns = 0
+        objects: List[Tuple[str, str, str, Dict[str, Any]]] = []
 
-        for table_info in tables:
-            schema = table_info.get('schema', 'public')
-            table_name = table_info.get('name', '')
+        for table_info in metadata.get('tables', []):
+            table_objects = self._index_table(connection_id, table_info)
+            if table_objects:
+                objects.extend(table_objects)
+                indexed_tables += 1
+                indexed_columns += len(table_objects) - 1
 
-            if not table_name:
+        stats = await self._ingest(connection_id, objects)
+
+        self.last_refresh[connection_id] = datetime.utcnow()
+        logger.info(
+            f"Indexed {indexed_tables} tables and {indexed_columns} columns "
+            f"for connection {connection_id} ({stats.objects_per_second:.0f} objects/s)"
+        )
+
+    def _index_table(
+        self,
+        connection_id: str,
+        table_info: Dict[str, Any],
+        fingerprint: Optional[str] = None
+    ) -> List[Tuple[str, str, str, Dict[str, Any]]]:
+        """
+        Store metadata for one table and its columns.
+
+        Args:
+            connection_id: MCP connection identifier
+            table_info: Table entry from database metadata
+            fingerprint: Precomputed table_fingerprint(table_info)
+
+        Returns:
+            (key, text, object_type, metadata) tuples to embed, table first;
+            empty if the table has no name
+        """
+        schema = table_info.get('schema', 'public')
+        table_name = table_info.get('name', '')
+
+        if not table_name:
+            return []
+
+        # Create table metadata
+        table_meta = TableMetadata(
+            connection_id=connection_id,
+            schema=schema,
+            name=table_name,
+            description=table_info.get('description', ''),
+            columns=table_info.get('columns', []),
+            indexes=table_info.get('indexes', []),
+            foreign_keys=table_info.get('foreign_keys', []),
+            row_count=table_info.get('row_count'),
+            size_bytes=table_info.get('size_bytes'),
+            last_updated=datetime.utcnow(),
+            fingerprint=fingerprint or table_fingerprint(table_info)
+        )
+
+        # Store table metadata
+        table_key = self._make_table_key(connection_id, schema, table_name)
+        self.tables[table_key] = table_meta
+        self._add_table_name(table_key, table_meta)
+
+        # Queue table for semantic search
+        objects = [(
+            table_key,
+            f"Table: {schema}.{table_name}. {table_meta.description}",
+            'table',
+            {
+                'connection_id': connection_id,
+                'schema': schema,
+                'name': table_name,
+                'description': table_meta.description
+            }
+        )]
+
+        # Index columns
+        for column_info in table_info.get('columns', []):
+            column_name = column_info.get('name', '')
+            if not column_name:
                 continue
 
-            # Create table metadata
-            table_meta = TableMetadata(
+            column_meta = ColumnMetadata(
                 connection_id=connection_id,
                 schema=schema,
-                name=table_name,
-                description=table_info.get('description', ''),
-                columns=table_info.get('columns', []),
-                indexes=table_info.get('indexes', []),
-                foreign_keys=table_info.get('foreign_keys', []),
-                row_count=table_info.get('row_count'),
-                size_bytes=table_info.get('size_bytes'),
-                last_updated=datetime.utcnow()
+                table_name=table_name,
+                name=column_name,
+                data_type=column_info.get('type', 'unknown'),
+                nullable=column_info.get('nullable', True),
+                default_value=column_info.get('default'),
+                description=column_info.get('description', ''),
+                is_primary_key=column_info.get('is_primary_key', False),
+                is_foreign_key=column_info.get('is_foreign_key', False),
+                foreign_key_ref=column_info.get('foreign_key_ref')
             )
 
-            # Store table metadata
-            table_key = self._make_table_key(connection_id, schema, table_name)
-            self.tables[table_key] = table_meta
+            # Store column metadata
+            column_key = self._make_column_key(connection_id, schema, table_name, column_name)
+            self.columns[column_key] = column_meta
+            self._add_column_name(column_key, column_meta)
 
-            # Index table for semantic search
-            table_text = f"Table: {schema}.{table_name}. {table_meta.description}"
-            table_vector = self._text_to_vector(table_text)
-
-            self.vector_db.add_object(
-                object_id=table_key,
-                vector=table_vector,
-                object_type='table',
-                metadata={
+            # Queue column for semantic search
+            objects.append((
+                column_key,
+                (
+                    f"Column: {schema}.{table_name}.{column_name}. "
+                    f"Type: {column_meta.data_type}. {column_meta.description}"
+                ),
+                'column',
+                {
                     'connection_id': connection_id,
                     'schema': schema,
-                    'name': table_name,
-                    'description': table_meta.description
+                    'table_name': table_name,
+                    'name': column_name,
+                    'data_type': column_meta.data_type,
+                    'description': column_meta.description
                 }
-            )
-            indexed_tables += 1
-
-            # Index columns
-            for column_info in table_info.get('columns', []):
-                column_name = column_info.get('name', '')
-                if not column_name:
-                    continue
-
-                column_meta = ColumnMetadata(
-                    connection_id=connection_id,
-                    schema=schema,
-                    table_name=table_name,
-                    name=column_name,
-                    data_type=column_info.get('type', 'unknown'),
-                    nullable=column_info.get('nullable', True),
-                    default_value=column_info.get('default'),
-                    description=column_info.get('description', ''),
-                    is_primary_key=column_info.get('is_primary_key', False),
-                    is_foreign_key=column_info.get('is_foreign_key', False),
-                    foreign_key_ref=column_info.get('foreign_key_ref')
-                )
+            ))
 
-                # Store column metadata
-                column_key = self._make_column_key(connection_id, schema, table_name, column_name)
-                self.columns[column_key] = column_meta
+        return objects
 
-                # Index column for semantic search
-                column_text = (
-                    f"Column: {schema}.{table_name}.{column_name}. "
-                    f"Type: {column_meta.data_type}. {column_meta.description}"
-                )
-                column_vector = self._text_to_vector(column_text)
-
-                self.vector_db.add_object(
-                    object_id=column_key,
-                    vector=column_vector,
-                    object_type='column',
-                    metadata={
-                        'connection_id': connection_id,
-                        'schema': schema,
-                        'table_name': table_name,
-                        'name': column_name,
-                        'data_type': column_meta.data_type,
-                        'description': column_meta.description
-                    }
-                )
-                indexed_columns += 1
+    def _forget_table(self, table_key: str) -> List[str]:
+        """
+        Drop a table and its columns from the metadata maps.
 
-        self.last_refresh[connection_id] = datetime.utcnow()
-        logger.info(
-            f"Indexed {indexed_tables} tables and {indexed_columns} columns "
-            f"for connection {connection_id}"
-        )
+        Args:
+            table_key: Key of the table
+
+        Returns:
+            Removed table and column keys, for deletion from the vector index
+        """
+        table = self.tables.pop(table_key, None)
+        if table is None:
+            return []
+
+        self.table_names.remove(table_key)
+        removed = [table_key]
+        for column_info in table.columns:
+            column_key = self._make_column_key(
+                table.connection_id, table.schema, table.name, column_info.get('name', '')
+            )
+            if self.columns.pop(column_key, None) is not None:
+                self.column_names.remove(column_key)
+                removed.append(column_key)
+        return removed
 
     async def search_tables(
         self,
@@ -297,91 +534,163 @@ class DatabaseMetadataCache:
         k: int = 5
     ) -> List[Dict[str, Any]]:
         """
-        Search for tables by semantic query.
+        Search for tables by name or semantic query.
 
         Args:
-            query: Search query (e.g., "find tables related to users")
+            query: Search query (e.g., "users" or "find tables related to users")
             connection_id: Optional filter by connection
             k: Number of results to return
 
         Returns:
             List of matching tables with metadata
         """
-        query_vector = self._text_to_vector(query)
-
-        results = self.vector_db.search_similar(
-            query_vector=query_vector,
-            k=k * 2,  # Get more for filtering
+        return await self._hybrid_search(
+            query,
+            k,
+            self.table_names,
+            self._describe_table,
             object_type='table',
-            threshold=0.0  # No threshold filter, return top-k
+            filters={'connection_id': connection_id} if connection_id else None,
+            shard_keys=[connection_id] if connection_id else None
         )
 
-        matches = []
-        for entry, distance in results:
-            # Filter by connection if specified
-            if connection_id and entry.metadata.get('connection_id') != connection_id:
-                continue
-
-            matches.append({
-                'connection_id': entry.metadata.get('connection_id'),
-                'schema': entry.metadata.get('schema'),
-                'name': entry.metadata.get('name'),
-                'description': entry.metadata.get('description'),
-                'similarity': 1.0 / (1.0 + distance)  # Convert distance to similarity
-            })
-
-            if len(matches) >= k:
-                break
-
-        return matches
-
     async def search_columns(
         self,
         query: str,
         table: Optional[str] = None,
-        k: int = 5
+        k: int = 5,
+        connection_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Search for columns by semantic query.
+        Search for columns by name or semantic query.
 
         Args:
-            query: Search query (e.g., "timestamp columns")
+            query: Search query (e.g., "email" or "timestamp columns")
             table: Optional filter by table name
             k: Number of results to return
+            connection_id: Optional filter by connection; only that
+                connection's vector shard is loaded and searched
 
         Returns:
             List of matching columns with metadata
         """
-        query_vector = self._text_to_vector(query)
-
-        results = self.vector_db.search_similar(
-            query_vector=query_vector,
-            k=k * 3,  # Get more for filtering
+        filters: Dict[str, Any] = {}
+        if connection_id:
+            filters['connection_id'] = connection_id
+        if table:
+            filters['table_name'] = table
+        return await self._hybrid_search(
+            query,
+            k,
+            self.column_names,
+            self._describe_column,
             object_type='column',
-            threshold=0.0  # No threshold filter, return top-k
+            filters=filters or None,
+            shard_keys=[connection_id] if connection_id else None,
+            vector_filters={'table_name': table} if table else None
         )
 
-        matches = []
-        for entry, distance in results:
-            # Filter by table if specified
-            if table and entry.metadata.get('table_name') != table:
-                continue
+    async def _hybrid_search(
+        self,
+        query: str,
+        k: int,
+        names: LexicalIndex,
+        describe: Callable[[str], Optional[Dict[str, Any]]],
+        object_type: str,
+        filters: Optional[Dict[str, Any]] = None,
+        shard_keys: Optional[List[str]] = None,
+        vector_filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer a search from the name index, falling back to vector search.
+
+        An exact name match, or a fuzzy match at least as similar as
+        lexical_confidence, is returned without embedding the query.
+        Otherwise the lexical and vector rankings are merged by reciprocal
+        rank fusion.
+
+        Args:
+            query: Search query
+            k: Number of results to return
+            names: Name index of the searched object type
+            describe: Builds a result dictionary from an object key
+            object_type: Vector entry type to search
+            filters: Metadata values name matches must have
+            shard_keys: Vector shards to search (default: all)
+            vector_filters: Filters pushed down into the vector search
+
+        Returns:
+            Result dictionaries with 'similarity' and 'match'
+            ('exact', 'lexical', 'semantic' or 'hybrid')
+        """
+        hits = names.search(query, k=k, filters=filters)
+
+        if hits and (hits[0].exact or hits[0].similarity >= self.lexical_confidence):
+            self.search_paths['exact' if hits[0].exact else 'lexical'] += 1
+            ranked = [
+                (hit.id, hit.similarity, 'exact' if hit.exact else 'lexical')
+                for hit in hits
+            ]
+        else:
+            self.search_paths['semantic'] += 1
+            results = self.shards.search(
+                (await self._texts_to_vectors([query]))[0],
+                k=k,
+                keys=shard_keys,
+                object_type=object_type,
+                threshold=0.0,  # No threshold filter, return top-k
+                filters=vector_filters
+            )
 
-            matches.append({
-                'connection_id': entry.metadata.get('connection_id'),
-                'schema': entry.metadata.get('schema'),
-                'table_name': entry.metadata.get('table_name'),
-                'name': entry.metadata.get('name'),
-                'data_type': entry.metadata.get('data_type'),
-                'description': entry.metadata.get('description'),
-                'similarity': 1.0 / (1.0 + distance)
-            })
+            similarity = {hit.id: hit.similarity for hit in hits}
+            match = {hit.id: 'lexical' for hit in hits}
+            for entry, distance in results:
+                # Convert distance to similarity
+                semantic = 1.0 / (1.0 + distance)
+                similarity[entry.id] = max(similarity.get(entry.id, 0.0), semantic)
+                match[entry.id] = 'hybrid' if entry.id in match else 'semantic'
 
-            if len(matches) >= k:
-                break
+            fused = reciprocal_rank_fusion([
+                [hit.id for hit in hits],
+                [entry.id for entry, _ in results]
+            ])
+            ranked = [(key, similarity[key], match[key]) for key, _ in fused[:k]]
 
+        matches = []
+        for key, similarity_score, match_type in ranked:
+            result = describe(key)
+            if result is not None:
+                result['similarity'] = similarity_score
+                result['match'] = match_type
+                matches.append(result)
         return matches
 
+    def _describe_table(self, table_key: str) -> Optional[Dict[str, Any]]:
+        """Search result fields of a table."""
+        table = self.tables.get(table_key)
+        if table is None:
+            return None
+        return {
+            'connection_id': table.connection_id,
+            'schema': table.schema,
+            'name': table.name,
+            'description': table.description
+        }
+
+    def _describe_column(self, column_key: str) -> Optional[Dict[str, Any]]:
+        """Search result fields of a column."""
+        column = self.columns.get(column_key)
+        if column is None:
+            return None
+        return {
+            'connection_id': column.connection_id,
+            'schema': column.schema,
+            'table_name': column.table_name,
+            'name': column.name,
+            'data_type': column.data_type,
+            'description': column.description
+        }
+
     def get_table(self, connection_id: str, schema: str, table_name: str) -> Optional[TableMetadata]:
         """Get table metadata by name."""
         key = self._make_table_key(connection_id, schema, table_name)
@@ -407,8 +716,7 @@ class DatabaseMetadataCache:
         ]
         for key in tables_to_remove:
             del self.tables[key]
-            # Also remove from vector DB
-            self.vector_db.delete_by_id(key)
+            self.table_names.remove(key)
 
         # Remove columns
         columns_to_remove = [
@@ -417,7 +725,10 @@ class DatabaseMetadataCache:
         ]
         for key in columns_to_remove:
             del self.columns[key]
-            self.vector_db.delete_by_id(key)
+            self.column_names.remove(key)
+
+        # Drop the connection's vector shard, in memory and on disk
+        self.shards.drop(connection_id)
 
         # Remove refresh timestamp
         self.last_refresh.pop(connection_id, None)
@@ -428,8 +739,10 @@ class DatabaseMetadataCache:
         """Clear all cached metadata."""
         self.tables.clear()
         self.columns.clear()
+        self.table_names.clear()
+        self.column_names.clear()
         self.last_refresh.clear()
-        self.vector_db = VectorDatabase(dimension=self.dimension, use_faiss=True)
+        self.shards.clear()
         logger.info("Cleared all metadata cache")
 
     def get_stats(self) -> Dict[str, Any]:
@@ -440,7 +753,8 @@ class DatabaseMetadataCache:
             'total_tables': len(self.tables),
             'total_columns': len(self.columns),
             'connections_cached': len(connections),
-            'vector_db_stats': self.vector_db.get_stats(),
+            'vector_db_stats': self.shards.get_stats(),
+            'search_paths': dict(self.search_paths),
             'last_refresh': {
                 conn_id: timestamp.isoformat()
                 for conn_id, timestamp in self.last_refresh.items()
@@ -523,48 +837,116 @@ class DatabaseMetadataCache:
         self.clear_connection(connection_id)
         logger.info(f"Invalidated cache for connection: {connection_id}")
 
-    async def refresh_connection(self, connection_id: str, metadata: Dict[str, Any]) -> None:
+    async def refresh_connection(self, connection_id: str, metadata: Dict[str, Any]) -> Dict[str, int]:
         """
         Update cached data for a connection.
 
+        Only tables whose fingerprint changed are re-embedded; tables that
+        no longer exist are removed and unchanged tables only get their
+        statistics (row_count, size_bytes) updated.
+
         Args:
             connection_id: Database connection identifier
             metadata: New metadata to index
+
+        Returns:
+            Counts of added, changed, removed and unchanged tables
         """
-        # Clear existing data for this connection
-        self.clear_connection(connection_id)
+        existing = {
+            key for key, table in self.tables.items()
+            if table.connection_id == connection_id
+        }
+        counts = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+        objects: List[Tuple[str, str, str, Dict[str, Any]]] = []
+        stale_keys: List[str] = []
+        seen = set()
+
+        for table_info in metadata.get('tables', []):
+            table_name = table_info.get('name', '')
+            if not table_name:
+                continue
 
-        # Re-index with new metadata
-        await self.index_database(connection_id, metadata)
+            table_key = self._make_table_key(
+                connection_id, table_info.get('schema', 'public'), table_name
+            )
+            seen.add(table_key)
+            fingerprint = table_fingerprint(table_info)
+            current = self.tables.get(table_key)
+
+            if current is not None and current.fingerprint == fingerprint:
+                current.row_count = table_info.get('row_count')
+                current.size_bytes = table_info.get('size_bytes')
+                current.last_updated = datetime.utcnow()
+                counts['unchanged'] += 1
+                continue
 
-        logger.info(f"Refreshed cache for connection: {connection_id}")
+            counts['changed' if current is not None else 'added'] += 1
+            old_keys = self._forget_table(table_key)
+            table_objects = self._index_table(connection_id, table_info, fingerprint)
+            objects.extend(table_objects)
 
-    async def save_to_disk(self) -> None:
-        """Save cache to disk."""
-        try:
-            # Save metadata
-            metadata_file = self.cache_dir / 'metadata.json'
-            metadata = {
-                'tables': {key: table.to_dict() for key, table in self.tables.items()},
-                'columns': {key: column.to_dict() for key, column in self.columns.items()},
-                'last_refresh': {
-                    conn_id: timestamp.isoformat()
-                    for conn_id, timestamp in self.last_refresh.items()
-                }
-            }
+            # Vectors of re-indexed keys are replaced; dropped columns are deleted
+            kept = {key for key, _, _, _ in table_objects}
+            stale_keys.extend(key for key in old_keys if key not in kept)
 
-            with open(metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
+        for table_key in existing - seen:
+            stale_keys.extend(self._forget_table(table_key))
+            counts['removed'] += 1
 
-            # Save vector database
-            vector_file = self.cache_dir / 'vectors.pkl'
-            with open(vector_file, 'wb') as f:
-                pickle.dump({
-                    'entries': self.vector_db.entries,
-                    'id_to_idx': self.vector_db._id_to_idx
-                }, f)
+        if stale_keys:
+            with self.shards.writing(connection_id) as shard:
+                shard.delete_many(stale_keys)
+        stats = await self._ingest(connection_id, objects)
 
-            logger.info(f"Saved metadata cache to {self.cache_dir}")
+        self.last_refresh[connection_id] = datetime.utcnow()
+        logger.info(
+            f"Refreshed cache for connection: {connection_id} "
+            f"({counts['added']} added, {counts['changed']} changed, "
+            f"{counts['removed']} removed, {counts['unchanged']} unchanged; "
+            f"{stats.objects} objects re-embedded)"
+        )
+        return counts
+
+    @property
+    def shards_dir(self) -> Path:
+        """Directory of the per-connection vector stores."""
+        return self.cache_dir / 'shards'
+
+    @property
+    def store_dir(self) -> Path:
+        """Directory of the single vector store written by earlier versions."""
+        return self.cache_dir / 'vector_store'
+
+    def _shard_attachments(self, connection_id: str) -> Dict[str, Any]:
+        """Catalog of one connection, saved with its vector shard."""
+        catalog: Dict[str, Any] = {
+            'tables': {
+                key: table.to_dict() for key, table in self.tables.items()
+                if table.connection_id == connection_id
+            },
+            'columns': {
+                key: column.to_dict() for key, column in self.columns.items()
+                if column.connection_id == connection_id
+            },
+            'last_refresh': {},
+            'embedder': self.embedder
+        }
+        if connection_id in self.last_refresh:
+            catalog['last_refresh'][connection_id] = self.last_refresh[connection_id].isoformat()
+        return {'catalog': catalog}
+
+    async def save_to_disk(self) -> None:
+        """Save cache to disk.
+
+        Each connection is stored as its own native vector store (see
+        ``vector.persistence``) with its metadata catalog as a checksummed
+        attachment; only connections changed since the last save are
+        written, each replaced atomically.
+        """
+        try:
+            saved = self.shards.save()
+
+            logger.info(f"Saved metadata cache to {self.cache_dir} ({saved} connections written)")
 
         except Exception as e:
             logger.error(f"Failed to save cache to disk: {e}")
@@ -573,47 +955,61 @@ class DatabaseMetadataCache:
         """
         Load cache from disk.
 
+        Reads the catalog of every saved connection; their vector shards
+        are opened, memory-mapped, on first search. Stores written by
+        earlier versions (a single vector store, or metadata.json and
+        vectors.pkl) are split into per-connection shards.
+
         Returns:
             True if loaded successfully, False otherwise
         """
         try:
-            metadata_file = self.cache_dir / 'metadata.json'
-            vector_file = self.cache_dir / 'vectors.pkl'
-
-            if not metadata_file.exists():
+            connection_ids = self.shards.scan()
+            reembed: List[str] = []
+            if connection_ids:
+                catalog: Dict[str, Any] = {'tables': {}, 'columns': {}, 'last_refresh': {}}
+                for connection_id in connection_ids:
+                    shard_catalog = read_attachment(self.shards.shard_dir(connection_id), 'catalog')
+                    for section in catalog:
+                        catalog[section].update(shard_catalog.get(section, {}))
+                    if shard_catalog.get('embedder', 'hash') != self.embedder:
+                        reembed.append(connection_id)
+            elif (self.store_dir / MANIFEST_FILE).exists():
+                catalog = read_attachment(self.store_dir, 'catalog')
+                self._ingest_entries(VectorDatabase.load(self.store_dir, mmap=False).entries)
+            elif (self.cache_dir / 'metadata.json').exists():
+                catalog = self._load_legacy()
+            else:
                 logger.info("No cached metadata found on disk")
                 return False
 
-            # Load metadata
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
-
             self.tables = {
                 key: TableMetadata.from_dict(data)
-                for key, data in metadata.get('tables', {}).items()
+                for key, data in catalog.get('tables', {}).items()
             }
 
             self.columns = {
                 key: ColumnMetadata.from_dict(data)
-                for key, data in metadata.get('columns', {}).items()
+                for key, data in catalog.get('columns', {}).items()
             }
 
             self.last_refresh = {
                 conn_id: datetime.fromisoformat(timestamp)
-                for conn_id, timestamp in metadata.get('last_refresh', {}).items()
+                for conn_id, timestamp in catalog.get('last_refresh', {}).items()
             }
 
-            # Load vector database if available
-            if vector_file.exists():
-                with open(vector_file, 'rb') as f:
-                    vector_data = pickle.load(f)
-                    self.vector_db.entries = vector_data['entries']
-                    self.vector_db._id_to_idx = vector_data['id_to_idx']
+            self.table_names.clear()
+            self.column_names.clear()
+            for key, table in self.tables.items():
+                self._add_table_name(key, table)
+            for key, column in self.columns.items():
+                self._add_column_name(key, column)
 
-                    # Rebuild FAISS index
-                    if self.vector_db.entries:
-                        vectors = np.array([entry.vector for entry in self.vector_db.entries], dtype=np.float32)
-                        self.vector_db.index.add(vectors)
+            if not connection_ids and self.embedder != 'hash':
+                # Earlier formats were always hash-embedded
+                reembed = sorted({table.connection_id for table in self.tables.values()})
+            for connection_id in reembed:
+                await self._reembed_connection(connection_id)
 
             logger.info(
                 f"Loaded metadata cache from disk: "
@@ -624,3 +1020,38 @@ class DatabaseMetadataCache:
         except Exception as e:
             logger.error(f"Failed to load cache from disk: {e}")
             return False
+
+    async def _reembed_connection(self, connection_id: str) -> None:
+        """Rebuild a loaded connection's vector shard with the current embedder."""
+        tables = [table for table in self.tables.values() if table.connection_id == connection_id]
+        self.shards.drop(connection_id)
+        objects: List[Tuple[str, str, str, Dict[str, Any]]] = []
+        for table in tables:
+            objects.extend(self._index_table(connection_id, table.to_dict(), table.fingerprint))
+        stats = await self._ingest(connection_id, objects)
+        logger.info(
+            f"Re-embedded connection {connection_id} with {self.embedder} "
+            f"({stats.objects} objects)"
+        )
+
+    def _load_legacy(self) -> Dict[str, Any]:
+        """Load the pre-native metadata.json/vectors.pkl format.
+
+        Returns:
+            Metadata catalog
+        """
+        with open(self.cache_dir / 'metadata.json', 'r') as f:
+            catalog = json.load(f)
+
+        # Rebuild FAISS indexes, skipping entries deleted before the save
+        vector_file = self.cache_dir / 'vectors.pkl'
+        if vector_file.exists():
+            with open(vector_file, 'rb') as f:
+                vector_data = pickle.load(f)
+
+            self._ingest_entries([
+                entry for entry in vector_data['entries']
+                if not entry.metadata.get('_deleted')
+            ])
+
+        return catalog
@@ -0,0 +1,292 @@
+"""
+Embedding Backends
+
+Inference backends for EmbeddingModel:
+
+- ``sentence-transformers``: reference PyTorch model (default)
+- ``onnx``: exported ONNX model run with onnxruntime
+- ``onnx-int8``: dynamically int8-quantized ONNX model
+
+The ONNX backends need the optional ``onnx`` extra (onnxruntime, tokenizers)
+and a model directory produced by ``export_onnx_model``. The backend is
+selected per deployment with the EMBEDDING_BACKEND environment variable.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+from abc import ABC, abstractmethod
+from pathlib import Path
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_TRANSFORMERS = "sentence-transformers"
+ONNX = "onnx"
+ONNX_INT8 = "onnx-int8"
+BACKENDS = (SENTENCE_TRANSFORMERS, ONNX, ONNX_INT8)
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def default_backend() -> str:
+    """Backend configured for this deployment (EMBEDDING_BACKEND)"""
+    backend = os.getenv("EMBEDDING_BACKEND", SENTENCE_TRANSFORMERS).lower()
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown EMBEDDING_BACKEND '{backend}', using {SENTENCE_TRANSFORMERS}")
+        return SENTENCE_TRANSFORMERS
+    return backend
+
+
+def onnx_model_dir(model_name: str, model_path: str) -> Path:
+    """Directory holding the ONNX export of a model"""
+    return Path(model_path) / "onnx" / model_name.replace("/", "_")
+
+
+def mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """
+    Average token embeddings over non-padding tokens and L2-normalize
+
+    Matches the Pooling + Normalize modules of sentence-transformers models.
+
+    Args:
+        token_embeddings: Array of shape (batch, tokens, dim)
+        attention_mask: Array of shape (batch, tokens)
+
+    Returns:
+        float32 array of shape (batch, dim)
+    """
+    mask = attention_mask[..., np.newaxis].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    counts = np.clip(mask.sum(axis=1), 1e-9, None)
+    pooled = summed / counts
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+def cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """
+    Compare embeddings of the same texts from two backends
+
+    Args:
+        reference: Embeddings from the reference backend
+        candidate: Embeddings from the backend under test
+
+    Returns:
+        Mean, minimum and maximum-drift (1 - cosine) statistics
+    """
+    ref = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cand = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosine = (ref * cand).sum(axis=1)
+    return {
+        'mean_cosine': float(cosine.mean()),
+        'min_cosine': float(cosine.min()),
+        'max_drift': float(1.0 - cosine.min())
+    }
+
+
+class EmbeddingBackend(ABC):
+    """Runs an embedding model"""
+
+    name: str = ""
+
+    @abstractmethod
+    def encode(self, texts: List[str], batch_size: int = 32, convert_to_numpy: bool = True) -> np.ndarray:
+        """
+        Embed texts
+
+        Same call signature as SentenceTransformer.encode.
+
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per forward pass
+            convert_to_numpy: Accepted for compatibility; always numpy
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Reference PyTorch backend"""
+
+    name = SENTENCE_TRANSFORMERS
+
+    def __init__(self, model_name: str, model_path: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, cache_folder=model_path)
+
+    def encode(self, texts: List[str], batch_size: int = 32, convert_to_numpy: bool = True) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+class ONNXEmbeddingBackend(EmbeddingBackend):
+    """onnxruntime backend for exported (optionally int8-quantized) models"""
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = False,
+        intra_op_threads: Optional[int] = None,
+        thread_affinity: Optional[Sequence[int]] = None,
+        max_length: int = 256
+    ) -> None:
+        """
+        Load an exported model
+
+        Args:
+            model_dir: Directory written by export_onnx_model
+            quantized: Use the int8 model
+            intra_op_threads: Threads per forward pass (default: all cores)
+            thread_affinity: CPU ids to pin intra-op threads to
+            max_length: Maximum tokens per text
+
+        Raises:
+            ImportError: If onnxruntime or tokenizers are not installed
+            FileNotFoundError: If the model directory is incomplete
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.name = ONNX_INT8 if quantized else ONNX
+        model_dir = Path(model_dir)
+        model_file = model_dir / (ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+        tokenizer_file = model_dir / TOKENIZER_FILE
+        for path in (model_file, tokenizer_file):
+            if not path.exists():
+                raise FileNotFoundError(f"ONNX embedding model file missing: {path}")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if thread_affinity:
+            intra_op_threads = intra_op_threads or len(thread_affinity)
+            # The first intra-op thread is the caller; affinities cover the rest
+            affinities = ";".join(str(cpu + 1) for cpu in thread_affinity[1:intra_op_threads])
+            if affinities:
+                options.add_session_config_entry("session.intra_op_thread_affinities", affinities)
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.session = ort.InferenceSession(
+            str(model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_file))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        logger.info(f"Loaded {self.name} embedding model from {model_file}")
+
+    def encode(self, texts: List[str], batch_size: int = 32, convert_to_numpy: bool = True) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        batches = [
+            self._encode_batch(texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ]
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(batches)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Tokenize, run and pool one batch"""
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds: Dict[str, Any] = {
+            'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+            'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        feeds = {name: value for name, value in feeds.items() if name in self.input_names}
+        token_embeddings = self.session.run(None, feeds)[0]
+        return mean_pool(token_embeddings, feeds['attention_mask'])
+
+
+def create_backend(
+    backend: str,
+    model_name: str,
+    model_path: str,
+    **options: Any
+) -> EmbeddingBackend:
+    """
+    Create an embedding backend
+
+    Args:
+        backend: One of BACKENDS
+        model_name: Model name
+        model_path: Model cache directory
+        **options: ONNXEmbeddingBackend options (intra_op_threads, thread_affinity)
+
+    Returns:
+        Loaded backend
+
+    Raises:
+        ValueError: If the backend is unknown
+        ImportError: If the backend's packages are not installed
+    """
+    if backend == SENTENCE_TRANSFORMERS:
+        return SentenceTransformerBackend(model_name, model_path)
+    if backend in (ONNX, ONNX_INT8):
+        return ONNXEmbeddingBackend(
+            str(onnx_model_dir(model_name, model_path)),
+            quantized=backend == ONNX_INT8,
+            **options
+        )
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def export_onnx_model(model_name: str, model_path: str, quantize: bool = True) -> Path:
+    """
+    Export a sentence-transformers model to ONNX (and int8)
+
+    Requires torch, transformers and onnxruntime.
+
+    Args:
+        model_name: Model name
+        model_path: Model cache directory
+        quantize: Also write a dynamically int8-quantized model
+
+    Returns:
+        Directory containing the exported model
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    output_dir = onnx_model_dir(model_name, model_path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    tokenizer = AutoTokenizer.from_pretrained(hub_name, cache_dir=model_path)
+    model = AutoModel.from_pretrained(hub_name, cache_dir=model_path).eval()
+    tokenizer.backend_tokenizer.save(str(output_dir / TOKENIZER_FILE))
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "tokens"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "tokens"}
+    torch.onnx.export(
+        model,
+        tuple(sample[name] for name in input_names),
+        str(output_dir / ONNX_MODEL_FILE),
+        input_names=input_names,
+        output_names=["last_hidden_state"],
+        dynamic_axes=dynamic_axes,
+        opset_version=14
+    )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            str(output_dir / ONNX_MODEL_FILE),
+            str(output_dir / ONNX_INT8_MODEL_FILE),
+            weight_type=QuantType.QInt8
+        )
+
+    logger.info(f"Exported {model_name} to {output_dir}")
+    return output_dir
@@ -0,0 +1,287 @@
+"""
+Embedding Cache
+
+Two-tier, content-addressed cache for text embeddings: an in-memory LRU in
+front of an on-disk SQLite store. Entries are keyed by model name and the
+SHA-256 of the text, so embeddings survive restarts and are never shared
+between models.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = "embeddings.sqlite3"
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_CHUNK = 500
+
+
+@dataclass
+class EmbeddingCacheStats:
+    """Embedding cache counters."""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    disk_evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        """Hits in either tier."""
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary."""
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'evictions': self.evictions,
+            'disk_evictions': self.disk_evictions
+        }
+
+
+def content_hash(text: str) -> bytes:
+    """SHA-256 digest identifying a text."""
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+class EmbeddingCache:
+    """In-memory LRU backed by a persistent SQLite embedding store.
+
+    The disk tier is opened lazily on first use. If it cannot be opened
+    (e.g. a read-only model directory) the cache keeps working in memory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_entries: int = 10_000,
+        max_disk_entries: int = 1_000_000
+    ) -> None:
+        """
+        Initialize embedding cache
+
+        Args:
+            cache_dir: Directory of the on-disk store (None keeps the cache in memory)
+            max_memory_entries: Maximum embeddings held in the LRU
+            max_disk_entries: Maximum embeddings kept on disk; least recently
+                used embeddings are pruned beyond this
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.stats = EmbeddingCacheStats()
+
+        self._memory: "OrderedDict[Tuple[str, bytes], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_count = 0
+        self._disk_failed = False
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier on first use."""
+        if self._conn is not None or self._disk_failed or self.cache_dir is None:
+            return self._conn
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.cache_dir / DB_FILE), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    hash BLOB NOT NULL,
+                    vector BLOB NOT NULL,
+                    accessed REAL NOT NULL,
+                    PRIMARY KEY (model, hash)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings (accessed)"
+            )
+            conn.commit()
+            self._disk_count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._conn = conn
+            logger.info(
+                f"Opened embedding cache at {self.cache_dir} ({self._disk_count} embeddings)"
+            )
+        except (OSError, sqlite3.Error) as e:
+            self._disk_failed = True
+            logger.warning(f"Embedding cache disk tier unavailable, using memory only: {e}")
+        return self._conn
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for a batch of texts
+
+        Args:
+            model_name: Model that produced the embeddings
+            texts: Texts to look up
+
+        Returns:
+            One embedding per text, None where missing
+        """
+        keys = [(model_name, content_hash(text)) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: Dict[bytes, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = vector
+                    self.stats.memory_hits += 1
+                else:
+                    missing.setdefault(key[1], []).append(i)
+
+            conn = self._disk() if missing else None
+            if conn is not None:
+                found = self._read_disk(conn, model_name, list(missing))
+                for digest, vector in found.items():
+                    self._remember((model_name, digest), vector)
+                    for i in missing.pop(digest):
+                        results[i] = vector
+                        self.stats.disk_hits += 1
+
+            self.stats.misses += sum(len(positions) for positions in missing.values())
+
+        return results
+
+    def put_many(self, model_name: str, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Store embeddings for a batch of texts
+
+        Args:
+            model_name: Model that produced the embeddings
+            texts: Embedded texts
+            vectors: Embeddings, one row per text
+        """
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                vector = np.array(vector, dtype=np.float32)
+                vector.setflags(write=False)
+                key = (model_name, content_hash(text))
+                self._remember(key, vector)
+                rows.append((model_name, key[1], vector.tobytes(), now))
+
+            conn = self._disk()
+            if conn is None or not rows:
+                return
+
+            try:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (model, hash, vector, accessed) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._disk_count += conn.total_changes - before
+                if self._disk_count > self.max_disk_entries:
+                    self._prune_disk(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to write embedding cache: {e}")
+
+    def _read_disk(
+        self,
+        conn: sqlite3.Connection,
+        model_name: str,
+        digests: List[bytes]
+    ) -> Dict[bytes, np.ndarray]:
+        """Fetch embeddings from disk and refresh their access time."""
+        found: Dict[bytes, np.ndarray] = {}
+        try:
+            for start in range(0, len(digests), _LOOKUP_CHUNK):
+                chunk = digests[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for digest, blob in conn.execute(
+                    f"SELECT hash, vector FROM embeddings "
+                    f"WHERE model = ? AND hash IN ({placeholders})",
+                    [model_name, *chunk]
+                ):
+                    found[digest] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embeddings SET accessed = ? WHERE model = ? AND hash = ?",
+                    [(now, model_name, digest) for digest in found]
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read embedding cache: {e}")
+        return found
+
+    def _remember(self, key: Tuple[str, bytes], vector: np.ndarray) -> None:
+        """Insert into the memory LRU, evicting the least recently used."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _prune_disk(self, conn: sqlite3.Connection) -> None:
+        """Delete the least recently used embeddings beyond the disk cap."""
+        excess = self._disk_count - self.max_disk_entries
+        conn.execute(
+            "DELETE FROM embeddings WHERE (model, hash) IN "
+            "(SELECT model, hash FROM embeddings ORDER BY accessed LIMIT ?)",
+            (excess,)
+        )
+        self._disk_count -= excess
+        self.stats.disk_evictions += excess
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get cache statistics
+
+        Returns:
+            Hit/miss counters and tier sizes
+        """
+        stats = self.stats.to_dict()
+        stats['memory_entries'] = len(self._memory)
+        stats['disk_entries'] = self._disk_count
+        stats['persistent'] = self._conn is not None
+        return stats
+
+    def clear(self) -> None:
+        """Remove all cached embeddings from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            conn = self._disk()
+            if conn is not None:
+                conn.execute("DELETE FROM embeddings")
+                conn.commit()
+                self._disk_count = 0
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
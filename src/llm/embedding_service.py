@@ -0,0 +1,294 @@
+"""
+Embedding Service
+
+In-process micro-batching front end for EmbeddingModel. Concurrent encode
+requests from the UI, the metadata indexer and the LLM manager are queued
+and coalesced into batched forward passes, bounded by a batch size and a
+deadline, on a fixed number of worker threads.
+"""
+
+from typing import Any, Dict, List, Optional, Union
+from concurrent.futures import Future
+from dataclasses import dataclass
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _EncodeRequest:
+    """A caller's texts waiting for a batch"""
+    texts: List[str]
+    future: Future
+    enqueued_at: float
+
+
+@dataclass
+class EmbeddingServiceStats:
+    """Embedding service counters"""
+    requests: int = 0
+    texts: int = 0
+    unique_texts: int = 0
+    batches: int = 0
+    max_batch_size: int = 0
+    peak_queue_depth: int = 0
+    encode_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    errors: int = 0
+
+    @property
+    def average_batch_size(self) -> float:
+        """Average texts per forward pass"""
+        return self.unique_texts / self.batches if self.batches else 0.0
+
+    @property
+    def average_wait_ms(self) -> float:
+        """Average time a request waited before its batch started"""
+        return self.wait_seconds / self.requests * 1000 if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary"""
+        return {
+            'requests': self.requests,
+            'texts': self.texts,
+            'unique_texts': self.unique_texts,
+            'batches': self.batches,
+            'average_batch_size': self.average_batch_size,
+            'max_batch_size': self.max_batch_size,
+            'peak_queue_depth': self.peak_queue_depth,
+            'average_wait_ms': self.average_wait_ms,
+            'encode_seconds': self.encode_seconds,
+            'errors': self.errors
+        }
+
+
+class EmbeddingService:
+    """Coalesces concurrent encode calls into batched forward passes"""
+
+    def __init__(
+        self,
+        model: Any,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        num_workers: int = 1,
+        intra_op_threads: Optional[int] = None
+    ) -> None:
+        """
+        Initialize embedding service
+
+        Args:
+            model: EmbeddingModel (anything with encode(texts, batch_size))
+            max_batch_size: Maximum texts per forward pass
+            max_wait_ms: Longest a request waits for others to join its batch
+            num_workers: Worker threads running forward passes
+            intra_op_threads: Threads used inside one forward pass (torch),
+                None leaves the library default
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.num_workers = num_workers
+        self.intra_op_threads = intra_op_threads
+        self.stats = EmbeddingServiceStats()
+
+        self._queue: "queue.Queue[Optional[_EncodeRequest]]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting for a batch"""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start the worker threads (called on first request)"""
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        """Start workers; caller holds the lock"""
+        if self._workers:
+            return
+
+        if self.intra_op_threads is not None:
+            self._limit_intra_op_threads(self.intra_op_threads)
+
+        for i in range(self.num_workers):
+            worker = threading.Thread(
+                target=self._run,
+                args=(self._queue,),
+                name=f"embedding-service-{i}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+        logger.info(
+            f"Embedding service started ({self.num_workers} workers, "
+            f"batch<={self.max_batch_size}, wait<={self.max_wait_ms}ms)"
+        )
+
+    def submit(self, texts: Union[str, List[str]]) -> Future:
+        """
+        Queue texts for encoding
+
+        Args:
+            texts: Single text or list of texts
+
+        Returns:
+            Future resolving to the embedding matrix
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+
+        future: Future = Future()
+        with self._lock:
+            self._start_locked()
+            self._queue.put(_EncodeRequest(list(texts), future, time.perf_counter()))
+            depth = self._queue.qsize()
+
+        if depth > self.stats.peak_queue_depth:
+            self.stats.peak_queue_depth = depth
+        return future
+
+    def encode(self, texts: Union[str, List[str]], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Encode texts, blocking until their batch has run
+
+        Drop-in replacement for EmbeddingModel.encode; batch_size is ignored
+        because batching is decided by the service.
+
+        Args:
+            texts: Single text or list of texts
+            batch_size: Ignored
+
+        Returns:
+            numpy array of embeddings
+        """
+        return self.submit(texts).result()
+
+    async def encode_async(self, texts: Union[str, List[str]]) -> np.ndarray:
+        """
+        Encode texts without blocking the event loop
+
+        Args:
+            texts: Single text or list of texts
+
+        Returns:
+            numpy array of embeddings
+        """
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def _run(self, requests: "queue.Queue[Optional[_EncodeRequest]]") -> None:
+        """Worker loop: collect a batch, encode it, resolve its requests"""
+        while True:
+            first = requests.get()
+            if first is None:
+                return
+
+            batch = [first]
+            size = len(first.texts)
+            deadline = first.enqueued_at + self.max_wait_ms / 1000
+            stop = False
+
+            while size < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    request = requests.get(timeout=timeout) if timeout > 0 else requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                size += len(request.texts)
+
+            self._encode_batch(batch)
+            if stop:
+                return
+
+    def _encode_batch(self, batch: List[_EncodeRequest]) -> None:
+        """Run one forward pass for a batch of requests"""
+        started = time.perf_counter()
+        # Cancelled requests are dropped before the forward pass
+        live = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        unique = list(dict.fromkeys(text for request in live for text in request.texts))
+
+        try:
+            if unique:
+                embeddings = np.asarray(self.model.encode(unique, batch_size=self.max_batch_size))
+                # Rows are split between callers by position
+                if len(embeddings) != len(unique):
+                    raise ValueError(
+                        f"Embedding model returned {len(embeddings)} vectors for {len(unique)} texts"
+                    )
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Batched encoding of {len(unique)} texts failed: {e}")
+            for request in live:
+                request.future.set_exception(e)
+            return
+
+        rows = {text: i for i, text in enumerate(unique)}
+        for request in live:
+            if request.texts:
+                request.future.set_result(embeddings[[rows[text] for text in request.texts]])
+            else:
+                request.future.set_result(np.empty((0, 0), dtype=np.float32))
+
+        stats = self.stats
+        stats.requests += len(batch)
+        stats.texts += sum(len(request.texts) for request in batch)
+        stats.unique_texts += len(unique)
+        stats.batches += 1
+        stats.max_batch_size = max(stats.max_batch_size, len(unique))
+        stats.encode_seconds += time.perf_counter() - started
+        stats.wait_seconds += sum(started - request.enqueued_at for request in batch)
+
+    @staticmethod
+    def _limit_intra_op_threads(threads: int) -> None:
+        """Cap threads used by a single forward pass"""
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            logger.debug("torch not installed, intra-op thread limit not applied")
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get service statistics
+
+        Returns:
+            Batch, queue and latency metrics
+        """
+        stats = self.stats.to_dict()
+        stats['queue_depth'] = self.queue_depth
+        stats['workers'] = len(self._workers)
+        return stats
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """
+        Stop the workers after serving queued requests
+
+        The service restarts on the next request.
+
+        Args:
+            timeout: Seconds to wait for each worker
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+            requests, self._queue = self._queue, queue.Queue()
+            # Sentinels queue behind pending requests, so those are still served
+            for _ in workers:
+                requests.put(None)
+
+        if not workers:
+            return
+        for worker in workers:
+            worker.join(timeout)
+        logger.info("Embedding service stopped")
@@ -4,24 +4,56 @@ Embedding Model Wrapper
 Provides text embedding functionality for semantic search and similarity.
 """
 
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 import numpy as np
 import logging
 
+from src.llm.embedding_backends import SENTENCE_TRANSFORMERS, create_backend, default_backend
+from src.llm.embedding_cache import EmbeddingCache
+from src.llm.similarity import CandidateMatrix, SimilarityEngine
+
 logger = logging.getLogger(__name__)
 
 
 class EmbeddingModel:
     """Wrapper for sentence transformer embedding models"""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", model_path: str = "/data0/models") -> None:
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", model_path: str = "/data0/models",
+                 cache: Optional[EmbeddingCache] = None, backend: Optional[str] = None,
+                 backend_options: Optional[Dict[str, Any]] = None) -> None:
         self.model_name = model_name
         self.model_path = model_path
         self.model = None
         self.initialized = False
 
+        # Inference backend (EMBEDDING_BACKEND): sentence-transformers, onnx or onnx-int8
+        self.backend = backend or default_backend()
+        self.backend_options = backend_options or {}
+
+        # Optional embedding cache; mock embeddings are never cached
+        self.cache = cache
+        self.is_mock = False
+
+        # Normalized candidate matrices for find_most_similar
+        self.similarity_engine = SimilarityEngine()
+
     def initialize(self) -> bool:
         """Initialize embedding model"""
+        if self.backend != SENTENCE_TRANSFORMERS:
+            try:
+                self.model = create_backend(
+                    self.backend, self.model_name, self.model_path, **self.backend_options
+                )
+                self.initialized = True
+                logger.info(f"Embedding model initialized: {self.model_name} ({self.backend})")
+                return True
+            except (ImportError, FileNotFoundError) as e:
+                logger.warning(
+                    f"{self.backend} embedding backend unavailable ({e}), "
+                    f"falling back to {SENTENCE_TRANSFORMERS}"
+                )
+                self.backend = SENTENCE_TRANSFORMERS
+
         try:
             from sentence_transformers import SentenceTransformer
 
@@ -35,6 +67,7 @@ class EmbeddingModel:
         except ImportError:
             logger.warning("sentence-transformers not installed, using mock embeddings")
             self.model = self._create_mock_model()
+            self.is_mock = True
             self.initialized = True
             return True
         except Exception as e:
@@ -56,6 +89,8 @@ class EmbeddingModel:
         """
         Generate embeddings for text(s)
 
+        With a cache, only texts not seen before (by this model) are encoded.
+
         Args:
             texts: Single text or list of texts
             batch_size: Batch size for encoding
@@ -70,6 +105,9 @@ class EmbeddingModel:
             if isinstance(texts, str):
                 texts = [texts]
 
+            if self.cache is not None and not self.is_mock and texts:
+                return self._encode_cached(texts, batch_size)
+
             embeddings = self.model.encode(
                 texts,
                 batch_size=batch_size,
@@ -80,6 +118,45 @@ class EmbeddingModel:
             logger.error(f"Encoding failed: {e}")
             raise
 
+    @property
+    def cache_namespace(self) -> str:
+        """Cache key prefix; quantized backends do not share reference embeddings"""
+        if self.backend == SENTENCE_TRANSFORMERS:
+            return self.model_name
+        return f"{self.model_name}:{self.backend}"
+
+    def _encode_cached(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Encode texts through the embedding cache"""
+        cached = self.cache.get_many(self.cache_namespace, texts)
+
+        # Encode each distinct missing text once
+        missing = list(dict.fromkeys(
+            text for text, vector in zip(texts, cached) if vector is None
+        ))
+        if missing:
+            embeddings = np.asarray(self.model.encode(
+                missing,
+                batch_size=batch_size,
+                convert_to_numpy=True
+            ), dtype=np.float32)
+            self.cache.put_many(self.cache_namespace, missing, embeddings)
+            encoded = dict(zip(missing, embeddings))
+            cached = [
+                vector if vector is not None else encoded[text]
+                for text, vector in zip(texts, cached)
+            ]
+
+        return np.vstack(cached)
+
+    def cache_stats(self) -> Optional[dict]:
+        """
+        Get embedding cache statistics
+
+        Returns:
+            Cache statistics, or None without a cache
+        """
+        return self.cache.get_stats() if self.cache is not None else None
+
     def similarity(self, text1: str, text2: str) -> float:
         """
         Calculate cosine similarity between two texts
@@ -100,14 +177,23 @@ class EmbeddingModel:
 
         return float(dot_product / (norm1 * norm2))
 
-    def find_most_similar(self, query: str, candidates: List[str], top_k: int = 5) -> List[tuple]:
+    def find_most_similar(self, query: str, candidates: List[str], top_k: int = 5,
+                          candidate_set: Optional[str] = None,
+                          encoder: Optional[Callable[[List[str]], np.ndarray]] = None) -> List[tuple]:
         """
         Find most similar texts to query
 
+        Normalized candidate embeddings are cached, so repeated lookups
+        against the same candidates only encode the query.
+
         Args:
             query: Query text
             candidates: List of candidate texts
             top_k: Number of top results to return
+            candidate_set: Stable name for a growing candidate list (e.g. query
+                history); new candidates are appended to its cached matrix
+            encoder: Encodes the query and uncached candidates (e.g. a shared
+                EmbeddingService's encode); defaults to this model's encode
 
         Returns:
             List of (text, similarity_score) tuples
@@ -115,27 +201,23 @@ class EmbeddingModel:
         if not candidates:
             return []
 
-        # Encode all texts
-        all_texts = [query] + candidates
-        embeddings = self.encode(all_texts)
+        entry, missing = self.similarity_engine.lookup(candidates, candidate_set)
+        start = len(entry.texts) if entry is not None else 0
 
-        query_embedding = embeddings[0]
-        candidate_embeddings = embeddings[1:]
+        # Query and uncached candidates are encoded in one batch
+        embeddings = (encoder or self.encode)([query] + missing)
 
-        # Calculate similarities
-        similarities = []
-        for i, candidate_emb in enumerate(candidate_embeddings):
-            dot_product = np.dot(query_embedding, candidate_emb)
-            norm1 = np.linalg.norm(query_embedding)
-            norm2 = np.linalg.norm(candidate_emb)
-            similarity = float(dot_product / (norm1 * norm2))
-            similarities.append((candidates[i], similarity))
+        if entry is None:
+            entry = CandidateMatrix(embeddings.shape[1], capacity=max(len(missing), 64))
+            self.similarity_engine.store(candidates, entry, candidate_set)
+        entry.extend(missing, embeddings[1:], start=start)
 
-        # Sort by similarity and return top_k
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:top_k]
+        return entry.rank(embeddings[0], top_k)
 
     def cleanup(self):
         """Cleanup resources"""
         self.model = None
         self.initialized = False
+        self.similarity_engine.clear()
+        if self.cache is not None:
+            self.cache.close()
@@ -10,6 +10,7 @@ import re
 import json
 import hashlib
 import logging
+import os
 from enum import Enum
 
 from src.llm.providers import (
@@ -17,6 +18,8 @@ from src.llm.providers import (
     OpenAIProvider, AnthropicProvider, MockProvider, LLMProviderFactory
 )
 from src.llm.embeddings import EmbeddingModel
+from src.llm.embedding_cache import EmbeddingCache
+from src.llm.embedding_service import EmbeddingService
 
 logger = logging.getLogger(__name__)
 
@@ -60,10 +63,19 @@ class LocalLLMManager:
     """Manages all LLM operations for AI-Shell with dual provider support"""
 
     def __init__(self, provider: Optional[LocalLLMProvider] = None,
-                 model_path: str = "/data0/models") -> None:
+                 model_path: str = "/data0/models",
+                 embedding_cache_dir: Optional[str] = None) -> None:
         self.model_path = model_path
         self.provider = provider
-        self.embedding_model = EmbeddingModel(model_path=model_path)
+
+        # Embeddings persist across sessions under the model directory by default
+        self.embedding_cache = EmbeddingCache(
+            embedding_cache_dir or os.path.join(model_path, "embedding_cache")
+        )
+        self.embedding_model = EmbeddingModel(model_path=model_path, cache=self.embedding_cache)
+
+        # Shared micro-batching front end for concurrent embedding callers
+        self.embedding_service = EmbeddingService(self.embedding_model)
 
         # Per-function providers for dual mode (self-hosted + public APIs)
         self.intent_provider: Optional[LocalLLMProvider] = None
@@ -77,6 +89,17 @@ class LocalLLMManager:
 
         self.initialized = False
 
+    @property
+    def embedding_model(self) -> EmbeddingModel:
+        """Embedding model; the shared embedding service encodes with it"""
+        return self._embedding_model
+
+    @embedding_model.setter
+    def embedding_model(self, model: EmbeddingModel) -> None:
+        self._embedding_model = model
+        if getattr(self, 'embedding_service', None) is not None:
+            self.embedding_service.model = model
+
     def initialize(self, provider_type: str = "ollama", model_name: str = "llama2", api_key: Optional[str] = None) -> bool:
         """
         Initialize LLM manager with specified provider
@@ -398,6 +421,9 @@ Respond with JSON in this format:
         """
         Generate embeddings for texts
 
+        Encoding goes through the shared embedding service, so concurrent
+        callers share batched forward passes.
+
         Args:
             texts: List of texts to embed
 
@@ -407,13 +433,16 @@ Respond with JSON in this format:
         if not self.initialized:
             raise RuntimeError("LLM Manager not initialized")
 
-        embeddings = self.embedding_model.encode(texts)
+        embeddings = self.embedding_service.encode(texts)
         return embeddings.tolist()
 
     def find_similar_queries(self, query: str, query_history: List[str], top_k: int = 5) -> List[Tuple[str, float]]:
         """
         Find similar queries from history
 
+        The history's normalized embeddings are cached and extended as it
+        grows, so each call only encodes the query and new history entries.
+
         Args:
             query: Current query
             query_history: List of historical queries
@@ -425,7 +454,10 @@ Respond with JSON in this format:
         if not self.initialized:
             raise RuntimeError("LLM Manager not initialized")
 
-        return self.embedding_model.find_most_similar(query, query_history, top_k)
+        return self.embedding_model.find_most_similar(
+            query, query_history, top_k, candidate_set="query_history",
+            encoder=self.embedding_service.encode
+        )
 
     def explain_query(self, query: str, context: Optional[str] = None) -> str:
         """
@@ -506,6 +538,7 @@ Provide 3-5 specific optimization suggestions. Format as a JSON array of strings
         """Cleanup resources"""
         if self.provider:
             self.provider.cleanup()
+        self.embedding_service.close()
         if self.embedding_model:
             self.embedding_model.cleanup()
 
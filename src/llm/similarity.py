@@ -0,0 +1,289 @@
+"""
+Similarity Engine
+
+Vectorized cosine-similarity ranking over cached candidate matrices.
+Candidate embeddings are L2-normalized once and kept in a contiguous
+matrix, so ranking a query is a single matrix-vector product followed by
+an argpartition top-k selection.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize vectors row by row
+
+    Args:
+        vectors: Matrix of shape (n, dim) or a single vector
+
+    Returns:
+        Contiguous float32 matrix of unit rows (zero rows stay zero)
+    """
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2, order='C')
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Indices of the top_k highest scores, best first
+
+    Args:
+        scores: 1-D score array
+        top_k: Number of indices to return
+
+    Returns:
+        Index array sorted by descending score
+    """
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if top_k < len(scores):
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+class CandidateMatrix:
+    """Normalized embeddings of a candidate list, growable in place
+
+    Each distinct text's row is stored once. ``texts`` is the current
+    candidate list; when it changes, only new texts get rows and the list
+    is pointed at the stored ones, so no row is copied. Rows of dropped
+    texts are compacted away once they outnumber the live ones.
+    """
+
+    def __init__(self, dimension: int, capacity: int = 64) -> None:
+        self.texts: List[str] = []
+        self._buffer = np.empty((capacity, dimension), dtype=np.float32)
+        self._size = 0
+        self._rows: Dict[str, int] = {}
+        # Row of each text, or None while text i is row i
+        self._order: Optional[np.ndarray] = None
+        # What rank() reads, swapped as one tuple so it never mixes states
+        self._view: Tuple[np.ndarray, int, Optional[np.ndarray], List[str]] = (
+            self._buffer, 0, None, self.texts
+        )
+        self._lock = threading.Lock()
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Normalized candidate matrix (one row per text)"""
+        buffer, size, order, _ = self._view
+        return buffer[:size] if order is None else buffer[order]
+
+    @property
+    def dimension(self) -> int:
+        return self._buffer.shape[1]
+
+    def _publish(self) -> None:
+        """Expose the current state to rank(); caller holds the lock"""
+        self._view = (self._buffer, self._size, self._order, self.texts)
+
+    def extend(self, texts: Sequence[str], vectors: np.ndarray, start: Optional[int] = None) -> None:
+        """
+        Append candidates
+
+        Args:
+            texts: Candidate texts
+            vectors: Their (unnormalized) embeddings
+            start: Expected current size; the append is skipped if another
+                caller already extended the matrix past it
+        """
+        if not texts:
+            return
+
+        with self._lock:
+            if start is not None and start != len(self.texts):
+                return
+
+            size = self._size
+            needed = size + len(texts)
+            if needed > len(self._buffer):
+                # Grow geometrically so appends are amortized O(1)
+                buffer = np.empty(
+                    (max(needed, 2 * len(self._buffer)), self.dimension), dtype=np.float32
+                )
+                buffer[:size] = self._buffer[:size]
+                self._buffer = buffer
+
+            self._buffer[size:needed] = normalize_rows(vectors)
+            for row, text in enumerate(texts, size):
+                self._rows.setdefault(text, row)
+            self._size = needed
+            if self._order is not None:
+                self._order = np.concatenate([self._order, np.arange(size, needed)])
+            # Rows are published before texts grow, so readers never see unset rows
+            self._publish()
+            self.texts.extend(texts)
+
+    def missing_suffix(self, texts: Sequence[str]) -> Optional[int]:
+        """
+        Check whether texts extend the cached candidates
+
+        Args:
+            texts: Current candidate list
+
+        Returns:
+            Index of the first uncached text, or None if the cache is stale
+        """
+        size = len(self.texts)
+        if len(texts) < size:
+            return None
+        prefix = texts if len(texts) == size else texts[:size]
+        if not isinstance(prefix, list):
+            prefix = list(prefix)
+        return size if prefix == self.texts else None
+
+    def retarget(self, texts: Sequence[str]) -> List[str]:
+        """
+        Point the matrix at a changed candidate list, reusing stored rows
+
+        Texts with a stored row keep their list order; the others are
+        returned for the caller to embed and extend() with.
+
+        Args:
+            texts: New candidate list
+
+        Returns:
+            Texts that still need embeddings
+        """
+        with self._lock:
+            rows = self._rows
+            known = [text for text in texts if text in rows]
+            missing = [text for text in texts if text not in rows]
+            order = np.fromiter((rows[text] for text in known), dtype=np.int64, count=len(known))
+
+            if self._size > 2 * len(known) + 64:
+                # Mostly dropped texts: keep only the live rows
+                buffer = np.empty((max(len(texts), 64), self.dimension), dtype=np.float32)
+                buffer[:len(known)] = self._buffer[order]
+                self._buffer = buffer
+                self._size = len(known)
+                self._rows = {}
+                for row, text in enumerate(known):
+                    self._rows.setdefault(text, row)
+                order = None
+            elif len(order) == self._size and np.array_equal(order, np.arange(self._size)):
+                order = None
+
+            self._order = order
+            self.texts = known
+            self._publish()
+        return missing
+
+    def rank(self, query_vector: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
+        """
+        Rank candidates by cosine similarity to a query embedding
+
+        Args:
+            query_vector: Query embedding
+            top_k: Number of results
+
+        Returns:
+            List of (text, similarity) tuples, most similar first
+        """
+        buffer, size, order, texts = self._view
+        if not size:
+            return []
+        scores = buffer[:size] @ normalize_rows(query_vector)[0]
+        if order is not None:
+            scores = scores[order]
+        if not len(scores):
+            return []
+        return [(texts[i], float(scores[i])) for i in top_k_indices(scores, top_k)]
+
+
+class SimilarityEngine:
+    """LRU of candidate matrices keyed by name or by candidate list"""
+
+    def __init__(self, max_candidate_sets: int = 16) -> None:
+        self.max_candidate_sets = max_candidate_sets
+        self._sets: "OrderedDict[object, CandidateMatrix]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(
+        self,
+        candidates: Sequence[str],
+        key: Optional[str] = None
+    ) -> Tuple[Optional[CandidateMatrix], List[str]]:
+        """
+        Find the cached matrix for a candidate list
+
+        Named sets (e.g. a growing query history) are extended incrementally
+        when the candidate list only gained new entries. When entries were
+        also dropped or reordered (a bounded, rotating history) the cached
+        rows of the remaining texts are reused and only new texts need
+        embeddings. Unnamed sets are keyed by their full contents.
+
+        Args:
+            candidates: Candidate texts
+            key: Optional stable name for the candidate set
+
+        Returns:
+            (cached matrix or None, texts that still need embeddings)
+        """
+        cache_key = key if key is not None else tuple(candidates)
+        with self._lock:
+            entry = self._sets.get(cache_key)
+            if entry is not None:
+                start = entry.missing_suffix(candidates)
+                if start is not None:
+                    self._sets.move_to_end(cache_key)
+                    self.hits += 1
+                    return entry, list(candidates[start:])
+                if key is not None:
+                    missing = entry.retarget(candidates)
+                    self._sets.move_to_end(cache_key)
+                    self.hits += 1
+                    return entry, missing
+                del self._sets[cache_key]
+
+            self.misses += 1
+            return None, list(candidates)
+
+    def store(
+        self,
+        candidates: Sequence[str],
+        entry: CandidateMatrix,
+        key: Optional[str] = None
+    ) -> None:
+        """
+        Cache a candidate matrix
+
+        Args:
+            candidates: Candidate texts the matrix was built from
+            entry: Candidate matrix
+            key: Optional stable name for the candidate set
+        """
+        cache_key = key if key is not None else tuple(candidates)
+        with self._lock:
+            self._sets[cache_key] = entry
+            self._sets.move_to_end(cache_key)
+            while len(self._sets) > self.max_candidate_sets:
+                self._sets.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached candidate matrices"""
+        with self._lock:
+            self._sets.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Cache statistics"""
+        return {
+            'candidate_sets': len(self._sets),
+            'candidates': sum(len(entry.texts) for entry in self._sets.values()),
+            'hits': self.hits,
+            'misses': self.misses
+        }
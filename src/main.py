@@ -172,9 +172,17 @@ class AIShell:
 
             # Initialize metadata cache with FAISS backend
             try:
+                # Schema objects are embedded through the LLM manager's shared
+                # service; mock embeddings are random, so hash vectors are kept
+                embedding_model = self.llm_manager.embedding_model
                 self.metadata_cache = DatabaseMetadataCache(
                     cache_dir=self.cache_dir,
-                    dimension=self.config.get('vector.dimension', 384)
+                    dimension=self.config.get('vector.dimension', 384),
+                    embedding_service=(
+                        self.llm_manager.embedding_service
+                        if embedding_model.initialized and not embedding_model.is_mock
+                        else None
+                    )
                 )
                 # Load existing cache from disk
                 await self.metadata_cache.load_from_disk()
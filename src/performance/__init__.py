@@ -7,6 +7,8 @@ Provides caching, monitoring, and optimization capabilities.
 from .optimizer import PerformanceOptimizer
 from .monitor import PerformanceMonitor
 from .cache import QueryCache
+from .cache_backends import FileCacheBackend, RedisCacheBackend, SharedCacheBackend
+from .sharded_cache import ShardedQueryCache
 
 # Alias for backward compatibility
 SystemMonitor = PerformanceMonitor
@@ -16,4 +18,8 @@ __all__ = [
     'SystemMonitor',
     'PerformanceMonitor',
     'QueryCache',
+    'ShardedQueryCache',
+    'SharedCacheBackend',
+    'RedisCacheBackend',
+    'FileCacheBackend',
 ]
@@ -6,14 +6,115 @@ Provides intelligent caching of database query results.
 
 import asyncio
 import hashlib
+import heapq
+import json
 import logging
-from typing import Any, Dict, Optional, Tuple
+import pickle
+import sys
+import time
+import types
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from pathlib import Path
+
+from .cache_backends import FileCacheBackend, RedisCacheBackend, SharedCacheBackend
+from .compression import CODECS, CompressionStats, choose_codec, codec_for_tag
+from .sql_tables import normalize_table, referenced_tables, written_tables
 
 logger = logging.getLogger(__name__)
 
+EVICTION_POLICIES = ('gdsf', 'lru')
+
+# L2 tag of entries whose tables are unknown; every write drops them
+_UNTRACKED_TAG = '*'
+
+# Shared by every value that references them, so never charged to an entry
+_SHARED_TYPES = (
+    type, types.ModuleType, types.FunctionType,
+    types.BuiltinFunctionType, types.MethodType
+)
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def estimate_size(value: Any) -> int:
+    """Deep size of a value in bytes.
+
+    Follows containers, instance dictionaries and slots. Objects reachable
+    through several references (e.g. column names shared by row dicts) are
+    counted once. Numpy arrays owning their data report the buffer through
+    sys.getsizeof.
+
+    Args:
+        value: Value to measure
+
+    Returns:
+        Approximate bytes held by the value
+    """
+    getsizeof = sys.getsizeof
+    seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += getsizeof(obj)
+
+        if isinstance(obj, dict):
+            members = [*obj.keys(), *obj.values()]
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            members = obj
+        elif isinstance(obj, _ATOMIC_TYPES):
+            continue
+        else:
+            members = []
+            attrs = getattr(obj, '__dict__', None)
+            if attrs is not None:
+                members.append(attrs)
+            for cls in type(obj).__mro__:
+                slots = cls.__dict__.get('__slots__', ())
+                for slot in (slots,) if isinstance(slots, str) else slots:
+                    if hasattr(obj, slot):
+                        members.append(getattr(obj, slot))
+
+        # Size scalar members inline; rows are mostly scalars
+        for member in members:
+            if type(member) in _ATOMIC_TYPES:
+                if id(member) not in seen:
+                    seen.add(id(member))
+                    total += getsizeof(member)
+            else:
+                stack.append(member)
+    return total
+
+
+def notification_tables(payload: str) -> Optional[List[str]]:
+    """Tables named by a change notification payload.
+
+    Args:
+        payload: Table name, comma-separated names, or a JSON object with
+            "table" or "tables"
+
+    Returns:
+        Table names, or None if the payload names none
+    """
+    try:
+        message = json.loads(payload) if payload else None
+    except ValueError:
+        message = payload
+    if isinstance(message, dict):
+        message = message.get('tables', message.get('table'))
+    if isinstance(message, str):
+        tables = [name.strip() for name in message.split(',') if name.strip()]
+    elif isinstance(message, list):
+        tables = [str(name) for name in message]
+    else:
+        tables = []
+    return tables or None
+
 
 @dataclass
 class CacheEntry:
@@ -25,9 +126,21 @@ class CacheEntry:
     access_count: int
     ttl_seconds: Optional[int]
     size_bytes: int
+    # Eviction rank and the position of the entry's latest heap item
+    priority: float = 0.0
+    sequence: int = 0
+    # Codec of a compressed value (the value is then the pickled bytes)
+    codec: Optional[str] = None
+    # Tables the cached result was read from (None = unknown)
+    tables: Optional[FrozenSet[str]] = None
+    # time.monotonic() deadline; entries built without one expire by
+    # created_at + ttl_seconds
+    expires_at: Optional[float] = None
 
     def is_expired(self) -> bool:
         """Check if entry is expired."""
+        if self.expires_at is not None:
+            return time.monotonic() >= self.expires_at
         if self.ttl_seconds is None:
             return False
         expiry_time = self.created_at + timedelta(seconds=self.ttl_seconds)
@@ -39,10 +152,40 @@ class CacheEntry:
 
 
 class QueryCache:
-    """Intelligent query result cache with LRU eviction."""
+    """Intelligent query result cache with size-aware eviction.
+
+    Entries are sized deeply and bounded by both ``max_size`` and
+    ``max_memory_mb``. The default ``gdsf`` policy (Greedy-Dual-Size-
+    Frequency) evicts the entry with the lowest ``frequency / size``
+    first, so one huge result read once cannot push out many small hot
+    ones; ``config['eviction_policy'] = 'lru'`` restores plain LRU.
+
+    With ``backend="redis"`` or ``backend="file"`` the in-process cache is
+    an L1 in front of a shared L2: writes go to both and are broadcast so
+    other instances drop their L1 copy, and L1 misses are filled from the
+    L2. L2 misses are remembered for ``negative_ttl`` seconds so repeated
+    misses do not round-trip to the shared store.
+
+    With ``compression=True`` values of at least ``compression_threshold``
+    bytes are pickled and compressed, in L1 and in the L2, and the memory
+    limit counts their compressed size. Entries that do not shrink by at
+    least ``compression_min_saving`` are stored as they are.
+
+    Each entry records the tables it was read from, given to ``set`` or
+    parsed from a SQL key, and ``invalidate_tables`` / ``invalidate_write``
+    drop exactly the entries that read a changed table. Entries whose
+    tables are unknown are dropped by every write.
+
+    Expiry uses monotonic deadlines kept in a min-heap, so expired entries
+    are reclaimed in O(expired) work: before evicting live entries to
+    make room, and by ``cleanup_expired``, which costs one comparison
+    when nothing has expired.
+    """
 
     def __init__(self, backend: str = "memory", ttl: int = 300, compression: bool = False,
-                 track_stats: bool = False, config: Optional[Dict[str, Any]] = None) -> None:
+                 track_stats: bool = False, config: Optional[Dict[str, Any]] = None,
+                 redis_url: Optional[str] = None,
+                 shared: Optional[SharedCacheBackend] = None) -> None:
         # Support both old config dict and new kwargs interface
         self.config = config or {}
         self.backend = backend
@@ -52,6 +195,23 @@ class QueryCache:
 
         self.max_size = self.config.get('max_size', 1000)
         self.max_memory_mb = self.config.get('max_memory_mb', 100)
+        self.eviction_policy = self.config.get('eviction_policy', 'gdsf')
+        if self.eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(
+                f"Unknown eviction policy '{self.eviction_policy}', "
+                f"expected one of {EVICTION_POLICIES}"
+            )
+
+        self.compression_threshold = self.config.get('compression_threshold', 16 * 1024)
+        self.compression_codec = self.config.get('compression_codec', 'auto')
+        self.compression_dense_bytes = self.config.get('compression_dense_bytes', 1024 * 1024)
+        self.compression_min_saving = self.config.get('compression_min_saving', 0.1)
+        if self.compression_codec != 'auto' and self.compression_codec not in CODECS:
+            raise ValueError(
+                f"Compression codec '{self.compression_codec}' is not available, "
+                f"expected 'auto' or one of {sorted(CODECS)}"
+            )
+        self.compression_stats = CompressionStats()
 
         self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self._lock = asyncio.Lock()
@@ -59,7 +219,53 @@ class QueryCache:
         self._misses = 0
         self._evictions = 0
         self._total_size_bytes = 0
-        self._redis_client = None
+
+        # Shared L2 and the L2 keys recently found missing
+        self.negative_ttl = self.config.get('negative_ttl', 5.0)
+        self._l2 = shared or self._create_backend(redis_url)
+        self._negative: OrderedDict[str, float] = OrderedDict()
+        self._l2_hits = 0
+        self._l2_misses = 0
+        self._negative_hits = 0
+        self._l2_errors = 0
+        self._remote_invalidations = 0
+
+        # Table -> keys of the entries that read it, and keys whose tables
+        # are unknown
+        self._table_index: Dict[str, Set[str]] = {}
+        self._untracked: Set[str] = set()
+        self._table_invalidations = 0
+
+        # GDSF min-heap of (priority, sequence, key); items superseded by a
+        # later access or removal are skipped when popped
+        self._priorities: List[Tuple[float, int, str]] = []
+        self._inflation = 0.0
+        self._sequence = 0
+
+        # Min-heap of (reclaim deadline, key); items whose entry was
+        # replaced or removed are skipped when popped
+        self._expiry: List[Tuple[float, str]] = []
+        self._expirations = 0
+
+    @property
+    def max_bytes(self) -> int:
+        """Memory limit in bytes."""
+        return int(self.max_memory_mb * 1024 * 1024)
+
+    def _create_backend(self, redis_url: Optional[str]) -> Optional[SharedCacheBackend]:
+        """Create the L2 named by ``backend`` (None for memory only)."""
+        if self.backend == "memory":
+            return None
+        if self.backend == "redis":
+            return RedisCacheBackend(
+                redis_url or self.config.get('redis_url', "redis://localhost:6379/0"),
+                namespace=self.config.get('namespace', "aishell:query")
+            )
+        if self.backend == "file":
+            return FileCacheBackend(
+                self.config.get('cache_dir') or str(Path.home() / ".aishell" / "query_cache")
+            )
+        raise ValueError(f"Unknown cache backend '{self.backend}'")
 
     def _generate_key(self, query: str, params: Optional[Dict[str, Any]] = None) -> str:
         """Generate cache key from query and parameters."""
@@ -72,12 +278,393 @@ class QueryCache:
     def _estimate_size(self, value: Any) -> int:
         """Estimate size of cached value in bytes."""
         try:
-            import sys
-            return sys.getsizeof(value)
+            return estimate_size(value)
         except Exception:
             # Fallback estimation
             return len(str(value))
 
+    def _prioritize(self, key: str, entry: CacheEntry) -> None:
+        """Rank an entry for eviction after it was stored or read.
+
+        The GDSF priority is the current inflation plus frequency / size.
+        Inflation rises to the priority of each victim, so entries that
+        stop being read eventually fall below newer ones.
+        """
+        self._sequence += 1
+        entry.sequence = self._sequence
+        if self.eviction_policy != 'gdsf':
+            return
+
+        entry.priority = self._inflation + (entry.access_count + 1) / max(entry.size_bytes, 1)
+        heapq.heappush(self._priorities, (entry.priority, entry.sequence, key))
+
+        if len(self._priorities) > 2 * len(self._cache) + 64:
+            self._priorities = [(e.priority, e.sequence, k) for k, e in self._cache.items()]
+            heapq.heapify(self._priorities)
+
+    def _touch(self, key: str, entry: CacheEntry) -> None:
+        """Record a hit on an entry."""
+        entry.last_accessed = datetime.now()
+        entry.access_count += 1
+        self._cache.move_to_end(key)
+        self._prioritize(key, entry)
+
+    def _victim(self) -> Optional[str]:
+        """Key of the next entry to evict."""
+        if self.eviction_policy == 'gdsf':
+            while self._priorities:
+                priority, sequence, key = heapq.heappop(self._priorities)
+                entry = self._cache.get(key)
+                if entry is not None and entry.sequence == sequence:
+                    self._inflation = priority
+                    return key
+        # Equal priorities and plain LRU: OrderedDict's first item is LRU
+        return next(iter(self._cache), None)
+
+    def _reclaim_at(self, entry: CacheEntry) -> float:
+        """Monotonic time from which an entry may be removed."""
+        return entry.expires_at
+
+    def _live_expiry(self, deadline: float, key: str) -> bool:
+        """Whether a heap item still belongs to the entry under key."""
+        entry = self._cache.get(key)
+        return entry is not None and entry.expires_at is not None and self._reclaim_at(entry) == deadline
+
+    def _schedule_expiry(self, key: str, entry: CacheEntry) -> None:
+        if entry.expires_at is None:
+            return
+        heapq.heappush(self._expiry, (self._reclaim_at(entry), key))
+        if len(self._expiry) > 2 * len(self._cache) + 64:
+            self._expiry = [
+                (self._reclaim_at(e), k) for k, e in self._cache.items() if e.expires_at is not None
+            ]
+            heapq.heapify(self._expiry)
+
+    def _expire(self) -> int:
+        """Remove the entries whose reclaim deadline has passed.
+
+        Returns:
+            Number of entries removed
+        """
+        expiry = self._expiry
+        if not expiry or expiry[0][0] > time.monotonic():
+            return 0
+
+        now = time.monotonic()
+        removed = 0
+        while expiry and expiry[0][0] <= now:
+            deadline, key = heapq.heappop(expiry)
+            if self._live_expiry(deadline, key):
+                self._discard(key)
+                removed += 1
+        self._expirations += removed
+        return removed
+
+    def next_expiry_in(self) -> Optional[float]:
+        """Seconds until the next entry can be reclaimed (None if none can).
+
+        Lets a background task sleep exactly until ``cleanup_expired`` has
+        work to do.
+        """
+        while self._expiry:
+            deadline, key = self._expiry[0]
+            if self._live_expiry(deadline, key):
+                return max(0.0, deadline - time.monotonic())
+            heapq.heappop(self._expiry)
+        return None
+
+    def _discard(self, key: str) -> Optional[CacheEntry]:
+        """Remove an L1 entry."""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._total_size_bytes -= entry.size_bytes
+            self._unindex(key, entry.tables)
+        return entry
+
+    def _index(self, key: str, tables: Optional[FrozenSet[str]]) -> None:
+        """Record the tables an entry depends on."""
+        if tables is None:
+            self._untracked.add(key)
+            return
+        for table in tables:
+            self._table_index.setdefault(table, set()).add(key)
+
+    def _unindex(self, key: str, tables: Optional[FrozenSet[str]]) -> None:
+        if tables is None:
+            self._untracked.discard(key)
+            return
+        for table in tables:
+            keys = self._table_index.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._table_index[table]
+
+    @staticmethod
+    def _dependencies(key: str, tables: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+        """Normalized tables of an entry, parsed from the key if not given."""
+        if tables is None:
+            return referenced_tables(key)
+        return frozenset(normalize_table(table) for table in tables)
+
+    def _insert(self, key: str, value: Any, ttl_seconds: Optional[float],
+                tables: Optional[FrozenSet[str]] = None) -> bool:
+        """Store an entry, evicting others until it fits.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl_seconds: Time to live in seconds (None = never expires)
+            tables: Normalized tables the value was read from (None = unknown)
+
+        Returns:
+            True if cached, False if the value alone exceeds the memory limit
+        """
+        self._discard(key)
+
+        size_bytes = self._estimate_size(value) + sys.getsizeof(key)
+        codec = None
+        if self.compression and size_bytes >= self.compression_threshold:
+            value, codec = self._compress(value, size_bytes)
+            if codec is not None:
+                size_bytes = sys.getsizeof(value) + sys.getsizeof(key)
+
+        if size_bytes > self.max_bytes:
+            logger.warning(f"Value too large to cache: {size_bytes} bytes")
+            return False
+
+        # Reclaim expired entries before evicting live ones
+        self._expire()
+        while self._cache and (
+            len(self._cache) >= self.max_size
+            or self._total_size_bytes + size_bytes > self.max_bytes
+        ):
+            self._evict_sync()
+
+        now = datetime.now()
+        entry = CacheEntry(
+            key=key,
+            value=value,
+            created_at=now,
+            last_accessed=now,
+            access_count=0,
+            ttl_seconds=ttl_seconds,
+            size_bytes=size_bytes,
+            codec=codec,
+            tables=tables,
+            expires_at=time.monotonic() + ttl_seconds if ttl_seconds is not None else None
+        )
+        entry.original_key = key  # Add original key attribute for pattern matching
+
+        self._cache[key] = entry
+        self._total_size_bytes += size_bytes
+        self._index(key, tables)
+        self._prioritize(key, entry)
+        self._schedule_expiry(key, entry)
+        return True
+
+    def _compress(self, value: Any, size_bytes: int) -> Tuple[Any, Optional[str]]:
+        """Pickle and compress a value for L1.
+
+        Returns:
+            (compressed bytes, codec name), or (value, None) if the value
+            cannot be pickled or does not compress well
+        """
+        start = time.perf_counter()
+        try:
+            raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            self.compression_stats.skipped += 1
+            return value, None
+
+        codec = choose_codec(len(raw), self.compression_dense_bytes, self.compression_codec)
+        blob = codec.compress(raw)
+        self.compression_stats.compress_seconds += time.perf_counter() - start
+
+        compressed_size = sys.getsizeof(blob)
+        if compressed_size > size_bytes * (1 - self.compression_min_saving):
+            self.compression_stats.skipped += 1
+            return value, None
+
+        self.compression_stats.compressed += 1
+        self.compression_stats.raw_bytes += size_bytes
+        self.compression_stats.compressed_bytes += compressed_size
+        return blob, codec.name
+
+    def _value(self, entry: CacheEntry) -> Any:
+        """Value of an entry, decompressed if needed."""
+        if entry.codec is None:
+            return entry.value
+        start = time.perf_counter()
+        value = pickle.loads(CODECS[entry.codec].decompress(entry.value))
+        self.compression_stats.decompressed += 1
+        self.compression_stats.decompress_seconds += time.perf_counter() - start
+        return value
+
+    def _pack(self, expires_at: Optional[float], value: Any,
+              tables: Optional[FrozenSet[str]] = None) -> bytes:
+        """Serialize an L2 payload: codec tag byte plus pickled data."""
+        raw = pickle.dumps((expires_at, tables, value), protocol=pickle.HIGHEST_PROTOCOL)
+        if self.compression and len(raw) >= self.compression_threshold:
+            codec = choose_codec(len(raw), self.compression_dense_bytes, self.compression_codec)
+            blob = codec.compress(raw)
+            if len(blob) <= len(raw) * (1 - self.compression_min_saving):
+                return bytes([codec.tag]) + blob
+        return b'\x00' + raw
+
+    @staticmethod
+    def _unpack(payload: bytes) -> Tuple[Optional[float], Optional[FrozenSet[str]], Any]:
+        """Deserialize an L2 payload into (expires_at, tables, value)."""
+        tag, data = payload[0], payload[1:]
+        if tag:
+            codec = codec_for_tag(tag)
+            if codec is None:
+                raise ValueError(f"Payload compressed with unavailable codec tag {tag}")
+            data = codec.decompress(data)
+        return pickle.loads(data)
+
+    def _store(self, key: str, value: Any, ttl_seconds: Optional[int],
+               tables: Optional[Iterable[str]] = None) -> bool:
+        """Cache a value in L1 and the shared L2.
+
+        Returns:
+            True if the value fits in L1
+        """
+        tables = self._dependencies(key, tables)
+        cached = self._insert(key, value, ttl_seconds, tables)
+        if self._l2 is not None:
+            self._negative.pop(key, None)
+            expires_at = time.time() + ttl_seconds if ttl_seconds is not None else None
+            try:
+                payload = self._pack(expires_at, value, tables)
+                self._l2.set(key, payload, ttl_seconds,
+                             tags=tables if tables is not None else (_UNTRACKED_TAG,))
+                self._l2.publish('key', key)
+            except Exception as e:
+                self._l2_errors += 1
+                logger.warning(f"Shared cache write failed: {e}")
+        return cached
+
+    def _get_shared(self, key: str) -> Tuple[bool, Any]:
+        """Fill an L1 miss from the shared L2.
+
+        Returns:
+            (found, value)
+        """
+        if self._l2 is None:
+            return False, None
+
+        negative_until = self._negative.get(key)
+        if negative_until is not None:
+            if negative_until > time.monotonic():
+                self._negative_hits += 1
+                return False, None
+            del self._negative[key]
+
+        try:
+            payload = self._l2.get(key)
+            if payload is not None:
+                expires_at, tables, value = self._unpack(payload)
+        except Exception as e:
+            self._l2_errors += 1
+            logger.warning(f"Shared cache read failed: {e}")
+            return False, None
+
+        ttl = None
+        if payload is not None and expires_at is not None:
+            ttl = expires_at - time.time()
+        if payload is None or (ttl is not None and ttl <= 0):
+            self._l2_misses += 1
+            self._negative[key] = time.monotonic() + self.negative_ttl
+            self._negative.move_to_end(key)
+            while len(self._negative) > self.max_size:
+                self._negative.popitem(last=False)
+            return False, None
+
+        self._l2_hits += 1
+        self._insert(key, value, ttl, tables)
+        return True, value
+
+    def _invalidate_shared(self, op: str, value: str = '') -> None:
+        """Apply an invalidation to the L2 and broadcast it."""
+        if self._l2 is None:
+            return
+        try:
+            if op == 'key':
+                self._l2.delete(value)
+            else:
+                self._l2.delete_prefix(value)
+            self._l2.publish(op, value)
+        except Exception as e:
+            self._l2_errors += 1
+            logger.warning(f"Shared cache invalidation failed: {e}")
+
+    def _apply_remote_invalidations(self) -> None:
+        """Drop L1 entries that other instances changed."""
+        if self._l2 is None:
+            return
+        try:
+            messages = self._l2.poll()
+        except Exception as e:
+            self._l2_errors += 1
+            logger.warning(f"Polling shared cache invalidations failed: {e}")
+            return
+
+        for op, value in messages:
+            self._remote_invalidations += 1
+            if op == 'key':
+                self._discard(value)
+                self._negative.pop(value, None)
+                continue
+            if op == 'tables':
+                self._drop_tables(value.split(',') if value else None)
+                continue
+            for key in [k for k in self._cache if k.startswith(value)]:
+                self._discard(key)
+            for key in [k for k in self._negative if k.startswith(value)]:
+                del self._negative[key]
+
+    def _statistics(self) -> Dict[str, Any]:
+        """Statistics shared by get_stats and get_statistics."""
+        total_requests = self._hits + self._misses
+        hit_rate = self._hits / total_requests if total_requests > 0 else 0.0
+
+        stats = {
+            'size': len(self._cache),
+            'max_size': self.max_size,
+            'memory_usage_mb': self._total_size_bytes / (1024 * 1024),
+            'memory_usage_bytes': self._total_size_bytes,
+            'max_memory_mb': self.max_memory_mb,
+            'eviction_policy': self.eviction_policy,
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': hit_rate,
+            'evictions': self._evictions,
+            'expirations': self._expirations,
+            'total_requests': total_requests,
+            'tracked_tables': len(self._table_index),
+            'untracked_entries': len(self._untracked),
+            'table_invalidations': self._table_invalidations
+        }
+        if self.compression:
+            stats['compression'] = self.compression_stats.to_dict()
+        if self._l2 is not None:
+            stats.update({
+                'backend': self.backend,
+                'l1_hits': self._hits - self._l2_hits,
+                'l2_hits': self._l2_hits,
+                'l2_misses': self._l2_misses,
+                'negative_hits': self._negative_hits,
+                'l2_errors': self._l2_errors,
+                'remote_invalidations': self._remote_invalidations
+            })
+        return stats
+
+    def close(self) -> None:
+        """Close the shared backend."""
+        if self._l2 is not None:
+            self._l2.close()
+
     async def get(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
         """
         Get cached query result.
@@ -100,22 +687,16 @@ class QueryCache:
 
             if entry.is_expired():
                 # Remove expired entry
-                self._cache.pop(key)
-                self._total_size_bytes -= entry.size_bytes
+                self._discard(key)
                 self._misses += 1
                 logger.debug(f"Cache entry expired: {key[:16]}...")
                 return None
 
-            # Update access metadata
-            entry.last_accessed = datetime.now()
-            entry.access_count += 1
-
-            # Move to end (most recently used)
-            self._cache.move_to_end(key)
+            self._touch(key, entry)
 
             self._hits += 1
             logger.debug(f"Cache hit: {key[:16]}...")
-            return entry.value
+            return self._value(entry)
 
     async def set(
         self,
@@ -134,91 +715,36 @@ class QueryCache:
             ttl_seconds: Time to live in seconds (None = use default)
         """
         key = self._generate_key(query, params)
-        size_bytes = self._estimate_size(value)
-
-        # Check memory limit
-        max_bytes = self.max_memory_mb * 1024 * 1024
-        if size_bytes > max_bytes:
-            logger.warning(f"Value too large to cache: {size_bytes} bytes")
-            return
 
         async with self._lock:
-            # Remove existing entry if present
-            if key in self._cache:
-                old_entry = self._cache.pop(key)
-                self._total_size_bytes -= old_entry.size_bytes
-
-            # Evict if at capacity
-            while len(self._cache) >= self.max_size:
-                await self._evict_lru()
-
-            # Evict if memory limit exceeded
-            while self._total_size_bytes + size_bytes > max_bytes:
-                if not self._cache:
-                    break
-                await self._evict_lru()
-
-            # Add new entry
-            entry = CacheEntry(
-                key=key,
-                value=value,
-                created_at=datetime.now(),
-                last_accessed=datetime.now(),
-                access_count=0,
-                ttl_seconds=ttl_seconds or self.default_ttl,
-                size_bytes=size_bytes
-            )
-
-            self._cache[key] = entry
-            self._total_size_bytes += size_bytes
-
-            logger.debug(f"Cached query result: {key[:16]}... ({size_bytes} bytes)")
+            if self._insert(key, value, ttl_seconds or self.default_ttl):
+                logger.debug(f"Cached query result: {key[:16]}...")
 
     async def _evict_lru(self) -> None:
-        """Method implementation."""
-        if not self._cache:
-            return
-
-        # OrderedDict maintains insertion order, first item is LRU
-        key, entry = self._cache.popitem(last=False)
-        self._total_size_bytes -= entry.size_bytes
-        self._evictions += 1
-        logger.debug(f"Evicted LRU entry: {key[:16]}...")
+        """Evict the entry chosen by the eviction policy."""
+        self._evict_sync()
 
     async def invalidate(self, query: str, params: Optional[Dict[str, Any]] = None) -> None:
         """Invalidate cache entry for specific query."""
         key = self._generate_key(query, params)
 
         async with self._lock:
-            if key in self._cache:
-                entry = self._cache.pop(key)
-                self._total_size_bytes -= entry.size_bytes
+            if self._discard(key) is not None:
                 logger.debug(f"Invalidated cache entry: {key[:16]}...")
 
-    async def invalidate_pattern(self, pattern: str) -> None:
-        """Invalidate all cache entries matching pattern."""
-        async with self._lock:
-            keys_to_remove = []
-
-            for key, entry in self._cache.items():
-                # This is simplified - would need to store original query
-                # For now, invalidate all
-                if pattern:  # Placeholder for pattern matching
-                    keys_to_remove.append(key)
-
-            for key in keys_to_remove:
-                entry = self._cache.pop(key)
-                self._total_size_bytes -= entry.size_bytes
-
-            if keys_to_remove:
-                logger.info(f"Invalidated {len(keys_to_remove)} entries matching pattern: {pattern}")
-
     async def clear(self) -> None:
         """Method implementation."""
         async with self._lock:
             count = len(self._cache)
             self._cache.clear()
+            self._negative.clear()
+            self._table_index.clear()
+            self._untracked.clear()
+            self._priorities.clear()
+            self._expiry.clear()
+            self._inflation = 0.0
             self._total_size_bytes = 0
+            self._invalidate_shared('clear')
             logger.info(f"Cleared {count} cache entries")
 
     async def get_stats(self) -> Dict[str, Any]:
@@ -229,20 +755,7 @@ class QueryCache:
             Cache statistics dictionary
         """
         async with self._lock:
-            total_requests = self._hits + self._misses
-            hit_rate = self._hits / total_requests if total_requests > 0 else 0.0
-
-            return {
-                'size': len(self._cache),
-                'max_size': self.max_size,
-                'memory_usage_mb': self._total_size_bytes / (1024 * 1024),
-                'max_memory_mb': self.max_memory_mb,
-                'hits': self._hits,
-                'misses': self._misses,
-                'hit_rate': hit_rate,
-                'evictions': self._evictions,
-                'total_requests': total_requests
-            }
+            return self._statistics()
 
     async def get_top_entries(self, limit: int = 10) -> list[Dict[str, Any]]:
         """
@@ -275,23 +788,19 @@ class QueryCache:
         """
         Remove all expired entries.
 
+        Only the expired entries are visited; when none has expired this
+        returns after one comparison.
+
         Returns:
             Number of entries removed
         """
         async with self._lock:
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if entry.is_expired()
-            ]
+            removed = self._expire()
 
-            for key in expired_keys:
-                entry = self._cache.pop(key)
-                self._total_size_bytes -= entry.size_bytes
+            if removed:
+                logger.info(f"Cleaned up {removed} expired cache entries")
 
-            if expired_keys:
-                logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
-
-            return len(expired_keys)
+            return removed
 
     # Synchronous wrappers for testing
     def set(self, key: str, value: Any, params: Optional[Dict[str, Any]] = None, ttl_seconds: Optional[int] = None):
@@ -306,75 +815,40 @@ class QueryCache:
 
     def _set_sync(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
         """Synchronous set implementation for testing."""
-        size_bytes = self._estimate_size(value)
-        max_bytes = self.max_memory_mb * 1024 * 1024
-
-        if size_bytes > max_bytes:
-            logger.warning(f"Value too large to cache: {size_bytes} bytes")
-            return
-
-        # Remove existing entry if present
-        if key in self._cache:
-            old_entry = self._cache.pop(key)
-            self._total_size_bytes -= old_entry.size_bytes
-
-        # Evict if at capacity
-        while len(self._cache) >= self.max_size:
-            self._evict_lru_sync()
-
-        # Evict if memory limit exceeded
-        while self._total_size_bytes + size_bytes > max_bytes:
-            if not self._cache:
-                break
-            self._evict_lru_sync()
-
-        # Add new entry (store original key for pattern matching)
-        entry = CacheEntry(
-            key=key,
-            value=value,
-            created_at=datetime.now(),
-            last_accessed=datetime.now(),
-            access_count=0,
-            ttl_seconds=ttl_seconds or self.default_ttl,
-            size_bytes=size_bytes
-        )
-        entry.original_key = key  # Add original key attribute for pattern matching
-
-        self._cache[key] = entry
-        self._total_size_bytes += size_bytes
+        self._store(key, value, ttl_seconds or self.default_ttl)
 
     def _get_sync(self, key: str) -> Optional[Any]:
         """Synchronous get implementation for testing."""
+        self._apply_remote_invalidations()
         entry = self._cache.get(key)
 
+        if entry is not None and entry.is_expired():
+            self._discard(key)
+            self._expirations += 1
+            entry = None
+
         if entry is None:
+            found, value = self._get_shared(key)
+            if found:
+                self._hits += 1
+                return value
             self._misses += 1
             return None
 
-        if entry.is_expired():
-            self._cache.pop(key)
-            self._total_size_bytes -= entry.size_bytes
-            self._misses += 1
-            return None
-
-        # Update access metadata
-        entry.last_accessed = datetime.now()
-        entry.access_count += 1
-
-        # Move to end (most recently used)
-        self._cache.move_to_end(key)
+        self._touch(key, entry)
 
         self._hits += 1
-        return entry.value
+        return self._value(entry)
 
-    def _evict_lru_sync(self):
-        """Synchronous LRU eviction."""
-        if not self._cache:
+    def _evict_sync(self) -> None:
+        """Evict the entry chosen by the eviction policy."""
+        key = self._victim()
+        if key is None:
             return
 
-        key, entry = self._cache.popitem(last=False)
-        self._total_size_bytes -= entry.size_bytes
+        entry = self._discard(key)
         self._evictions += 1
+        logger.debug(f"Evicted cache entry: {key[:16]}... ({entry.size_bytes} bytes)")
 
     def invalidate_pattern(self, pattern: str):
         """Synchronous pattern invalidation for testing."""
@@ -390,55 +864,30 @@ class QueryCache:
                         keys_to_remove.append(key)
 
         for key in keys_to_remove:
-            entry = self._cache.pop(key)
-            self._total_size_bytes -= entry.size_bytes
+            self._discard(key)
+
+        if pattern.endswith('*'):
+            self._invalidate_shared('prefix', pattern[:-1])
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get cache statistics synchronously for testing."""
-        total_requests = self._hits + self._misses
-        hit_rate = self._hits / total_requests if total_requests > 0 else 0.0
+        return self._statistics()
 
-        return {
-            'size': len(self._cache),
-            'max_size': self.max_size,
-            'memory_usage_mb': self._total_size_bytes / (1024 * 1024),
-            'max_memory_mb': self.max_memory_mb,
-            'hits': self._hits,
-            'misses': self._misses,
-            'hit_rate': hit_rate,
-            'evictions': self._evictions,
-            'total_requests': total_requests
-        }
+    def set(self, key: str, value: Any, ttl: Optional[int] = None,
+            tables: Optional[Iterable[str]] = None) -> None:
+        """Synchronous set for testing.
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Synchronous set for testing."""
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (None = default)
+            tables: Tables the value was read from; parsed from the key
+                when it is a SQL query and not given
+        """
         if ttl is None:
             ttl = self.default_ttl
 
-        size_bytes = self._estimate_size(value)
-
-        # Check memory limit
-        while (self._total_size_bytes + size_bytes > self.max_memory_mb * 1024 * 1024 and
-               len(self._cache) > 0):
-            self._evict_lru_sync()
-
-        # Check max size limit
-        while len(self._cache) >= self.max_size and len(self._cache) > 0:
-            self._evict_lru_sync()
-
-        entry = CacheEntry(
-            key=key,
-            value=value,
-            created_at=datetime.now(),
-            last_accessed=datetime.now(),
-            access_count=0,
-            ttl_seconds=ttl,
-            size_bytes=size_bytes
-        )
-        entry.original_key = key
-
-        self._cache[key] = entry
-        self._total_size_bytes += size_bytes
+        self._store(key, value, ttl, tables)
 
     def get(self, key: str) -> Optional[Any]:
         """Synchronous get for testing."""
@@ -446,6 +895,85 @@ class QueryCache:
 
     def invalidate(self, key: str) -> None:
         """Synchronous invalidate for testing."""
-        if key in self._cache:
-            entry = self._cache.pop(key)
-            self._total_size_bytes -= entry.size_bytes
+        self._discard(key)
+        self._negative.pop(key, None)
+        self._invalidate_shared('key', key)
+
+    def _drop_tables(self, tables: Optional[Iterable[str]]) -> int:
+        """Drop the L1 entries that read any of the tables (None = all)."""
+        if tables is None:
+            keys = list(self._cache)
+        else:
+            keys = set(self._untracked)
+            for table in tables:
+                keys.update(self._table_index.get(table, ()))
+        for key in keys:
+            self._discard(key)
+        return len(keys)
+
+    def invalidate_tables(self, tables: Optional[Iterable[str]]) -> int:
+        """Invalidate the entries that read any of the given tables.
+
+        Entries whose tables are unknown are invalidated too. The L2 drops
+        the same entries and other instances are told to.
+
+        Args:
+            tables: Changed tables (schema-qualified or quoted names are
+                accepted), or None if unknown, which invalidates everything
+
+        Returns:
+            Number of L1 entries removed
+        """
+        if tables is not None:
+            tables = sorted({normalize_table(table) for table in tables})
+            if not tables:
+                return 0
+
+        removed = self._drop_tables(tables)
+        self._table_invalidations += 1
+        if removed:
+            logger.debug(f"Invalidated {removed} cache entries for tables {tables or 'all'}")
+
+        if self._l2 is not None:
+            try:
+                if tables is None:
+                    self._l2.delete_prefix('')
+                else:
+                    self._l2.delete_tags([*tables, _UNTRACKED_TAG])
+                self._l2.publish('tables', ','.join(tables or ()))
+            except Exception as e:
+                self._l2_errors += 1
+                logger.warning(f"Shared cache invalidation failed: {e}")
+        return removed
+
+    def invalidate_write(self, sql: str) -> int:
+        """Invalidate the entries a write statement makes stale.
+
+        Args:
+            sql: Statement that was executed (read-only statements are ignored)
+
+        Returns:
+            Number of L1 entries removed
+        """
+        tables = written_tables(sql)
+        if tables is not None and not tables:
+            return 0
+        return self.invalidate_tables(tables)
+
+    async def handle_change_notification(self, channel: str, payload: str) -> int:
+        """Invalidate the tables named by a database change notification.
+
+        Suitable as a ``PostgreSQLEnhancedClient.listen`` handler for
+        triggers that ``NOTIFY`` with the changed table as payload.
+
+        Args:
+            channel: Notification channel
+            payload: Table name, comma-separated names, or a JSON object
+                with "table" or "tables"; empty means unknown
+
+        Returns:
+            Number of L1 entries removed
+        """
+        tables = notification_tables(payload)
+        logger.debug(f"Change notification on {channel}: {tables or 'unknown tables'}")
+        return self.invalidate_tables(tables)
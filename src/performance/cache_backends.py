@@ -0,0 +1,313 @@
+"""
+Shared (L2) backends for QueryCache.
+
+A backend stores serialized entries where every cache instance can read
+them and carries invalidation messages between instances, so each
+in-process L1 can drop entries another process changed:
+
+- RedisCacheBackend: Redis keys plus a pub/sub channel, shared across hosts
+- FileCacheBackend: a directory plus an append-only invalidation log,
+  shared by processes on one host (and used as the stand-in in tests)
+
+Backends move opaque bytes; QueryCache owns serialization.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import shutil
+import struct
+import tempfile
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class SharedCacheBackend(ABC):
+    """Storage and invalidation broadcast shared by QueryCache instances."""
+
+    def __init__(self) -> None:
+        # Identifies this instance's own broadcasts
+        self.origin = uuid.uuid4().hex
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a payload, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, payload: bytes, ttl: Optional[float], tags: Iterable[str] = ()) -> None:
+        """Store a payload (ttl None = no expiry) under tags such as table names."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete a payload."""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every payload whose key starts with prefix.
+
+        Returns:
+            Number of payloads deleted
+        """
+
+    @abstractmethod
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        """Delete every payload stored under any of the tags.
+
+        Returns:
+            Number of payloads deleted
+        """
+
+    @abstractmethod
+    def _send(self, message: str) -> None:
+        """Deliver an encoded message to every instance."""
+
+    @abstractmethod
+    def _receive(self) -> List[str]:
+        """Encoded messages delivered since the last call."""
+
+    def publish(self, op: str, value: str = '') -> None:
+        """Broadcast an invalidation to the other instances.
+
+        Args:
+            op: 'key', 'prefix', 'tables' or 'clear'
+            value: Key, prefix or comma-separated tables
+        """
+        self._send(json.dumps({'origin': self.origin, 'op': op, 'value': value}))
+
+    def poll(self) -> List[Tuple[str, str]]:
+        """Invalidations broadcast by other instances since the last poll.
+
+        Returns:
+            (op, value) tuples, oldest first
+        """
+        messages = []
+        for raw in self._receive():
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                logger.warning(f"Ignoring malformed cache invalidation: {raw[:80]!r}")
+                continue
+            if message.get('origin') != self.origin:
+                messages.append((message.get('op'), message.get('value', '')))
+        return messages
+
+    def close(self) -> None:
+        """Release connections."""
+
+
+class RedisCacheBackend(SharedCacheBackend):
+    """Redis-backed shared cache."""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", namespace: str = "aishell:query") -> None:
+        """
+        Initialize Redis backend.
+
+        Args:
+            url: Redis connection URL
+            namespace: Prefix of cache keys and of the invalidation channel
+        """
+        super().__init__()
+        import redis
+        from redis.connection import parse_url
+
+        self.namespace = namespace
+        self.channel = f"{namespace}:invalidate"
+        self._client = redis.Redis(**parse_url(url))
+        self._pubsub = None
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _tag(self, tag: str) -> str:
+        # Outside the key space so delete_prefix never matches it
+        return f"{self.namespace}#tag:{tag}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self._key(key))
+
+    def set(self, key: str, payload: bytes, ttl: Optional[float], tags: Iterable[str] = ()) -> None:
+        if ttl is None:
+            self._client.set(self._key(key), payload)
+        else:
+            self._client.setex(self._key(key), max(1, int(ttl)), payload)
+        for tag in tags:
+            self._client.sadd(self._tag(tag), key)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._key(key))
+
+    def delete_prefix(self, prefix: str) -> int:
+        deleted = 0
+        batch = []
+        for name in self._client.scan_iter(match=f"{self._key(prefix)}*", count=500):
+            batch.append(name)
+            if len(batch) >= 500:
+                deleted += self._client.delete(*batch)
+                batch = []
+        if batch:
+            deleted += self._client.delete(*batch)
+        return deleted
+
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        deleted = 0
+        for tag in tags:
+            keys = self._client.smembers(self._tag(tag))
+            names = [self._key(k.decode() if isinstance(k, bytes) else k) for k in keys]
+            if names:
+                deleted += self._client.delete(*names)
+            self._client.delete(self._tag(tag))
+        return deleted
+
+    def _send(self, message: str) -> None:
+        self._client.publish(self.channel, message)
+
+    def _receive(self) -> List[str]:
+        if self._pubsub is None:
+            # Subscribe on first poll; earlier broadcasts predate our L1
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(self.channel)
+
+        messages = []
+        while True:
+            message = self._pubsub.get_message(timeout=0)
+            if not message:
+                return messages
+            data = message.get('data')
+            if isinstance(data, bytes):
+                data = data.decode('utf-8', 'replace')
+            if isinstance(data, str):
+                messages.append(data)
+
+    def close(self) -> None:
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+        self._client.close()
+
+
+# Entry file header: expiry (epoch seconds, 0 = none) and key length
+_HEADER = struct.Struct('<dI')
+_LOG_FILE = "invalidations.log"
+
+
+class FileCacheBackend(SharedCacheBackend):
+    """Directory-backed shared cache for processes on one host.
+
+    Each entry is one file written atomically; tags are directories of
+    empty marker files named after the entries they hold. Invalidations
+    are appended to a log that every instance reads from its own offset.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initialize file backend.
+
+        Args:
+            directory: Directory shared by the cache instances
+        """
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._log_path = self.directory / _LOG_FILE
+        self._log_path.touch(exist_ok=True)
+        # Only broadcasts made after this instance started concern it
+        self._log_offset = self._log_path.stat().st_size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.entry"
+
+    def _tag_dir(self, tag: str) -> Path:
+        return self.directory / "tags" / hashlib.sha256(tag.encode()).hexdigest()
+
+    def _read(self, path: Path) -> Optional[Tuple[float, str, bytes]]:
+        """(expires_at, key, payload) of an entry file."""
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        expires_at, key_length = _HEADER.unpack_from(data)
+        start = _HEADER.size
+        key = data[start:start + key_length].decode()
+        return expires_at, key, data[start + key_length:]
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        entry = self._read(path)
+        if entry is None:
+            return None
+        expires_at, stored_key, payload = entry
+        if stored_key != key:
+            return None
+        if expires_at and expires_at <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return payload
+
+    def set(self, key: str, payload: bytes, ttl: Optional[float], tags: Iterable[str] = ()) -> None:
+        encoded = key.encode()
+        expires_at = time.time() + ttl if ttl is not None else 0.0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(expires_at, len(encoded)))
+                f.write(encoded)
+                f.write(payload)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        for tag in tags:
+            tag_dir = self._tag_dir(tag)
+            tag_dir.mkdir(parents=True, exist_ok=True)
+            (tag_dir / self._path(key).name).touch()
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def delete_prefix(self, prefix: str) -> int:
+        deleted = 0
+        for path in self.directory.glob('*.entry'):
+            entry = self._read(path)
+            if entry is not None and entry[1].startswith(prefix):
+                path.unlink(missing_ok=True)
+                deleted += 1
+        return deleted
+
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        deleted = 0
+        for tag in tags:
+            tag_dir = self._tag_dir(tag)
+            if not tag_dir.is_dir():
+                continue
+            for marker in tag_dir.iterdir():
+                path = self.directory / marker.name
+                if path.exists():
+                    path.unlink(missing_ok=True)
+                    deleted += 1
+            shutil.rmtree(tag_dir, ignore_errors=True)
+        return deleted
+
+    def _send(self, message: str) -> None:
+        # O_APPEND keeps concurrent single-line writes whole
+        fd = os.open(self._log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, (message + '\n').encode())
+        finally:
+            os.close(fd)
+
+    def _receive(self) -> List[str]:
+        if self._log_path.stat().st_size <= self._log_offset:
+            return []
+        with open(self._log_path, 'rb') as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # Leave a partially written last line for the next poll
+        end = data.rfind(b'\n') + 1
+        self._log_offset += end
+        return [line for line in data[:end].decode().splitlines() if line]
@@ -3,9 +3,14 @@ Extended cache implementations with fallback mechanisms.
 """
 
 import asyncio
+import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Callable, Optional
-from .cache import QueryCache
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from .cache import CacheEntry, QueryCache
+
+logger = logging.getLogger(__name__)
 
 
 class CacheFallback(QueryCache):
@@ -45,9 +50,49 @@ class CacheFallback(QueryCache):
             raise
 
 
+@dataclass
+class StaleCacheStats:
+    """Stale-while-revalidate counters of StaleCache.get_or_fetch."""
+    fresh_hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    # Callers that waited on a fetch another caller had started
+    coalesced: int = 0
+    fetches: int = 0
+    fetch_errors: int = 0
+    # Background refreshes started for stale entries, and those that failed
+    refreshes: int = 0
+    refresh_errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache, fresh or stale."""
+        total = self.fresh_hits + self.stale_hits + self.misses
+        return (self.fresh_hits + self.stale_hits) / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary."""
+        return {
+            'fresh_hits': self.fresh_hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'coalesced': self.coalesced,
+            'fetches': self.fetches,
+            'fetch_errors': self.fetch_errors,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors
+        }
+
+
 class StaleCache(QueryCache):
     """
     Cache that accepts stale entries when fresh data unavailable.
+
+    ``get_or_fetch`` implements stale-while-revalidate: fresh entries are
+    returned without calling the fetcher, entries past ``ttl`` but within
+    ``stale_ttl`` are returned at once while one background task refreshes
+    them, and concurrent misses for a key share a single fetch.
     """
 
     def __init__(self, ttl: float = 300, stale_ttl: float = 3600, **kwargs):
@@ -60,6 +105,43 @@ class StaleCache(QueryCache):
         """
         super().__init__(ttl=ttl, **kwargs)
         self.stale_ttl = stale_ttl
+        self.swr_stats = StaleCacheStats()
+        # Fetch or refresh in flight per key. Invalidating a key detaches
+        # its fetch, whose result is then returned but not cached
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _reclaim_at(self, entry: CacheEntry) -> float:
+        # Expired entries stay servable until stale_ttl after they were cached
+        return max(entry.expires_at, entry.expires_at - entry.ttl_seconds + self.stale_ttl)
+
+    def _lookup(self, key: str, allow_stale: bool) -> Tuple[str, Any]:
+        """Classify a cached entry.
+
+        Returns:
+            ('fresh' | 'stale' | 'miss', value)
+        """
+        entry = self._cache.get(key)
+        if entry is not None and entry.is_expired():
+            if time.monotonic() >= self._reclaim_at(entry):
+                # Too stale, remove
+                self._discard(key)
+                entry = None
+            elif not allow_stale:
+                self._misses += 1
+                return 'miss', None
+            else:
+                entry.last_accessed = datetime.now()
+                entry.access_count += 1
+                self._hits += 1
+                return 'stale', self._value(entry)
+
+        if entry is None:
+            self._misses += 1
+            return 'miss', None
+
+        self._touch(key, entry)
+        self._hits += 1
+        return 'fresh', self._value(entry)
 
     def _get_sync(self, key: str, allow_stale: bool = False) -> Optional[Any]:
         """
@@ -72,31 +154,40 @@ class StaleCache(QueryCache):
         Returns:
             Cached value or None
         """
-        entry = self._cache.get(key)
+        return self._lookup(key, allow_stale)[1]
 
-        if entry is None:
-            return None
-
-        # Check if expired
-        if entry.is_expired():
-            # Check if within stale TTL
-            age = entry.age_seconds()
-            if allow_stale and age <= self.stale_ttl:
-                # Return stale entry
-                entry.last_accessed = datetime.now()
-                entry.access_count += 1
-                return entry.value
+    def _fetch(self, key: str, fetcher: Callable, timeout: Optional[float]) -> asyncio.Task:
+        """Start a fetch for key, or return the one in flight."""
+        task = self._inflight.get(key)
+        if task is not None:
+            return task
+        task = asyncio.ensure_future(self._run_fetch(key, fetcher, timeout))
+        self._inflight[key] = task
+        return task
+
+    async def _run_fetch(self, key: str, fetcher: Callable, timeout: Optional[float]) -> Any:
+        self.swr_stats.fetches += 1
+        try:
+            if timeout:
+                result = await asyncio.wait_for(fetcher(), timeout=timeout)
             else:
-                # Too stale, remove
-                self._cache.pop(key)
-                self._total_size_bytes -= entry.size_bytes
-                return None
+                result = await fetcher()
+            # A detached fetch was invalidated and may predate the write
+            if self._inflight.get(key) is asyncio.current_task():
+                self.set(key, result)
+            return result
+        except BaseException:
+            self.swr_stats.fetch_errors += 1
+            raise
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
 
-        # Not expired, return fresh value
-        entry.last_accessed = datetime.now()
-        entry.access_count += 1
-        self._cache.move_to_end(key)
-        return entry.value
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is not None:
+            self.swr_stats.refresh_errors += 1
+            if not task.cancelled():
+                logger.warning(f"Background refresh failed: {task.exception()}")
 
     async def get_or_fetch(
         self,
@@ -106,39 +197,73 @@ class StaleCache(QueryCache):
         timeout: Optional[float] = None
     ) -> Any:
         """
-        Get value from cache or fetch, accepting stale on timeout.
+        Get value from cache or fetch, serving stale data while refreshing.
 
         Args:
             key: Cache key
-            fetcher: Function to fetch fresh data
-            allow_stale: Whether to accept stale data
+            fetcher: Coroutine function fetching fresh data
+            allow_stale: Whether to serve stale entries (if not, they are
+                treated as misses)
             timeout: Fetch timeout in seconds
 
         Returns:
             Cached or fetched value
         """
-        # Check cache first (including stale if allowed)
-        cached = self._get_sync(key, allow_stale=allow_stale)
+        state, value = self._lookup(key, allow_stale)
+        if state == 'fresh':
+            self.swr_stats.fresh_hits += 1
+            return value
+
+        if state == 'stale':
+            self.swr_stats.stale_hits += 1
+            if key not in self._inflight:
+                self.swr_stats.refreshes += 1
+                self._fetch(key, fetcher, timeout).add_done_callback(self._refresh_done)
+            return value
 
-        # Try to fetch fresh data
+        self.swr_stats.misses += 1
+        if key in self._inflight:
+            self.swr_stats.coalesced += 1
         try:
-            if timeout:
-                result = await asyncio.wait_for(fetcher(), timeout=timeout)
-            else:
-                result = await fetcher()
+            # Shielded so one caller giving up does not cancel the others
+            return await asyncio.shield(self._fetch(key, fetcher, timeout))
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError("Fetch timeout and no cached value available")
 
-            # Cache fresh result
-            self.set(key, result)
-            return result
+    def _detach(self, keys: Iterable[str]) -> None:
+        """Keep fetches started before an invalidation out of the cache.
 
-        except (asyncio.TimeoutError, asyncio.CancelledError):
-            # Timeout - return stale if available and allowed
-            if allow_stale and cached is not None:
-                return cached
-            raise asyncio.TimeoutError("Fetch timeout and no cached value available")
+        Later callers for these keys start a new fetch instead of joining
+        the detached one.
+        """
+        for key in list(keys):
+            self._inflight.pop(key, None)
 
-        except Exception:
-            # Other error - return stale if available
-            if allow_stale and cached is not None:
-                return cached
-            raise
+    def invalidate(self, key: str) -> None:
+        self._detach([key])
+        super().invalidate(key)
+
+    def invalidate_pattern(self, pattern: str):
+        if pattern.endswith('*'):
+            self._detach(key for key in self._inflight if key.startswith(pattern[:-1]))
+        super().invalidate_pattern(pattern)
+
+    def _drop_tables(self, tables: Optional[Iterable[str]]) -> int:
+        if tables is None:
+            self._detach(self._inflight)
+        else:
+            tables = set(tables)
+            self._detach(
+                key for key in self._inflight
+                if (reads := self._dependencies(key, None)) is None or reads & tables
+            )
+        return super()._drop_tables(tables)
+
+    async def clear(self) -> None:
+        self._detach(self._inflight)
+        await super().clear()
+
+    def _statistics(self) -> Dict[str, Any]:
+        stats = super()._statistics()
+        stats['stale_while_revalidate'] = self.swr_stats.to_dict()
+        return stats
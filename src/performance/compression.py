@@ -0,0 +1,115 @@
+"""
+Compression codecs for cached query results.
+
+zlib is always available; lz4 and zstandard are used when installed. The
+codec is chosen per entry: small results favour compression speed, large
+ones compression ratio.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+import zlib
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class Codec:
+    """Compression codec; tag identifies it in serialized payloads."""
+    name: str
+    tag: int
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _zstd_codec(name: str, level: int) -> Codec:
+    # Compressor objects are not safe to share between threads
+    return Codec(
+        name=name,
+        tag=3,
+        compress=lambda data: zstandard.ZstdCompressor(level=level).compress(data),
+        decompress=lambda data: zstandard.ZstdDecompressor().decompress(data)
+    )
+
+
+CODECS: Dict[str, Codec] = {
+    'zlib': Codec('zlib', 1, lambda data: zlib.compress(data, 6), zlib.decompress),
+    'zlib-fast': Codec('zlib-fast', 1, lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+if LZ4_AVAILABLE:
+    CODECS['lz4'] = Codec('lz4', 2, lz4.frame.compress, lz4.frame.decompress)
+if ZSTD_AVAILABLE:
+    CODECS['zstd'] = _zstd_codec('zstd', 6)
+    CODECS['zstd-fast'] = _zstd_codec('zstd-fast', 1)
+
+# Every variant of a codec decompresses with the same function
+_BY_TAG: Dict[int, Codec] = {codec.tag: codec for codec in CODECS.values()}
+
+# Preference order per entry size
+_FAST = ('lz4', 'zstd-fast', 'zlib-fast')
+_DENSE = ('zstd', 'zlib', 'lz4')
+
+
+def choose_codec(size: int, dense_bytes: int, preferred: str = 'auto') -> Codec:
+    """Pick the codec for an entry.
+
+    Args:
+        size: Uncompressed size in bytes
+        dense_bytes: Size from which compression ratio matters more than speed
+        preferred: Codec name, or 'auto' to choose by size
+
+    Returns:
+        Codec to use
+    """
+    if preferred != 'auto':
+        return CODECS[preferred]
+    for name in (_DENSE if size >= dense_bytes else _FAST):
+        if name in CODECS:
+            return CODECS[name]
+    return CODECS['zlib']
+
+
+def codec_for_tag(tag: int) -> Optional[Codec]:
+    """Codec that wrote a payload tag (None if unavailable here)."""
+    return _BY_TAG.get(tag)
+
+
+@dataclass
+class CompressionStats:
+    """Compression counters."""
+    compressed: int = 0
+    skipped: int = 0
+    decompressed: int = 0
+    # Memory the compressed values would take uncompressed, and what they take
+    raw_bytes: int = 0
+    compressed_bytes: int = 0
+    compress_seconds: float = 0.0
+    decompress_seconds: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        """Uncompressed over compressed bytes (1.0 if nothing compressed)."""
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 1.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary."""
+        return {
+            'compressed_entries': self.compressed,
+            'skipped_entries': self.skipped,
+            'decompressions': self.decompressed,
+            'raw_bytes': self.raw_bytes,
+            'compressed_bytes': self.compressed_bytes,
+            'compression_ratio': self.ratio,
+            'compress_ms': self.compress_seconds * 1000,
+            'decompress_ms': self.decompress_seconds * 1000
+        }
@@ -0,0 +1,311 @@
+"""
+Sharded in-process query cache.
+
+Splits the key space over independent QueryCache segments, each with its
+own lock, eviction order and share of the size and memory limits, so
+threads working on unrelated keys do not wait for each other.
+
+Hits are served without blocking on the shard lock: the entry is read
+from the segment's dictionary and the access is applied right away if
+the lock is free, or queued in the shard's read buffer and applied by the
+next thread that holds the lock. Recency is therefore slightly behind
+under contention, which only affects which entry is evicted next.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import logging
+import math
+import threading
+
+from .cache import QueryCache, notification_tables
+from .sql_tables import written_tables
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ShardStats:
+    """Lock and read-path counters of one shard."""
+    lock_acquisitions: int = 0
+    # Acquisitions that had to wait for another thread
+    contended: int = 0
+    # Hits applied from the read buffer instead of under the lock
+    buffered_reads: int = 0
+
+    @property
+    def contention_rate(self) -> float:
+        """Fraction of lock acquisitions that waited."""
+        return self.contended / self.lock_acquisitions if self.lock_acquisitions else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            'lock_acquisitions': self.lock_acquisitions,
+            'contended': self.contended,
+            'contention_rate': self.contention_rate,
+            'buffered_reads': self.buffered_reads
+        }
+
+
+class _Shard:
+    """One segment of a ShardedQueryCache."""
+
+    __slots__ = ('cache', 'lock', 'stats', 'reads')
+
+    def __init__(self, cache: QueryCache, read_buffer_size: int) -> None:
+        self.cache = cache
+        self.lock = threading.Lock()
+        self.stats = ShardStats()
+        # Keys hit while another thread held the lock
+        self.reads: deque = deque(maxlen=read_buffer_size)
+
+
+class ShardedQueryCache:
+    """Thread-safe QueryCache split into independently locked shards.
+
+    Accepts the QueryCache options (memory backend only) and divides
+    ``max_size`` and ``max_memory_mb`` evenly between the shards. Each
+    shard evicts on its own, so the cache as a whole approximates the
+    configured policy.
+    """
+
+    def __init__(self, shards: int = 16, ttl: int = 300, compression: bool = False,
+                 config: Optional[Dict[str, Any]] = None, read_buffer_size: int = 1024) -> None:
+        """
+        Initialize sharded cache.
+
+        Args:
+            shards: Number of shards
+            ttl: Default time to live in seconds
+            compression: Compress large values (see QueryCache)
+            config: QueryCache configuration; limits apply to the whole cache
+            read_buffer_size: Pending hits kept per shard while its lock is busy
+        """
+        if shards < 1:
+            raise ValueError(f"shards must be at least 1, got {shards}")
+
+        self.config = config or {}
+        self.default_ttl = ttl
+        self.max_size = self.config.get('max_size', 1000)
+        self.max_memory_mb = self.config.get('max_memory_mb', 100)
+
+        shard_config = {
+            **self.config,
+            'max_size': max(1, math.ceil(self.max_size / shards)),
+            'max_memory_mb': self.max_memory_mb / shards
+        }
+        self._shards: List[_Shard] = [
+            _Shard(QueryCache(ttl=ttl, compression=compression, config=shard_config),
+                   read_buffer_size)
+            for _ in range(shards)
+        ]
+
+    @property
+    def shard_count(self) -> int:
+        """Number of shards."""
+        return len(self._shards)
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    @contextmanager
+    def _locked(self, shard: _Shard) -> Iterator[QueryCache]:
+        """Hold a shard's lock, applying its buffered reads first."""
+        contended = not shard.lock.acquire(blocking=False)
+        if contended:
+            shard.lock.acquire()
+        try:
+            shard.stats.lock_acquisitions += 1
+            shard.stats.contended += contended
+            self._drain(shard)
+            yield shard.cache
+        finally:
+            shard.lock.release()
+
+    @staticmethod
+    def _drain(shard: _Shard) -> None:
+        """Apply hits buffered while the lock was busy (lock held)."""
+        cache = shard.cache
+        while shard.reads:
+            key = shard.reads.popleft()
+            entry = cache._cache.get(key)
+            if entry is not None:
+                cache._touch(key, entry)
+            cache._hits += 1
+            shard.stats.buffered_reads += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        shard = self._shard(key)
+        cache = shard.cache
+        entry = cache._cache.get(key)
+
+        if entry is not None and not entry.is_expired():
+            if shard.lock.acquire(blocking=False):
+                try:
+                    shard.stats.lock_acquisitions += 1
+                    self._drain(shard)
+                    # The entry may have been replaced since it was read
+                    if cache._cache.get(key) is entry:
+                        cache._touch(key, entry)
+                    cache._hits += 1
+                finally:
+                    shard.lock.release()
+            else:
+                shard.reads.append(key)
+            return cache._value(entry)
+
+        # Misses and expired entries change the segment
+        with self._locked(shard) as cache:
+            return cache.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None,
+            tables: Optional[Iterable[str]] = None) -> None:
+        """Cache a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (None = default)
+            tables: Tables the value was read from (see QueryCache.set)
+        """
+        with self._locked(self._shard(key)) as cache:
+            cache.set(key, value, ttl, tables)
+
+    def invalidate(self, key: str) -> None:
+        """Remove one entry."""
+        with self._locked(self._shard(key)) as cache:
+            cache.invalidate(key)
+
+    def invalidate_pattern(self, pattern: str) -> None:
+        """Remove the entries whose key matches ``prefix*``."""
+        for shard in self._shards:
+            with self._locked(shard) as cache:
+                cache.invalidate_pattern(pattern)
+
+    def invalidate_tables(self, tables: Optional[Iterable[str]]) -> int:
+        """Remove the entries that read any of the tables (None = all).
+
+        Returns:
+            Number of entries removed
+        """
+        if tables is not None:
+            tables = list(tables)
+        removed = 0
+        for shard in self._shards:
+            with self._locked(shard) as cache:
+                removed += cache.invalidate_tables(tables)
+        return removed
+
+    def invalidate_write(self, sql: str) -> int:
+        """Remove the entries a write statement makes stale.
+
+        Returns:
+            Number of entries removed
+        """
+        tables = written_tables(sql)
+        if tables is not None and not tables:
+            return 0
+        return self.invalidate_tables(tables)
+
+    async def handle_change_notification(self, channel: str, payload: str) -> int:
+        """Invalidate the tables named by a change notification.
+
+        See QueryCache.handle_change_notification.
+        """
+        tables = notification_tables(payload)
+        logger.debug(f"Change notification on {channel}: {tables or 'unknown tables'}")
+        return self.invalidate_tables(tables)
+
+    async def clear(self) -> None:
+        """Remove every entry."""
+        for shard in self._shards:
+            with self._locked(shard) as cache:
+                cache._drop_tables(None)
+                shard.reads.clear()
+
+    async def cleanup_expired(self) -> int:
+        """Remove expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for shard in self._shards:
+            with self._locked(shard) as cache:
+                removed += cache._expire()
+        return removed
+
+    def next_expiry_in(self) -> Optional[float]:
+        """Seconds until the next entry can be reclaimed (None if none can)."""
+        delays = []
+        for shard in self._shards:
+            with self._locked(shard) as cache:
+                delay = cache.next_expiry_in()
+            if delay is not None:
+                delays.append(delay)
+        return min(delays, default=None)
+
+    def get_shard_statistics(self) -> List[Dict[str, Any]]:
+        """Statistics of each shard.
+
+        Returns:
+            One dictionary per shard with its size, hits, misses,
+            evictions, memory use and lock counters
+        """
+        shard_stats = []
+        for shard in self._shards:
+            with self._locked(shard) as cache:
+                stats = cache.get_statistics()
+            shard_stats.append({
+                'size': stats['size'],
+                'hits': stats['hits'],
+                'misses': stats['misses'],
+                'hit_rate': stats['hit_rate'],
+                'evictions': stats['evictions'],
+                'expirations': stats['expirations'],
+                'memory_usage_bytes': stats['memory_usage_bytes'],
+                **shard.stats.to_dict()
+            })
+        return shard_stats
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Statistics of the whole cache."""
+        shard_stats = self.get_shard_statistics()
+
+        def total(name: str) -> int:
+            return sum(stats[name] for stats in shard_stats)
+
+        hits, misses = total('hits'), total('misses')
+        acquisitions = total('lock_acquisitions')
+        return {
+            'shards': len(shard_stats),
+            'size': total('size'),
+            'max_size': self.max_size,
+            'memory_usage_bytes': total('memory_usage_bytes'),
+            'memory_usage_mb': total('memory_usage_bytes') / (1024 * 1024),
+            'max_memory_mb': self.max_memory_mb,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'evictions': total('evictions'),
+            'expirations': total('expirations'),
+            'total_requests': hits + misses,
+            'lock_acquisitions': acquisitions,
+            'lock_contention_rate': total('contended') / acquisitions if acquisitions else 0.0,
+            'buffered_reads': total('buffered_reads')
+        }
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Statistics of the whole cache."""
+        return self.get_statistics()
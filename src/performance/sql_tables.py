@@ -0,0 +1,509 @@
+"""
+Table dependencies of SQL statements.
+
+A lightweight tokenizer (no SQL grammar) that finds the tables a query
+reads and the tables a statement writes, so cached results can be
+invalidated per table. Names are lowercased without quotes or schema, so
+``"Public"."Orders"`` and ``orders`` are the same table; tables with the
+same name in different schemas share invalidations, which errs on the
+safe side.
+
+``None`` means the dependencies are unknown (e.g. a stored procedure
+call) and callers must assume the statement touches every table. Views
+and functions are opaque: a query reading a view depends on the view's
+name only, so invalidate views by name when their base tables change.
+
+``fingerprint`` reduces a statement to its shape, so queries that differ
+only in literal values share one fingerprint. ``cacheable_read`` and
+``volatile_functions`` tell whether a query's result may be reused.
+"""
+
+from typing import FrozenSet, List, Optional, Set, Tuple
+import re
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+# String literal or number not part of a name or $1 placeholder
+_LITERAL = re.compile(r"'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+# Spaces the fingerprint drops around punctuation
+_LOOSE = re.compile(r" (?=[.,)])|(?<=[.($]) ")
+_TOKEN = re.compile(
+    r'"(?:[^"]|"")*"'      # "quoted identifier"
+    r"|`[^`]*`"            # `mysql identifier`
+    r"|\[[^\]]*\]"         # [sql server identifier]
+    r"|[A-Za-z_][\w$]*"    # bare word
+    r"|[(),;.=]"
+    r"|\S"
+)
+
+# Words that never name a table where one is expected
+_KEYWORDS = {
+    'select', 'from', 'where', 'join', 'on', 'using', 'as', 'with', 'recursive',
+    'lateral', 'only', 'set', 'values', 'default', 'into', 'table', 'if', 'not',
+    'exists', 'inner', 'left', 'right', 'full', 'outer', 'cross', 'natural',
+    'group', 'order', 'by', 'having', 'limit', 'offset', 'union', 'all',
+    'intersect', 'except', 'returning', 'do', 'nothing', 'update', 'delete',
+    'insert', 'for', 'nowait', 'skip', 'locked', 'of', 'share', 'window',
+    'fetch', 'first', 'next', 'rows', 'row', 'unique', 'concurrently', 'and',
+    'or', 'when', 'then', 'case', 'end', 'matched', 'to', 'ignore', 'low_priority',
+    'quick', 'temporary', 'temp', 'unlogged', 'global', 'local', 'cascade', 'restrict'
+}
+
+# Words that may follow a complete table reference; anything else means the
+# reference is not understood
+_AFTER_TABLE = {
+    'where', 'join', 'straight_join', 'inner', 'left', 'right', 'full', 'outer',
+    'cross', 'natural', 'on', 'using', 'set', 'from', 'group', 'order', 'having',
+    'limit', 'offset', 'fetch', 'window', 'union', 'intersect', 'except', 'minus',
+    'returning', 'into', 'for', 'lock', 'cascade', 'restrict', 'restart', 'continue'
+}
+
+# Words introducing a list of table references
+_TABLE_LISTS = {'from', 'join', 'straight_join', 'using', 'apply'}
+
+_TABLE_MODIFIERS = {'only', 'lateral', 'table', 'if', 'not', 'exists'}
+
+# Statements that change no table data
+_READ_ONLY = {
+    'select', 'show', 'explain', 'describe', 'desc', 'set', 'begin', 'start',
+    'commit', 'rollback', 'savepoint', 'release', 'vacuum', 'analyze', 'use',
+    'pragma', 'listen', 'unlisten', 'notify', 'grant', 'revoke', 'values',
+    'declare', 'fetch', 'close', 'prepare', 'deallocate', 'discard', 'reset',
+    'lock', 'checkpoint'
+}
+
+# Statements that must name the table whose rows they change
+_DATA_WRITES = {'insert', 'update', 'delete', 'merge', 'truncate', 'replace',
+                'upsert', 'copy', 'load'}
+_WRITES = _DATA_WRITES | {'drop', 'alter', 'create', 'rename', 'comment', 'refresh'}
+
+
+# Functions whose result changes between calls or that have side effects
+# (sequences, clocks, random values, locks, session state)
+_VOLATILE = {
+    'nextval', 'setval', 'currval', 'lastval', 'now', 'random', 'rand', 'uuid',
+    'uuid_short', 'gen_random_uuid', 'uuid_generate_v1', 'uuid_generate_v4',
+    'clock_timestamp', 'statement_timestamp', 'transaction_timestamp', 'timeofday',
+    'sysdate', 'curdate', 'curtime', 'current_timestamp', 'unix_timestamp',
+    'utc_timestamp', 'utc_date', 'utc_time', 'get_lock', 'release_lock',
+    'release_all_locks', 'is_free_lock', 'is_used_lock', 'sleep', 'pg_sleep',
+    'last_insert_id', 'found_rows', 'row_count', 'set_config', 'pg_notify',
+    'txid_current', 'pg_current_xact_id', 'dblink', 'dblink_exec'
+}
+_VOLATILE_PREFIXES = ('pg_advisory_', 'pg_try_advisory_')
+# Words that read the clock without parentheses
+_VOLATILE_WORDS = {'current_timestamp', 'current_date', 'current_time',
+                   'localtime', 'localtimestamp'}
+
+
+def _normalize(token: str) -> str:
+    if token[0] in '"`[':
+        token = token[1:-1]
+    return token.lower()
+
+
+def _tokenize(sql: str) -> List[str]:
+    sql = _STRING.sub(" '' ", _COMMENT.sub(' ', sql))
+    tokens = []
+    for token in _TOKEN.findall(sql):
+        # Fold schema.table (and db.schema.table) into the last part
+        if len(tokens) >= 2 and tokens[-1] == '.' and _is_name(tokens[-2]) and _is_name(token):
+            del tokens[-2:]
+        tokens.append(token)
+    return tokens
+
+
+def _is_name(token: str) -> bool:
+    return token[0] in '"`[' or (token[0].isalpha() or token[0] == '_')
+
+
+def _skip_modifiers(tokens: List[str], i: int) -> int:
+    while i < len(tokens) and tokens[i].lower() in _TABLE_MODIFIERS:
+        i += 1
+    return i
+
+
+def _table_at(tokens: List[str], i: int, columns: bool = False) -> Optional[str]:
+    """Table named by token i, skipping modifiers; None if it is not a table.
+
+    A name followed by a parenthesis is a table function, unless columns
+    is set for write targets such as ``INSERT INTO t (a, b)``.
+    """
+    i = _skip_modifiers(tokens, i)
+    if i >= len(tokens) or not _is_name(tokens[i]):
+        return None
+    if tokens[i][0] not in '"`[' and tokens[i].lower() in _KEYWORDS:
+        return None
+    if not columns and i + 1 < len(tokens) and tokens[i + 1] == '(':
+        return None
+    return _normalize(tokens[i])
+
+
+def _statements(tokens: List[str]) -> List[List[str]]:
+    statements, current, depth = [], [], 0
+    for token in tokens:
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        if token == ';' and depth <= 0:
+            if current:
+                statements.append(current)
+            current, depth = [], 0
+        else:
+            current.append(token)
+    if current:
+        statements.append(current)
+    return statements
+
+
+def _cte_names(tokens: List[str]) -> Set[str]:
+    """Names defined by WITH clauses."""
+    names = set()
+    for i, token in enumerate(tokens):
+        if token.lower() != 'as' or i + 1 >= len(tokens) or tokens[i + 1] != '(':
+            continue
+        j = i - 1
+        # name (col, ...) AS (
+        if tokens[j] == ')':
+            depth = 0
+            while j >= 0:
+                depth += tokens[j] == ')'
+                depth -= tokens[j] == '('
+                if depth == 0:
+                    break
+                j -= 1
+            j -= 1
+        if j >= 1 and _is_name(tokens[j]) and tokens[j - 1].lower() in ('with', 'recursive', ','):
+            names.add(_normalize(tokens[j]))
+    return names
+
+
+def _closing(tokens: List[str], i: int) -> int:
+    """Index of the parenthesis closing the one at i."""
+    depth = 0
+    for j in range(i, len(tokens)):
+        depth += tokens[j] == '('
+        depth -= tokens[j] == ')'
+        if depth == 0:
+            return j
+    return len(tokens)
+
+
+def _is_alias(token: str) -> bool:
+    if token[0] in '"`[':
+        return True
+    return _is_name(token) and token.lower() not in _KEYWORDS and token.lower() not in _AFTER_TABLE
+
+
+def _table_list(tokens: List[str], i: int, aliases: bool = True) -> Optional[Tuple[Set[str], int]]:
+    """Comma-separated table references starting at token i.
+
+    References may be tables, subqueries or table functions, each with an
+    optional alias and column alias list (``a AS t(x)``).
+
+    Returns:
+        (tables, index of the token after the list), or None if a reference
+        is followed by something not understood
+    """
+    tables = set()
+    while True:
+        i = _skip_modifiers(tokens, i)
+        if i < len(tokens) and tokens[i] == '(':
+            # Subquery; its own FROM clauses are read separately
+            i = _closing(tokens, i) + 1
+        elif i + 1 < len(tokens) and _is_name(tokens[i]) and tokens[i + 1] == '(':
+            # Table function: skip its arguments
+            i = _closing(tokens, i + 1) + 1
+        else:
+            table = _table_at(tokens, i)
+            if table is None:
+                return None
+            tables.add(table)
+            i += 1
+            # DELETE a.*, b.* FROM ...
+            if tokens[i:i + 2] == ['.', '*']:
+                i += 2
+
+        if aliases:
+            if i < len(tokens) and tokens[i].lower() == 'as':
+                i += 1
+                if i >= len(tokens) or not _is_alias(tokens[i]):
+                    return None
+            if i < len(tokens) and _is_alias(tokens[i]):
+                i += 1
+                if i < len(tokens) and tokens[i] == '(':
+                    i = _closing(tokens, i) + 1
+
+        if i < len(tokens) and tokens[i] == ',':
+            i += 1
+            continue
+        if i >= len(tokens) or tokens[i] in (')', ';') or tokens[i].lower() in _AFTER_TABLE:
+            return tables, i
+        return None
+
+
+def _source_tables(tokens: List[str]) -> Optional[Set[str]]:
+    """Tables after FROM, JOIN and USING, including comma-separated lists.
+
+    Returns:
+        Table names, or None if a table reference is not understood
+    """
+    tables = set()
+    for i, token in enumerate(tokens):
+        if token.lower() not in _TABLE_LISTS:
+            continue
+        following = tokens[i + 1] if i + 1 < len(tokens) else ''
+        # EXTRACT(x FROM 1), IS DISTINCT FROM: not a table list
+        if not following or not (_is_name(following) or following == '(') or \
+                (i and tokens[i - 1].lower() == 'distinct'):
+            continue
+        parsed = _table_list(tokens, i + 1)
+        if parsed is None:
+            return None
+        tables |= parsed[0]
+    return tables
+
+
+def fingerprint(sql: str) -> Tuple[str, Tuple[str, ...]]:
+    """Shape of a statement and the literal values it was written with.
+
+    Comments are dropped, string and numeric literals become ``?`` (IN
+    lists of any length become one), words are lowercased and whitespace
+    is collapsed. ``WHERE id = 1`` and ``where id=2`` share a fingerprint;
+    the literals tell them apart.
+
+    Args:
+        sql: Statement text
+
+    Returns:
+        (fingerprint, literal values in order of appearance)
+    """
+    literals: List[str] = []
+
+    def placeholder(match: re.Match) -> str:
+        literals.append(match.group(0))
+        return '?'
+
+    shape = _IN_LIST.sub('(?)', _LITERAL.sub(placeholder, _COMMENT.sub(' ', sql)))
+    tokens = [
+        token if token[0] in '"`[' else token.lower()
+        for token in _TOKEN.findall(shape)
+    ]
+    return _LOOSE.sub('', ' '.join(tokens)), tuple(literals)
+
+
+def cacheable_read(sql: str) -> bool:
+    """Whether a statement is a single plain query.
+
+    Plain means SELECT, WITH ... SELECT or VALUES that locks no rows
+    (``FOR UPDATE``/``FOR SHARE``, ``LOCK IN SHARE MODE``), creates or
+    fills nothing (``SELECT ... INTO``) and writes no table. Functions are
+    not considered; see ``volatile_functions``.
+
+    Args:
+        sql: Statement text
+
+    Returns:
+        True if running the statement again has no effect besides its result
+    """
+    statements = _statements(_tokenize(sql))
+    if len(statements) != 1:
+        return False
+    tokens = statements[0]
+    if tokens[0].lower() not in ('select', 'with', 'values', '('):
+        return False
+    lowered = [token.lower() for token in tokens]
+    for i, word in enumerate(lowered):
+        following = lowered[i + 1] if i + 1 < len(lowered) else ''
+        if word == 'into':
+            return False
+        if word == 'for' and following in ('update', 'share', 'no', 'key'):
+            return False
+        if word == 'lock' and following == 'in':
+            return False
+    return written_tables(sql) == frozenset()
+
+
+def volatile_functions(sql: str) -> FrozenSet[str]:
+    """Volatile or side-effecting functions a statement calls.
+
+    Covers sequences (``nextval``), clocks (``now()``,
+    ``CURRENT_TIMESTAMP``), random values, advisory and named locks
+    (``pg_advisory_*``, ``GET_LOCK``) and session state.
+
+    Args:
+        sql: Statement text
+
+    Returns:
+        Lowercased function names (empty if none)
+    """
+    tokens = _tokenize(sql)
+    found = set()
+    for i, token in enumerate(tokens):
+        if token[0] in '"`[' or not _is_name(token):
+            continue
+        name = token.lower()
+        called = i + 1 < len(tokens) and tokens[i + 1] == '('
+        if name in _VOLATILE_WORDS or called and (
+            name in _VOLATILE or name.startswith(_VOLATILE_PREFIXES)
+        ):
+            found.add(name)
+    return frozenset(found)
+
+
+def normalize_table(name: str) -> str:
+    """Table name as the other functions report it.
+
+    Args:
+        name: Table name, optionally quoted or schema-qualified
+
+    Returns:
+        Lowercased name without quotes or schema
+    """
+    tokens = _tokenize(name)
+    return _normalize(tokens[-1]) if tokens else name.lower()
+
+
+def referenced_tables(sql: str) -> Optional[FrozenSet[str]]:
+    """Tables a read-only query reads.
+
+    Args:
+        sql: Query text
+
+    Returns:
+        Table names, or None if the text is not a query this can analyse
+    """
+    tokens = _tokenize(sql)
+    if not tokens or tokens[0].lower() not in ('select', 'with', 'values', '('):
+        return None
+    written = written_tables(sql)
+    if written is None or written:
+        return None
+    tables = _source_tables(tokens)
+    if tables is None:
+        return None
+    return frozenset(tables - _cte_names(tokens))
+
+
+def written_tables(sql: str) -> Optional[FrozenSet[str]]:
+    """Tables whose data or definition a statement changes.
+
+    Args:
+        sql: One or more statements
+
+    Returns:
+        Table names (empty for read-only statements), or None if unknown
+    """
+    written: Set[str] = set()
+    for tokens in _statements(_tokenize(sql)):
+        verb = tokens[0].lower()
+        if verb in _READ_ONLY:
+            continue
+        if verb not in _WRITES and verb != 'with' and tokens[0] != '(':
+            return None
+
+        tables = _statement_writes(tokens)
+        if tables is None:
+            return None
+        written |= tables
+    return frozenset(written)
+
+
+def _statement_writes(tokens: List[str]) -> Optional[Set[str]]:
+    """Tables written by one statement (None if a write target is unclear)."""
+    tables = set()
+    lowered = [token.lower() for token in tokens]
+    verb = lowered[0]
+
+    for i, word in enumerate(lowered):
+        previous = lowered[i - 1] if i else ''
+        # UPDATE/DELETE starting the statement or a CTE body, not ON DELETE,
+        # FOR UPDATE, trigger events or MERGE actions
+        starts = previous in ('', '(', ')')
+        if word in ('insert', 'replace', 'upsert') and previous not in ('or', 'then'):
+            target = i + 1
+            while target < len(tokens) and lowered[target] in (
+                'into', 'ignore', 'low_priority', 'overwrite', 'or', 'replace'
+            ):
+                target += 1
+        elif word == 'update' and starts:
+            # Every table before SET may be written (UPDATE a, b / a JOIN b SET b.x)
+            targets = _update_targets(tokens, i + 1)
+            if targets is None:
+                return None
+            tables |= targets
+            continue
+        elif word == 'delete' and starts:
+            targets = _delete_targets(tokens, i + 1)
+            if targets is None:
+                return None
+            tables |= targets
+            continue
+        elif word == 'merge' and i + 1 < len(tokens) and lowered[i + 1] == 'into':
+            target = i + 2
+        elif word in ('truncate', 'drop') and i == 0:
+            # TRUNCATE [TABLE] a, b / DROP [TEMPORARY] TABLE [IF EXISTS] a, b
+            target = i + 1
+            if verb == 'drop':
+                while target < len(tokens) and lowered[target] in ('temporary', 'materialized'):
+                    target += 1
+                if target >= len(tokens) or lowered[target] not in ('table', 'view'):
+                    continue
+            parsed = _table_list(tokens, target, aliases=False)
+            if parsed is None:
+                return None
+            tables |= parsed[0]
+            continue
+        elif word == 'copy' and i == 0:
+            target = i + 1
+        elif word in ('table', 'view') and verb in _WRITES and verb not in ('truncate', 'drop'):
+            target = i + 1
+        elif word == 'on' and verb in ('create', 'drop', 'comment') and 'index' in lowered[:i]:
+            target = i + 1
+        elif word == 'to' and verb in ('rename', 'alter') and 'table' in lowered[:i]:
+            target = i + 1
+        else:
+            continue
+
+        table = _table_at(tokens, target, columns=True)
+        if table is not None:
+            tables.add(table)
+
+    if not tables and verb in _DATA_WRITES:
+        return None
+    # Other DDL without a table (CREATE FUNCTION, ALTER SEQUENCE) changes no rows
+    return tables - _cte_names(tokens)
+
+
+def _update_targets(tokens: List[str], i: int) -> Optional[Set[str]]:
+    """Tables named between UPDATE and its SET."""
+    while i < len(tokens) and tokens[i].lower() in ('low_priority', 'ignore'):
+        i += 1
+    depth = 0
+    for end in range(i, len(tokens)):
+        depth += tokens[end] == '('
+        depth -= tokens[end] == ')'
+        if depth == 0 and tokens[end].lower() == 'set':
+            return _source_tables(['from', *tokens[i:end]])
+    return None
+
+
+def _delete_targets(tokens: List[str], i: int) -> Optional[Set[str]]:
+    """Tables a DELETE removes rows from.
+
+    ``DELETE a, b FROM ...`` names them before FROM; otherwise it is the
+    list after FROM (``DELETE FROM a``, ``DELETE FROM a, b USING ...``).
+    """
+    while i < len(tokens) and tokens[i].lower() in ('low_priority', 'quick', 'ignore'):
+        i += 1
+    if i < len(tokens) and tokens[i].lower() == 'from':
+        parsed = _table_list(tokens, i + 1)
+    else:
+        parsed = _table_list(tokens, i, aliases=False)
+        if parsed is not None and not (
+            parsed[1] < len(tokens) and tokens[parsed[1]].lower() == 'from'
+        ):
+            parsed = None
+    return None if parsed is None else parsed[0]
@@ -5,12 +5,16 @@ This package contains intelligent UI engines for enhanced user experience:
 - Additional engines can be added here
 """
 
+from .context_cache import ContextCache
 from .context_suggestion import (
     ContextAwareSuggestionEngine,
-    SuggestionContext
+    SuggestionContext,
+    SuggestionUpdate
 )
 
 __all__ = [
+    'ContextCache',
     'ContextAwareSuggestionEngine',
-    'SuggestionContext'
+    'SuggestionContext',
+    'SuggestionUpdate'
 ]
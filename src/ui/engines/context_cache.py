@@ -0,0 +1,255 @@
+"""Bounded context cache for the suggestion engine.
+
+A TTL-LRU mapping with single-flight loading: while a key is being
+computed, further requests for it await the same load instead of starting
+their own. Loads run as separate tasks, so a superseded keystroke that
+stops waiting does not cancel a load other keystrokes still need.
+
+Entries are bounded by count and by estimated memory. Values pushed in
+from outside, which no load could recompute, can be pinned instead: pinned
+entries never expire, are not evicted and do not count against the bounds.
+"""
+
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+import asyncio
+import logging
+import time
+
+try:
+    from ...performance.cache import estimate_size
+except ImportError:
+    from performance.cache import estimate_size
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ContextCacheStats:
+    """Context cache counters."""
+    hits: int = 0
+    misses: int = 0
+    shared_loads: int = 0
+    load_errors: int = 0
+    expirations: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served without starting a load."""
+        total = self.hits + self.shared_loads + self.misses
+        return (self.hits + self.shared_loads) / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'shared_loads': self.shared_loads,
+            'hit_rate': self.hit_rate,
+            'load_errors': self.load_errors,
+            'expirations': self.expirations,
+            'evictions': self.evictions
+        }
+
+
+class _Entry:
+    """Cached value."""
+
+    __slots__ = ('value', 'timestamp', 'size')
+
+    def __init__(self, value: Any, timestamp: float, size: int) -> None:
+        self.value = value
+        self.timestamp = timestamp
+        self.size = size
+
+
+class ContextCache(MutableMapping):
+    """TTL-LRU cache of gathered context with single-flight loading.
+
+    As a mapping, items are ``(value, timestamp)`` tuples, pinned entries
+    included; reading them does not touch recency or the statistics.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entries: int = 128,
+        max_bytes: int = 16 * 1024 * 1024,
+        sizer: Callable[[Any], int] = estimate_size
+    ) -> None:
+        """Initialize context cache.
+
+        Args:
+            ttl: Seconds an entry stays fresh
+            max_entries: Maximum cached entries
+            max_bytes: Maximum estimated memory of cached values; a value
+                larger than this is returned but not cached
+            sizer: Function estimating the memory of a value
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self.stats = ContextCacheStats()
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._pinned: Dict[str, Tuple[Any, float]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._size_bytes = 0
+
+    def __getitem__(self, key: str) -> Tuple[Any, float]:
+        if key in self._pinned:
+            return self._pinned[key]
+        entry = self._entries[key]
+        return entry.value, entry.timestamp
+
+    def __setitem__(self, key: str, item: Tuple[Any, float]) -> None:
+        value, timestamp = item
+        self.put(key, value, timestamp)
+
+    def __delitem__(self, key: str) -> None:
+        self._inflight.pop(key, None)
+        if self._pinned.pop(key, None) is None:
+            self._size_bytes -= self._entries.pop(key).size
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._pinned or key in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([*self._pinned, *self._entries])
+
+    def __len__(self) -> int:
+        return len(self._pinned) + len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Estimated memory of the cached values."""
+        return self._size_bytes
+
+    def put(self, key: str, value: Any, timestamp: Optional[float] = None) -> bool:
+        """Cache a value, replacing any entry or pending load of the key.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            timestamp: Time the value was computed (defaults to now)
+
+        Returns:
+            True if the value was cached, False if it exceeds max_bytes
+        """
+        # A load already running would overwrite this value with older data
+        self._inflight.pop(key, None)
+        self._pinned.pop(key, None)
+        self._discard(key)
+
+        size = self.sizer(value)
+        if size > self.max_bytes:
+            logger.debug(f"Context '{key}' too large to cache: {size} bytes")
+            return False
+
+        self._entries[key] = _Entry(value, time.time() if timestamp is None else timestamp, size)
+        self._size_bytes += size
+        while len(self._entries) > self.max_entries or self._size_bytes > self.max_bytes:
+            evicted, entry = self._entries.popitem(last=False)
+            self._size_bytes -= entry.size
+            self.stats.evictions += 1
+            logger.debug(f"Evicted context '{evicted}'")
+        return True
+
+    def pin(self, key: str, value: Any) -> None:
+        """Store a value that stays until replaced, deleted or cleared.
+
+        For values that cannot be loaded again: a pinned entry never
+        expires, is never evicted and is not limited by max_bytes.
+
+        Args:
+            key: Cache key
+            value: Value to keep
+        """
+        self._inflight.pop(key, None)
+        self._discard(key)
+        self._pinned[key] = (value, time.time())
+
+    def clear(self) -> None:
+        """Remove every entry, pinned ones included, and forget pending loads."""
+        self._entries.clear()
+        self._pinned.clear()
+        self._inflight.clear()
+        self._size_bytes = 0
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Get a fresh value, loading it if it is missing or expired.
+
+        Concurrent calls for a key share one load. If the load fails, every
+        waiting caller gets the exception and nothing is cached.
+
+        Args:
+            key: Cache key
+            load: Coroutine function computing the value
+
+        Returns:
+            Cached or loaded value
+        """
+        pinned = self._pinned.get(key)
+        if pinned is not None:
+            self.stats.hits += 1
+            return pinned[0]
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.time() - entry.timestamp < self.ttl:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry.value
+            self._discard(key)
+            self.stats.expirations += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats.shared_loads += 1
+        else:
+            self.stats.misses += 1
+            task = asyncio.ensure_future(self._load(key, load, time.time()))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        # Shielded so that a cancelled caller leaves the load running
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, load: Callable[[], Awaitable[Any]], started: float) -> Any:
+        value = await load()
+        # Only store if the key was not overwritten or cleared meanwhile
+        if self._inflight.get(key) is asyncio.current_task():
+            self.put(key, value, started)
+        return value
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats.load_errors += 1
+            logger.warning(f"Loading context '{key}' failed: {task.exception()}")
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size_bytes -= entry.size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Counters plus current entries, memory and pending loads
+        """
+        return {
+            **self.stats.to_dict(),
+            'entries': len(self._entries),
+            'pinned': len(self._pinned),
+            'size_bytes': self._size_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'pending_loads': len(self._inflight)
+        }
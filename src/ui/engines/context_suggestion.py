@@ -4,21 +4,28 @@ This module provides intelligent autocomplete suggestions by gathering context
 from the current environment and scoring suggestions based on relevance.
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+)
 from dataclasses import dataclass, field
 from enum import Enum
 import asyncio
+import inspect
 import logging
 import os
 import time
 from pathlib import Path
 
+from .context_cache import ContextCache
+
 try:
     from ...vector.autocomplete import IntelligentCompleter, CompletionCandidate
     from ...llm.embeddings import EmbeddingModel
+    from ...llm.embedding_service import EmbeddingService
 except ImportError:
     from vector.autocomplete import IntelligentCompleter, CompletionCandidate
     from llm.embeddings import EmbeddingModel
+    from llm.embedding_service import EmbeddingService
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +81,38 @@ class SuggestionContext:
     query_text: str = ""
 
 
+@dataclass
+class SuggestionUpdate:
+    """Suggestions streamed by one tier of the keystroke pipeline.
+
+    Attributes:
+        tier: Tier that produced the update ('fast', 'vector' or 'llm')
+        candidates: Ranked suggestions from every tier so far
+        final: True for the last update of a keystroke
+        elapsed_ms: Time since the keystroke
+        reused: True if the tier narrowed the previous keystroke's result
+            instead of recomputing it
+    """
+    tier: str
+    candidates: List[CompletionCandidate]
+    final: bool
+    elapsed_ms: float
+    reused: bool = False
+
+
+@dataclass
+class _PipelineResult:
+    """Tier results of one keystroke, kept for narrowing by the next."""
+    query: str
+    statement_type: Optional[str]
+    object_type: Optional[str]
+    tiers: Dict[str, List[CompletionCandidate]] = field(default_factory=dict)
+
+
+# Tiers whose result can be narrowed when the input extends the last word
+NARROWABLE_TIERS = ('vector', 'llm')
+
+
 class ContextAwareSuggestionEngine:
     """Engine for context-aware autocomplete suggestions.
 
@@ -82,18 +121,38 @@ class ContextAwareSuggestionEngine:
 
     Performance target: < 150ms response time
 
+    For per-keystroke use, stream_suggestions (or submit) runs a tiered
+    pipeline: pattern, syntax and history suggestions first, then vector
+    search within the remaining budget, then the optional LLM suggester.
+    A new keystroke supersedes the previous one, and when it only extends
+    the word being typed the previous vector and LLM results are narrowed
+    instead of recomputed.
+
     Attributes:
         completer: IntelligentCompleter instance
         embedding_model: EmbeddingModel for query embeddings
-        context_cache: Cache of gathered context
+        embedding_service: Optional shared EmbeddingService that batches
+            query encodes with other callers
+        llm_suggester: Optional coroutine function (query, context) returning
+            CompletionCandidates for the last pipeline tier
+        context_cache: Bounded, single-flight cache of gathered context
         cache_ttl: Time-to-live for cached context (seconds)
+        budget_ms: Latency budget for the fast and vector tiers
     """
 
     def __init__(
         self,
         completer: IntelligentCompleter,
         embedding_model: EmbeddingModel,
-        cache_ttl: int = 300  # 5 minutes
+        cache_ttl: int = 300,  # 5 minutes
+        embedding_service: Optional[EmbeddingService] = None,
+        llm_suggester: Optional[
+            Callable[[str, Dict[str, Any]], Awaitable[List[CompletionCandidate]]]
+        ] = None,
+        budget_ms: float = 150.0,
+        llm_timeout: Optional[float] = None,
+        cache_max_entries: int = 128,
+        cache_max_bytes: int = 16 * 1024 * 1024
     ):
         """Initialize ContextAwareSuggestionEngine.
 
@@ -101,14 +160,79 @@ class ContextAwareSuggestionEngine:
             completer: IntelligentCompleter instance
             embedding_model: EmbeddingModel for embeddings
             cache_ttl: Cache time-to-live in seconds
+            embedding_service: Shared micro-batching service; when set,
+                keystroke encodes are queued instead of each taking a thread
+            llm_suggester: Coroutine function producing LLM suggestions,
+                streamed after the vector tier
+            budget_ms: Time after a keystroke by which the vector tier must
+                finish; slower vector searches are dropped for that keystroke
+            llm_timeout: Seconds allowed for the LLM tier (None for no limit)
+            cache_max_entries: Maximum entries in the context cache
+            cache_max_bytes: Maximum estimated memory of cached context
         """
         self.completer = completer
         self.embedding_model = embedding_model
-        self.cache_ttl = cache_ttl
-        self._context_cache: Dict[str, Tuple[Any, float]] = {}
+        self.embedding_service = embedding_service
+        self._context_cache = ContextCache(
+            ttl=cache_ttl,
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes
+        )
         self._command_history: List[str] = []
         self._max_history = 100
 
+        # Keystroke pipeline state
+        self.llm_suggester = llm_suggester
+        self.budget_ms = budget_ms
+        self.llm_timeout = llm_timeout
+        self._generation = 0
+        self._pending: Optional[asyncio.Task] = None
+        self._last_result: Optional[_PipelineResult] = None
+        self.pipeline_stats = {
+            'keystrokes': 0,
+            'superseded': 0,
+            'reused_tiers': 0,
+            'timeouts': 0,
+            'over_budget': 0,
+            'stale_skips': 0
+        }
+
+    @classmethod
+    def from_llm_manager(
+        cls,
+        completer: IntelligentCompleter,
+        llm_manager: Any,
+        **kwargs: Any
+    ) -> 'ContextAwareSuggestionEngine':
+        """Create an engine sharing an LLM manager's embedding model and service.
+
+        Keystroke encodes are then batched with the manager's other
+        embedding callers instead of running their own forward passes.
+
+        Args:
+            completer: IntelligentCompleter instance
+            llm_manager: LocalLLMManager owning the embedding model and service
+            **kwargs: Other constructor arguments
+
+        Returns:
+            ContextAwareSuggestionEngine
+        """
+        return cls(
+            completer,
+            llm_manager.embedding_model,
+            embedding_service=llm_manager.embedding_service,
+            **kwargs
+        )
+
+    @property
+    def cache_ttl(self) -> float:
+        """Time-to-live for cached context (seconds)."""
+        return self._context_cache.ttl
+
+    @cache_ttl.setter
+    def cache_ttl(self, ttl: float) -> None:
+        self._context_cache.ttl = ttl
+
     async def get_suggestions(
         self,
         query: str,
@@ -133,10 +257,13 @@ class ContextAwareSuggestionEngine:
                 context = await self.gather_context(query)
 
             # Generate query embedding asynchronously
-            query_vector = await asyncio.to_thread(
-                self.embedding_model.encode,
-                query
-            )
+            if self.embedding_service is not None:
+                query_vector = await self.embedding_service.encode_async(query)
+            else:
+                query_vector = await asyncio.to_thread(
+                    self.embedding_model.encode,
+                    query
+                )
 
             # Get completions from IntelligentCompleter
             candidates = await asyncio.to_thread(
@@ -176,6 +303,237 @@ class ContextAwareSuggestionEngine:
             logger.error(f"Error generating suggestions: {e}", exc_info=True)
             return []
 
+    def submit(
+        self,
+        query: str,
+        on_update: Callable[[SuggestionUpdate], Any],
+        context: Optional[Dict[str, Any]] = None,
+        max_results: int = 10
+    ) -> asyncio.Task:
+        """Start the pipeline for a keystroke, cancelling the previous one.
+
+        Args:
+            query: User's query text
+            on_update: Called (and awaited, if it returns an awaitable)
+                with every SuggestionUpdate
+            context: Optional pre-gathered context
+            max_results: Maximum number of suggestions
+
+        Returns:
+            Task delivering the updates
+        """
+        if self._pending is not None and not self._pending.done():
+            self._pending.cancel()
+            self.pipeline_stats['superseded'] += 1
+
+        self._pending = asyncio.create_task(
+            self._deliver(query, on_update, context, max_results)
+        )
+        return self._pending
+
+    async def _deliver(
+        self,
+        query: str,
+        on_update: Callable[[SuggestionUpdate], Any],
+        context: Optional[Dict[str, Any]],
+        max_results: int
+    ) -> None:
+        """Feed pipeline updates to a callback."""
+        async for update in self.stream_suggestions(query, context, max_results):
+            result = on_update(update)
+            if inspect.isawaitable(result):
+                await result
+
+    async def stream_suggestions(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        max_results: int = 10
+    ) -> AsyncIterator[SuggestionUpdate]:
+        """Stream suggestions for a keystroke tier by tier.
+
+        Yields an update after the fast tier (patterns, syntax, history),
+        the vector tier and, if configured, the LLM tier. The stream stops
+        early once a newer keystroke starts a stream of its own.
+
+        Args:
+            query: User's query text
+            context: Optional pre-gathered context
+            max_results: Maximum number of suggestions
+
+        Yields:
+            SuggestionUpdate with the suggestions ranked so far
+        """
+        start_time = time.perf_counter()
+        self._generation += 1
+        generation = self._generation
+        self.pipeline_stats['keystrokes'] += 1
+
+        if context is None:
+            context = await self.gather_context(query)
+        if generation != self._generation:
+            return
+
+        result = _PipelineResult(
+            query=query,
+            statement_type=context.get('statement_type'),
+            object_type=context.get('object_type')
+        )
+        reused = self._narrow_previous(result)
+        self._last_result = result
+
+        tiers: List[Tuple[str, Callable[[], Awaitable[List[CompletionCandidate]]]]] = [
+            ('fast', lambda: self._fast_tier(query, context, max_results)),
+            ('vector', lambda: self._vector_tier(query, context, max_results, generation)),
+        ]
+        if self.llm_suggester is not None:
+            tiers.append(('llm', lambda: self.llm_suggester(query, context)))
+
+        for position, (tier, compute) in enumerate(tiers):
+            if tier not in result.tiers:
+                timeout: Optional[float] = None
+                if tier == 'vector':
+                    # Whatever the fast tier left of the budget
+                    elapsed = time.perf_counter() - start_time
+                    timeout = max(self.budget_ms / 1000 - elapsed, 0.0)
+                elif tier == 'llm':
+                    timeout = self.llm_timeout
+                try:
+                    candidates = await asyncio.wait_for(compute(), timeout)
+                    result.tiers[tier] = candidates
+                except asyncio.TimeoutError:
+                    self.pipeline_stats['timeouts'] += 1
+                    logger.debug(f"Suggestion tier '{tier}' exceeded its time limit")
+                except Exception as e:
+                    logger.error(f"Error in suggestion tier '{tier}': {e}", exc_info=True)
+
+                if generation != self._generation:
+                    return
+
+            merged = self._deduplicate(
+                candidate for tier_candidates in result.tiers.values()
+                for candidate in tier_candidates
+            )
+            rescored = await self._rescore_with_context(merged, query, context)
+            ranked = sorted(rescored, key=lambda c: c.score, reverse=True)
+
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            if tier == 'vector' and elapsed_ms > self.budget_ms:
+                self.pipeline_stats['over_budget'] += 1
+                logger.warning(
+                    f"Suggestion generation took {elapsed_ms:.1f}ms (target: <{self.budget_ms:.0f}ms)"
+                )
+
+            yield SuggestionUpdate(
+                tier=tier,
+                candidates=ranked[:max_results],
+                final=position == len(tiers) - 1,
+                elapsed_ms=elapsed_ms,
+                reused=tier in reused
+            )
+
+    async def _fast_tier(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        max_results: int
+    ) -> List[CompletionCandidate]:
+        """Pattern, syntax and history suggestions; no embedding."""
+        return self.completer.get_fast_completions(query, context, max_results)
+
+    async def _vector_tier(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        max_results: int,
+        generation: Optional[int] = None
+    ) -> List[CompletionCandidate]:
+        """Embed the query and search the vector database.
+
+        A thread already running cannot be cancelled, so once the encode
+        returns the search is only started if the keystroke is still current.
+
+        Args:
+            query: User's query text
+            context: Gathered context
+            max_results: Maximum number of suggestions
+            generation: Keystroke generation the work belongs to
+
+        Returns:
+            Vector search candidates
+        """
+        if self.embedding_service is not None:
+            # Cancelling this await also drops the request from the service queue
+            query_vector = await self.embedding_service.encode_async(query)
+        else:
+            query_vector = await asyncio.to_thread(self.embedding_model.encode, query)
+
+        if generation is not None and generation != self._generation:
+            self.pipeline_stats['stale_skips'] += 1
+            return []
+
+        return await asyncio.to_thread(
+            self.completer.get_vector_completions,
+            query_vector,
+            context,
+            max_results
+        )
+
+    def _narrow_previous(self, result: _PipelineResult) -> List[str]:
+        """Carry over the previous keystroke's slow tiers, narrowed to the new input.
+
+        Only applies when the new query extends the word being typed, so
+        the statement and expected object type are unchanged.
+
+        Args:
+            result: Result of the new keystroke, filled in place
+
+        Returns:
+            Tiers reused
+        """
+        previous = self._last_result
+        if previous is None or not result.query.startswith(previous.query):
+            return []
+
+        extension = result.query[len(previous.query):]
+        if (
+            any(char.isspace() for char in extension)
+            or previous.statement_type != result.statement_type
+            or previous.object_type != result.object_type
+        ):
+            return []
+
+        words = result.query.split()
+        word = words[-1].lower() if words and not result.query[-1:].isspace() else ""
+
+        reused = []
+        for tier in NARROWABLE_TIERS:
+            if tier not in previous.tiers:
+                continue
+            narrowed = [
+                candidate for candidate in previous.tiers[tier]
+                if not word or any(
+                    part.lower().startswith(word)
+                    for part in (candidate.text, candidate.text.rsplit('.', 1)[-1])
+                )
+            ]
+            # Nothing left to show: recompute for the longer prefix instead
+            if narrowed:
+                result.tiers[tier] = narrowed
+                reused.append(tier)
+
+        self.pipeline_stats['reused_tiers'] += len(reused)
+        return reused
+
+    @staticmethod
+    def _deduplicate(candidates) -> List[CompletionCandidate]:
+        """Keep the highest-scored candidate per text."""
+        unique: Dict[str, CompletionCandidate] = {}
+        for candidate in candidates:
+            if candidate.text not in unique or candidate.score > unique[candidate.text].score:
+                unique[candidate.text] = candidate
+        return list(unique.values())
+
     async def gather_context(
         self,
         query: str = "",
@@ -387,6 +745,8 @@ class ContextAwareSuggestionEngine:
     ) -> Any:
         """Get value from cache or fetch if expired.
 
+        Concurrent keystrokes needing the same key share one fetch.
+
         Args:
             key: Cache key
             fetch_func: Function to fetch value if not cached
@@ -394,18 +754,10 @@ class ContextAwareSuggestionEngine:
         Returns:
             Cached or fetched value
         """
-        now = time.time()
-
-        if key in self._context_cache:
-            value, timestamp = self._context_cache[key]
-            if now - timestamp < self.cache_ttl:
-                return value
-
-        # Fetch new value
-        value = await asyncio.to_thread(fetch_func)
-        self._context_cache[key] = (value, now)
-
-        return value
+        return await self._context_cache.get_or_load(
+            key,
+            lambda: asyncio.to_thread(fetch_func)
+        )
 
     def _get_current_directory(self) -> str:
         """Get current working directory.
@@ -456,8 +808,18 @@ class ContextAwareSuggestionEngine:
             self._context_cache.pop(key, None)
         else:
             self._context_cache.clear()
+        # Narrowed results would be based on the old context
+        self._last_result = None
         logger.debug(f"Cache cleared: {key or 'all'}")
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get context cache statistics.
+
+        Returns:
+            Hit rate, load and eviction counters, entries and memory usage
+        """
+        return self._context_cache.get_stats()
+
     def set_database_objects(
         self,
         tables: List[str],
@@ -465,6 +827,9 @@ class ContextAwareSuggestionEngine:
     ) -> None:
         """Manually set database objects (for testing or external updates).
 
+        The objects are pinned in the context cache: nothing could reload
+        them, so they neither expire nor count against the cache bounds.
+
         Args:
             tables: List of table names
             columns: Dictionary mapping table names to column lists
@@ -473,8 +838,7 @@ class ContextAwareSuggestionEngine:
             'tables': tables,
             'columns': columns
         }
-        now = time.time()
-        self._context_cache['database_objects'] = (objects, now)
+        self._context_cache.pin('database_objects', objects)
         logger.debug(f"Database objects updated: {len(tables)} tables")
 
 # Alias for backward compatibility
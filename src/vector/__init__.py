@@ -1,6 +1,10 @@
 """Vector database system for AI-Shell intelligent completion."""
 
 from .store import VectorDatabase
+from .shards import ShardedVectorIndex
+from .lexical import LexicalIndex
+from .prefix import PrefixIndex
 from .autocomplete import IntelligentCompleter
 
-__all__ = ['VectorDatabase', 'IntelligentCompleter']
+__all__ = ['VectorDatabase', 'ShardedVectorIndex', 'LexicalIndex', 'PrefixIndex',
+           'IntelligentCompleter']
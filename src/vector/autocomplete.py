@@ -1,10 +1,13 @@
 """Intelligent autocomplete system using vector similarity."""
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Deque, List, Dict, Any, Optional, Tuple
+from collections import deque
 import numpy as np
 from dataclasses import dataclass
 import logging
+import math
 
+from .prefix import PrefixIndex
 from .store import VectorDatabase
 
 logger = logging.getLogger(__name__)
@@ -22,16 +25,43 @@ class CompletionCandidate:
 class IntelligentCompleter:
     """Intelligent autocomplete using vector similarity and patterns."""
 
-    def __init__(self, vector_db: VectorDatabase) -> None:
+    def __init__(
+        self,
+        vector_db: VectorDatabase,
+        max_history: int = 100,
+        history_half_life: int = 100,
+        history_results: int = 20
+    ) -> None:
         """Initialize completer.
 
+        History and registered patterns are kept in prefix indexes updated
+        as commands run, so completion cost does not grow with history size.
+
         Args:
             vector_db: Vector database instance
+            max_history: Commands remembered
+            history_half_life: Commands after which a use counts half as
+                much when ranking history completions
+            history_results: History completions offered per query
         """
         self.vector_db = vector_db
         self.pattern_cache: Dict[str, List[str]] = {}
-        self.completion_history: List[str] = []
-        self.max_history = 100
+        self.max_history = max_history
+        self.history_results = history_results
+
+        # Uses decay exponentially with the command sequence number
+        self._decay = math.log(2) / history_half_life
+        self._sequence = 0
+        self._history: Deque[Tuple[str, int]] = deque()
+
+        # History ranked by frecency (decayed use count, stored as a log)
+        self.history_index = PrefixIndex()
+        self.pattern_index = PrefixIndex()
+
+    @property
+    def completion_history(self) -> List[str]:
+        """Remembered commands, oldest first."""
+        return [text for text, _ in self._history]
 
     def add_to_history(self, completion: str) -> None:
         """Add completion to history.
@@ -39,9 +69,33 @@ class IntelligentCompleter:
         Args:
             completion: Completed text
         """
-        self.completion_history.append(completion)
-        if len(self.completion_history) > self.max_history:
-            self.completion_history.pop(0)
+        self._sequence += 1
+        self._history.append((completion, self._sequence))
+
+        use = self._decay * self._sequence
+        entry = self.history_index.get(completion)
+        if entry is None:
+            self.history_index.update(completion, use, 1)
+        else:
+            self.history_index.update(completion, float(np.logaddexp(entry.score, use)), entry.data + 1)
+
+        while len(self._history) > self.max_history:
+            self._forget_use(*self._history.popleft())
+
+    def _forget_use(self, completion: str, sequence: int) -> None:
+        """Remove one evicted use of a command from the history index."""
+        entry = self.history_index.get(completion)
+        if entry is None:
+            return
+        if entry.data <= 1:
+            self.history_index.remove(completion)
+            return
+
+        # Subtract exp(use) from exp(score); later uses keep it positive
+        remaining = math.exp(self._decay * sequence - entry.score)
+        self.history_index.update(
+            entry.text, entry.score + math.log1p(-min(remaining, 1.0 - 1e-12)), entry.data - 1
+        )
 
     def get_completions(
         self,
@@ -94,6 +148,54 @@ class IntelligentCompleter:
 
         return sorted_candidates[:max_results]
 
+    def get_fast_completions(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        max_results: int = 10
+    ) -> List[CompletionCandidate]:
+        """Get completions that need no query embedding.
+
+        Covers pattern, syntax and history sources, all answered from
+        in-memory indexes; suited to every keystroke.
+
+        Args:
+            query: Query text
+            context: Additional context (cursor position, statement type, etc.)
+            max_results: Maximum number of results
+
+        Returns:
+            List of completion candidates
+        """
+        context = context or {}
+        candidates = (
+            self._get_pattern_completions(query, context)
+            + self._get_syntax_completions(query, context)
+            + self._get_history_completions(query)
+        )
+        unique_candidates = self._deduplicate_candidates(candidates)
+        return sorted(unique_candidates, key=lambda c: c.score, reverse=True)[:max_results]
+
+    def get_vector_completions(
+        self,
+        query_vector: np.ndarray,
+        context: Optional[Dict[str, Any]] = None,
+        max_results: int = 10
+    ) -> List[CompletionCandidate]:
+        """Get completions from vector similarity only.
+
+        Args:
+            query_vector: Query embedding vector
+            context: Additional context (object_type filters the search)
+            max_results: Maximum number of results
+
+        Returns:
+            List of completion candidates
+        """
+        candidates = self._get_vector_completions(query_vector, context or {}, max_results)
+        unique_candidates = self._deduplicate_candidates(candidates)
+        return sorted(unique_candidates, key=lambda c: c.score, reverse=True)[:max_results]
+
     def _get_vector_completions(
         self,
         query_vector: np.ndarray,
@@ -162,6 +264,18 @@ class IntelligentCompleter:
         candidates = []
         query_lower = query.lower().strip()
 
+        # Registered patterns extending the word being typed
+        words = query_lower.split()
+        if words and not query.endswith(' '):
+            for entry in self.pattern_index.complete(words[-1], k=self.history_results):
+                for rank, completion in enumerate(entry.data):
+                    candidates.append(CompletionCandidate(
+                        text=completion,
+                        score=0.9 - 0.01 * min(rank, 10),
+                        metadata={'type': 'pattern', 'pattern': entry.text},
+                        source='pattern'
+                    ))
+
         # SQL keyword patterns
         if query_lower.startswith('sel'):
             candidates.append(CompletionCandidate(
@@ -254,24 +368,27 @@ class IntelligentCompleter:
             List of candidates
         """
         candidates = []
-        query_lower = query.lower()
-
-        for historical in self.completion_history[-20:]:  # Last 20
-            if historical.lower().startswith(query_lower) and historical != query:
-                # Calculate score based on recency and match quality
-                recency_score = (
-                    self.completion_history.index(historical) /
-                    len(self.completion_history)
-                )
-                match_score = len(query) / len(historical) if historical else 0
-                score = (recency_score * 0.3 + match_score * 0.7) * 0.6
 
-                candidates.append(CompletionCandidate(
-                    text=historical,
-                    score=score,
-                    metadata={'type': 'history'},
-                    source='history'
-                ))
+        # Best frecency first; one extra in case the query itself is in history
+        matches = [
+            entry for entry in self.history_index.complete(query, k=self.history_results + 1)
+            if entry.text != query
+        ][:self.history_results]
+
+        for rank, entry in enumerate(matches):
+            historical = entry.text
+
+            # Calculate score based on frecency rank and match quality
+            recency_score = 1.0 - rank / len(matches)
+            match_score = len(query) / len(historical) if historical else 0
+            score = (recency_score * 0.3 + match_score * 0.7) * 0.6
+
+            candidates.append(CompletionCandidate(
+                text=historical,
+                score=score,
+                metadata={'type': 'history', 'uses': entry.data},
+                source='history'
+            ))
 
         return candidates
 
@@ -304,6 +421,8 @@ class IntelligentCompleter:
             completions: List of completions for this pattern
         """
         self.pattern_cache[pattern] = completions
+        # Shorter patterns are closer to the typed word
+        self.pattern_index.update(pattern, -float(len(pattern)), completions)
         logger.debug(f"Registered pattern: {pattern} with {len(completions)} completions")
 
     def get_context_aware_completions(
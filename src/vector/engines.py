@@ -0,0 +1,320 @@
+"""Pluggable FAISS index engines for the vector database.
+
+Each engine knows how to create, train and tune one family of FAISS index:
+
+- ``flat``: exact L2 scan (IndexFlatL2), best for small collections
+- ``ivf_flat``: inverted file with exact residuals, tuned with ``nprobe``
+- ``ivf_pq``: inverted file with product quantization, for very large collections
+- ``hnsw``: graph-based search, tuned with ``efSearch``
+
+``select_index_type`` picks an engine from the collection size so that
+``VectorDatabase`` can move between tiers automatically as it grows.
+
+Every index is ID-mapped: vectors are added with caller-provided int64
+labels, either natively (IVF) or through an IndexIDMap2 wrapper.
+"""
+
+import logging
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Optional, Type
+
+import numpy as np
+import faiss
+
+logger = logging.getLogger(__name__)
+
+# Collection sizes at which the automatic selector switches tiers
+FLAT_MAX_VECTORS = 10_000
+IVF_FLAT_MAX_VECTORS = 1_000_000
+
+# Upper bound on vectors sampled to train IVF coarse quantizers
+MAX_TRAINING_POINTS_PER_LIST = 256
+
+
+class IndexType(Enum):
+    """Supported FAISS index families."""
+    FLAT = "flat"
+    IVF_FLAT = "ivf_flat"
+    IVF_PQ = "ivf_pq"
+    HNSW = "hnsw"
+
+
+@dataclass
+class SearchParams:
+    """Recall/latency knobs for approximate indexes.
+
+    Attributes:
+        nprobe: Number of inverted lists visited per IVF query
+        ef_search: Size of the HNSW candidate queue per query
+        hnsw_m: Number of HNSW graph neighbours per node
+    """
+    nprobe: int = 16
+    ef_search: int = 64
+    hnsw_m: int = 32
+
+
+def select_index_type(n_vectors: int) -> IndexType:
+    """Pick an index type for a collection of the given size.
+
+    Args:
+        n_vectors: Number of vectors in the collection
+
+    Returns:
+        Recommended index type
+    """
+    if n_vectors < FLAT_MAX_VECTORS:
+        return IndexType.FLAT
+    if n_vectors < IVF_FLAT_MAX_VECTORS:
+        return IndexType.IVF_FLAT
+    return IndexType.IVF_PQ
+
+
+class IndexEngine(ABC):
+    """Base class for FAISS index engines."""
+
+    index_type: IndexType
+
+    # Whether the index stores caller labels itself (otherwise IndexIDMap2 is used)
+    native_ids = False
+
+    # Whether remove_ids() is supported; otherwise deletions are tombstoned
+    supports_removal = True
+
+    def __init__(self, dimension: int, params: Optional[SearchParams] = None) -> None:
+        """Initialize engine.
+
+        Args:
+            dimension: Vector dimension
+            params: Search parameters (default: SearchParams())
+        """
+        self.dimension = dimension
+        self.params = params or SearchParams()
+
+    def min_training_size(self, n_vectors: int) -> int:
+        """Minimum number of vectors needed to train this index.
+
+        Args:
+            n_vectors: Size of the collection the index is built for
+
+        Returns:
+            Minimum training set size (0 if no training is needed)
+        """
+        return 0
+
+    def can_build(self, n_vectors: int) -> bool:
+        """Check whether a collection is large enough for this engine."""
+        return n_vectors >= self.min_training_size(n_vectors)
+
+    @abstractmethod
+    def create(self, n_vectors: int) -> faiss.Index:
+        """Create an empty (possibly untrained) index sized for n_vectors."""
+
+    def build(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> faiss.Index:
+        """Create, train and populate an ID-mapped index from a vector matrix.
+
+        Args:
+            vectors: float32 matrix of shape (n_vectors, dimension)
+            ids: int64 labels for the vectors (default: 0..n_vectors-1)
+
+        Returns:
+            Populated FAISS index
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        if ids is None:
+            ids = np.arange(len(vectors), dtype=np.int64)
+
+        index = self.create(len(vectors))
+
+        if not index.is_trained:
+            index.train(self._training_sample(index, vectors))
+
+        if not self.native_ids:
+            index = faiss.IndexIDMap2(index)
+
+        if len(vectors):
+            index.add_with_ids(vectors, np.ascontiguousarray(ids, dtype=np.int64))
+
+        self.tune(index)
+        return index
+
+    def tune(self, index: faiss.Index) -> None:
+        """Apply search parameters to an index built by this engine."""
+
+    def search_parameters(
+        self,
+        index: faiss.Index,
+        selector: faiss.IDSelector,
+        selectivity: float = 1.0
+    ) -> faiss.SearchParameters:
+        """Per-query parameters restricting a search to selected labels.
+
+        Approximate engines widen their search as the selector gets more
+        selective, so filtered queries still find k neighbours.
+
+        Args:
+            index: Index built by this engine
+            selector: Labels the search may return
+            selectivity: Fraction of indexed vectors accepted by the selector
+
+        Returns:
+            FAISS search parameters
+        """
+        return faiss.SearchParameters(sel=selector)
+
+    @staticmethod
+    def unwrap(index: faiss.Index) -> faiss.Index:
+        """Return the index underneath an IndexIDMap wrapper."""
+        if isinstance(index, faiss.IndexIDMap):
+            return faiss.downcast_index(index.index)
+        return index
+
+    def _training_sample(self, index: faiss.Index, vectors: np.ndarray) -> np.ndarray:
+        """Select a training sample bounded by the number of inverted lists."""
+        nlist = getattr(faiss.extract_index_ivf(index), 'nlist', 1)
+        max_points = nlist * MAX_TRAINING_POINTS_PER_LIST
+        if len(vectors) <= max_points:
+            return vectors
+
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(vectors), size=max_points, replace=False)
+        return vectors[np.sort(sample)]
+
+
+class FlatIndexEngine(IndexEngine):
+    """Exact L2 search."""
+
+    index_type = IndexType.FLAT
+
+    def create(self, n_vectors: int) -> faiss.Index:
+        return faiss.IndexFlatL2(self.dimension)
+
+
+class IVFFlatIndexEngine(IndexEngine):
+    """Inverted file index with exact residual storage."""
+
+    index_type = IndexType.IVF_FLAT
+    native_ids = True
+
+    # FAISS k-means wants roughly 39 points per centroid
+    points_per_list = 39
+
+    def nlist_for(self, n_vectors: int) -> int:
+        """Number of inverted lists for a collection size (~4 * sqrt(n))."""
+        nlist = int(4 * math.sqrt(max(n_vectors, 1)))
+        return max(1, min(nlist, n_vectors // self.points_per_list))
+
+    def min_training_size(self, n_vectors: int) -> int:
+        return self.points_per_list * 2
+
+    def create(self, n_vectors: int) -> faiss.Index:
+        quantizer = faiss.IndexFlatL2(self.dimension)
+        return faiss.IndexIVFFlat(quantizer, self.dimension, self.nlist_for(n_vectors))
+
+    def tune(self, index: faiss.Index) -> None:
+        ivf = faiss.extract_index_ivf(index)
+        ivf.nprobe = min(self.params.nprobe, ivf.nlist)
+
+    def search_parameters(
+        self,
+        index: faiss.Index,
+        selector: faiss.IDSelector,
+        selectivity: float = 1.0
+    ) -> faiss.SearchParameters:
+        nlist = faiss.extract_index_ivf(index).nlist
+        nprobe = math.ceil(self.params.nprobe / max(selectivity, 1e-6))
+        return faiss.SearchParametersIVF(sel=selector, nprobe=min(nprobe, nlist))
+
+
+class IVFPQIndexEngine(IVFFlatIndexEngine):
+    """Inverted file index with product-quantized residuals."""
+
+    index_type = IndexType.IVF_PQ
+
+    # Bits per sub-quantizer code
+    nbits = 8
+
+    def pq_subquantizers(self) -> int:
+        """Largest divisor of the dimension giving sub-vectors of >= 8 floats."""
+        for m in range(min(64, self.dimension // 8), 0, -1):
+            if self.dimension % m == 0:
+                return m
+        return 1
+
+    def min_training_size(self, n_vectors: int) -> int:
+        # Each sub-quantizer trains 2**nbits centroids
+        return max(super().min_training_size(n_vectors), 1 << self.nbits)
+
+    def create(self, n_vectors: int) -> faiss.Index:
+        quantizer = faiss.IndexFlatL2(self.dimension)
+        return faiss.IndexIVFPQ(
+            quantizer,
+            self.dimension,
+            self.nlist_for(n_vectors),
+            self.pq_subquantizers(),
+            self.nbits
+        )
+
+
+class HNSWIndexEngine(IndexEngine):
+    """Hierarchical navigable small world graph index."""
+
+    index_type = IndexType.HNSW
+
+    # Graph nodes cannot be unlinked; deleted vectors wait for compaction
+    supports_removal = False
+
+    def create(self, n_vectors: int) -> faiss.Index:
+        return faiss.IndexHNSWFlat(self.dimension, self.params.hnsw_m)
+
+    def tune(self, index: faiss.Index) -> None:
+        self.unwrap(index).hnsw.efSearch = self.params.ef_search
+
+    def search_parameters(
+        self,
+        index: faiss.Index,
+        selector: faiss.IDSelector,
+        selectivity: float = 1.0
+    ) -> faiss.SearchParameters:
+        ef_search = math.ceil(self.params.ef_search / max(selectivity, 1e-6))
+        return faiss.SearchParametersHNSW(
+            sel=selector,
+            efSearch=max(1, min(ef_search, index.ntotal))
+        )
+
+
+INDEX_ENGINES: Dict[IndexType, Type[IndexEngine]] = {
+    IndexType.FLAT: FlatIndexEngine,
+    IndexType.IVF_FLAT: IVFFlatIndexEngine,
+    IndexType.IVF_PQ: IVFPQIndexEngine,
+    IndexType.HNSW: HNSWIndexEngine,
+}
+
+
+def register_engine(engine_cls: Type[IndexEngine]) -> None:
+    """Register (or replace) the engine used for an index type.
+
+    Args:
+        engine_cls: IndexEngine subclass with an ``index_type`` attribute
+    """
+    INDEX_ENGINES[engine_cls.index_type] = engine_cls
+
+
+def create_engine(
+    index_type: IndexType,
+    dimension: int,
+    params: Optional[SearchParams] = None
+) -> IndexEngine:
+    """Instantiate the registered engine for an index type.
+
+    Args:
+        index_type: Index family
+        dimension: Vector dimension
+        params: Search parameters
+
+    Returns:
+        IndexEngine instance
+    """
+    return INDEX_ENGINES[index_type](dimension, params)
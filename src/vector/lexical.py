@@ -0,0 +1,273 @@
+"""Lexical name index for hybrid search.
+
+Answers name lookups without an embedding model:
+
+- exact names (and qualified aliases such as ``schema.table``) through a
+  hash map
+- fuzzy names through a trigram index ranked with BM25; the trigram
+  Jaccard similarity of a hit tells callers how close the name is
+
+Postings are also partitioned by metadata value, so a filtered search only
+scores entries that pass the filter. Trigrams shared by a large share of
+the names (``" id"`` in a column index) do not bring in candidates of their
+own; they only add to the scores of names found through rarer trigrams.
+
+Results from the lexical and vector paths are combined with
+reciprocal_rank_fusion.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import math
+import re
+
+_TOKEN_SPLIT = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a name and strip identifier quoting."""
+    return name.strip().strip('"`[]').lower()
+
+
+def trigrams(text: str) -> Counter:
+    """Padded character trigrams of each word in text.
+
+    Words are split on anything but letters and digits, so ``created_at``
+    and ``created at`` share their trigrams.
+    """
+    grams: Counter = Counter()
+    for token in _TOKEN_SPLIT.split(text.lower()):
+        if token:
+            padded = f"  {token} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Merge ranked ID lists by reciprocal rank.
+
+    Args:
+        rankings: ID lists, best first
+        k: Rank constant; larger values flatten the contribution of top ranks
+
+    Returns:
+        (id, score) tuples, highest score first
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, object_id in enumerate(ranking):
+            scores[object_id] = scores.get(object_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+@dataclass
+class LexicalHit:
+    """Lexical search result."""
+    id: str
+    score: float
+    similarity: float
+    exact: bool
+
+
+@dataclass
+class _Document:
+    """Indexed name."""
+    names: Tuple[str, ...]
+    grams: Counter
+    length: int
+    metadata: Dict[str, Any]
+
+
+class LexicalIndex:
+    """Exact-name map plus trigram BM25 index over object names."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_gram_candidates: int = 1000) -> None:
+        """Initialize lexical index.
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+            max_gram_candidates: Trigrams with more (filtered) postings than
+                this only score names found through rarer trigrams
+        """
+        self.k1 = k1
+        self.b = b
+        self.max_gram_candidates = max_gram_candidates
+
+        self._docs: Dict[str, _Document] = {}
+        self._exact: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._partitions: Dict[Tuple[str, Any], Set[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, object_id: str) -> bool:
+        return object_id in self._docs
+
+    def add(
+        self,
+        object_id: str,
+        name: str,
+        aliases: Sequence[str] = (),
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Index a name, replacing any previous entry with the same ID.
+
+        Args:
+            object_id: Unique identifier
+            name: Name matched exactly and fuzzily
+            aliases: Further names matched exactly (e.g. ``schema.table``)
+            metadata: Values for search filters; must be hashable
+        """
+        self.remove(object_id)
+
+        names = tuple(dict.fromkeys(normalize_name(n) for n in (name, *aliases)))
+        grams = trigrams(name)
+        doc = _Document(names=names, grams=grams, length=sum(grams.values()), metadata=metadata or {})
+        self._docs[object_id] = doc
+        self._total_length += doc.length
+
+        for exact_name in names:
+            self._exact.setdefault(exact_name, set()).add(object_id)
+        for gram in doc.grams:
+            self._postings.setdefault(gram, set()).add(object_id)
+        for item in doc.metadata.items():
+            self._partitions.setdefault(item, set()).add(object_id)
+
+    def remove(self, object_id: str) -> bool:
+        """Remove an entry.
+
+        Args:
+            object_id: ID to remove
+
+        Returns:
+            True if the entry existed
+        """
+        doc = self._docs.pop(object_id, None)
+        if doc is None:
+            return False
+
+        self._total_length -= doc.length
+        for exact_name in doc.names:
+            self._discard(self._exact, exact_name, object_id)
+        for gram in doc.grams:
+            self._discard(self._postings, gram, object_id)
+        for item in doc.metadata.items():
+            self._discard(self._partitions, item, object_id)
+        return True
+
+    @staticmethod
+    def _discard(mapping: Dict[Any, Set[str]], key: Any, object_id: str) -> None:
+        ids = mapping.get(key)
+        if ids is not None:
+            ids.discard(object_id)
+            if not ids:
+                del mapping[key]
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._docs.clear()
+        self._exact.clear()
+        self._postings.clear()
+        self._partitions.clear()
+        self._total_length = 0
+
+    @staticmethod
+    def _matches(doc: _Document, filters: Optional[Dict[str, Any]]) -> bool:
+        return not filters or all(doc.metadata.get(key) == value for key, value in filters.items())
+
+    def _allowed(self, filters: Optional[Dict[str, Any]]) -> Optional[Set[str]]:
+        """IDs passing every filter, or None when there are no filters."""
+        if not filters:
+            return None
+        partitions = sorted(
+            (self._partitions.get(item, set()) for item in filters.items()), key=len
+        )
+        return partitions[0].intersection(*partitions[1:])
+
+    def lookup(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[str]:
+        """IDs whose name or an alias equals the query.
+
+        Args:
+            query: Name to look up
+            filters: Metadata values entries must match
+
+        Returns:
+            Matching IDs, sorted
+        """
+        return sorted(
+            object_id for object_id in self._exact.get(normalize_name(query), ())
+            if self._matches(self._docs[object_id], filters)
+        )
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[LexicalHit]:
+        """Rank entries by exact match, then BM25 over shared trigrams.
+
+        Args:
+            query: Search text
+            k: Number of results to return
+            filters: Metadata values entries must match
+
+        Returns:
+            Hits, best first
+        """
+        exact = self.lookup(query, filters)
+        hits = [LexicalHit(id=object_id, score=math.inf, similarity=1.0, exact=True) for object_id in exact]
+        if len(hits) >= k or not self._docs:
+            return hits[:k]
+
+        allowed = self._allowed(filters)
+        if allowed is not None and not allowed:
+            return hits
+
+        query_grams = trigrams(query)
+        postings = []
+        for gram, query_tf in query_grams.items():
+            ids = self._postings.get(gram)
+            if not ids:
+                continue
+            # IDF comes from the whole index so scores do not depend on the filter
+            idf = math.log(1.0 + (len(self._docs) - len(ids) + 0.5) / (len(ids) + 0.5))
+            if allowed is not None:
+                ids = ids & allowed if len(ids) > len(allowed) else allowed & ids
+                if not ids:
+                    continue
+            postings.append((gram, query_tf, idf, ids))
+        # Rarest trigrams first: they pick the candidates, common ones add to them
+        postings.sort(key=lambda posting: len(posting[3]))
+
+        avg_length = self._total_length / len(self._docs)
+        scores: Dict[str, float] = {}
+        for gram, query_tf, idf, ids in postings:
+            if scores and len(ids) > self.max_gram_candidates:
+                ids = [object_id for object_id in scores if object_id in ids]
+            for object_id in ids:
+                doc = self._docs[object_id]
+                tf = doc.grams[gram]
+                norm = self.k1 * (1.0 - self.b + self.b * doc.length / avg_length)
+                scores[object_id] = scores.get(object_id, 0.0) + query_tf * idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        seen = set(exact)
+        query_set = set(query_grams)
+        for object_id, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+            if len(hits) >= k:
+                break
+            if object_id in seen:
+                continue
+            doc = self._docs[object_id]
+            doc_set = set(doc.grams)
+            hits.append(LexicalHit(
+                id=object_id,
+                score=score,
+                similarity=len(query_set & doc_set) / len(query_set | doc_set),
+                exact=False
+            ))
+        return hits
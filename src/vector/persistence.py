@@ -0,0 +1,343 @@
+"""Versioned on-disk format for VectorDatabase.
+
+A saved store is a directory containing:
+
+- ``manifest.json``: format name/version, index settings and a size and
+  CRC32 checksum for every other file
+- ``index.faiss``: the FAISS index, loadable with memory mapping
+- ``vectors.npy``: packed float32 vector matrix, loaded with ``np.load(mmap_mode='r')``
+- ``labels.npy``: int64 FAISS label of each vector row
+- ``entries.json``: compact columnar table of ids, object types and metadata
+- ``<name>.json``: optional JSON attachments stored alongside the index
+
+Stores are written to a temporary directory and swapped in with a rename, so
+a crash never leaves a half-written store behind. Loading maps the index and
+vector matrix instead of re-adding every vector, so pages are read lazily.
+"""
+
+import json
+import logging
+import os
+import shutil
+import uuid
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+
+import numpy as np
+import faiss
+
+from .engines import IndexType, create_engine
+
+if TYPE_CHECKING:
+    from .store import VectorDatabase
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NAME = "aishell-vector-store"
+FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+INDEX_FILE = "index.faiss"
+VECTORS_FILE = "vectors.npy"
+LABELS_FILE = "labels.npy"
+ENTRIES_FILE = "entries.json"
+
+_CHUNK_SIZE = 1 << 20
+
+
+class VectorStoreFormatError(Exception):
+    """Raised when a saved vector store is missing, corrupted or incompatible."""
+    pass
+
+
+def _crc32(path: Path) -> int:
+    """CRC32 checksum of a file, read in chunks."""
+    crc = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_CHUNK_SIZE)
+            if not chunk:
+                return crc
+            crc = zlib.crc32(chunk, crc)
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """Write compact JSON."""
+    with open(path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'), default=str)
+
+
+def save_vector_store(
+    db: 'VectorDatabase',
+    directory: Union[str, Path],
+    attachments: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Save a vector database in the native on-disk format.
+
+    Args:
+        db: Vector database to save
+        directory: Target directory (replaced atomically)
+        attachments: JSON-serializable objects stored as ``<name>.json``
+
+    Returns:
+        The written manifest
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = directory.with_name(f"{directory.name}.tmp-{uuid.uuid4().hex[:8]}")
+    tmp_dir.mkdir()
+
+    try:
+        with db._lock:
+            labels = np.fromiter(db._entries.keys(), dtype=np.int64, count=len(db._entries))
+            entries = list(db._entries.values())
+            index = db.index
+            if db._index_mapped and faiss.try_extract_index_ivf(index) is not None:
+                # Mapped inverted lists would be written as an invalid index
+                index = materialize_index(index)
+            faiss.write_index(index, str(tmp_dir / INDEX_FILE))
+            manifest = {
+                'format': FORMAT_NAME,
+                'format_version': FORMAT_VERSION,
+                'dimension': db.dimension,
+                'count': len(entries),
+                'index_type': db.engine.index_type.value,
+                'index_ntotal': int(db.index.ntotal),
+                'requested_index_type': (
+                    db.requested_index_type.value if db.requested_index_type else 'auto'
+                ),
+                'next_label': db._next_label,
+                'trained_size': db._trained_size,
+                'tombstones': sorted(db._tombstones),
+                'nprobe': db.search_params.nprobe,
+                'ef_search': db.search_params.ef_search,
+            }
+
+        np.save(tmp_dir / VECTORS_FILE, db._vector_matrix(entries))
+        np.save(tmp_dir / LABELS_FILE, labels)
+        _write_json(tmp_dir / ENTRIES_FILE, {
+            'ids': [entry.id for entry in entries],
+            'object_types': [entry.object_type for entry in entries],
+            'metadata': [entry.metadata for entry in entries],
+        })
+
+        attachment_names = []
+        for name, data in (attachments or {}).items():
+            _write_json(tmp_dir / f"{name}.json", data)
+            attachment_names.append(name)
+        manifest['attachments'] = attachment_names
+
+        manifest['files'] = {
+            path.name: {'size': path.stat().st_size, 'crc32': _crc32(path)}
+            for path in sorted(tmp_dir.iterdir())
+        }
+        _write_json(tmp_dir / MANIFEST_FILE, manifest)
+
+        # Swap the new store in; readers of the old files keep their mappings
+        old_dir = None
+        if directory.exists():
+            old_dir = directory.with_name(f"{directory.name}.old-{uuid.uuid4().hex[:8]}")
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    logger.info(f"Saved vector store with {manifest['count']} entries to {directory}")
+    return manifest
+
+
+def read_manifest(directory: Union[str, Path]) -> Dict[str, Any]:
+    """Read and validate a store manifest.
+
+    Args:
+        directory: Store directory
+
+    Returns:
+        Manifest dictionary
+
+    Raises:
+        VectorStoreFormatError: If the manifest is missing or incompatible
+    """
+    path = Path(directory) / MANIFEST_FILE
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise VectorStoreFormatError(f"No vector store manifest at {path}")
+    except (OSError, ValueError) as e:
+        raise VectorStoreFormatError(f"Unreadable vector store manifest {path}: {e}")
+
+    if manifest.get('format') != FORMAT_NAME:
+        raise VectorStoreFormatError(f"{path} is not a vector store manifest")
+    if manifest.get('format_version', 0) > FORMAT_VERSION:
+        raise VectorStoreFormatError(
+            f"Vector store format {manifest.get('format_version')} is newer than "
+            f"supported version {FORMAT_VERSION}"
+        )
+    return manifest
+
+
+def verify_files(
+    directory: Union[str, Path],
+    manifest: Dict[str, Any],
+    names: Optional[list] = None,
+    checksums: bool = True
+) -> None:
+    """Check store files against the sizes and checksums in the manifest.
+
+    Args:
+        directory: Store directory
+        manifest: Manifest returned by read_manifest
+        names: Files to check (default: all files in the manifest)
+        checksums: Also recompute CRC32 checksums (reads whole files)
+
+    Raises:
+        VectorStoreFormatError: If a file is missing, truncated or corrupted
+    """
+    directory = Path(directory)
+    files = manifest.get('files', {})
+    for name in names or list(files):
+        expected = files.get(name)
+        path = directory / name
+        if expected is None or not path.exists():
+            raise VectorStoreFormatError(f"Vector store file missing: {path}")
+        if path.stat().st_size != expected['size']:
+            raise VectorStoreFormatError(
+                f"Vector store file {path} has size {path.stat().st_size}, "
+                f"expected {expected['size']}"
+            )
+        if checksums and _crc32(path) != expected['crc32']:
+            raise VectorStoreFormatError(f"Vector store file {path} failed checksum")
+
+
+def read_attachment(directory: Union[str, Path], name: str) -> Any:
+    """Read a checksum-verified JSON attachment from a store.
+
+    Args:
+        directory: Store directory
+        name: Attachment name passed to save_vector_store
+
+    Returns:
+        Decoded attachment
+
+    Raises:
+        VectorStoreFormatError: If the attachment is missing or corrupted
+    """
+    manifest = read_manifest(directory)
+    filename = f"{name}.json"
+    verify_files(directory, manifest, [filename])
+    with open(Path(directory) / filename, 'r') as f:
+        return json.load(f)
+
+
+def load_vector_store(
+    directory: Union[str, Path],
+    mmap: bool = True,
+    verify: bool = False,
+    **db_kwargs: Any
+) -> 'VectorDatabase':
+    """Open a saved vector database.
+
+    File sizes and the entry table checksum are always verified; ``verify``
+    additionally checksums the index and vector matrix, which reads them
+    completely instead of paging them in lazily.
+
+    Args:
+        directory: Store directory
+        mmap: Memory-map the index and vector matrix
+        verify: Verify checksums of every file
+        **db_kwargs: Extra VectorDatabase constructor arguments
+
+    Returns:
+        Loaded VectorDatabase
+
+    Raises:
+        VectorStoreFormatError: If the store is missing, corrupted or incompatible
+    """
+    from .store import VectorDatabase
+
+    directory = Path(directory)
+    manifest = read_manifest(directory)
+    verify_files(directory, manifest, checksums=verify)
+    verify_files(directory, manifest, [ENTRIES_FILE])
+
+    dimension = manifest['dimension']
+    index_type = IndexType(manifest['index_type'])
+
+    try:
+        vectors = np.load(directory / VECTORS_FILE, mmap_mode='r' if mmap else None)
+        labels = np.load(directory / LABELS_FILE)
+        with open(directory / ENTRIES_FILE, 'r') as f:
+            table = json.load(f)
+        index = faiss.read_index(str(directory / INDEX_FILE), _io_flags(index_type) if mmap else 0)
+    except (OSError, ValueError, RuntimeError) as e:
+        raise VectorStoreFormatError(f"Failed to read vector store {directory}: {e}")
+
+    count = manifest['count']
+    if (
+        vectors.shape != (count, dimension)
+        or len(labels) != count
+        or len(table['ids']) != count
+        or index.ntotal != manifest['index_ntotal']
+        or index.d != dimension
+    ):
+        raise VectorStoreFormatError(f"Vector store {directory} is inconsistent with its manifest")
+
+    db_kwargs.setdefault('index_type', manifest.get('requested_index_type', 'auto'))
+    db_kwargs.setdefault('nprobe', manifest.get('nprobe', 16))
+    db_kwargs.setdefault('ef_search', manifest.get('ef_search', 64))
+    db = VectorDatabase(dimension=dimension, **db_kwargs)
+    db._restore(
+        index=index,
+        engine=create_engine(index_type, dimension, db.search_params),
+        labels=labels,
+        vectors=vectors,
+        ids=table['ids'],
+        object_types=table['object_types'],
+        metadatas=table['metadata'],
+        next_label=manifest['next_label'],
+        trained_size=manifest['trained_size'],
+        tombstones=manifest.get('tombstones', []),
+        mapped=mmap
+    )
+
+    logger.info(f"Opened vector store with {count} entries from {directory}")
+    return db
+
+
+def _io_flags(index_type: IndexType) -> int:
+    """FAISS read flags that memory-map an index of the given type."""
+    if index_type in (IndexType.IVF_FLAT, IndexType.IVF_PQ):
+        return faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    # Flat codes (flat and HNSW storage) are mapped in place
+    return getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def materialize_index(index: faiss.Index) -> faiss.Index:
+    """Copy a memory-mapped index into owned, writable memory.
+
+    Args:
+        index: Index opened by load_vector_store with mmap=True
+
+    Returns:
+        Writable index with the same contents
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None:
+        return faiss.deserialize_index(faiss.serialize_index(index))
+
+    # Memory-mapped inverted lists cannot be serialized or cloned; copy them
+    source = ivf.invlists
+    lists = faiss.ArrayInvertedLists(ivf.nlist, ivf.code_size)
+    for list_no in range(ivf.nlist):
+        size = source.list_size(list_no)
+        if size:
+            lists.add_entries(list_no, size, source.get_ids(list_no), source.get_codes(list_no))
+    ivf.replace_invlists(lists, True)
+    lists.this.disown()
+    return index
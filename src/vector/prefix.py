@@ -0,0 +1,228 @@
+"""Weighted prefix index for completion sources.
+
+A radix trie over lowercased keys. Every node caches the best-scored
+entries of its subtree, so the top completions of a prefix are read from
+a single node no matter how many entries share it. Insertions, score
+updates and removals refresh the caches along one path only.
+"""
+
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import heapq
+import os
+
+
+@dataclass
+class PrefixEntry:
+    """Indexed completion."""
+    text: str
+    score: float
+    data: Any = None
+
+
+class _Node:
+    """Radix trie node."""
+
+    __slots__ = ('children', 'entry', 'top')
+
+    def __init__(self) -> None:
+        # First character of the edge label -> (edge label, child)
+        self.children: Dict[str, Tuple[str, '_Node']] = {}
+        self.entry: Optional[PrefixEntry] = None
+        # Best entries of the subtree, highest score first
+        self.top: List[PrefixEntry] = []
+
+
+def _score(entry: PrefixEntry) -> float:
+    return entry.score
+
+
+class PrefixIndex:
+    """Case-insensitive prefix index returning the best-scored completions."""
+
+    def __init__(self, top_k: int = 32) -> None:
+        """Initialize prefix index.
+
+        Args:
+            top_k: Completions cached per node; larger requests walk the
+                matching subtree
+        """
+        self.top_k = top_k
+        self._root = _Node()
+        self._entries: Dict[str, PrefixEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, text: str) -> bool:
+        return text.lower() in self._entries
+
+    def get(self, text: str) -> Optional[PrefixEntry]:
+        """Get the entry of a text."""
+        return self._entries.get(text.lower())
+
+    def update(self, text: str, score: float, data: Any = None) -> PrefixEntry:
+        """Insert a text or change its score.
+
+        Texts differing only in case share one entry, which keeps the
+        casing of the latest update.
+
+        Args:
+            text: Completion text
+            score: Ranking score (higher is better)
+            data: Payload returned with the entry
+
+        Returns:
+            The entry
+        """
+        key = text.lower()
+        path = self._insert_path(key)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            entry = PrefixEntry(text=text, score=score, data=data)
+            path[-1].entry = entry
+            self._entries[key] = entry
+            self._promote(path, entry)
+            return entry
+
+        lowered = score < entry.score
+        entry.text, entry.score, entry.data = text, score, data
+        if lowered:
+            self._refresh(path)
+        else:
+            self._promote(path, entry)
+        return entry
+
+    def remove(self, text: str) -> bool:
+        """Remove a text.
+
+        Args:
+            text: Completion text
+
+        Returns:
+            True if the text was indexed
+        """
+        key = text.lower()
+        if self._entries.pop(key, None) is None:
+            return False
+
+        path = [(self._root, '')]
+        node, i = self._root, 0
+        while i < len(key):
+            label, node = node.children[key[i]]
+            path.append((node, key[i]))
+            i += len(label)
+        node.entry = None
+
+        # Drop empty leaves and merge pass-through nodes
+        while len(path) > 1:
+            node, char = path[-1]
+            parent = path[-2][0]
+            if node.entry is not None or len(node.children) > 1:
+                break
+            label = parent.children[char][0]
+            if not node.children:
+                del parent.children[char]
+                path.pop()
+                continue
+            child_label, child = next(iter(node.children.values()))
+            parent.children[char] = (label + child_label, child)
+            path[-1] = (child, char)
+            break
+
+        self._refresh([node for node, _ in path])
+        return True
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._root = _Node()
+        self._entries.clear()
+
+    def complete(self, prefix: str, k: int = 10) -> List[PrefixEntry]:
+        """Best-scored entries starting with a prefix.
+
+        Args:
+            prefix: Typed text (case-insensitive)
+            k: Number of entries to return
+
+        Returns:
+            Entries, highest score first
+        """
+        node = self._locate(prefix.lower())
+        if node is None:
+            return []
+        if k <= self.top_k:
+            return node.top[:k]
+        return heapq.nlargest(k, self._walk(node), key=_score)
+
+    def _locate(self, prefix: str) -> Optional[_Node]:
+        """Topmost node whose subtree holds every key with the prefix."""
+        node, i = self._root, 0
+        while i < len(prefix):
+            edge = node.children.get(prefix[i])
+            if edge is None:
+                return None
+            label, child = edge
+            rest = prefix[i:i + len(label)]
+            if not label.startswith(rest):
+                return None
+            node, i = child, i + len(label)
+        return node
+
+    def _insert_path(self, key: str) -> List[_Node]:
+        """Nodes from the root to the node of key, creating it if needed."""
+        node, i = self._root, 0
+        path = [node]
+        while i < len(key):
+            edge = node.children.get(key[i])
+            if edge is None:
+                child = _Node()
+                node.children[key[i]] = (key[i:], child)
+                path.append(child)
+                return path
+
+            label, child = edge
+            common = len(os.path.commonprefix([label, key[i:]]))
+            if common < len(label):
+                # Split the edge at the end of the shared prefix
+                middle = _Node()
+                middle.children[label[common]] = (label[common:], child)
+                middle.top = list(child.top)
+                node.children[key[i]] = (label[:common], middle)
+                child = middle
+
+            node, i = child, i + common
+            path.append(node)
+        return path
+
+    def _promote(self, path: List[_Node], entry: PrefixEntry) -> None:
+        """Place a new or higher-scored entry in the cached completions."""
+        for node in path:
+            top = node.top
+            if not any(cached is entry for cached in top):
+                if len(top) >= self.top_k and entry.score <= top[-1].score:
+                    continue
+                top.append(entry)
+            top.sort(key=_score, reverse=True)
+            del top[self.top_k:]
+
+    def _refresh(self, path: List[_Node]) -> None:
+        """Recompute the cached completions of a path, deepest node first."""
+        for node in reversed(path):
+            own = [node.entry] if node.entry is not None else []
+            node.top = heapq.nlargest(
+                self.top_k,
+                chain(own, *(child.top for _, child in node.children.values())),
+                key=_score
+            )
+
+    def _walk(self, node: _Node) -> Iterator[PrefixEntry]:
+        """Every entry of a subtree."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.entry is not None:
+                yield node.entry
+            stack.extend(child for _, child in node.children.values())
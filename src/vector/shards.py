@@ -0,0 +1,401 @@
+"""Sharded vector index.
+
+Keeps one VectorDatabase per shard key (e.g. a database connection) so
+that a large collection does not have to live in memory at once:
+
+- shards saved in the native store format are opened lazily, with a
+  memory-mapped index, on first use
+- loaded shards are evicted least-recently-used first when their estimated
+  memory exceeds a budget; modified shards are saved before eviction, and
+  shards taking part in a search stay loaded until it finishes
+- searches spanning several shards run on a thread pool (FAISS releases
+  the GIL) and the per-shard top-k results are merged by distance
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from urllib.parse import quote, unquote
+import heapq
+import logging
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from .persistence import MANIFEST_FILE
+from .store import VectorDatabase, VectorEntry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ShardStats:
+    """Shard lifecycle counters."""
+    loads: int = 0
+    load_seconds: float = 0.0
+    saves: int = 0
+    evictions: int = 0
+    parallel_searches: int = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary."""
+        return {
+            'loads': self.loads,
+            'load_seconds': self.load_seconds,
+            'saves': self.saves,
+            'evictions': self.evictions,
+            'parallel_searches': self.parallel_searches
+        }
+
+
+class ShardedVectorIndex:
+    """Vector databases partitioned by key, loaded on demand."""
+
+    def __init__(
+        self,
+        dimension: int,
+        store_dir: Optional[Union[str, Path]] = None,
+        memory_budget_bytes: Optional[int] = None,
+        max_workers: int = 4,
+        attachments: Optional[Callable[[str], Dict[str, Any]]] = None,
+        **db_kwargs: Any
+    ) -> None:
+        """Initialize sharded index.
+
+        Args:
+            dimension: Vector dimension of every shard
+            store_dir: Directory holding one saved store per shard; without
+                it shards are memory-only and never evicted
+            memory_budget_bytes: Evict loaded shards beyond this estimated
+                size (None for no limit)
+            max_workers: Threads used for searches spanning several shards
+            attachments: Called with a shard key when the shard is saved;
+                returns attachments stored with it
+            **db_kwargs: Extra VectorDatabase arguments (e.g. partition_keys)
+        """
+        self.dimension = dimension
+        self.store_dir = Path(store_dir) if store_dir is not None else None
+        self.memory_budget_bytes = memory_budget_bytes
+        self.max_workers = max_workers
+        self.attachments = attachments
+        self.db_kwargs = db_kwargs
+        self.stats = ShardStats()
+
+        # Loaded shards, least recently used first
+        self._loaded: "OrderedDict[str, VectorDatabase]" = OrderedDict()
+        # Shards with a saved store and their entry counts as saved
+        self._saved: Dict[str, int] = {}
+        # Loaded shards modified since their last save
+        self._dirty: Set[str] = set()
+        # Shards in use by running searches (key -> number of searches)
+        self._pinned: Dict[str, int] = {}
+
+        self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def shard_dir(self, key: str) -> Path:
+        """Directory of a shard's saved store."""
+        if self.store_dir is None:
+            raise ValueError("Sharded index has no store directory")
+        return self.store_dir / quote(key, safe='')
+
+    def scan(self) -> List[str]:
+        """Register shards saved under the store directory without loading them.
+
+        Returns:
+            Keys of the saved shards
+        """
+        if self.store_dir is None or not self.store_dir.exists():
+            return []
+
+        from .persistence import read_manifest
+
+        found = []
+        with self._lock:
+            for path in sorted(self.store_dir.iterdir()):
+                if not (path / MANIFEST_FILE).exists():
+                    continue
+                key = unquote(path.name)
+                self._saved[key] = read_manifest(path)['count']
+                found.append(key)
+        return found
+
+    def keys(self) -> List[str]:
+        """Keys of all shards, loaded or not."""
+        with self._lock:
+            return list(dict.fromkeys([*self._loaded, *self._saved]))
+
+    def is_loaded(self, key: str) -> bool:
+        """Whether a shard is in memory."""
+        return key in self._loaded
+
+    def get(self, key: str, create: bool = False) -> Optional[VectorDatabase]:
+        """Get a shard, loading it from disk if needed.
+
+        Args:
+            key: Shard key
+            create: Create an empty shard if it does not exist
+
+        Returns:
+            The shard, or None if it does not exist and create is False
+        """
+        with self._lock:
+            db = self._loaded.get(key)
+            if db is not None:
+                self._loaded.move_to_end(key)
+                return db
+
+            if key in self._saved:
+                start = time.perf_counter()
+                db = VectorDatabase.load(self.shard_dir(key), **self.db_kwargs)
+                self.stats.loads += 1
+                self.stats.load_seconds += time.perf_counter() - start
+                logger.debug(f"Loaded vector shard '{key}'")
+            elif create:
+                db = VectorDatabase(dimension=self.dimension, **self.db_kwargs)
+            else:
+                return None
+
+            self._loaded[key] = db
+            self._enforce_budget(pinned={key})
+            return db
+
+    @contextmanager
+    def writing(self, key: str) -> Iterator[VectorDatabase]:
+        """Modify a shard, creating it if needed.
+
+        The shard is marked dirty if it changed, and the memory budget is
+        enforced afterwards; other writers and loads wait meanwhile.
+
+        Args:
+            key: Shard key
+
+        Yields:
+            The shard
+        """
+        with self._lock:
+            db = self.get(key, create=True)
+            before = self._revision(db)
+            try:
+                yield db
+            finally:
+                if self._revision(db) != before:
+                    self._dirty.add(key)
+                self._enforce_budget(pinned={key})
+
+    @staticmethod
+    def _revision(db: VectorDatabase) -> Tuple[Any, ...]:
+        """State that changes whenever entries are added, replaced or deleted."""
+        return (db.index, db._next_label, len(db._entries), len(db._tombstones))
+
+    @contextmanager
+    def _pinning(self, keys: Sequence[str]) -> Iterator[None]:
+        """Keep shards loaded while in use, then apply the budget again."""
+        with self._lock:
+            for key in keys:
+                self._pinned[key] = self._pinned.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                for key in keys:
+                    self._pinned[key] -= 1
+                    if not self._pinned[key]:
+                        del self._pinned[key]
+                self._enforce_budget(pinned=set())
+
+    def search(
+        self,
+        query_vector: np.ndarray,
+        k: int = 5,
+        keys: Optional[Sequence[str]] = None,
+        **search_kwargs: Any
+    ) -> List[Tuple[VectorEntry, float]]:
+        """Search shards and merge their results.
+
+        The searched shards are pinned until the search finishes, so
+        loading one never evicts another the same search needs; the
+        memory budget may be exceeded meanwhile.
+
+        Args:
+            query_vector: Query embedding vector
+            k: Number of results to return
+            keys: Shards to search (default: all)
+            **search_kwargs: VectorDatabase.search_similar arguments
+                (object_type, threshold, filters)
+
+        Returns:
+            List of (entry, L2_distance) tuples, sorted by distance (ascending)
+        """
+        keys = self.keys() if keys is None else list(keys)
+
+        def search_shard(db: VectorDatabase) -> List[Tuple[VectorEntry, float]]:
+            return db.search_similar(query_vector, k=k, **search_kwargs)
+
+        with self._pinning(keys):
+            shards = [db for db in (self.get(key) for key in keys) if db is not None]
+            if len(shards) > 1 and self.max_workers > 1:
+                self.stats.parallel_searches += 1
+                results = list(self._pool().map(search_shard, shards))
+            else:
+                results = [search_shard(db) for db in shards]
+
+        if len(results) == 1:
+            return results[0]
+        return heapq.nsmallest(k, (hit for hits in results for hit in hits), key=lambda hit: hit[1])
+
+    def get_by_id(self, key: str, object_id: str) -> Optional[VectorEntry]:
+        """Get an entry of a shard by ID."""
+        db = self.get(key)
+        return db.get_by_id(object_id) if db is not None else None
+
+    def save(self, key: Optional[str] = None) -> int:
+        """Save modified shards.
+
+        Args:
+            key: Only save this shard
+
+        Returns:
+            Number of shards saved
+        """
+        with self._lock:
+            keys = [key] if key is not None else list(self._dirty)
+            saved = 0
+            for dirty_key in keys:
+                if dirty_key in self._dirty and dirty_key in self._loaded:
+                    self._save_locked(dirty_key)
+                    saved += 1
+            return saved
+
+    def _save_locked(self, key: str) -> None:
+        """Save one loaded shard; caller holds the lock."""
+        db = self._loaded[key]
+        attachments = self.attachments(key) if self.attachments else None
+        db.save(self.shard_dir(key), attachments=attachments)
+        self._saved[key] = len(db.entries)
+        self._dirty.discard(key)
+        self.stats.saves += 1
+
+    def evict(self, key: str) -> bool:
+        """Drop a loaded shard from memory, saving it first if modified.
+
+        Args:
+            key: Shard key
+
+        Returns:
+            True if the shard was evicted
+        """
+        with self._lock:
+            if key not in self._loaded:
+                return False
+            if key in self._dirty:
+                if self.store_dir is None:
+                    return False
+                self._save_locked(key)
+            del self._loaded[key]
+            self.stats.evictions += 1
+            logger.debug(f"Evicted vector shard '{key}'")
+            return True
+
+    def _enforce_budget(self, pinned: Set[str]) -> None:
+        """Evict least recently used shards until under the budget."""
+        if self.memory_budget_bytes is None:
+            return
+
+        usage = {key: db.memory_usage() for key, db in self._loaded.items()}
+        total = sum(usage.values())
+        for key in list(self._loaded):
+            if total <= self.memory_budget_bytes:
+                break
+            if key not in pinned and key not in self._pinned and self.evict(key):
+                total -= usage[key]
+
+    def memory_usage(self) -> int:
+        """Estimated bytes of the loaded shards."""
+        with self._lock:
+            return sum(db.memory_usage() for db in self._loaded.values())
+
+    def drop(self, key: str) -> bool:
+        """Delete a shard from memory and disk.
+
+        Args:
+            key: Shard key
+
+        Returns:
+            True if the shard existed
+        """
+        with self._lock:
+            existed = self._loaded.pop(key, None) is not None
+            existed = self._saved.pop(key, None) is not None or existed
+            self._dirty.discard(key)
+            if self.store_dir is not None:
+                shutil.rmtree(self.shard_dir(key), ignore_errors=True)
+            return existed
+
+    def clear(self) -> None:
+        """Delete every shard from memory and disk."""
+        with self._lock:
+            for key in self.keys():
+                self.drop(key)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        """Search thread pool, created on first parallel search."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="vector-shard"
+                )
+            return self._executor
+
+    def close(self) -> None:
+        """Stop the search threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get shard statistics.
+
+        Returns:
+            Statistics dictionary; entry counts of unloaded shards are
+            those recorded when they were saved
+        """
+        with self._lock:
+            shards = {}
+            type_counts: Dict[str, int] = {}
+            for key in self.keys():
+                db = self._loaded.get(key)
+                if db is None:
+                    shards[key] = {'loaded': False, 'entries': self._saved[key]}
+                    continue
+                db_stats = db.get_stats()
+                for object_type, count in db_stats['type_counts'].items():
+                    type_counts[object_type] = type_counts.get(object_type, 0) + count
+                shards[key] = {
+                    'loaded': True,
+                    'entries': db_stats['total_entries'],
+                    'dirty': key in self._dirty,
+                    'memory_bytes': db_stats['memory_bytes'],
+                    'index_type': db_stats['index_type']
+                }
+
+            return {
+                'total_entries': sum(shard['entries'] for shard in shards.values()),
+                'dimension': self.dimension,
+                'type_counts': type_counts,
+                'shards': len(shards),
+                'loaded_shards': len(self._loaded),
+                'memory_bytes': sum(
+                    shard.get('memory_bytes', 0) for shard in shards.values()
+                ),
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'per_shard': shards,
+                **self.stats.to_dict()
+            }
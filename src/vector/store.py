@@ -5,13 +5,30 @@ Install with: pip install faiss-cpu==1.12.0
 """
 
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Callable, Iterable, Optional, Sequence, Set, Tuple, Union
 from dataclasses import dataclass
+import itertools
 import logging
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
 import faiss
 
+from .engines import (
+    IndexEngine,
+    IndexType,
+    IVFFlatIndexEngine,
+    SearchParams,
+    create_engine,
+    select_index_type,
+)
+
 logger = logging.getLogger(__name__)
 
+# Rough per-entry cost of ids, metadata dicts and partitions
+ENTRY_OVERHEAD_BYTES = 512
+
 
 @dataclass
 class VectorEntry:
@@ -22,31 +39,181 @@ class VectorEntry:
     object_type: str
 
 
+@dataclass
+class IngestStats:
+    """Throughput report for a bulk ingestion."""
+    objects: int = 0
+    embed_seconds: float = 0.0
+    index_seconds: float = 0.0
+
+    @property
+    def objects_per_second(self) -> float:
+        """Objects ingested per second of embedding and indexing time."""
+        total = self.embed_seconds + self.index_seconds
+        return self.objects / total if total > 0 else 0.0
+
+    def merge(self, other: 'IngestStats') -> None:
+        """Accumulate another report into this one."""
+        self.objects += other.objects
+        self.embed_seconds += other.embed_seconds
+        self.index_seconds += other.index_seconds
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary."""
+        return {
+            'objects': self.objects,
+            'embed_seconds': self.embed_seconds,
+            'index_seconds': self.index_seconds,
+            'objects_per_second': self.objects_per_second
+        }
+
+
+@dataclass
+class SearchResults:
+    """Column-oriented results of a multi-query search.
+
+    The hits of query i are at positions offsets[i]:offsets[i + 1] of the
+    ids, distances and entries columns, sorted by distance (ascending).
+    """
+    offsets: np.ndarray
+    ids: List[str]
+    distances: np.ndarray
+    entries: List[VectorEntry]
+
+    @classmethod
+    def from_hits(cls, hits: Sequence[Sequence[Tuple[VectorEntry, float]]]) -> 'SearchResults':
+        """Build from per-query (entry, distance) lists."""
+        offsets = np.zeros(len(hits) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(query_hits) for query_hits in hits])
+        entries = [entry for query_hits in hits for entry, _ in query_hits]
+        return cls(
+            offsets=offsets,
+            ids=[entry.id for entry in entries],
+            distances=np.fromiter(
+                (dist for query_hits in hits for _, dist in query_hits),
+                dtype=np.float32,
+                count=len(entries)
+            ),
+            entries=entries
+        )
+
+    def __len__(self) -> int:
+        """Number of queries."""
+        return len(self.offsets) - 1
+
+    @property
+    def query_indices(self) -> np.ndarray:
+        """Query index of every hit."""
+        return np.repeat(np.arange(len(self)), np.diff(self.offsets))
+
+    def for_query(self, query_index: int) -> List[Tuple[VectorEntry, float]]:
+        """(entry, L2_distance) hits of one query."""
+        start, end = self.offsets[query_index], self.offsets[query_index + 1]
+        return list(zip(self.entries[start:end], self.distances[start:end].tolist()))
+
+    def to_lists(self) -> List[List[Tuple[VectorEntry, float]]]:
+        """Hits of every query, as returned by search_similar."""
+        return [self.for_query(i) for i in range(len(self))]
+
+
 class VectorDatabase:
     """Vector database for semantic search and indexing.
 
     Requires FAISS (Facebook AI Similarity Search) library.
-    Uses FAISS IndexFlatL2 for exact L2 distance search.
+    Starts with an exact IndexFlatL2 and, in ``auto`` mode, moves to
+    approximate indexes (IVF-Flat, IVF-PQ) as the collection grows.
+
+    Entries are stored under stable int64 labels in an ID-mapped index, so
+    deletions remove vectors from the index. Indexes that cannot remove
+    vectors (HNSW) keep tombstones until the next compaction.
+
+    Filters on object type and on the configured partition keys are pushed
+    down into the index through label partitions and FAISS ID selectors.
+
+    ``save`` and ``load`` use the native format in ``vector.persistence``;
+    loaded stores memory-map the index and vectors and copy the index into
+    memory on the first write.
     """
 
-    def __init__(self, dimension: int = 384) -> None:
+    def __init__(
+        self,
+        dimension: int = 384,
+        index_type: str = "auto",
+        nprobe: int = 16,
+        ef_search: int = 64,
+        background_retrain: bool = True,
+        retrain_growth: float = 2.0,
+        compaction_threshold: float = 0.2,
+        partition_keys: Tuple[str, ...] = (),
+        brute_force_limit: int = 2048
+    ) -> None:
         """Initialize vector database with FAISS backend.
 
         Args:
             dimension: Vector dimension for embeddings (default: 384)
+            index_type: 'auto', 'flat', 'ivf_flat', 'ivf_pq' or 'hnsw'
+            nprobe: Inverted lists probed per query (IVF indexes)
+            ef_search: Candidate queue size per query (HNSW index)
+            background_retrain: Rebuild the index in a background thread
+            retrain_growth: Retrain IVF indexes once the collection grows
+                by this factor since the last training
+            compaction_threshold: Compact the index once this fraction of
+                its vectors are tombstones
+            partition_keys: Metadata keys (besides object type) indexed
+                for filter pushdown, e.g. ('connection_id',)
+            brute_force_limit: Filtered searches matching at most this
+                many entries are scored exactly without touching the index
 
         Raises:
             ImportError: If FAISS is not installed
+            ValueError: If index_type is unknown
         """
         self.dimension = dimension
+        self.requested_index_type: Optional[IndexType] = (
+            None if index_type == "auto" else IndexType(index_type)
+        )
+        self.search_params = SearchParams(nprobe=nprobe, ef_search=ef_search)
+        self.background_retrain = background_retrain
+        self.retrain_growth = retrain_growth
+        self.compaction_threshold = compaction_threshold
+
+        # Live entries keyed by FAISS label; labels are never reused
+        self._entries: Dict[int, VectorEntry] = {}
+        self._id_to_label: Dict[str, int] = {}
+        self._next_label = 0
+
+        # Deleted labels still present in an index without remove_ids()
+        self._tombstones: Set[int] = set()
+
+        # Label partitions by (key, value) for filter pushdown
+        self.partition_keys = tuple(partition_keys)
+        self.brute_force_limit = brute_force_limit
+        self._partitions: Dict[Tuple[str, Any], Set[int]] = defaultdict(set)
+
+        # Cumulative bulk ingestion throughput
+        self.ingest_stats = IngestStats()
+
+        # Guards index swaps performed by (background) retraining
+        self._lock = threading.RLock()
+        self._retrain_thread: Optional[threading.Thread] = None
+
+        self.engine: IndexEngine = self._target_engine(0)
+        self.index = self.engine.build(
+            np.empty((0, dimension), dtype=np.float32),
+            np.empty(0, dtype=np.int64)
+        )
+        self._trained_size = 0
 
-        # Initialize FAISS index with L2 distance (IndexFlatL2)
-        # FAISS 1.12.0 API is compatible with 1.7.4
-        self.index = faiss.IndexFlatL2(dimension)
-        logger.info(f"Initialized FAISS IndexFlatL2 with dimension {dimension}")
+        # True while the index is a read-only memory map of a saved store
+        self._index_mapped = False
+        logger.info(
+            f"Initialized FAISS {self.engine.index_type.value} index with dimension {dimension}"
+        )
 
-        self.entries: List[VectorEntry] = []
-        self._id_to_idx: Dict[str, int] = {}
+    @property
+    def entries(self) -> List[VectorEntry]:
+        """Live entries in insertion order."""
+        return list(self._entries.values())
 
     def add_object(
         self,
@@ -57,6 +224,8 @@ class VectorDatabase:
     ) -> None:
         """Add a system object to the vector database.
 
+        Adding an existing object_id replaces the previous entry.
+
         Args:
             object_id: Unique identifier
             vector: Embedding vector
@@ -76,30 +245,123 @@ class VectorDatabase:
             object_type=object_type
         )
 
-        idx = len(self.entries)
-        self.entries.append(entry)
-        self._id_to_idx[object_id] = idx
+        with self._lock:
+            self._ensure_writable()
+            self._remove_labels(self._discard([object_id]))
+
+            label = self._next_label
+            self._next_label += 1
+            self._entries[label] = entry
+            self._id_to_label[object_id] = label
+            for partition in self._partitions_of(entry):
+                self._partitions[partition].add(label)
 
-        # Add to FAISS index - requires float32 2D array (n_vectors, dimension)
-        vec_2d = vector.reshape(1, -1).astype(np.float32)
-        self.index.add(vec_2d)
+            # Add to FAISS index - requires float32 2D array (n_vectors, dimension)
+            vec_2d = vector.reshape(1, -1).astype(np.float32)
+            self.index.add_with_ids(vec_2d, np.array([label], dtype=np.int64))
 
         logger.debug(f"Added {object_type} object: {object_id}")
+        self._maybe_retrain()
+
+    def add_objects(
+        self,
+        object_ids: Sequence[str],
+        vectors: np.ndarray,
+        object_types: Union[str, Sequence[str]],
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+    ) -> IngestStats:
+        """Add many objects with a single index append.
+
+        Vectors are copied once into a contiguous float32 matrix; entries keep
+        row views of it. Existing object_ids are replaced.
+
+        Args:
+            object_ids: Unique identifiers
+            vectors: Embedding matrix of shape (len(object_ids), dimension)
+            object_types: One object type for all objects, or one per object
+            metadatas: Optional metadata per object
+
+        Returns:
+            Ingestion statistics for this batch
+        """
+        start = time.perf_counter()
+        matrix = np.array(vectors, dtype=np.float32, order='C', copy=True)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension {matrix.shape[1]} doesn't match "
+                f"index dimension {self.dimension}"
+            )
+        if matrix.shape[0] != len(object_ids):
+            raise ValueError(
+                f"Got {matrix.shape[0]} vectors for {len(object_ids)} object ids"
+            )
+
+        if isinstance(object_types, str):
+            object_types = [object_types] * len(object_ids)
+        if metadatas is None:
+            metadatas = [None] * len(object_ids)
+
+        # Within a batch the last occurrence of an id wins
+        positions = list({object_id: i for i, object_id in enumerate(object_ids)}.values())
+        positions.sort()
+        if len(positions) < len(object_ids):
+            matrix = matrix[positions]
+
+        with self._lock:
+            self._ensure_writable()
+            self._remove_labels(self._discard(object_ids[i] for i in positions))
+
+            labels = np.arange(
+                self._next_label, self._next_label + len(positions), dtype=np.int64
+            )
+            self._next_label += len(positions)
+
+            for row, (label, i) in enumerate(zip(labels.tolist(), positions)):
+                entry = VectorEntry(
+                    id=object_ids[i],
+                    vector=matrix[row],
+                    metadata=metadatas[i] or {},
+                    object_type=object_types[i]
+                )
+                self._entries[label] = entry
+                self._id_to_label[entry.id] = label
+                for partition in self._partitions_of(entry):
+                    self._partitions[partition].add(label)
+
+            if len(labels):
+                self.index.add_with_ids(matrix, labels)
+
+        stats = IngestStats(objects=len(positions), index_seconds=time.perf_counter() - start)
+        self.ingest_stats.merge(stats)
+        logger.debug(
+            f"Bulk added {stats.objects} objects "
+            f"({stats.objects_per_second:.0f} objects/s)"
+        )
+
+        self._maybe_retrain()
+        return stats
 
     def search_similar(
         self,
         query_vector: np.ndarray,
         k: int = 5,
         object_type: Optional[str] = None,
-        threshold: float = 0.5
+        threshold: float = 0.5,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Tuple[VectorEntry, float]]:
         """Search for similar objects using FAISS L2 distance.
 
+        Filters restrict the search inside the index, so selective filters
+        still return up to k results instead of a truncated top-k.
+
         Args:
             query_vector: Query embedding vector
             k: Number of results to return
             object_type: Filter by object type
             threshold: Similarity threshold (0-1, higher is more similar)
+            filters: Exact-match metadata filters, e.g. {'connection_id': 'db1'}
 
         Returns:
             List of (entry, L2_distance) tuples, sorted by distance (ascending)
@@ -109,24 +371,123 @@ class VectorDatabase:
             For normalized vectors, L2 distance ranges from 0 to 2.
             Threshold is converted to similarity metric: similarity = 1.0 / (1.0 + distance)
         """
-        if not self.entries:
-            return []
+        return self.search_many(
+            query_vector.reshape(1, -1),
+            k=k,
+            object_type=object_type,
+            threshold=threshold,
+            filters=filters
+        ).for_query(0)
+
+    def search_many(
+        self,
+        query_vectors: np.ndarray,
+        k: int = 5,
+        object_type: Optional[str] = None,
+        threshold: float = 0.5,
+        filters: Optional[Union[Dict[str, Any], Sequence[Optional[Dict[str, Any]]]]] = None
+    ) -> 'SearchResults':
+        """Search for the neighbours of many query vectors at once.
+
+        Queries sharing the same filters are answered by a single FAISS
+        call on the query matrix, so a batch avoids the per-call overhead
+        of looping over search_similar.
+
+        Args:
+            query_vectors: Query embeddings, shape (n_queries, dimension)
+            k: Number of results per query
+            object_type: Filter by object type (all queries)
+            threshold: Similarity threshold (0-1, higher is more similar)
+            filters: Exact-match metadata filters shared by all queries, or
+                one filter dictionary (or None) per query
+
+        Returns:
+            Column-oriented results, one group of hits per query
+
+        Raises:
+            ValueError: If per-query filters do not match the number of queries
+        """
+        queries = np.ascontiguousarray(
+            np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.dimension)
+        )
+        n_queries = len(queries)
+
+        if filters is None or isinstance(filters, dict):
+            query_filters = [filters] * n_queries
+        else:
+            query_filters = list(filters)
+            if len(query_filters) != n_queries:
+                raise ValueError(
+                    f"Got {len(query_filters)} filters for {n_queries} queries"
+                )
 
-        # Prepare query for FAISS - requires float32 2D array
-        query_2d = query_vector.reshape(1, -1).astype(np.float32)
+        hits: List[List[Tuple[VectorEntry, float]]] = [[] for _ in range(n_queries)]
+        if self._entries and n_queries:
+            # Queries with equal filters share a candidate set and a FAISS call
+            groups: Dict[str, List[int]] = defaultdict(list)
+            for row, row_filters in enumerate(query_filters):
+                groups[repr(sorted((row_filters or {}).items()))].append(row)
 
-        # Get more results than needed to allow for filtering
-        distances, indices = self.index.search(query_2d, k * 2)
+            for rows in groups.values():
+                found = self._search_group(queries[rows], k, object_type, query_filters[rows[0]])
+                if found is None:
+                    continue
+                distances, labels = found
+                for row, row_distances, row_labels in zip(rows, distances, labels):
+                    hits[row] = self._collect_hits(row_distances, row_labels, k, threshold)
 
-        results = []
-        for dist, idx in zip(distances[0], indices[0]):
-            if idx >= len(self.entries):
-                continue
+        return SearchResults.from_hits(hits)
 
-            entry = self.entries[idx]
+    def _search_group(
+        self,
+        queries: np.ndarray,
+        k: int,
+        object_type: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Search a query matrix under one filter; None if nothing matches."""
+        candidates = self._candidate_labels(object_type, filters)
+        if candidates is None:
+            if not self._tombstones:
+                return self.index.search(queries, k)
+            # Tombstoned labels are still in the graph; keep them out of the results
+            tombstones = faiss.IDSelectorBatch(
+                np.fromiter(self._tombstones, dtype=np.int64, count=len(self._tombstones))
+            )
+            selector = faiss.IDSelectorNot(tombstones)
+            index = self.index
+            params = self.engine.search_parameters(
+                index, selector, 1.0 - len(self._tombstones) / max(index.ntotal, 1)
+            )
+            return index.search(queries, k, params=params)
+        if not candidates:
+            return None
+        if len(candidates) <= self.brute_force_limit:
+            return self._search_subset(queries, candidates, k)
+
+        index = self.index
+        engine = self.engine
+        selector = faiss.IDSelectorBatch(
+            np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        )
+        params = engine.search_parameters(
+            index, selector, len(candidates) / max(index.ntotal, 1)
+        )
+        return index.search(queries, k, params=params)
 
-            # Apply object type filter
-            if object_type and entry.object_type != object_type:
+    def _collect_hits(
+        self,
+        distances: np.ndarray,
+        labels: np.ndarray,
+        k: int,
+        threshold: float
+    ) -> List[Tuple[VectorEntry, float]]:
+        """Turn one row of FAISS output into (entry, distance) hits."""
+        results = []
+        for dist, label in zip(distances, labels):
+            # FAISS pads missing neighbours with -1; deleted labels are skipped
+            entry = self._entries.get(int(label))
+            if entry is None:
                 continue
 
             # Apply threshold using L2 distance
@@ -143,6 +504,63 @@ class VectorDatabase:
 
         return results
 
+    def _partitions_of(self, entry: VectorEntry) -> List[Tuple[str, Any]]:
+        """Partitions an entry belongs to."""
+        partitions = [('object_type', entry.object_type)]
+        for key in self.partition_keys:
+            if key in entry.metadata:
+                partitions.append((key, entry.metadata[key]))
+        return partitions
+
+    def _candidate_labels(
+        self,
+        object_type: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> Optional[Set[int]]:
+        """Labels matching the filters, or None when nothing is filtered."""
+        conditions = dict(filters or {})
+        if object_type:
+            conditions['object_type'] = object_type
+        if not conditions:
+            return None
+
+        partitions = []
+        residual = {}
+        for key, value in conditions.items():
+            if key == 'object_type' or key in self.partition_keys:
+                partitions.append(self._partitions.get((key, value), set()))
+            else:
+                residual[key] = value
+
+        if partitions:
+            partitions.sort(key=len)
+            candidates = partitions[0].intersection(*partitions[1:])
+        else:
+            candidates = set(self._entries)
+
+        # Keys without a partition fall back to a metadata scan
+        if residual:
+            candidates = {
+                label for label in candidates
+                if all(
+                    self._entries[label].metadata.get(key) == value
+                    for key, value in residual.items()
+                )
+            }
+        return candidates
+
+    def _search_subset(
+        self,
+        queries: np.ndarray,
+        candidates: Set[int],
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact L2 search restricted to a small set of labels."""
+        labels = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        vectors = self._vector_matrix(self._entries[int(label)] for label in labels)
+        distances, positions = faiss.knn(queries, vectors, min(k, len(labels)))
+        return distances, labels[positions]
+
     def get_by_id(self, object_id: str) -> Optional[VectorEntry]:
         """Get entry by ID.
 
@@ -152,9 +570,9 @@ class VectorDatabase:
         Returns:
             Vector entry or None
         """
-        idx = self._id_to_idx.get(object_id)
-        if idx is not None:
-            return self.entries[idx]
+        label = self._id_to_label.get(object_id)
+        if label is not None:
+            return self._entries.get(label)
         return None
 
     def delete_by_id(self, object_id: str) -> bool:
@@ -166,43 +584,105 @@ class VectorDatabase:
         Returns:
             True if deleted, False if not found
         """
-        idx = self._id_to_idx.get(object_id)
-        if idx is None:
-            return False
+        deleted = self.delete_many([object_id]) > 0
+        if deleted:
+            logger.debug(f"Deleted object: {object_id}")
+        return deleted
+
+    def delete_many(self, object_ids: Iterable[str]) -> int:
+        """Delete several entries, removing their vectors from the index.
+
+        Args:
+            object_ids: Object identifiers
 
-        # Mark as deleted in metadata
-        self.entries[idx].metadata['_deleted'] = True
-        logger.debug(f"Deleted object: {object_id}")
-        return True
+        Returns:
+            Number of entries deleted
+        """
+        with self._lock:
+            labels = self._discard(object_ids)
+            self._remove_labels(labels)
+
+        if labels:
+            self._maybe_retrain()
+        return len(labels)
+
+    def _discard(self, object_ids: Iterable[str]) -> List[int]:
+        """Drop entries from the ID maps and return their labels."""
+        labels = []
+        for object_id in object_ids:
+            label = self._id_to_label.pop(object_id, None)
+            if label is not None:
+                entry = self._entries.pop(label)
+                for partition in self._partitions_of(entry):
+                    members = self._partitions.get(partition)
+                    if members is not None:
+                        members.discard(label)
+                        if not members:
+                            del self._partitions[partition]
+                labels.append(label)
+        return labels
+
+    def _remove_labels(self, labels: List[int]) -> None:
+        """Remove labels from the index, or tombstone them if unsupported."""
+        if not labels:
+            return
+
+        self._ensure_writable()
+        if self.engine.supports_removal:
+            self.index.remove_ids(np.asarray(labels, dtype=np.int64))
+        else:
+            self._tombstones.update(labels)
+
+    @property
+    def tombstone_ratio(self) -> float:
+        """Fraction of indexed vectors that belong to deleted entries."""
+        ntotal = self.index.ntotal
+        return len(self._tombstones) / ntotal if ntotal else 0.0
 
     def index_database_objects(
         self,
         tables: List[Dict[str, Any]],
-        embedding_func: callable
-    ) -> None:
+        embedding_func: Optional[Callable[[str], np.ndarray]] = None,
+        batch_embedding_func: Optional[Callable[[List[str]], np.ndarray]] = None,
+        batch_size: int = 256
+    ) -> IngestStats:
         """Index database objects with embeddings.
 
+        Texts are embedded and appended to the index in batches. Pass
+        batch_embedding_func (e.g. EmbeddingModel.encode) to embed a whole
+        batch per model call; embedding_func is called once per text.
+
         Args:
             tables: List of table definitions
-            embedding_func: Function to generate embeddings from text
+            embedding_func: Function to generate an embedding from one text
+            batch_embedding_func: Function to generate embeddings for a list of texts
+            batch_size: Number of objects embedded and indexed per batch
+
+        Returns:
+            Ingestion statistics
+
+        Raises:
+            ValueError: If no embedding function is given
         """
+        if embedding_func is None and batch_embedding_func is None:
+            raise ValueError("embedding_func or batch_embedding_func is required")
+
+        objects = []
         for table in tables:
             table_name = table.get('name', '')
             table_desc = table.get('description', '')
 
             # Index table
-            table_text = f"Table: {table_name}. {table_desc}"
-            table_vector = embedding_func(table_text)
-            self.add_object(
-                object_id=f"table:{table_name}",
-                vector=table_vector,
-                object_type='table',
-                metadata={
+            objects.append((
+                f"table:{table_name}",
+                f"Table: {table_name}. {table_desc}",
+                'table',
+                {
                     'name': table_name,
                     'description': table_desc,
                     'schema': table.get('schema', 'public')
                 }
-            )
+            ))
 
             # Index columns
             for column in table.get('columns', []):
@@ -210,24 +690,45 @@ class VectorDatabase:
                 col_type = column.get('type', '')
                 col_desc = column.get('description', '')
 
-                col_text = (
-                    f"Column: {table_name}.{col_name}. "
-                    f"Type: {col_type}. {col_desc}"
-                )
-                col_vector = embedding_func(col_text)
-                self.add_object(
-                    object_id=f"column:{table_name}.{col_name}",
-                    vector=col_vector,
-                    object_type='column',
-                    metadata={
+                objects.append((
+                    f"column:{table_name}.{col_name}",
+                    f"Column: {table_name}.{col_name}. Type: {col_type}. {col_desc}",
+                    'column',
+                    {
                         'table': table_name,
                         'name': col_name,
                         'type': col_type,
                         'description': col_desc
                     }
-                )
+                ))
+
+        stats = IngestStats()
+        for start in range(0, len(objects), batch_size):
+            batch = objects[start:start + batch_size]
+            texts = [text for _, text, _, _ in batch]
+
+            embed_start = time.perf_counter()
+            if batch_embedding_func is not None:
+                vectors = batch_embedding_func(texts)
+            else:
+                vectors = np.vstack([embedding_func(text) for text in texts])
+            embed_seconds = time.perf_counter() - embed_start
+
+            batch_stats = self.add_objects(
+                [object_id for object_id, _, _, _ in batch],
+                vectors,
+                [object_type for _, _, object_type, _ in batch],
+                [metadata for _, _, _, metadata in batch]
+            )
+            batch_stats.embed_seconds = embed_seconds
+            self.ingest_stats.embed_seconds += embed_seconds
+            stats.merge(batch_stats)
 
-        logger.info(f"Indexed {len(self.entries)} database objects")
+        logger.info(
+            f"Indexed {stats.objects} database objects "
+            f"({stats.objects_per_second:.0f} objects/s)"
+        )
+        return stats
 
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics.
@@ -236,13 +737,279 @@ class VectorDatabase:
             Statistics dictionary
         """
         type_counts = {}
-        for entry in self.entries:
-            if not entry.metadata.get('_deleted'):
-                type_counts[entry.object_type] = type_counts.get(entry.object_type, 0) + 1
+        for entry in self._entries.values():
+            type_counts[entry.object_type] = type_counts.get(entry.object_type, 0) + 1
 
         return {
-            'total_entries': len(self.entries),
+            'total_entries': len(self._entries),
             'dimension': self.dimension,
             'type_counts': type_counts,
-            'index_size': self.index.ntotal
+            'index_size': self.index.ntotal,
+            'index_type': self.engine.index_type.value,
+            'nprobe': self.search_params.nprobe,
+            'ef_search': self.search_params.ef_search,
+            'trained_size': self._trained_size,
+            'tombstones': len(self._tombstones),
+            'tombstone_ratio': self.tombstone_ratio,
+            'ingest': self.ingest_stats.to_dict(),
+            'retraining': self.is_retraining,
+            'memory_mapped': self._index_mapped,
+            'memory_bytes': self.memory_usage()
         }
+
+    def memory_usage(self) -> int:
+        """Estimate resident bytes of the index, vectors and entry metadata.
+
+        A memory-mapped index is paged in on demand and not counted.
+
+        Returns:
+            Estimated bytes
+        """
+        vector_bytes = self.dimension * np.dtype(np.float32).itemsize
+        index_bytes = 0 if self._index_mapped else self.index.ntotal * vector_bytes
+        return index_bytes + len(self._entries) * (vector_bytes + ENTRY_OVERHEAD_BYTES)
+
+    def save(self, directory: Union[str, Path], attachments: Optional[Dict[str, Any]] = None) -> None:
+        """Save the database in the native on-disk format.
+
+        Args:
+            directory: Target directory (replaced atomically)
+            attachments: JSON-serializable objects stored alongside the index
+        """
+        from .persistence import save_vector_store
+
+        save_vector_store(self, directory, attachments)
+
+    @classmethod
+    def load(
+        cls,
+        directory: Union[str, Path],
+        mmap: bool = True,
+        verify: bool = False,
+        **kwargs: Any
+    ) -> 'VectorDatabase':
+        """Open a database saved with save().
+
+        Args:
+            directory: Store directory
+            mmap: Memory-map the index and vectors instead of reading them
+            verify: Verify checksums of every file before opening
+            **kwargs: Extra constructor arguments (e.g. partition_keys)
+
+        Returns:
+            Loaded database
+
+        Raises:
+            VectorStoreFormatError: If the store is missing or corrupted
+        """
+        from .persistence import load_vector_store
+
+        return load_vector_store(directory, mmap=mmap, verify=verify, **kwargs)
+
+    def _restore(
+        self,
+        index: faiss.Index,
+        engine: IndexEngine,
+        labels: np.ndarray,
+        vectors: np.ndarray,
+        ids: Sequence[str],
+        object_types: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        next_label: int,
+        trained_size: int,
+        tombstones: Iterable[int],
+        mapped: bool
+    ) -> None:
+        """Replace the contents of this database with a loaded store."""
+        with self._lock:
+            self._entries.clear()
+            self._id_to_label.clear()
+            self._partitions.clear()
+            for row, label in enumerate(labels.tolist()):
+                entry = VectorEntry(
+                    id=ids[row],
+                    vector=vectors[row],
+                    metadata=metadatas[row],
+                    object_type=object_types[row]
+                )
+                self._entries[label] = entry
+                self._id_to_label[entry.id] = label
+                for partition in self._partitions_of(entry):
+                    self._partitions[partition].add(label)
+
+            engine.tune(index)
+            self.index = index
+            self.engine = engine
+            self._next_label = next_label
+            self._trained_size = trained_size
+            self._tombstones = set(tombstones)
+            self._index_mapped = mapped
+
+    def _ensure_writable(self) -> None:
+        """Copy a memory-mapped index into memory before modifying it."""
+        if not self._index_mapped:
+            return
+
+        from .persistence import materialize_index
+
+        self.index = materialize_index(self.index)
+        self.engine.tune(self.index)
+        self._index_mapped = False
+        logger.debug("Copied memory-mapped vector index into memory for writing")
+
+    def set_search_params(
+        self,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None
+    ) -> None:
+        """Tune recall/latency of approximate indexes.
+
+        Args:
+            nprobe: Inverted lists probed per query (IVF indexes)
+            ef_search: Candidate queue size per query (HNSW index)
+        """
+        if nprobe is not None:
+            self.search_params.nprobe = nprobe
+        if ef_search is not None:
+            self.search_params.ef_search = ef_search
+
+        with self._lock:
+            self.engine.tune(self.index)
+
+    @property
+    def is_retraining(self) -> bool:
+        """Whether a background retrain is in progress."""
+        thread = self._retrain_thread
+        return thread is not None and thread.is_alive()
+
+    def _target_engine(self, n_vectors: int) -> IndexEngine:
+        """Engine the index should use for a collection of n_vectors."""
+        index_type = self.requested_index_type or select_index_type(n_vectors)
+        engine = create_engine(index_type, self.dimension, self.search_params)
+
+        # Untrainable collections stay on the exact index until they grow
+        if not engine.can_build(n_vectors):
+            engine = create_engine(IndexType.FLAT, self.dimension, self.search_params)
+        return engine
+
+    def _needs_retrain(self, n_vectors: int) -> bool:
+        """Check whether the index tier, training or tombstones are out of date."""
+        if self._target_engine(n_vectors).index_type != self.engine.index_type:
+            return True
+
+        if self.tombstone_ratio >= self.compaction_threshold:
+            return True
+
+        # IVF centroids drift as the collection grows past its training set
+        return (
+            isinstance(self.engine, IVFFlatIndexEngine)
+            and n_vectors >= self._trained_size * self.retrain_growth
+        )
+
+    def _maybe_retrain(self) -> None:
+        """Schedule a retrain if the collection outgrew the current index."""
+        if self.is_retraining or not self._needs_retrain(len(self._entries)):
+            return
+        self.retrain()
+
+    def retrain(self, background: Optional[bool] = None) -> None:
+        """Rebuild the index with the engine suited to the current size.
+
+        Readers keep using the old index until the new one is swapped in;
+        additions and deletions made during a background rebuild are
+        replayed before the swap. Rebuilding also drops all tombstones.
+
+        Args:
+            background: Run in a background thread (default: background_retrain)
+        """
+        if background is None:
+            background = self.background_retrain
+
+        with self._lock:
+            if self.is_retraining:
+                return
+
+            engine = self._target_engine(len(self._entries))
+            labels = np.fromiter(self._entries.keys(), dtype=np.int64, count=len(self._entries))
+            snapshot = self._vector_matrix(self._entries.values())
+
+            if background:
+                self._retrain_thread = threading.Thread(
+                    target=self._rebuild,
+                    args=(engine, labels, snapshot),
+                    name="vector-index-retrain",
+                    daemon=True
+                )
+                self._retrain_thread.start()
+                return
+
+        self._rebuild(engine, labels, snapshot)
+
+    def compact(self, background: Optional[bool] = None) -> None:
+        """Rebuild the index without the vectors of deleted entries.
+
+        Args:
+            background: Run in a background thread (default: background_retrain)
+        """
+        self.retrain(background=background)
+
+    def wait_for_retrain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background retrain to finish.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if no retrain is running afterwards
+        """
+        thread = self._retrain_thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self.is_retraining
+
+    def _rebuild(self, engine: IndexEngine, labels: np.ndarray, snapshot: np.ndarray) -> None:
+        """Build a new index from a snapshot and swap it in."""
+        try:
+            index = engine.build(snapshot, labels)
+
+            with self._lock:
+                # Replay entries added while the index was being built;
+                # labels grow monotonically so they sit at the end
+                last_label = int(labels[-1]) if len(labels) else -1
+                pending = list(itertools.takewhile(
+                    lambda item: item[0] > last_label,
+                    reversed(self._entries.items())
+                ))
+                if pending:
+                    index.add_with_ids(
+                        self._vector_matrix(entry for _, entry in pending),
+                        np.array([label for label, _ in pending], dtype=np.int64)
+                    )
+
+                # Replay deletions made while the index was being built
+                removed = [int(label) for label in labels if int(label) not in self._entries]
+                tombstones: Set[int] = set()
+                if removed and engine.supports_removal:
+                    index.remove_ids(np.asarray(removed, dtype=np.int64))
+                elif removed:
+                    tombstones.update(removed)
+
+                self.index = index
+                self.engine = engine
+                self._index_mapped = False
+                self._tombstones = tombstones
+                self._trained_size = len(snapshot)
+
+            logger.info(
+                f"Rebuilt vector index as {engine.index_type.value} "
+                f"with {index.ntotal} vectors"
+            )
+        except Exception as e:
+            logger.error(f"Vector index rebuild failed: {e}")
+
+    def _vector_matrix(self, entries: Iterable[VectorEntry]) -> np.ndarray:
+        """Stack entry vectors into a contiguous float32 matrix."""
+        vectors = [entry.vector for entry in entries]
+        if not vectors:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.ascontiguousarray(np.vstack(vectors), dtype=np.float32)
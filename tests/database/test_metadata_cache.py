@@ -9,7 +9,10 @@ from pathlib import Path
 from datetime import datetime
 import asyncio
 
+import numpy as np
+
 from src.database.metadata_cache import DatabaseMetadataCache, TableMetadata, ColumnMetadata
+from src.vector.store import VectorDatabase
 
 
 @pytest.fixture
@@ -179,7 +182,7 @@ class TestDatabaseMetadataCacheBasics:
         assert cache.cache_dir == Path(temp_cache_dir)
         assert len(cache.tables) == 0
         assert len(cache.columns) == 0
-        assert cache.vector_db is not None
+        assert cache.shards is not None
 
     def test_cache_directory_creation(self):
         """Test that cache directory is created if it doesn't exist."""
@@ -214,7 +217,7 @@ class TestIndexing:
         assert len(cache.columns) == 13
 
         # Verify vector database has entries
-        stats = cache.vector_db.get_stats()
+        stats = cache.shards.get_stats()
         assert stats['total_entries'] == 16  # 3 tables + 13 columns
 
     @pytest.mark.asyncio
@@ -484,6 +487,52 @@ class TestCacheInvalidation:
         assert len(cache.tables) == 2
         assert cache.last_refresh["test_db"] > original_refresh_time
 
+    @pytest.mark.asyncio
+    async def test_refresh_reembeds_only_changed_tables(self, cache, sample_metadata):
+        """Test incremental refresh using table fingerprints."""
+        import copy
+
+        await cache.index_database("test_db", sample_metadata)
+        embedded = []
+        original = cache._texts_to_vectors
+        cache._texts_to_vectors = lambda texts: embedded.extend(texts) or original(texts)
+
+        updated = copy.deepcopy(sample_metadata)
+        changed = updated['tables'][0]
+        changed['columns'] = changed['columns'][:-1] + [
+            {'name': 'added_col', 'type': 'text', 'description': 'new column'}
+        ]
+        removed = updated['tables'].pop()
+        updated['tables'][1]['row_count'] = 999999
+
+        counts = await cache.refresh_connection("test_db", updated)
+
+        assert counts == {'added': 0, 'changed': 1, 'removed': 1, 'unchanged': 1}
+        # Only the changed table and its columns were re-embedded
+        assert len(embedded) == 1 + len(changed['columns'])
+        assert cache.get_table("test_db", "public", removed['name']) is None
+        assert cache.get_table("test_db", "public", updated['tables'][1]['name']).row_count == 999999
+
+        dropped = sample_metadata['tables'][0]['columns'][-1]['name']
+        assert cache.get_column("test_db", "public", changed['name'], dropped) is None
+        assert cache.shards.get_by_id(
+            "test_db", cache._make_column_key("test_db", "public", changed['name'], dropped)
+        ) is None
+        assert cache.shards.get_stats()['total_entries'] == len(cache.tables) + len(cache.columns)
+
+    @pytest.mark.asyncio
+    async def test_refresh_unchanged_schema_embeds_nothing(self, cache, sample_metadata):
+        """Test that refreshing an identical schema skips embedding."""
+        await cache.index_database("test_db", sample_metadata)
+        cache._texts_to_vectors = None  # Would fail if called with any texts
+
+        await cache.save_to_disk()
+        counts = await cache.refresh_connection("test_db", sample_metadata)
+
+        assert counts['unchanged'] == len(sample_metadata['tables'])
+        # Nothing to rewrite on the next save
+        assert cache.shards.get_stats()['per_shard']['test_db']['dirty'] is False
+
     def test_clear_all(self, cache):
         """Test clearing all cached data."""
         # Add some data
@@ -512,12 +561,11 @@ class TestPersistence:
 
         await cache.save_to_disk()
 
-        # Check that files were created
-        metadata_file = Path(temp_cache_dir) / 'metadata.json'
-        vector_file = Path(temp_cache_dir) / 'vectors.pkl'
+        # Check that the connection's native store was created
+        store_dir = Path(temp_cache_dir) / 'shards' / 'test_db'
 
-        assert metadata_file.exists()
-        assert vector_file.exists()
+        for name in ('manifest.json', 'index.faiss', 'vectors.npy', 'entries.json', 'catalog.json'):
+            assert (store_dir / name).exists()
 
     @pytest.mark.asyncio
     async def test_load_from_disk(self, cache, sample_metadata, temp_cache_dir):
@@ -534,6 +582,42 @@ class TestPersistence:
         assert len(new_cache.columns) == 13
         assert "test_db" in new_cache.last_refresh
 
+    @pytest.mark.asyncio
+    async def test_load_from_disk_detects_corruption(self, cache, sample_metadata, temp_cache_dir):
+        """Test that a corrupted catalog is rejected."""
+        await cache.index_database("test_db", sample_metadata)
+        await cache.save_to_disk()
+
+        catalog_file = Path(temp_cache_dir) / 'shards' / 'test_db' / 'catalog.json'
+        data = bytearray(catalog_file.read_bytes())
+        data[10] ^= 0xFF
+        catalog_file.write_bytes(bytes(data))
+
+        new_cache = DatabaseMetadataCache(cache_dir=temp_cache_dir)
+        assert await new_cache.load_from_disk() is False
+
+    @pytest.mark.asyncio
+    async def test_load_from_legacy_format(self, cache, sample_metadata, temp_cache_dir):
+        """Test loading metadata.json/vectors.pkl written by older versions."""
+        import json
+        import pickle
+
+        await cache.index_database("test_db", sample_metadata)
+        with open(Path(temp_cache_dir) / 'metadata.json', 'w') as f:
+            json.dump({
+                'tables': {key: table.to_dict() for key, table in cache.tables.items()},
+                'columns': {key: column.to_dict() for key, column in cache.columns.items()},
+                'last_refresh': {}
+            }, f)
+        with open(Path(temp_cache_dir) / 'vectors.pkl', 'wb') as f:
+            pickle.dump({'entries': cache.shards.get("test_db").entries}, f)
+
+        new_cache = DatabaseMetadataCache(cache_dir=temp_cache_dir)
+
+        assert await new_cache.load_from_disk() is True
+        assert len(new_cache.tables) == 3
+        assert new_cache.shards.get_stats()['total_entries'] == cache.shards.get_stats()['total_entries']
+
     @pytest.mark.asyncio
     async def test_load_from_disk_no_cache(self, cache):
         """Test loading when no cache exists."""
@@ -702,5 +786,216 @@ class TestEdgeCases:
         assert not (vec1 == vec2).all()
 
 
+
+class TestSharding:
+    """Test per-connection vector shards."""
+
+    @pytest.mark.asyncio
+    async def test_connections_have_separate_shards(self, cache, sample_metadata):
+        """Test that each connection is indexed in its own shard."""
+        await cache.index_database("db1", sample_metadata)
+        await cache.index_database("db2", sample_metadata)
+
+        assert sorted(cache.shards.keys()) == ["db1", "db2"]
+
+        results = await cache.search_tables("users", k=6)
+        assert {r['connection_id'] for r in results} == {"db1", "db2"}
+
+        cache.clear_connection("db1")
+        assert cache.shards.keys() == ["db2"]
+
+    @pytest.mark.asyncio
+    async def test_shards_load_on_first_search(self, cache, sample_metadata, temp_cache_dir):
+        """Test that loading from disk defers opening vector shards."""
+        await cache.index_database("db1", sample_metadata)
+        await cache.index_database("db2", sample_metadata)
+        await cache.save_to_disk()
+
+        new_cache = DatabaseMetadataCache(cache_dir=temp_cache_dir)
+        assert await new_cache.load_from_disk() is True
+        assert len(new_cache.tables) == 6
+        assert new_cache.get_stats()['vector_db_stats']['loaded_shards'] == 0
+
+        results = await new_cache.search_tables("people who sign in", connection_id="db2", k=3)
+
+        assert {r['connection_id'] for r in results} == {"db2"}
+        assert new_cache.shards.is_loaded("db2")
+        assert not new_cache.shards.is_loaded("db1")
+
+    @pytest.mark.asyncio
+    async def test_column_search_scoped_to_connection(self, cache, sample_metadata, temp_cache_dir):
+        """Test that a connection-scoped column search loads only its shard."""
+        await cache.index_database("db1", sample_metadata)
+        await cache.index_database("db2", sample_metadata)
+        await cache.save_to_disk()
+
+        new_cache = DatabaseMetadataCache(cache_dir=temp_cache_dir)
+        await new_cache.load_from_disk()
+        semantic = await new_cache.search_columns("how to contact someone", connection_id="db2", k=5)
+        exact = await new_cache.search_columns("email", connection_id="db1", k=5)
+
+        assert {r['connection_id'] for r in semantic} == {"db2"}
+        assert {r['connection_id'] for r in exact} == {"db1"}
+        assert new_cache.shards.is_loaded("db2")
+        assert not new_cache.shards.is_loaded("db1")
+
+    @pytest.mark.asyncio
+    async def test_memory_budget_unloads_idle_connections(self, temp_cache_dir, sample_metadata):
+        """Test that shards beyond the memory budget are saved and unloaded."""
+        cache = DatabaseMetadataCache(cache_dir=temp_cache_dir, memory_budget_bytes=1)
+        await cache.index_database("db1", sample_metadata)
+        await cache.index_database("db2", sample_metadata)
+
+        assert not cache.shards.is_loaded("db1")
+
+        results = await cache.search_columns("how to contact someone", k=26)
+        assert len(results) == 26
+
+    @pytest.mark.asyncio
+    async def test_load_from_single_store_format(self, cache, sample_metadata, temp_cache_dir):
+        """Test loading the single vector store written by earlier versions."""
+        await cache.index_database("db1", sample_metadata)
+        await cache.index_database("db2", sample_metadata)
+        merged = VectorDatabase(dimension=384)
+        for key in ("db1", "db2"):
+            entries = cache.shards.get(key).entries
+            merged.add_objects(
+                [e.id for e in entries],
+                np.vstack([e.vector for e in entries]),
+                [e.object_type for e in entries],
+                [e.metadata for e in entries]
+            )
+        merged.save(Path(temp_cache_dir) / 'other' / 'vector_store', attachments={'catalog': {
+            'tables': {key: table.to_dict() for key, table in cache.tables.items()},
+            'columns': {key: column.to_dict() for key, column in cache.columns.items()},
+            'last_refresh': {}
+        }})
+
+        new_cache = DatabaseMetadataCache(cache_dir=str(Path(temp_cache_dir) / 'other'))
+
+        assert await new_cache.load_from_disk() is True
+        assert sorted(new_cache.shards.keys()) == ["db1", "db2"]
+        assert new_cache.shards.get_stats()['total_entries'] == 32
+
+
+class TestHybridSearch:
+    """Test exact, fuzzy and semantic search paths."""
+
+    @pytest.mark.asyncio
+    async def test_exact_name_skips_embedding(self, cache, sample_metadata, monkeypatch):
+        """Test that an exact table name is answered without the model."""
+        await cache.index_database("test_db", sample_metadata)
+
+        def fail(text):
+            raise AssertionError("query was embedded")
+        monkeypatch.setattr(cache, '_text_to_vector', fail)
+
+        results = await cache.search_tables("public.users", k=3)
+
+        assert results[0]['name'] == 'users'
+        assert results[0]['match'] == 'exact'
+        assert results[0]['similarity'] == 1.0
+        assert cache.get_stats()['search_paths']['exact'] == 1
+
+    @pytest.mark.asyncio
+    async def test_fuzzy_name_skips_embedding(self, cache, sample_metadata, monkeypatch):
+        """Test that a near-exact column name is answered lexically."""
+        await cache.index_database("test_db", sample_metadata)
+        monkeypatch.setattr(cache, '_text_to_vector', None)
+
+        results = await cache.search_columns("user_idd", k=3)
+
+        assert results[0]['name'] == 'user_id'
+        assert results[0]['match'] == 'lexical'
+
+    @pytest.mark.asyncio
+    async def test_semantic_query_fuses_rankings(self, cache, sample_metadata):
+        """Test that other queries merge name and vector matches."""
+        await cache.index_database("test_db", sample_metadata)
+
+        results = await cache.search_tables("user accounts", k=3)
+
+        assert 'users' in [r['name'] for r in results]
+        assert {r['match'] for r in results} <= {'lexical', 'semantic', 'hybrid'}
+        assert cache.get_stats()['search_paths']['semantic'] == 1
+
+    @pytest.mark.asyncio
+    async def test_name_index_follows_refresh_and_reload(self, cache, sample_metadata, temp_cache_dir):
+        """Test that dropped tables leave the name index and reloads rebuild it."""
+        await cache.index_database("test_db", sample_metadata)
+        await cache.refresh_connection("test_db", {'tables': sample_metadata['tables'][1:]})
+
+        assert cache.table_names.lookup("users") == []
+
+        await cache.save_to_disk()
+        new_cache = DatabaseMetadataCache(cache_dir=temp_cache_dir)
+        await new_cache.load_from_disk()
+
+        results = await new_cache.search_tables("posts", k=1)
+        assert results[0]['match'] == 'exact'
+
+
+class FakeEmbeddingService:
+    """Embedding service returning deterministic vectors and recording calls."""
+
+    def __init__(self, name='fake-model', dimension=384):
+        self.model = type('Model', (), {'cache_namespace': name})()
+        self.dimension = dimension
+        self.calls = []
+
+    def encode(self, texts):
+        raise AssertionError("blocking encode called from the event loop")
+
+    async def encode_async(self, texts):
+        self.calls.append(list(texts))
+        rng = np.random.default_rng(len(self.calls))
+        return rng.standard_normal((len(texts), self.dimension)).astype(np.float32)
+
+
+class TestEmbeddingService:
+    """Test embedding objects and queries through a shared service."""
+
+    @pytest.mark.asyncio
+    async def test_objects_and_queries_use_service(self, temp_cache_dir, sample_metadata):
+        """Test that indexing and semantic search encode through the service."""
+        service = FakeEmbeddingService()
+        cache = DatabaseMetadataCache(cache_dir=temp_cache_dir, embedding_service=service)
+
+        await cache.index_database("test_db", sample_metadata)
+        indexed = sum(len(texts) for texts in service.calls)
+        assert indexed == len(cache.tables) + len(cache.columns)
+
+        await cache.search_tables("where are accounts kept", k=2)
+        assert service.calls[-1] == ["where are accounts kept"]
+
+    @pytest.mark.asyncio
+    async def test_reload_with_other_embedder_reembeds(self, cache, temp_cache_dir, sample_metadata):
+        """Test that shards saved with hash vectors are rebuilt for a model."""
+        await cache.index_database("test_db", sample_metadata)
+        await cache.save_to_disk()
+
+        service = FakeEmbeddingService()
+        new_cache = DatabaseMetadataCache(cache_dir=temp_cache_dir, embedding_service=service)
+        assert await new_cache.load_from_disk()
+        assert sum(len(texts) for texts in service.calls) == len(cache.tables) + len(cache.columns)
+        await new_cache.save_to_disk()
+
+        service = FakeEmbeddingService()
+        same_model = DatabaseMetadataCache(cache_dir=temp_cache_dir, embedding_service=service)
+        assert await same_model.load_from_disk()
+        assert service.calls == []
+
+    @pytest.mark.asyncio
+    async def test_dimension_mismatch_rejected(self, temp_cache_dir, sample_metadata):
+        """Test that service vectors must match the cache dimension."""
+        cache = DatabaseMetadataCache(
+            cache_dir=temp_cache_dir,
+            embedding_service=FakeEmbeddingService(dimension=128)
+        )
+
+        with pytest.raises(ValueError, match="128-dimensional"):
+            await cache.index_database("test_db", sample_metadata)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,207 @@
+"""Tests for the read-through result cache of BaseDatabaseClient."""
+
+import pytest
+
+from src.database.clients.base import BaseDatabaseClient, DatabaseConfig, ResultCachePolicy
+from src.performance.sql_tables import cacheable_read, fingerprint, volatile_functions
+
+
+class FakeClient(BaseDatabaseClient):
+    """Client returning canned rows and recording executed statements."""
+
+    def __init__(self, policy=None):
+        super().__init__(DatabaseConfig(host="localhost", port=0, database="test", user="u",
+                                        password="p", min_pool_size=1, max_retries=1,
+                                        result_cache=policy))
+        self.statements = []
+
+    async def _create_connection(self):
+        return object()
+
+    async def _execute_impl(self, connection, query, params=None):
+        self.statements.append(query)
+        if self._get_query_type(query) == 'SELECT':
+            return ['n'], [(len(self.statements),)], 1
+        return [], [], 1
+
+    async def _get_ping_query(self):
+        return "SELECT 1"
+
+
+@pytest.fixture
+def client():
+    return FakeClient(ResultCachePolicy(default_ttl=60))
+
+
+class TestFingerprint:
+    """Test query normalization."""
+
+    def test_literals_share_fingerprint(self):
+        first, first_literals = fingerprint("SELECT * FROM users WHERE id = 1")
+        second, second_literals = fingerprint("select *\n  from USERS where id=2 -- lookup")
+
+        assert first == second == "select * from users where id = ?"
+        assert first_literals == ('1',)
+        assert second_literals == ('2',)
+
+    def test_in_lists_and_placeholders(self):
+        shape, literals = fingerprint(
+            "SELECT a FROM s.t WHERE x IN (1, 2, 3) AND name = 'O''Brien' AND y = $1"
+        )
+
+        assert shape == "select a from s.t where x in (?) and name = ? and y = $1"
+        assert literals == ('1', '2', '3', "'O''Brien'")
+
+    @pytest.mark.parametrize("query", [
+        "SELECT * FROM a FOR UPDATE",
+        "SELECT * FROM a WHERE id = 1 FOR NO KEY UPDATE SKIP LOCKED",
+        "select * from a for share of a",
+        "SELECT * FROM a LOCK IN SHARE MODE",
+        "SELECT * INTO newt FROM a",
+        "SELECT id INTO OUTFILE '/tmp/a' FROM a",
+        "SELECT * FROM a; SELECT * FROM b",
+        "UPDATE a SET n = 1",
+    ])
+    def test_side_effecting_statements_not_cacheable(self, query):
+        assert not cacheable_read(query)
+
+    def test_plain_reads_cacheable(self):
+        assert cacheable_read("WITH x AS (SELECT * FROM a) SELECT * FROM x JOIN b ON b.id = x.id;")
+        assert cacheable_read("SELECT substring(name FROM 1 FOR 3), 'for update' FROM a")
+
+    def test_volatile_functions(self):
+        assert volatile_functions("SELECT nextval('s') FROM a") == {'nextval'}
+        assert volatile_functions("SELECT pg_advisory_lock(1) FROM a") == {'pg_advisory_lock'}
+        assert volatile_functions("SELECT GET_LOCK('x', 1), NOW() FROM a") == {'get_lock', 'now'}
+        assert volatile_functions("SELECT * FROM a WHERE t < CURRENT_TIMESTAMP") == {'current_timestamp'}
+        assert not volatile_functions("SELECT count(*), 'now()' FROM a WHERE random_id = 1")
+
+
+@pytest.mark.asyncio
+class TestReadThrough:
+    """Test serving SELECT results from the cache."""
+
+    async def test_repeated_select_served_from_cache(self, client):
+        first = await client.execute("SELECT n FROM counters WHERE id = 1")
+        second = await client.execute("select n from counters where id=1")
+
+        assert first['cached'] is False
+        assert second['cached'] is True
+        assert second['rows'] == first['rows']
+        assert len(client.statements) == 1
+
+    async def test_literals_and_params_are_part_of_key(self, client):
+        await client.execute("SELECT n FROM counters WHERE id = 1")
+        await client.execute("SELECT n FROM counters WHERE id = 2")
+        await client.execute("SELECT n FROM counters WHERE id = %(id)s", {'id': 1})
+        await client.execute("SELECT n FROM counters WHERE id = %(id)s", {'id': 2})
+        await client.execute("SELECT n FROM counters WHERE id = %(id)s", {'id': 1})
+
+        assert len(client.statements) == 4
+
+    async def test_write_invalidates_cached_reads(self, client):
+        await client.execute("SELECT n FROM counters WHERE id = 1")
+        await client.execute("SELECT n FROM other")
+
+        await client.execute("UPDATE counters SET n = n + 1 WHERE id = 1")
+        await client.execute("SELECT n FROM counters WHERE id = 1")
+        await client.execute("SELECT n FROM other")
+
+        assert client.statements.count("SELECT n FROM counters WHERE id = 1") == 2
+        assert client.statements.count("SELECT n FROM other") == 1
+
+    @pytest.mark.parametrize("query", [
+        "SELECT * FROM a FOR UPDATE",
+        "SELECT * INTO newt FROM a",
+        "SELECT nextval('s') FROM a",
+        "SELECT pg_advisory_lock(1) FROM a",
+        "SELECT GET_LOCK('job', 10) FROM a",
+        "SELECT * FROM a WHERE created < now()",
+    ])
+    async def test_side_effecting_selects_always_execute(self, client, query):
+        await client.execute(query)
+        result = await client.execute(query)
+
+        assert 'cached' not in result
+        assert client.statements == [query, query]
+
+    async def test_listed_volatile_query_is_cached(self):
+        client = FakeClient(ResultCachePolicy(query_ttls={"SELECT * FROM a WHERE t < now()": 5}))
+        await client.execute("SELECT * FROM a WHERE t < now()")
+        await client.execute("SELECT * FROM a WHERE t < now()")
+        await client.execute("SELECT * FROM a FOR UPDATE")
+        await client.execute("SELECT * FROM a FOR UPDATE")
+
+        assert len(client.statements) == 3
+        await client.close()
+
+    async def test_returned_rows_do_not_alias_cache(self, client):
+        await client.execute("SELECT n FROM counters")
+        result = await client.execute("SELECT n FROM counters")
+        result['rows'].clear()
+
+        assert (await client.execute("SELECT n FROM counters"))['rows']
+
+    async def test_metrics_record_hits_and_misses(self, client):
+        await client.execute("SELECT n FROM counters")
+        await client.execute("SELECT n FROM counters")
+        await client.execute("INSERT INTO counters (n) VALUES (1)")
+
+        metrics = client.metrics
+        assert metrics['query_count'] == 3
+        assert metrics['cache_hits'] == 1
+        assert metrics['cache_misses'] == 1
+        assert metrics['cache_hit_rate'] == 0.5
+        assert metrics['result_cache']['size'] == 0
+
+        miss, hit, write = metrics['recent_queries'][-3:]
+        assert (write.cache_hit, hit.cache_hit, miss.cache_hit) == (None, True, False)
+        assert hit.fingerprint == "select n from counters"
+
+
+@pytest.mark.asyncio
+class TestPolicy:
+    """Test per-table and per-query TTLs."""
+
+    async def test_disabled_by_default(self):
+        client = FakeClient()
+        await client.execute("SELECT n FROM counters")
+        result = await client.execute("SELECT n FROM counters")
+
+        assert 'cached' not in result
+        assert len(client.statements) == 2
+        await client.close()
+
+    async def test_table_ttl_overrides_default(self):
+        client = FakeClient(ResultCachePolicy(default_ttl=None, table_ttls={'public.Rates': 30}))
+        await client.execute("SELECT * FROM rates")
+        await client.execute("SELECT * FROM rates")
+        await client.execute("SELECT * FROM orders")
+        await client.execute("SELECT * FROM orders")
+
+        assert client.statements == ["SELECT * FROM rates", "SELECT * FROM orders", "SELECT * FROM orders"]
+        key = next(iter(client.query_cache._cache))
+        assert client.query_cache._cache[key].ttl_seconds == 30
+        await client.close()
+
+    async def test_uncached_table_wins_in_joins(self):
+        policy = ResultCachePolicy(default_ttl=60, table_ttls={'rates': 30, 'live_prices': 0})
+        assert policy.ttl_for("q", frozenset({'rates', 'orders'})) == 30
+        assert not policy.ttl_for("q", frozenset({'rates', 'live_prices'}))
+
+    async def test_query_ttl_matches_any_literals(self):
+        policy = ResultCachePolicy(
+            default_ttl=60,
+            query_ttls={"SELECT * FROM sessions WHERE id = 0": 0, "SELECT now()": 1}
+        )
+        client = FakeClient(policy)
+
+        for query in ("SELECT * FROM sessions WHERE id = 7", "SELECT * FROM sessions WHERE id = 7",
+                      "SELECT now()", "SELECT now()", "SELECT 1", "SELECT 1"):
+            await client.execute(query)
+
+        assert client.statements == [
+            "SELECT * FROM sessions WHERE id = 7", "SELECT * FROM sessions WHERE id = 7",
+            "SELECT now()", "SELECT 1", "SELECT 1"
+        ]
+        await client.close()
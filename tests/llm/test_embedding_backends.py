@@ -0,0 +1,116 @@
+"""
+Tests for embedding backends, including ONNX/int8 parity with the reference model
+
+The parity test needs sentence-transformers, onnxruntime and tokenizers plus an
+ONNX export under EMBEDDING_PARITY_MODEL_PATH; it is skipped otherwise, so the
+default CI run does not cover it. To run it (export also needs torch and
+transformers):
+
+    export EMBEDDING_PARITY_MODEL_PATH=~/.cache/aishell/models
+    python -c "from src.llm.embedding_backends import export_onnx_model as e; e('all-MiniLM-L6-v2', '$EMBEDDING_PARITY_MODEL_PATH')"
+    pytest tests/llm/test_embedding_backends.py -m slow
+"""
+
+import os
+import time
+
+import pytest
+import numpy as np
+
+from src.llm.embedding_backends import (
+    ONNX_INT8,
+    SENTENCE_TRANSFORMERS,
+    cosine_drift,
+    create_backend,
+    default_backend,
+    mean_pool,
+)
+from src.llm.embeddings import EmbeddingModel
+
+
+PARITY_TEXTS = [
+    "SELECT * FROM users WHERE id = 1",
+    "show me all orders placed last week",
+    "users table",
+    "customer email address column",
+    "INSERT INTO products (name, price) VALUES ('pen', 1.5)",
+    "which tables reference the accounts table",
+    "ls -la /var/log",
+    "average order value by month",
+]
+
+# Maximum allowed drift (1 - cosine) of the quantized model
+MAX_INT8_DRIFT = 0.02
+
+# Minimum throughput gain of the quantized model over the reference on CPU;
+# dynamic int8 quantization of MiniLM is expected to be several times faster
+MIN_INT8_SPEEDUP = 2.0
+
+
+class TestHelpers:
+    """Test pooling, drift and backend selection"""
+
+    def test_mean_pool_ignores_padding(self):
+        tokens = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]]])
+        mask = np.array([[1, 1, 0]])
+
+        pooled = mean_pool(tokens, mask)
+
+        assert np.allclose(pooled, [[1.0, 0.0]])
+
+    def test_cosine_drift(self):
+        reference = np.array([[1.0, 0.0], [0.0, 1.0]])
+        candidate = np.array([[2.0, 0.0], [1.0, 1.0]])
+
+        drift = cosine_drift(reference, candidate)
+
+        assert drift['min_cosine'] == pytest.approx(np.sqrt(0.5))
+        assert drift['max_drift'] == pytest.approx(1 - np.sqrt(0.5))
+
+    def test_default_backend_from_environment(self, monkeypatch):
+        monkeypatch.setenv("EMBEDDING_BACKEND", "ONNX-INT8")
+        assert default_backend() == ONNX_INT8
+
+        monkeypatch.setenv("EMBEDDING_BACKEND", "bogus")
+        assert default_backend() == SENTENCE_TRANSFORMERS
+
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            create_backend("bogus", "model", str(tmp_path))
+
+    def test_missing_onnx_model_falls_back(self, tmp_path):
+        embedding = EmbeddingModel(model_path=str(tmp_path), backend=ONNX_INT8)
+
+        assert embedding.initialize() is True
+        assert embedding.backend == SENTENCE_TRANSFORMERS
+
+    def test_cache_namespace_separates_backends(self):
+        assert EmbeddingModel(backend=SENTENCE_TRANSFORMERS).cache_namespace == "all-MiniLM-L6-v2"
+        assert EmbeddingModel(backend=ONNX_INT8).cache_namespace == "all-MiniLM-L6-v2:onnx-int8"
+
+
+@pytest.mark.slow
+def test_int8_parity_with_reference():
+    """Cosine drift and throughput of the int8 backend against sentence-transformers"""
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    model_path = os.getenv("EMBEDDING_PARITY_MODEL_PATH")
+    if not model_path:
+        pytest.skip("EMBEDDING_PARITY_MODEL_PATH not set")
+
+    reference = create_backend(SENTENCE_TRANSFORMERS, "all-MiniLM-L6-v2", model_path)
+    quantized = create_backend(ONNX_INT8, "all-MiniLM-L6-v2", model_path)
+
+    drift = cosine_drift(reference.encode(PARITY_TEXTS), quantized.encode(PARITY_TEXTS))
+    assert drift['max_drift'] <= MAX_INT8_DRIFT, drift
+
+    texts = PARITY_TEXTS * 32
+    timings = {}
+    for name, backend in (("reference", reference), ("int8", quantized)):
+        backend.encode(texts[:8])
+        start = time.perf_counter()
+        backend.encode(texts)
+        timings[name] = time.perf_counter() - start
+    speedup = timings['reference'] / timings['int8']
+    assert speedup >= MIN_INT8_SPEEDUP, f"int8 speedup {speedup:.2f}x, timings {timings}"
@@ -0,0 +1,127 @@
+"""
+Tests for the two-tier embedding cache and its use by EmbeddingModel
+"""
+
+import pytest
+from unittest.mock import Mock
+import numpy as np
+
+from src.llm.embedding_cache import EmbeddingCache
+from src.llm.embeddings import EmbeddingModel
+
+
+def fake_encode(texts, batch_size=32, convert_to_numpy=True):
+    """Deterministic embeddings derived from text length"""
+    return np.array([[len(text), 1.0, 0.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def cached_model(tmp_path):
+    """Initialized embedding model with a persistent cache and a counting encoder"""
+    embedding = EmbeddingModel(cache=EmbeddingCache(str(tmp_path)))
+    embedding.model = Mock()
+    embedding.model.encode.side_effect = fake_encode
+    embedding.initialized = True
+    return embedding
+
+
+class TestEmbeddingCache:
+    """Test cache tiers, metrics and caps"""
+
+    def test_miss_then_memory_hit(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path))
+
+        assert cache.get_many("m", ["a", "b"]) == [None, None]
+        cache.put_many("m", ["a"], np.ones((1, 3), dtype=np.float32))
+        result = cache.get_many("m", ["a", "b"])
+
+        assert np.allclose(result[0], 1.0)
+        assert result[1] is None
+        stats = cache.get_stats()
+        assert stats['misses'] == 3
+        assert stats['memory_hits'] == 1
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path))
+        cache.put_many("m", ["a"], np.full((1, 3), 2.0, dtype=np.float32))
+        cache.close()
+
+        reopened = EmbeddingCache(str(tmp_path))
+        result = reopened.get_many("m", ["a"])
+
+        assert np.allclose(result[0], 2.0)
+        assert reopened.get_stats()['disk_hits'] == 1
+
+    def test_keyed_by_model(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path))
+        cache.put_many("m1", ["a"], np.ones((1, 3), dtype=np.float32))
+
+        assert cache.get_many("m2", ["a"]) == [None]
+
+    def test_memory_cap(self):
+        cache = EmbeddingCache(max_memory_entries=2)
+        cache.put_many("m", ["a", "b", "c"], np.ones((3, 3), dtype=np.float32))
+
+        assert cache.get_many("m", ["a"]) == [None]
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_disk_cap_prunes_least_recently_used(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path), max_memory_entries=1, max_disk_entries=2)
+        cache.put_many("m", ["a", "b"], np.ones((2, 3), dtype=np.float32))
+        cache.get_many("m", ["a"])
+        cache.put_many("m", ["c"], np.ones((1, 3), dtype=np.float32))
+
+        stats = cache.get_stats()
+        assert stats['disk_entries'] == 2
+        assert stats['disk_evictions'] == 1
+
+    def test_unwritable_directory_falls_back_to_memory(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        cache = EmbeddingCache(str(blocker / "cache"))
+
+        cache.put_many("m", ["a"], np.ones((1, 3), dtype=np.float32))
+
+        assert cache.get_many("m", ["a"])[0] is not None
+        assert cache.get_stats()['persistent'] is False
+
+
+class TestCachedEncoding:
+    """Test EmbeddingModel.encode with a cache"""
+
+    def test_repeated_texts_encoded_once(self, cached_model):
+        first = cached_model.encode(["users", "orders", "users"])
+        second = cached_model.encode(["orders", "users"])
+
+        assert cached_model.model.encode.call_count == 1
+        assert cached_model.model.encode.call_args[0][0] == ["users", "orders"]
+        assert first.shape == (3, 3)
+        assert np.allclose(second, first[[1, 0]])
+
+    def test_only_misses_are_encoded(self, cached_model):
+        cached_model.encode(["users"])
+        cached_model.encode(["users", "products"])
+
+        assert cached_model.model.encode.call_args[0][0] == ["products"]
+
+    def test_cache_persists_across_models(self, cached_model, tmp_path):
+        cached_model.encode(["users"])
+        cached_model.cleanup()
+
+        restarted = EmbeddingModel(cache=EmbeddingCache(str(tmp_path)))
+        restarted.model = Mock()
+        restarted.initialized = True
+        result = restarted.encode(["users"])
+
+        restarted.model.encode.assert_not_called()
+        assert np.allclose(result, [[5.0, 1.0, 0.0]])
+
+    def test_mock_embeddings_are_not_cached(self, tmp_path):
+        embedding = EmbeddingModel(cache=EmbeddingCache(str(tmp_path)))
+        embedding.model = embedding._create_mock_model()
+        embedding.is_mock = True
+        embedding.initialized = True
+
+        embedding.encode(["users"])
+
+        assert embedding.cache_stats()['misses'] == 0
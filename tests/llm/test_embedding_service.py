@@ -0,0 +1,145 @@
+"""
+Tests for the micro-batching embedding service
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+import numpy as np
+
+from src.llm.embedding_service import EmbeddingService
+
+
+class RecordingModel:
+    """Encoder that records each forward pass"""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.calls = []
+        self.delay = delay
+        self.fail = fail
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise ValueError("model failure")
+        time.sleep(self.delay)
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def model():
+    return RecordingModel()
+
+
+def test_single_request(model):
+    service = EmbeddingService(model, max_wait_ms=1)
+
+    result = service.encode(["ab", "abc"])
+
+    assert result.tolist() == [[2.0, 1.0], [3.0, 1.0]]
+    service.close()
+
+
+def test_concurrent_requests_are_coalesced(model):
+    service = EmbeddingService(model, max_wait_ms=200)
+    results = {}
+
+    def worker(i):
+        results[i] = service.encode("x" * i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(model.calls) < 8
+    assert all(results[i][0, 0] == i for i in range(1, 9))
+    stats = service.get_stats()
+    assert stats['requests'] == 8
+    assert stats['average_batch_size'] > 1
+    service.close()
+
+
+def test_batch_size_cap(model):
+    service = EmbeddingService(model, max_batch_size=4, max_wait_ms=100)
+
+    futures = [service.submit([f"text {i}"]) for i in range(10)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert max(len(call) for call in model.calls) <= 4
+    assert service.get_stats()['max_batch_size'] <= 4
+    service.close()
+
+
+def test_duplicate_texts_encoded_once(model):
+    service = EmbeddingService(model, max_wait_ms=100)
+
+    futures = [service.submit(["same", "other"]), service.submit(["same"])]
+    results = [future.result(timeout=5) for future in futures]
+
+    assert sum(call.count("same") for call in model.calls) == 1
+    assert results[1].tolist() == [[4.0, 1.0]]
+    service.close()
+
+
+def test_errors_propagate_to_callers():
+    service = EmbeddingService(RecordingModel(fail=True), max_wait_ms=1)
+
+    with pytest.raises(ValueError, match="model failure"):
+        service.encode(["text"])
+    assert service.get_stats()['errors'] == 1
+    service.close()
+
+
+def test_wrong_row_count_fails_callers_not_worker(model):
+    broken = RecordingModel()
+    broken.encode = lambda texts, batch_size=32: np.zeros((1, 2), dtype=np.float32)
+    service = EmbeddingService(broken, max_wait_ms=1)
+
+    with pytest.raises(ValueError, match="1 vectors for 2 texts"):
+        service.encode(["a", "b"])
+
+    service.model = model
+    assert service.encode(["abc"]).tolist() == [[3.0, 1.0]]
+    service.close()
+
+
+def test_queue_depth_metrics():
+    service = EmbeddingService(RecordingModel(delay=0.05), max_batch_size=1, max_wait_ms=0)
+
+    futures = [service.submit([f"text {i}"]) for i in range(5)]
+    for future in futures:
+        future.result(timeout=5)
+
+    stats = service.get_stats()
+    assert stats['peak_queue_depth'] >= 2
+    assert stats['queue_depth'] == 0
+    service.close()
+
+
+def test_close_and_restart(model):
+    service = EmbeddingService(model, max_wait_ms=1)
+    service.encode(["a"])
+
+    service.close()
+    assert service.get_stats()['workers'] == 0
+
+    assert service.encode(["b"]).tolist() == [[1.0, 1.0]]
+    service.close()
+
+
+def test_encode_async(model):
+    service = EmbeddingService(model, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(service.encode_async("y" * i) for i in range(1, 4)))
+
+    results = asyncio.run(run())
+
+    assert [result[0, 0] for result in results] == [1.0, 2.0, 3.0]
+    assert len(model.calls) == 1
+    service.close()
@@ -305,7 +305,11 @@ class TestEmbeddings:
 
         assert len(result) == 2
         assert len(result[0]) == 3
-        initialized_manager.embedding_model.encode.assert_called_once_with(texts)
+        # Encoded in one batch by the shared embedding service
+        initialized_manager.embedding_model.encode.assert_called_once_with(
+            texts, batch_size=initialized_manager.embedding_service.max_batch_size
+        )
+        assert initialized_manager.embedding_service.stats.requests == 1
 
     def test_find_similar_queries_not_initialized(self):
         """Test similar query search requires initialization"""
@@ -331,6 +335,8 @@ class TestEmbeddings:
         assert len(result) == 2
         assert result[0][1] > result[1][1]  # Sorted by similarity
         initialized_manager.embedding_model.find_most_similar.assert_called_once()
+        _, kwargs = initialized_manager.embedding_model.find_most_similar.call_args
+        assert kwargs['encoder'] == initialized_manager.embedding_service.encode
 
 
 class TestQueryExplanation:
@@ -25,7 +25,9 @@ def mock_embedding():
     import numpy as np
     embedding = Mock()
     embedding.initialized = True
-    embedding.encode = Mock(return_value=np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]))
+    embedding.encode = Mock(
+        side_effect=lambda texts, **kwargs: np.array([[0.1, 0.2, 0.3]] * len(texts))
+    )
     embedding.find_most_similar = Mock(return_value=[
         ("SELECT * FROM users", 0.95),
         ("SELECT id FROM users", 0.85)
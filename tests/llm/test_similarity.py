@@ -0,0 +1,169 @@
+"""
+Tests for vectorized similarity ranking and candidate matrix caching
+"""
+
+import pytest
+from unittest.mock import Mock
+import numpy as np
+
+from src.llm.embeddings import EmbeddingModel
+from src.llm.similarity import CandidateMatrix, SimilarityEngine, normalize_rows, top_k_indices
+
+
+def text_vector(text):
+    """Deterministic embedding per text"""
+    rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+    return rng.standard_normal(16).astype(np.float32)
+
+
+def fake_encode(texts, batch_size=32, convert_to_numpy=True):
+    return np.vstack([text_vector(text) for text in texts])
+
+
+@pytest.fixture
+def model():
+    """Initialized embedding model with a deterministic encoder"""
+    embedding = EmbeddingModel()
+    embedding.model = Mock()
+    embedding.model.encode.side_effect = fake_encode
+    embedding.initialized = True
+    return embedding
+
+
+def loop_ranking(query, candidates, top_k):
+    """Reference implementation: per-candidate cosine similarity"""
+    q = text_vector(query)
+    scored = []
+    for text in candidates:
+        c = text_vector(text)
+        scored.append((text, float(np.dot(q, c) / (np.linalg.norm(q) * np.linalg.norm(c)))))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:top_k]
+
+
+class TestHelpers:
+    """Test normalization and top-k selection"""
+
+    def test_normalize_rows_keeps_zero_rows(self):
+        result = normalize_rows(np.array([[3.0, 4.0], [0.0, 0.0]]))
+
+        assert np.allclose(result, [[0.6, 0.8], [0.0, 0.0]])
+
+    def test_top_k_indices(self):
+        scores = np.array([0.1, 0.9, 0.5, 0.7])
+
+        assert top_k_indices(scores, 2).tolist() == [1, 3]
+        assert top_k_indices(scores, 10).tolist() == [1, 3, 2, 0]
+        assert top_k_indices(scores, 0).tolist() == []
+
+    def test_candidate_matrix_grows(self):
+        matrix = CandidateMatrix(2, capacity=1)
+        matrix.extend(["a"], np.array([[1.0, 0.0]]))
+        matrix.extend(["b", "c"], np.array([[0.0, 2.0], [1.0, 1.0]]))
+
+        assert matrix.texts == ["a", "b", "c"]
+        assert matrix.rank(np.array([0.0, 1.0]), 1)[0][0] == "b"
+
+    def test_stale_extend_is_skipped(self):
+        matrix = CandidateMatrix(2)
+        matrix.extend(["a"], np.array([[1.0, 0.0]]), start=0)
+        matrix.extend(["a"], np.array([[1.0, 0.0]]), start=0)
+
+        assert matrix.texts == ["a"]
+
+    def test_retarget_reuses_rows_in_place(self):
+        matrix = CandidateMatrix(2)
+        matrix.extend(["a", "b", "c"], np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]))
+        buffer = matrix._buffer
+
+        missing = matrix.retarget(["c", "d", "a"])
+        matrix.extend(missing, np.array([[-1.0, 0.0]]), start=2)
+
+        assert missing == ["d"]
+        assert matrix._buffer is buffer
+        assert matrix._size == 4
+        assert matrix.texts == ["c", "a", "d"]
+        assert [text for text, _ in matrix.rank(np.array([1.0, 0.0]), 3)] == ["a", "c", "d"]
+        assert np.allclose(matrix.matrix[2], [-1.0, 0.0])
+
+    def test_rotation_compacts_dropped_rows(self):
+        rng = np.random.default_rng(0)
+        texts = [f"t{i}" for i in range(10)]
+        matrix = CandidateMatrix(4)
+        matrix.extend(texts, rng.standard_normal((10, 4)))
+
+        for i in range(10, 500):
+            texts = texts[1:] + [f"t{i}"]
+            missing = matrix.retarget(texts)
+            matrix.extend(missing, rng.standard_normal((1, 4)), start=9)
+
+        assert matrix.texts == texts
+        assert matrix._size <= 2 * len(texts) + 64 + 1
+        assert len(matrix.rank(rng.standard_normal(4), 20)) == 10
+
+
+class TestCachedRanking:
+    """Test find_most_similar with cached candidate matrices"""
+
+    def test_matches_loop_ranking(self, model):
+        candidates = [f"query {i}" for i in range(200)]
+
+        result = model.find_most_similar("select users", candidates, top_k=5)
+
+        expected = loop_ranking("select users", candidates, 5)
+        assert [text for text, _ in result] == [text for text, _ in expected]
+        assert np.allclose([s for _, s in result], [s for _, s in expected], atol=1e-5)
+
+    def test_repeated_candidates_only_encode_query(self, model):
+        candidates = ["a", "b", "c"]
+        model.find_most_similar("q1", candidates)
+
+        model.find_most_similar("q2", candidates)
+
+        assert model.model.encode.call_args[0][0] == ["q2"]
+
+    def test_named_set_encodes_only_new_entries(self, model):
+        history = ["a", "b"]
+        model.find_most_similar("q", history, candidate_set="history")
+
+        history.append("c")
+        result = model.find_most_similar("q", history, top_k=10, candidate_set="history")
+
+        assert model.model.encode.call_args[0][0] == ["q", "c"]
+        assert sorted(text for text, _ in result) == ["a", "b", "c"]
+
+    def test_rotated_set_encodes_only_new_entries(self, model):
+        model.find_most_similar("q", ["a", "b"], candidate_set="history")
+
+        result = model.find_most_similar("q", ["b", "c"], top_k=10, candidate_set="history")
+
+        assert model.model.encode.call_args[0][0] == ["q", "c"]
+        assert sorted(text for text, _ in result) == ["b", "c"]
+
+    def test_bounded_history_rotation_matches_loop_ranking(self, model):
+        history = [f"query {i}" for i in range(100)]
+        model.find_most_similar("q", history, candidate_set="history")
+
+        for i in range(100, 110):
+            history = history[1:] + [f"query {i}"]
+            result = model.find_most_similar("select users", history, candidate_set="history")
+
+            assert model.model.encode.call_args[0][0] == ["select users", f"query {i}"]
+        expected = loop_ranking("select users", history, 5)
+        assert [text for text, _ in result] == [text for text, _ in expected]
+
+    def test_reordered_set_reuses_rows(self, model):
+        model.find_most_similar("q", ["a", "b", "c"], candidate_set="history")
+
+        result = model.find_most_similar("q", ["c", "d", "a"], top_k=10, candidate_set="history")
+
+        assert model.model.encode.call_args[0][0] == ["q", "d"]
+        assert sorted(text for text, _ in result) == ["a", "c", "d"]
+
+    def test_engine_evicts_least_recently_used(self):
+        engine = SimilarityEngine(max_candidate_sets=1)
+        engine.store(["a"], CandidateMatrix(2))
+        engine.store(["b"], CandidateMatrix(2))
+
+        assert engine.lookup(["a"])[0] is None
+        assert engine.lookup(["b"])[0] is not None
@@ -6,6 +6,7 @@ Measures:
 - TTL expiration overhead
 - Compression performance
 - Pattern invalidation speed
+- Throughput scaling of the sharded cache with concurrency
 """
 
 import unittest
@@ -332,6 +333,66 @@ class BenchmarkCacheStatistics(unittest.TestCase):
         self.assertLess(stats_time, 100.0)
 
 
+class BenchmarkShardedQueryCache(unittest.TestCase):
+    """Benchmark throughput of the sharded cache under concurrency."""
+
+    def run_workers(self, cache, threads, ops_per_thread=5000, keys=1000):
+        """Run a 90% read / 10% write mix; returns operations per second."""
+        import threading
+
+        for i in range(keys):
+            cache.set(f"query_{i}", {"result": i})
+
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            barrier.wait()
+            for _ in range(ops_per_thread):
+                key = f"query_{rng.randrange(keys)}"
+                if rng.random() < 0.9:
+                    cache.get(key)
+                else:
+                    cache.set(key, {"result": key})
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for t in workers:
+            t.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        return threads * ops_per_thread / elapsed
+
+    def test_throughput_scaling(self):
+        """Compare one lock (1 shard) with 16 shards as threads increase."""
+        from src.performance.sharded_cache import ShardedQueryCache
+
+        print(f"\n=== Sharded Cache Throughput (90% GET / 10% SET) ===")
+        print(f"{'threads':>8} {'1 shard ops/s':>15} {'contention':>11} "
+              f"{'16 shards ops/s':>16} {'contention':>11}")
+
+        results = {}
+        for threads in (1, 2, 4, 8, 16):
+            row = []
+            for shards in (1, 16):
+                cache = ShardedQueryCache(shards=shards, config={'max_size': 10000})
+                ops = self.run_workers(cache, threads)
+                stats = cache.get_statistics()
+                row.append((ops, stats['lock_contention_rate']))
+            results[threads] = row
+            (single_ops, single_rate), (sharded_ops, sharded_rate) = row
+            print(f"{threads:>8} {single_ops:>15,.0f} {single_rate:>10.2%} "
+                  f"{sharded_ops:>16,.0f} {sharded_rate:>10.2%}")
+
+        # With the GIL throughput stays roughly flat as threads are added;
+        # free-threaded builds scale with the shard count
+        (single_ops, _), (sharded_ops, _) = results[16]
+        self.assertGreater(sharded_ops, 0.5 * single_ops)
+
+
 if __name__ == "__main__":
     # Run benchmarks
     suite = unittest.TestLoader().loadTestsFromModule(__import__(__name__))
@@ -0,0 +1,103 @@
+"""Performance benchmarks for multi-query vector search.
+
+Measures:
+- Queries per second of search_many versus a search_similar loop
+- Throughput scaling with batch size
+- Batched search with per-query filters
+"""
+
+import unittest
+import time
+
+import numpy as np
+
+
+class BenchmarkVectorSearch(unittest.TestCase):
+    """Benchmark VectorDatabase.search_many throughput."""
+
+    def setUp(self):
+        """Set up benchmark fixtures."""
+        from src.vector.store import VectorDatabase
+
+        self.dimension = 384
+        self.n_vectors = 20000
+        self.batch_sizes = [1, 8, 64, 256]
+        self.k = 10
+
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((self.n_vectors, self.dimension)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        self.db = VectorDatabase(
+            dimension=self.dimension,
+            index_type='flat',
+            partition_keys=('connection_id',)
+        )
+        self.db.add_objects(
+            [f'obj_{i}' for i in range(self.n_vectors)],
+            vectors,
+            'column',
+            [{'connection_id': f'db{i % 4}'} for i in range(self.n_vectors)]
+        )
+
+        queries = rng.standard_normal((max(self.batch_sizes), self.dimension)).astype(np.float32)
+        self.queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+    def measure_qps(self, search, n_queries, repeats=3):
+        """Best queries per second over several runs."""
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            search()
+            best = min(best, time.perf_counter() - start)
+        return n_queries / best
+
+    def test_batch_throughput_scaling(self):
+        """Benchmark search_many against a search_similar loop per batch size."""
+        print(f"\n=== Multi-Query Search Throughput ({self.n_vectors} vectors) ===")
+        print(f"{'batch':>6} {'loop q/s':>12} {'batch q/s':>12} {'speedup':>8}")
+
+        speedups = {}
+        for batch_size in self.batch_sizes:
+            queries = self.queries[:batch_size]
+
+            loop_qps = self.measure_qps(
+                lambda: [self.db.search_similar(q, k=self.k, threshold=0.0) for q in queries],
+                batch_size
+            )
+            batch_qps = self.measure_qps(
+                lambda: self.db.search_many(queries, k=self.k, threshold=0.0),
+                batch_size
+            )
+            speedups[batch_size] = batch_qps / loop_qps
+            print(f"{batch_size:>6} {loop_qps:>12.0f} {batch_qps:>12.0f} {speedups[batch_size]:>7.1f}x")
+
+        # One FAISS call per batch should beat per-query calls at scale
+        self.assertGreater(speedups[max(self.batch_sizes)], 1.0)
+
+    def test_per_query_filter_throughput(self):
+        """Benchmark batched search with a filter per query."""
+        batch_size = max(self.batch_sizes)
+        filters = [{'connection_id': f'db{i % 4}'} for i in range(batch_size)]
+
+        loop_qps = self.measure_qps(
+            lambda: [
+                self.db.search_similar(q, k=self.k, threshold=0.0, filters=f)
+                for q, f in zip(self.queries, filters)
+            ],
+            batch_size
+        )
+        batch_qps = self.measure_qps(
+            lambda: self.db.search_many(self.queries, k=self.k, threshold=0.0, filters=filters),
+            batch_size
+        )
+
+        print(f"\n=== Filtered Multi-Query Search ({batch_size} queries, 4 filters) ===")
+        print(f"Loop: {loop_qps:.0f} q/s")
+        print(f"Batch: {batch_qps:.0f} q/s ({batch_qps / loop_qps:.1f}x)")
+
+        self.assertGreater(batch_qps, loop_qps)
+
+
+if __name__ == "__main__":
+    unittest.main()
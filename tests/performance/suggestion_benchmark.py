@@ -0,0 +1,376 @@
+"""Suggestion-latency benchmark harness.
+
+Replays typing traces against IntelligentCompleter and
+ContextAwareSuggestionEngine over synthetic schemas and reports p50/p95/p99
+latency per suggestion source:
+
+- completer.pattern / .syntax / .history / .vector: each completion source
+  called on every keystroke prefix
+- completer.embed: query embedding (hashing embedder, no model download)
+- engine.fast / .vector: time from keystroke to each streamed tier, with
+  keystrokes submitted at the trace's typing speed so superseded work is
+  cancelled as in the shell
+
+Results are compared against stored baselines; a source regresses when its
+p95 exceeds the baseline by more than the tolerance.
+
+Usage (from the repository root):
+    python tests/performance/suggestion_benchmark.py --sizes 100 10000 100000
+    python tests/performance/suggestion_benchmark.py --update-baseline
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+import time
+
+import numpy as np
+
+PERFORMANCE_DIR = Path(__file__).parent
+TRACES_FILE = PERFORMANCE_DIR / 'traces' / 'typing_traces.json'
+BASELINE_FILE = PERFORMANCE_DIR / 'baselines' / 'suggestion_latency.json'
+
+DEFAULT_SIZES = (100, 10_000, 100_000)
+PERCENTILES = (50, 95, 99)
+
+DOMAINS = [
+    'sales', 'billing', 'crm', 'hr', 'inventory', 'shipping',
+    'support', 'marketing', 'finance', 'analytics', 'auth', 'catalog'
+]
+ENTITIES = [
+    'customers', 'orders', 'invoices', 'payments', 'users', 'products',
+    'events', 'accounts', 'sessions', 'items', 'refunds', 'addresses',
+    'contracts', 'tickets', 'campaigns', 'ledgers', 'reports', 'roles',
+    'vendors', 'warehouses'
+]
+
+
+@dataclass
+class Trace:
+    """Typing trace: final text and the delay before each keystroke."""
+    name: str
+    text: str
+    delays_ms: List[int]
+
+    def keystrokes(self) -> List[Tuple[str, float]]:
+        """(input after the keystroke, seconds since the previous keystroke)."""
+        return [
+            (self.text[:i + 1], delay / 1000)
+            for i, delay in enumerate(self.delays_ms)
+        ]
+
+
+@dataclass
+class LatencyReport:
+    """Latency samples (ms) per source for one schema size."""
+    size: int
+    samples: Dict[str, List[float]] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, source: str, milliseconds: float) -> None:
+        """Record one sample."""
+        self.samples.setdefault(source, []).append(milliseconds)
+
+    def percentiles(self) -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99 and sample count per source."""
+        summary = {}
+        for source, values in sorted(self.samples.items()):
+            points = np.percentile(values, PERCENTILES)
+            summary[source] = {'n': len(values)}
+            summary[source].update({
+                f'p{p}': round(float(value), 4) for p, value in zip(PERCENTILES, points)
+            })
+        return summary
+
+
+class HashingEmbedder:
+    """Deterministic character-trigram embedder standing in for the model."""
+
+    def __init__(self, dimension: int = 384) -> None:
+        self.dimension = dimension
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        padded = f"  {text.lower()} "
+        for i in range(len(padded) - 2):
+            digest = hashlib.blake2b(padded[i:i + 3].encode(), digest_size=4).digest()
+            vector[int.from_bytes(digest, 'little') % self.dimension] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def encode(self, texts: Any, **kwargs: Any) -> np.ndarray:
+        """Encode a text or a list of texts."""
+        if isinstance(texts, str):
+            return self._encode_one(texts)
+        return np.vstack([self._encode_one(text) for text in texts])
+
+
+def table_name(i: int) -> str:
+    """Name of the i-th synthetic table; the first 240 have no suffix."""
+    name = f"{DOMAINS[i % len(DOMAINS)]}_{ENTITIES[(i // len(DOMAINS)) % len(ENTITIES)]}"
+    cycle = i // (len(DOMAINS) * len(ENTITIES))
+    return f"{name}_{cycle}" if cycle else name
+
+
+def build_schema(n_tables: int) -> List[Dict[str, Any]]:
+    """Synthetic tables with a handful of columns each."""
+    tables = []
+    for i in range(n_tables):
+        name = table_name(i)
+        entity = name.split('_')[1]
+        tables.append({
+            'name': name,
+            'description': f"{name.replace('_', ' ')} records",
+            'columns': ['id', 'status', 'created_at', 'updated_at', f"{entity.rstrip('s')}_name"]
+        })
+    return tables
+
+
+def load_traces(path: Path = TRACES_FILE) -> List[Trace]:
+    """Load typing traces."""
+    with open(path) as f:
+        return [Trace(**trace) for trace in json.load(f)['traces']]
+
+
+def build_completer(schema: List[Dict[str, Any]], embedder: HashingEmbedder, history_size: int = 5000):
+    """IntelligentCompleter over the schema's tables, with seeded history."""
+    from src.vector.autocomplete import IntelligentCompleter
+    from src.vector.store import VectorDatabase
+
+    db = VectorDatabase(dimension=embedder.dimension, background_retrain=False)
+    names = [table['name'] for table in schema]
+    db.add_objects(
+        names,
+        embedder.encode([table['description'] for table in schema]),
+        'table',
+        [{'name': table['name'], 'description': table['description']} for table in schema]
+    )
+
+    completer = IntelligentCompleter(db, max_history=history_size)
+    rng = np.random.default_rng(0)
+    for i in rng.integers(0, len(names), size=history_size):
+        completer.add_to_history(f"SELECT * FROM {names[i]} WHERE id = {i}")
+    completer.register_pattern('COUNT', ['COUNT(*)', 'COUNT(DISTINCT '])
+    completer.register_pattern('CURRENT_TIMESTAMP', ['CURRENT_TIMESTAMP'])
+    return completer
+
+
+def _timed(report: LatencyReport, source: str, func, *args) -> Any:
+    start = time.perf_counter()
+    result = func(*args)
+    report.add(source, (time.perf_counter() - start) * 1000)
+    return result
+
+
+def bench_completer(report: LatencyReport, completer, embedder: HashingEmbedder, traces: Sequence[Trace]) -> None:
+    """Time each completion source on every keystroke prefix."""
+    for trace in traces:
+        for query, _ in trace.keystrokes():
+            context: Dict[str, Any] = {}
+            _timed(report, 'completer.pattern', completer._get_pattern_completions, query, context)
+            _timed(report, 'completer.syntax', completer._get_syntax_completions, query, context)
+            _timed(report, 'completer.history', completer._get_history_completions, query)
+            vector = _timed(report, 'completer.embed', embedder.encode, query)
+            _timed(report, 'completer.vector', completer._get_vector_completions, vector, context, 10)
+
+
+async def bench_engine(
+    report: LatencyReport,
+    completer,
+    embedder: HashingEmbedder,
+    schema: List[Dict[str, Any]],
+    traces: Sequence[Trace],
+    time_scale: float = 1.0
+) -> None:
+    """Replay traces through the keystroke pipeline at typing speed.
+
+    Args:
+        report: Report receiving engine.<tier> samples and counters
+        completer: Completer used by the engine
+        embedder: Embedding model used by the engine
+        schema: Tables exposed as database objects
+        traces: Typing traces
+        time_scale: Multiplier for inter-key delays (0.5 types twice as fast)
+    """
+    from src.ui.engines.context_suggestion import ContextAwareSuggestionEngine
+
+    engine = ContextAwareSuggestionEngine(completer=completer, embedding_model=embedder)
+    engine.set_database_objects(
+        [table['name'] for table in schema],
+        {table['name']: table['columns'] for table in schema}
+    )
+
+    def record(update) -> None:
+        report.add(f'engine.{update.tier}', update.elapsed_ms)
+
+    for trace in traces:
+        task: Optional[asyncio.Task] = None
+        for query, delay in trace.keystrokes():
+            await asyncio.sleep(delay * time_scale)
+            task = engine.submit(query, record)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    for name in ('keystrokes', 'superseded', 'reused_tiers', 'timeouts', 'over_budget'):
+        report.counters[f'engine.{name}'] = report.counters.get(f'engine.{name}', 0) + engine.pipeline_stats[name]
+
+
+def run(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    traces: Optional[Sequence[Trace]] = None,
+    time_scale: float = 1.0,
+    engine: bool = True
+) -> Dict[int, LatencyReport]:
+    """Benchmark every schema size.
+
+    Args:
+        sizes: Numbers of tables
+        traces: Typing traces (default: the recorded traces)
+        time_scale: Multiplier for inter-key delays in the engine replay
+        engine: Also replay traces through ContextAwareSuggestionEngine
+
+    Returns:
+        Report per size
+    """
+    traces = list(traces) if traces is not None else load_traces()
+    embedder = HashingEmbedder()
+    reports = {}
+    for size in sizes:
+        report = LatencyReport(size=size)
+        schema = build_schema(size)
+        completer = build_completer(schema, embedder)
+        bench_completer(report, completer, embedder, traces)
+        if engine:
+            asyncio.run(bench_engine(report, completer, embedder, schema, traces, time_scale))
+        reports[size] = report
+    return reports
+
+
+def compare(
+    current: Dict[int, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Any],
+    tolerance: Optional[float] = None,
+    floor_ms: Optional[float] = None
+) -> List[str]:
+    """Regressions of current percentiles against a baseline.
+
+    A source regresses when its p95 exceeds the baseline p95 by more than
+    tolerance (relative) and floor_ms (absolute, to ignore timer noise).
+
+    Args:
+        current: Percentiles per size, as from LatencyReport.percentiles
+        baseline: Stored baseline document
+        tolerance: Allowed relative slowdown (default: the baseline's)
+        floor_ms: Allowed absolute slowdown (default: the baseline's)
+
+    Returns:
+        Human-readable regression messages; empty if none
+    """
+    tolerance = baseline.get('tolerance', 0.25) if tolerance is None else tolerance
+    floor_ms = baseline.get('floor_ms', 1.0) if floor_ms is None else floor_ms
+
+    regressions = []
+    for size, sources in sorted(current.items()):
+        stored = baseline.get('sizes', {}).get(str(size), {})
+        for source, stats in sources.items():
+            if source not in stored:
+                continue
+            before, after = stored[source]['p95'], stats['p95']
+            if after > before * (1 + tolerance) and after - before > floor_ms:
+                regressions.append(
+                    f"{size} tables, {source}: p95 {after:.2f}ms vs baseline {before:.2f}ms "
+                    f"(+{(after / before - 1) * 100 if before else float('inf'):.0f}%)"
+                )
+    return regressions
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> Dict[str, Any]:
+    """Load stored baselines; empty if none were saved."""
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(
+    reports: Dict[int, LatencyReport],
+    path: Path = BASELINE_FILE,
+    tolerance: float = 0.25,
+    floor_ms: float = 1.0
+) -> None:
+    """Store current percentiles as the baseline, keeping other sizes."""
+    baseline = load_baseline(path)
+    baseline['tolerance'] = tolerance
+    baseline['floor_ms'] = floor_ms
+    sizes = baseline.setdefault('sizes', {})
+    for size, report in reports.items():
+        sizes[str(size)] = report.percentiles()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def format_report(report: LatencyReport) -> str:
+    """Percentile table of one report."""
+    lines = [
+        f"=== Suggestion latency: {report.size} tables ===",
+        f"{'source':<20} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    ]
+    for source, stats in report.percentiles().items():
+        lines.append(
+            f"{source:<20} {stats['n']:>6} {stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['p99']:>9.3f}"
+        )
+    for name, value in sorted(report.counters.items()):
+        lines.append(f"{name:<20} {value:>6}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmark; exit status 1 on regressions."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--time-scale', type=float, default=1.0,
+                        help='multiplier for recorded inter-key delays')
+    parser.add_argument('--no-engine', action='store_true',
+                        help='only benchmark IntelligentCompleter sources')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    reports = run(args.sizes, time_scale=args.time_scale, engine=not args.no_engine)
+    for report in reports.values():
+        print(format_report(report))
+        print()
+
+    if args.update_baseline:
+        save_baseline(reports, args.baseline, tolerance=args.tolerance or 0.25)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print("No baseline stored; run with --update-baseline")
+        return 0
+
+    regressions = compare(
+        {size: report.percentiles() for size, report in reports.items()},
+        baseline,
+        tolerance=args.tolerance
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, str(PERFORMANCE_DIR.parent.parent))
+    sys.exit(main())
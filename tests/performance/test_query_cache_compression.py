@@ -0,0 +1,124 @@
+"""Tests for QueryCache compression."""
+
+import os
+
+import pytest
+
+from src.performance.cache import QueryCache, estimate_size
+from src.performance.compression import CODECS, choose_codec, codec_for_tag
+
+
+def analytics_rows(count):
+    regions = ('north', 'south', 'east', 'west')
+    return [
+        {
+            'order_id': i,
+            'region': f"region_{regions[i % 4]}",
+            'product': f"product_{i % 50:04d}",
+            'status': 'shipped' if i % 3 else 'pending',
+            'amount': round(i * 1.25, 2)
+        }
+        for i in range(count)
+    ]
+
+
+class TestCodecs:
+    """Test codec selection."""
+
+    def test_auto_prefers_speed_for_small_and_ratio_for_large(self):
+        small = choose_codec(1000, dense_bytes=10_000)
+        large = choose_codec(100_000, dense_bytes=10_000)
+
+        assert small.name in ('lz4', 'zstd-fast', 'zlib-fast')
+        assert large.name in ('zstd', 'zlib', 'lz4')
+
+    def test_every_codec_round_trips(self):
+        data = b"SELECT * FROM orders " * 1000
+        for codec in CODECS.values():
+            assert codec_for_tag(codec.tag).decompress(codec.compress(data)) == data
+
+
+class TestQueryCacheCompression:
+    """Test transparent compression of cached results."""
+
+    def test_large_result_compressed_transparently(self):
+        cache = QueryCache(compression=True)
+        rows = analytics_rows(2000)
+        cache.set("q", rows)
+
+        entry = cache._cache["q"]
+        assert entry.codec is not None
+        assert entry.size_bytes < estimate_size(rows) / 3
+        assert cache.get("q") == rows
+
+    def test_small_result_stored_as_is(self):
+        cache = QueryCache(compression=True)
+        rows = analytics_rows(2)
+        cache.set("q", rows)
+
+        assert cache._cache["q"].codec is None
+        assert cache.get("q") is rows
+
+    def test_incompressible_result_skipped(self):
+        cache = QueryCache(compression=True, config={'compression_threshold': 1024})
+        cache.set("q", os.urandom(64 * 1024))
+
+        assert cache._cache["q"].codec is None
+        assert cache.compression_stats.skipped == 1
+
+    def test_unpicklable_result_stored_as_is(self):
+        cache = QueryCache(compression=True, config={'compression_threshold': 0})
+        value = [lambda: None] * 10
+
+        cache.set("q", value)
+
+        assert cache.get("q") is value
+
+    def test_memory_cap_counts_compressed_bytes(self):
+        rows = analytics_rows(1000)
+        limit_mb = 4 * estimate_size(rows) / (1024 * 1024)
+        plain = QueryCache(config={'max_memory_mb': limit_mb})
+        compressed = QueryCache(compression=True, config={'max_memory_mb': limit_mb})
+
+        for i in range(40):
+            plain.set(f"q{i}", analytics_rows(1000))
+            compressed.set(f"q{i}", analytics_rows(1000))
+
+        assert len(plain._cache) <= 4
+        assert len(compressed._cache) >= 3 * len(plain._cache)
+        assert compressed._total_size_bytes <= compressed.max_bytes
+
+    def test_statistics_report_ratio_and_cpu(self):
+        cache = QueryCache(compression=True)
+        cache.set("q", analytics_rows(2000))
+        cache.get("q")
+
+        stats = cache.get_statistics()['compression']
+        assert stats['compressed_entries'] == 1
+        assert stats['decompressions'] == 1
+        assert stats['compression_ratio'] > 3
+        assert stats['compress_ms'] > 0
+        assert stats['decompress_ms'] > 0
+
+    def test_explicit_codec(self):
+        cache = QueryCache(compression=True, config={'compression_codec': 'zlib'})
+        cache.set("q", analytics_rows(2000))
+
+        assert cache._cache["q"].codec == 'zlib'
+
+    def test_unavailable_codec_rejected(self):
+        with pytest.raises(ValueError):
+            QueryCache(compression=True, config={'compression_codec': 'brotli'})
+
+    def test_shared_tier_payload_compressed(self, tmp_path):
+        config = {'cache_dir': str(tmp_path)}
+        writer = QueryCache(backend="file", compression=True, config=config)
+        reader = QueryCache(backend="file", compression=True, config=config)
+        rows = analytics_rows(2000)
+
+        writer.set("q", rows)
+
+        payload = writer._l2.get("q")
+        assert payload[0] != 0
+        assert len(payload) < estimate_size(rows) / 3
+        assert reader.get("q") == rows
@@ -0,0 +1,234 @@
+"""Tests for table-dependency invalidation of QueryCache."""
+
+import json
+
+import pytest
+
+from src.database.clients.base import BaseDatabaseClient, DatabaseConfig
+from src.performance.cache import QueryCache
+from src.performance.sql_tables import normalize_table, referenced_tables, written_tables
+
+
+class TestSqlTables:
+    """Test table extraction from SQL."""
+
+    @pytest.mark.parametrize("sql, tables", [
+        ("SELECT * FROM orders", {"orders"}),
+        ("SELECT o.id FROM public.orders o JOIN \"Customers\" c ON c.id = o.cid", {"orders", "customers"}),
+        ("SELECT * FROM a, b AS bb, c WHERE a.x = 'FROM d'", {"a", "b", "c"}),
+        ("WITH recent AS (SELECT * FROM orders) SELECT * FROM recent JOIN items USING (id)",
+         {"orders", "items"}),
+        ("SELECT * FROM generate_series(1, 10) g, users", {"users"}),
+        ("SELECT * FROM a STRAIGHT_JOIN b", {"a", "b"}),
+        ("SELECT * FROM a AS t(x), b", {"a", "b"}),
+        ("SELECT * FROM (SELECT * FROM a) s, b", {"a", "b"}),
+        ("SELECT EXTRACT(year FROM d), SUBSTRING(n FROM 2) FROM a WHERE x IS DISTINCT FROM y", {"a", "d"}),
+        ("SELECT 1", set()),
+    ])
+    def test_referenced_tables(self, sql, tables):
+        assert referenced_tables(sql) == tables
+
+    @pytest.mark.parametrize("sql", [
+        "SELECT * FROM orders FOR UPDATE; DELETE FROM orders",
+        "CALL refresh_everything()",
+        "user_1",
+        "SELECT * FROM a TABLESAMPLE BERNOULLI (10), b",
+        "SELECT * FROM a WITH (NOLOCK), b",
+    ])
+    def test_referenced_tables_unknown(self, sql):
+        assert referenced_tables(sql) is None
+
+    @pytest.mark.parametrize("sql, tables", [
+        ("INSERT INTO orders (a, b) SELECT a, b FROM staging", {"orders"}),
+        ("UPDATE sales.orders SET total = 0 WHERE id = 1", {"orders"}),
+        ("DELETE FROM orders WHERE id = 1 RETURNING *", {"orders"}),
+        ("INSERT INTO t (id) VALUES (1) ON CONFLICT (id) DO UPDATE SET id = 2", {"t"}),
+        ("MERGE INTO target USING source ON target.id = source.id "
+         "WHEN MATCHED THEN UPDATE SET v = 1", {"target"}),
+        ("TRUNCATE a, b", {"a", "b"}),
+        ("DROP TABLE IF EXISTS a, b CASCADE", {"a", "b"}),
+        ("UPDATE a, b SET a.x = 1, b.x = 1", {"a", "b"}),
+        ("UPDATE a JOIN b ON a.id = b.id SET b.x = 1", {"a", "b"}),
+        ("UPDATE orders SET total = 0 FROM items WHERE items.id = orders.id", {"orders"}),
+        ("DELETE a, b FROM a JOIN b ON a.id = b.id", {"a", "b"}),
+        ("DELETE FROM a USING b WHERE a.id = b.id", {"a"}),
+        ("CREATE TABLE c (id int REFERENCES p ON DELETE CASCADE)", {"c"}),
+        ("ALTER TABLE users ADD COLUMN age int", {"users"}),
+        ("CREATE INDEX idx ON users (email)", {"users"}),
+        ("SELECT * FROM users", set()),
+        ("BEGIN; UPDATE a SET x = 1; UPDATE b SET x = 1; COMMIT", {"a", "b"}),
+    ])
+    def test_written_tables(self, sql, tables):
+        assert written_tables(sql) == tables
+
+    def test_written_tables_unknown(self):
+        assert written_tables("CALL archive_orders()") is None
+        assert written_tables("EXEC sp_cleanup") is None
+        assert written_tables("UPDATE a TABLESAMPLE SYSTEM (1) SET x = 1") is None
+        assert written_tables("DELETE a, b USING a") is None
+
+    def test_normalize_table(self):
+        assert normalize_table('"Sales"."Orders"') == "orders"
+        assert normalize_table("ORDERS") == "orders"
+
+
+class TestTableInvalidation:
+    """Test invalidation of exactly the affected entries."""
+
+    def test_write_invalidates_only_readers_of_table(self):
+        cache = QueryCache()
+        cache.set("SELECT * FROM orders", [1])
+        cache.set("SELECT * FROM orders JOIN users ON users.id = orders.uid", [2])
+        cache.set("SELECT * FROM products", [3])
+
+        assert cache.invalidate_write("UPDATE orders SET total = 0") == 2
+
+        assert cache.get("SELECT * FROM orders") is None
+        assert cache.get("SELECT * FROM orders JOIN users ON users.id = orders.uid") is None
+        assert cache.get("SELECT * FROM products") == [3]
+
+    @pytest.mark.parametrize("read, write", [
+        ("SELECT * FROM b", "DROP TABLE IF EXISTS a, b"),
+        ("SELECT * FROM b", "UPDATE a, b SET b.x = 1"),
+        ("SELECT * FROM b", "UPDATE a JOIN b ON a.id = b.id SET b.x = 1"),
+        ("SELECT * FROM b", "DELETE a, b FROM a JOIN b ON a.id = b.id"),
+        ("SELECT * FROM a STRAIGHT_JOIN b", "UPDATE b SET x = 1"),
+        ("SELECT * FROM a AS t(x), b", "UPDATE b SET x = 1"),
+        ("SELECT * FROM a TABLESAMPLE BERNOULLI (10), b", "UPDATE b SET x = 1"),
+    ])
+    def test_write_to_any_listed_table_invalidates(self, read, write):
+        cache = QueryCache()
+        cache.set(read, [1])
+
+        cache.invalidate_write(write)
+
+        assert cache.get(read) is None
+
+    def test_read_only_statement_invalidates_nothing(self):
+        cache = QueryCache()
+        cache.set("SELECT * FROM orders", [1])
+
+        assert cache.invalidate_write("SELECT * FROM orders") == 0
+        assert cache.get("SELECT * FROM orders") == [1]
+
+    def test_unknown_dependencies_invalidated_by_any_write(self):
+        cache = QueryCache()
+        cache.set("report:daily", [1])
+        cache.set("SELECT * FROM products", [2])
+
+        cache.invalidate_tables(["orders"])
+
+        assert cache.get("report:daily") is None
+        assert cache.get("SELECT * FROM products") == [2]
+
+    def test_explicit_tables_override_parsing(self):
+        cache = QueryCache()
+        cache.set("report:daily", [1], tables=["public.Orders"])
+        cache.set("report:users", [2], tables=["users"])
+
+        cache.invalidate_tables(["ORDERS"])
+
+        assert cache.get("report:daily") is None
+        assert cache.get("report:users") == [2]
+
+    def test_unknown_write_invalidates_everything(self):
+        cache = QueryCache()
+        cache.set("SELECT * FROM orders", [1])
+        cache.set("SELECT * FROM products", [2])
+
+        assert cache.invalidate_write("CALL archive_orders()") == 2
+        assert len(cache._cache) == 0
+
+    def test_index_follows_removals(self):
+        cache = QueryCache(config={'max_size': 2})
+        for i in range(5):
+            cache.set(f"SELECT * FROM t{i}", [i])
+        cache.invalidate("SELECT * FROM t4")
+
+        assert set(cache._table_index) == {"t3"}
+        stats = cache.get_statistics()
+        assert stats['tracked_tables'] == 1
+        assert stats['untracked_entries'] == 0
+
+    def test_replacing_entry_reindexes(self):
+        cache = QueryCache()
+        cache.set("q", [1], tables=["orders"])
+        cache.set("q", [2], tables=["users"])
+
+        cache.invalidate_tables(["orders"])
+
+        assert cache.get("q") == [2]
+
+    @pytest.mark.asyncio
+    async def test_change_notification(self):
+        cache = QueryCache()
+        cache.set("SELECT * FROM orders", [1])
+        cache.set("SELECT * FROM users", [2])
+        cache.set("SELECT * FROM products", [3])
+
+        await cache.handle_change_notification("table_changes", "orders")
+        await cache.handle_change_notification("table_changes", json.dumps({"tables": ["users"]}))
+
+        assert cache.get("SELECT * FROM orders") is None
+        assert cache.get("SELECT * FROM users") is None
+        assert cache.get("SELECT * FROM products") == [3]
+
+        await cache.handle_change_notification("table_changes", "")
+        assert cache.get("SELECT * FROM products") is None
+
+    def test_shared_tier_invalidated_by_table(self, tmp_path):
+        config = {'cache_dir': str(tmp_path)}
+        first = QueryCache(backend="file", config=config)
+        second = QueryCache(backend="file", config=config)
+        first.set("SELECT * FROM orders", [1])
+        first.set("SELECT * FROM products", [2])
+        assert second.get("SELECT * FROM orders") == [1]
+
+        first.invalidate_write("DELETE FROM orders")
+
+        assert second.get("SELECT * FROM orders") is None
+        assert second.get("SELECT * FROM products") == [2]
+        assert first._l2.get("SELECT * FROM orders") is None
+
+        third = QueryCache(backend="file", config=config)
+        assert third.get("SELECT * FROM products") == [2]
+        assert third._cache["SELECT * FROM products"].tables == {"products"}
+
+
+class FakeClient(BaseDatabaseClient):
+    """Client that records statements instead of running them."""
+
+    def __init__(self):
+        super().__init__(DatabaseConfig(host="localhost", port=0, database="test", user="u",
+                                        password="p", min_pool_size=1, max_retries=1))
+        self.statements = []
+
+    async def _create_connection(self):
+        return object()
+
+    async def _execute_impl(self, connection, query, params=None):
+        self.statements.append(query)
+        return [], [], 1
+
+    async def _get_ping_query(self):
+        return "SELECT 1"
+
+
+class TestClientInvalidation:
+    """Test writes through BaseDatabaseClient.execute."""
+
+    @pytest.mark.asyncio
+    async def test_execute_invalidates_written_tables(self):
+        client = FakeClient()
+        client.query_cache = QueryCache()
+        client.query_cache.set("SELECT * FROM orders", [1])
+        client.query_cache.set("SELECT * FROM users", [2])
+
+        await client.execute("SELECT * FROM orders")
+        assert client.query_cache.get("SELECT * FROM orders") == [1]
+
+        await client.execute("INSERT INTO orders (id) VALUES (1)")
+
+        assert client.query_cache.get("SELECT * FROM orders") is None
+        assert client.query_cache.get("SELECT * FROM users") == [2]
+        await client.close()
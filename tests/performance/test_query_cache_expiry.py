@@ -0,0 +1,114 @@
+"""Tests for QueryCache deadline-based expiry."""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.performance.cache import QueryCache
+from src.performance.cache_extended import StaleCache
+
+
+def spy_expiry_checks(cache):
+    cache._live_expiry = Mock(wraps=cache._live_expiry)
+    return cache._live_expiry
+
+
+class TestExpiry:
+    """Test reclaiming expired entries."""
+
+    @pytest.mark.asyncio
+    async def test_cleanup_visits_only_expired_entries(self):
+        cache = QueryCache(config={'max_size': 20000})
+        for i in range(10000):
+            cache.set(f"live_{i}", i)
+        for i in range(3):
+            cache.set(f"old_{i}", i, ttl=0.05)
+        time.sleep(0.06)
+        checks = spy_expiry_checks(cache)
+
+        assert await cache.cleanup_expired() == 3
+
+        assert checks.call_count == 3
+        assert len(cache._cache) == 10000
+        assert cache.get_statistics()['expirations'] == 3
+
+    @pytest.mark.asyncio
+    async def test_cleanup_free_when_nothing_expired(self):
+        cache = QueryCache()
+        for i in range(1000):
+            cache.set(f"q{i}", i)
+        checks = spy_expiry_checks(cache)
+
+        assert await cache.cleanup_expired() == 0
+        assert checks.call_count == 0
+
+    def test_expired_reclaimed_before_evicting_live(self):
+        cache = QueryCache(config={'max_size': 3})
+        cache.set("old", 1, ttl=0)
+        cache.set("b", 2)
+        cache.set("c", 3)
+
+        cache.set("d", 4)
+
+        assert set(cache._cache) == {"b", "c", "d"}
+        stats = cache.get_statistics()
+        assert stats['evictions'] == 0
+        assert stats['expirations'] == 1
+
+    @pytest.mark.asyncio
+    async def test_replaced_entry_keeps_new_deadline(self):
+        cache = QueryCache()
+        cache.set("q", 1, ttl=0)
+        cache.set("q", 2, ttl=300)
+
+        assert await cache.cleanup_expired() == 0
+        assert cache.get("q") == 2
+
+    def test_get_reports_expired_entry_missing(self):
+        cache = QueryCache()
+        cache.set("q", 1, ttl=0)
+
+        assert cache.get("q") is None
+        assert "q" not in cache._cache
+
+    def test_next_expiry_in(self):
+        cache = QueryCache(ttl=None)
+        assert cache.next_expiry_in() is None
+
+        cache.set("forever", 1)
+        assert cache.next_expiry_in() is None
+
+        cache.set("q", 1, ttl=60)
+        cache.set("r", 1, ttl=120)
+        assert cache.next_expiry_in() == pytest.approx(60, abs=1)
+
+        cache.invalidate("q")
+        assert cache.next_expiry_in() == pytest.approx(120, abs=1)
+
+    def test_heap_stays_bounded_under_rewrites(self):
+        cache = QueryCache()
+        for i in range(5000):
+            cache.set("q", i)
+
+        assert len(cache._expiry) <= 2 * len(cache._cache) + 64
+
+
+class TestStaleExpiry:
+    """Test that stale-servable entries outlive their TTL."""
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_kept_until_stale_ttl(self):
+        cache = StaleCache(ttl=0, stale_ttl=3600)
+        cache.set("q", [1])
+
+        assert await cache.cleanup_expired() == 0
+        assert cache._get_sync("q", allow_stale=True) == [1]
+        assert cache._get_sync("q") is None
+
+    @pytest.mark.asyncio
+    async def test_entry_reclaimed_after_stale_ttl(self):
+        cache = StaleCache(ttl=0, stale_ttl=0)
+        cache.set("q", [1])
+
+        assert await cache.cleanup_expired() == 1
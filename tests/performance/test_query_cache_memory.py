@@ -0,0 +1,141 @@
+"""Tests for QueryCache memory accounting and size-aware eviction."""
+
+import sys
+
+import pytest
+
+from src.performance.cache import QueryCache, estimate_size
+
+
+def rows(count, width=4):
+    return [tuple(f"value_{i}_{j}" for j in range(width)) for i in range(count)]
+
+
+def accounted(cache):
+    return sum(entry.size_bytes for entry in cache._cache.values())
+
+
+class TestEstimateSize:
+    """Test deep size estimation."""
+
+    def test_counts_nested_rows(self):
+        result = rows(1000)
+
+        assert estimate_size(result) > 30 * sys.getsizeof(result)
+        assert estimate_size(result) >= sum(
+            sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row) for row in result
+        )
+
+    def test_shared_objects_counted_once(self):
+        name = 'x' * 1000
+        shared = [name] * 100
+
+        assert estimate_size(shared) == sys.getsizeof(shared) + sys.getsizeof(name)
+
+    def test_follows_instance_attributes_and_slots(self):
+        class Row:
+            def __init__(self, payload):
+                self.payload = payload
+
+        class SlotRow:
+            __slots__ = ('payload',)
+
+            def __init__(self, payload):
+                self.payload = payload
+
+        payload = 'y' * 10_000
+        assert estimate_size(Row(payload)) > 10_000
+        assert estimate_size(SlotRow(payload)) > 10_000
+
+
+class TestMemoryCap:
+    """Test that max_memory_mb is a hard limit."""
+
+    def test_large_results_respect_cap(self):
+        cache = QueryCache(config={'max_memory_mb': 1, 'max_size': 1000})
+
+        for i in range(20):
+            cache.set(f"SELECT * FROM t{i}", rows(2000))
+            assert cache._total_size_bytes <= cache.max_bytes
+            assert cache._total_size_bytes == accounted(cache)
+
+        stats = cache.get_statistics()
+        assert stats['evictions'] > 0
+        assert stats['memory_usage_bytes'] <= cache.max_bytes
+
+    def test_oversized_value_rejected(self):
+        cache = QueryCache(config={'max_memory_mb': 0.1})
+        cache.set("q", [1])
+        cache.set("q", rows(5000))
+
+        assert cache.get("q") is None
+        assert cache._total_size_bytes == 0
+
+    def test_replacing_key_keeps_accounting_exact(self):
+        cache = QueryCache()
+        cache.set("q", rows(100))
+        cache.set("q", rows(10))
+
+        assert len(cache._cache) == 1
+        assert cache._total_size_bytes == accounted(cache)
+
+    @pytest.mark.asyncio
+    async def test_clear_resets_accounting(self):
+        cache = QueryCache()
+        cache.set("q", rows(10))
+        await cache.clear()
+
+        assert cache._total_size_bytes == 0
+        assert cache._priorities == []
+
+
+class TestEvictionPolicy:
+    """Test GDSF and LRU eviction."""
+
+    def test_gdsf_evicts_large_cold_entry_first(self):
+        small = rows(10)
+        big = rows(2000)
+        limit = estimate_size(big) + 3 * estimate_size(small) + 2048
+        cache = QueryCache(config={'max_memory_mb': limit / (1024 * 1024)})
+
+        cache.set("big", big)
+        cache.set("small1", small)
+        cache.set("small2", small)
+        cache.set("small3", rows(10))
+        cache.set("small4", rows(10))
+
+        assert cache.get("big") is None
+        assert all(cache.get(f"small{i}") is not None for i in range(1, 5))
+
+    def test_gdsf_keeps_frequently_read_entries(self):
+        cache = QueryCache(config={'max_size': 3})
+        cache.set("hot", [1])
+        cache.set("cold", [2])
+        for _ in range(5):
+            cache.get("hot")
+        cache.set("new1", [3])
+        cache.set("new2", [4])
+
+        assert cache.get("hot") == [1]
+        assert cache.get("cold") is None
+
+    def test_lru_policy(self):
+        small = rows(10)
+        big = rows(2000)
+        limit = estimate_size(big) + estimate_size(small) + 2048
+        cache = QueryCache(config={
+            'max_memory_mb': limit / (1024 * 1024),
+            'eviction_policy': 'lru'
+        })
+
+        cache.set("big", big)
+        cache.set("small1", small)
+        cache.set("small2", rows(10))
+
+        assert cache.get("big") is None
+        assert cache.get("small1") is not None
+        assert cache.get_statistics()['eviction_policy'] == 'lru'
+
+    def test_unknown_policy_rejected(self):
+        with pytest.raises(ValueError):
+            QueryCache(config={'eviction_policy': 'random'})
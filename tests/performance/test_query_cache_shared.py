@@ -0,0 +1,155 @@
+"""Tests for the two-tier (L1 + shared L2) QueryCache."""
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+
+from src.performance.cache import QueryCache
+from src.performance.cache_backends import FileCacheBackend
+
+
+@pytest.fixture
+def shared_dir(tmp_path):
+    return str(tmp_path / "l2")
+
+
+def make_cache(shared_dir, **config):
+    return QueryCache(backend="file", ttl=300, config={'cache_dir': shared_dir, **config})
+
+
+class TestFileCacheBackend:
+    """Test the file-backed L2."""
+
+    def test_round_trip_and_expiry(self, shared_dir):
+        backend = FileCacheBackend(shared_dir)
+        backend.set("k", b"payload", ttl=None)
+        backend.set("gone", b"payload", ttl=-1)
+
+        assert backend.get("k") == b"payload"
+        assert backend.get("gone") is None
+        assert backend.get("missing") is None
+
+    def test_delete_prefix(self, shared_dir):
+        backend = FileCacheBackend(shared_dir)
+        for key in ("user:1", "user:2", "order:1"):
+            backend.set(key, b"x", ttl=None)
+
+        assert backend.delete_prefix("user:") == 2
+        assert backend.get("order:1") == b"x"
+
+    def test_broadcast_skips_own_messages(self, shared_dir):
+        first = FileCacheBackend(shared_dir)
+        second = FileCacheBackend(shared_dir)
+        first.publish('key', 'a')
+
+        assert first.poll() == []
+        assert second.poll() == [('key', 'a')]
+        assert second.poll() == []
+
+
+class TestSharedQueryCache:
+    """Test L1/L2 behaviour across cache instances."""
+
+    def test_hit_carries_across_instances(self, shared_dir):
+        writer = make_cache(shared_dir)
+        reader = make_cache(shared_dir)
+        rows = [(1, 'alice', Decimal('9.50'), date(2024, 1, 1))]
+        writer.set("SELECT * FROM users", rows)
+
+        assert reader.get("SELECT * FROM users") == rows
+        assert reader.get("SELECT * FROM users") == rows
+
+        stats = reader.get_statistics()
+        assert stats['l2_hits'] == 1
+        assert stats['l1_hits'] == 1
+
+    def test_write_invalidates_other_l1(self, shared_dir):
+        first = make_cache(shared_dir)
+        second = make_cache(shared_dir)
+        first.set("q", [1])
+        assert second.get("q") == [1]
+
+        first.set("q", [2])
+
+        assert second.get("q") == [2]
+        assert second.get_statistics()['remote_invalidations'] == 2
+
+    def test_invalidate_reaches_other_instances(self, shared_dir):
+        first = make_cache(shared_dir)
+        second = make_cache(shared_dir)
+        first.set("user_1", [1])
+        first.set("user_2", [2])
+        first.set("order_1", [3])
+        for key in ("user_1", "user_2", "order_1"):
+            second.get(key)
+
+        first.invalidate("order_1")
+        first.invalidate_pattern("user_*")
+
+        assert second.get("user_1") is None
+        assert second.get("user_2") is None
+        assert second.get("order_1") is None
+
+    def test_negative_cache_skips_l2(self, shared_dir):
+        cache = make_cache(shared_dir)
+        cache._l2.get = Mock(wraps=cache._l2.get)
+
+        assert cache.get("missing") is None
+        assert cache.get("missing") is None
+
+        assert cache._l2.get.call_count == 1
+        assert cache.get_statistics()['negative_hits'] == 1
+
+    def test_remote_write_clears_negative_entry(self, shared_dir):
+        reader = make_cache(shared_dir)
+        writer = make_cache(shared_dir)
+        assert reader.get("q") is None
+
+        writer.set("q", [1])
+
+        assert reader.get("q") == [1]
+
+    def test_negative_entry_expires(self, shared_dir):
+        reader = make_cache(shared_dir, negative_ttl=0)
+        reader._l2.get = Mock(return_value=None)
+
+        reader.get("q")
+        reader.get("q")
+
+        assert reader._l2.get.call_count == 2
+
+    def test_l2_ttl_carries_to_l1(self, shared_dir):
+        writer = make_cache(shared_dir)
+        reader = make_cache(shared_dir)
+        writer.set("q", [1], ttl=60)
+
+        reader.get("q")
+
+        assert reader._cache["q"].ttl_seconds == pytest.approx(60, abs=1)
+
+    def test_l2_failure_degrades_to_l1(self, shared_dir):
+        cache = make_cache(shared_dir)
+        cache._l2.set = Mock(side_effect=OSError("disk full"))
+        cache._l2.get = Mock(side_effect=OSError("disk full"))
+
+        cache.set("q", [1])
+        assert cache.get("q") == [1]
+        assert cache.get("other") is None
+        assert cache.get_statistics()['l2_errors'] == 2
+
+    @pytest.mark.asyncio
+    async def test_clear_empties_shared_tier(self, shared_dir):
+        first = make_cache(shared_dir)
+        second = make_cache(shared_dir)
+        first.set("q", [1])
+        second.get("q")
+
+        await first.clear()
+
+        assert second.get("q") is None
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            QueryCache(backend="memcached")
@@ -0,0 +1,127 @@
+"""Tests for ShardedQueryCache."""
+
+import threading
+
+import pytest
+
+from src.performance.sharded_cache import ShardedQueryCache
+
+
+class TestShardedQueryCache:
+    """Test sharding, locking and statistics."""
+
+    def test_round_trip(self):
+        cache = ShardedQueryCache(shards=4)
+        for i in range(100):
+            cache.set(f"q{i}", [i])
+
+        assert all(cache.get(f"q{i}") == [i] for i in range(100))
+        assert cache.get("missing") is None
+
+        stats = cache.get_statistics()
+        assert stats['size'] == 100
+        assert stats['hits'] == 100
+        assert stats['misses'] == 1
+
+    def test_keys_spread_over_shards(self):
+        cache = ShardedQueryCache(shards=8)
+        for i in range(400):
+            cache.set(f"SELECT * FROM t WHERE id = {i}", i)
+
+        sizes = [stats['size'] for stats in cache.get_shard_statistics()]
+        assert len(sizes) == 8
+        assert sum(sizes) == 400
+        assert min(sizes) > 0
+
+    def test_limits_divided_between_shards(self):
+        cache = ShardedQueryCache(shards=4, config={'max_size': 40})
+        for i in range(200):
+            cache.set(f"q{i}", i)
+
+        stats = cache.get_statistics()
+        assert stats['size'] <= 40
+        assert stats['evictions'] >= 160
+
+    def test_hit_while_lock_busy_is_buffered(self):
+        cache = ShardedQueryCache(shards=1)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        shard = cache._shards[0]
+
+        with shard.lock:
+            assert cache.get("a") == 1
+        assert list(shard.reads) == ["a"]
+
+        cache.set("c", 3)
+        assert not shard.reads
+        # The buffered hit made "a" more recent than "b"
+        assert list(shard.cache._cache) == ["b", "a", "c"]
+
+        stats = cache.get_statistics()
+        assert stats['hits'] == 1
+        assert stats['buffered_reads'] == 1
+
+    def test_expired_entry_not_served_lock_free(self):
+        cache = ShardedQueryCache(shards=2, ttl=-1)
+        cache.set("q", [1])
+
+        assert cache.get("q") is None
+        assert cache.get_statistics()['size'] == 0
+
+    def test_table_invalidation_across_shards(self):
+        cache = ShardedQueryCache(shards=4)
+        for i in range(20):
+            cache.set(f"SELECT * FROM orders WHERE id = {i}", i)
+            cache.set(f"SELECT * FROM users WHERE id = {i}", i)
+
+        assert cache.invalidate_write("DELETE FROM orders") == 20
+
+        assert cache.get("SELECT * FROM orders WHERE id = 1") is None
+        assert cache.get("SELECT * FROM users WHERE id = 1") == 1
+
+    @pytest.mark.asyncio
+    async def test_clear_and_cleanup(self):
+        cache = ShardedQueryCache(shards=4)
+        cache.set("old", 1, ttl=-1)
+        cache.set("new", 2)
+
+        # "old" is reclaimed by the insert of "new" when both share a shard
+        await cache.cleanup_expired()
+        stats = cache.get_statistics()
+        assert stats['expirations'] == 1
+        assert stats['size'] == 1
+        await cache.clear()
+
+        assert (await cache.get_stats())['size'] == 0
+
+    def test_concurrent_threads_keep_consistent_state(self):
+        cache = ShardedQueryCache(shards=4, config={'max_size': 64})
+        errors = []
+
+        def worker(worker_id):
+            try:
+                for i in range(2000):
+                    key = f"q{(worker_id * 7 + i) % 128}"
+                    if cache.get(key) is None:
+                        cache.set(key, [i])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        stats = cache.get_statistics()
+        assert stats['total_requests'] == 8 * 2000
+        assert stats['size'] <= 64
+        for shard in cache._shards:
+            assert shard.cache._total_size_bytes == sum(
+                entry.size_bytes for entry in shard.cache._cache.values()
+            )
+
+    def test_invalid_shard_count(self):
+        with pytest.raises(ValueError):
+            ShardedQueryCache(shards=0)
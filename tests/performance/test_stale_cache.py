@@ -0,0 +1,192 @@
+"""Tests for StaleCache stale-while-revalidate and fetch coalescing."""
+
+import asyncio
+
+import pytest
+
+from src.performance.cache_extended import StaleCache
+
+
+class CountingFetcher:
+    """Fetcher returning successive values after an optional delay."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f"v{self.calls}"
+
+
+async def settle(cache):
+    """Wait for background refreshes to finish."""
+    while cache._inflight:
+        await asyncio.gather(*cache._inflight.values(), return_exceptions=True)
+
+
+@pytest.mark.asyncio
+class TestStaleWhileRevalidate:
+    """Test serving fresh, stale and missing keys."""
+
+    async def test_fresh_value_served_without_fetch(self):
+        cache = StaleCache(ttl=300)
+        cache.set("k", "cached")
+        fetcher = CountingFetcher()
+
+        assert await cache.get_or_fetch("k", fetcher) == "cached"
+        assert fetcher.calls == 0
+        assert cache.swr_stats.fresh_hits == 1
+
+    async def test_stale_value_served_while_refreshing(self):
+        cache = StaleCache(ttl=300, stale_ttl=3600)
+        cache.set("k", "old", ttl=0)
+        fetcher = CountingFetcher(delay=0.01)
+
+        results = await asyncio.gather(*(cache.get_or_fetch("k", fetcher) for _ in range(5)))
+
+        assert results == ["old"] * 5
+        await settle(cache)
+        assert fetcher.calls == 1
+        assert await cache.get_or_fetch("k", fetcher) == "v1"
+
+        stats = cache.swr_stats
+        assert stats.stale_hits == 5
+        assert stats.refreshes == 1
+        assert stats.fresh_hits == 1
+
+    async def test_stale_not_allowed_waits_for_fetch(self):
+        cache = StaleCache(ttl=300, stale_ttl=3600)
+        cache.set("k", "old", ttl=0)
+
+        assert await cache.get_or_fetch("k", CountingFetcher(), allow_stale=False) == "v1"
+
+    async def test_failed_refresh_keeps_stale_value(self):
+        cache = StaleCache(ttl=300, stale_ttl=3600)
+        cache.set("k", "old", ttl=0)
+        fetcher = CountingFetcher(error=ConnectionError("down"))
+
+        assert await cache.get_or_fetch("k", fetcher) == "old"
+        await settle(cache)
+
+        assert await cache.get_or_fetch("k", fetcher) == "old"
+        await settle(cache)
+        assert cache.swr_stats.refresh_errors == 2
+
+    async def test_stale_on_timeout(self):
+        cache = StaleCache(ttl=300, stale_ttl=3600)
+        cache.set("k", "old", ttl=0)
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        assert await cache.get_or_fetch("k", slow, timeout=0.05) == "old"
+        await settle(cache)
+        assert cache.swr_stats.refresh_errors == 1
+
+
+@pytest.mark.asyncio
+class TestCoalescing:
+    """Test that concurrent misses share one fetch."""
+
+    async def test_concurrent_misses_share_fetch(self):
+        cache = StaleCache()
+        fetcher = CountingFetcher(delay=0.01)
+
+        results = await asyncio.gather(*(cache.get_or_fetch("k", fetcher) for _ in range(10)))
+
+        assert results == ["v1"] * 10
+        assert fetcher.calls == 1
+        assert cache.swr_stats.misses == 10
+        assert cache.swr_stats.coalesced == 9
+        assert not cache._inflight
+
+    async def test_fetch_error_reaches_all_waiters_then_retries(self):
+        cache = StaleCache()
+        failing = CountingFetcher(delay=0.01, error=ConnectionError("down"))
+
+        results = await asyncio.gather(
+            *(cache.get_or_fetch("k", failing) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert failing.calls == 1
+        assert await cache.get_or_fetch("k", CountingFetcher()) == "v1"
+
+    async def test_miss_timeout_raises(self):
+        cache = StaleCache()
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await cache.get_or_fetch("k", slow, timeout=0.05)
+
+    async def test_cancelled_caller_does_not_cancel_shared_fetch(self):
+        cache = StaleCache()
+        fetcher = CountingFetcher(delay=0.05)
+
+        first = asyncio.ensure_future(cache.get_or_fetch("k", fetcher))
+        second = asyncio.ensure_future(cache.get_or_fetch("k", fetcher))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "v1"
+        assert fetcher.calls == 1
+
+    async def test_invalidation_during_fetch_not_cached(self):
+        cache = StaleCache()
+        fetcher = CountingFetcher(delay=0.02)
+
+        pending = asyncio.ensure_future(cache.get_or_fetch("SELECT * FROM orders", fetcher))
+        await asyncio.sleep(0.005)
+        cache.invalidate_write("UPDATE orders SET total = 0")
+
+        assert await pending == "v1"
+        assert cache.get("SELECT * FROM orders") is None
+
+    async def test_unrelated_invalidation_keeps_fetch(self):
+        cache = StaleCache()
+        fetcher = CountingFetcher(delay=0.02)
+
+        pending = asyncio.ensure_future(cache.get_or_fetch("a", fetcher))
+        await asyncio.sleep(0.005)
+        cache.invalidate("unrelated")
+        joined = asyncio.ensure_future(cache.get_or_fetch("a", fetcher))
+
+        assert await pending == await joined == "v1"
+        assert fetcher.calls == 1
+        assert cache.get("a") == "v1"
+
+    async def test_invalidation_detaches_only_matching_fetches(self):
+        cache = StaleCache()
+        orders, users, other = CountingFetcher(0.02), CountingFetcher(0.02), CountingFetcher(0.02)
+
+        pending = [
+            asyncio.ensure_future(cache.get_or_fetch("SELECT * FROM orders", orders)),
+            asyncio.ensure_future(cache.get_or_fetch("SELECT * FROM users", users)),
+            asyncio.ensure_future(cache.get_or_fetch("report:1", other)),
+        ]
+        await asyncio.sleep(0.005)
+        cache.invalidate_pattern("report:*")
+        cache.invalidate_write("DELETE FROM orders")
+        await asyncio.gather(*pending)
+
+        assert cache.get("SELECT * FROM orders") is None
+        assert cache.get("SELECT * FROM users") == "v1"
+        assert cache.get("report:1") is None
+
+    async def test_statistics_include_swr_counters(self):
+        cache = StaleCache()
+        await cache.get_or_fetch("k", CountingFetcher())
+        await cache.get_or_fetch("k", CountingFetcher())
+
+        stats = cache.get_statistics()['stale_while_revalidate']
+        assert stats['misses'] == 1
+        assert stats['fresh_hits'] == 1
+        assert stats['hit_rate'] == 0.5
+        assert stats['fetches'] == 1
@@ -0,0 +1,104 @@
+"""Suggestion-latency benchmark checks.
+
+The full run (100, 10k and 100k tables, compared against the stored
+baseline) is ``python tests/performance/suggestion_benchmark.py``; these
+tests exercise the harness on small schemas.
+"""
+
+import asyncio
+
+import pytest
+
+from suggestion_benchmark import (
+    HashingEmbedder,
+    LatencyReport,
+    build_completer,
+    build_schema,
+    bench_engine,
+    compare,
+    load_baseline,
+    load_traces,
+    run,
+    table_name,
+)
+
+BUDGET_MS = 150
+
+
+def test_traces_only_use_tables_of_the_smallest_schema():
+    names = {table['name'] for table in build_schema(100)}
+    for trace in load_traces():
+        assert len(trace.delays_ms) == len(trace.text)
+        assert any(name in trace.text for name in names), trace.name
+
+
+def test_table_names_are_unique():
+    assert len({table_name(i) for i in range(5000)}) == 5000
+
+
+def test_percentiles():
+    report = LatencyReport(size=10)
+    for value in range(1, 101):
+        report.add('completer.history', float(value))
+
+    stats = report.percentiles()['completer.history']
+
+    assert stats['n'] == 100
+    assert stats['p50'] == pytest.approx(50.5)
+    assert stats['p99'] == pytest.approx(99.01)
+
+
+def test_compare_flags_p95_regressions_only_beyond_tolerance_and_floor():
+    baseline = {'tolerance': 0.25, 'floor_ms': 1.0, 'sizes': {'100': {
+        'completer.vector': {'p50': 1.0, 'p95': 4.0, 'p99': 5.0},
+        'completer.history': {'p50': 0.01, 'p95': 0.02, 'p99': 0.03},
+    }}}
+    current = {100: {
+        'completer.vector': {'p50': 1.0, 'p95': 6.0, 'p99': 9.0},
+        'completer.history': {'p50': 0.05, 'p95': 0.9, 'p99': 1.0},
+        'engine.fast': {'p50': 1.0, 'p95': 2.0, 'p99': 3.0},
+    }}
+
+    regressions = compare(current, baseline)
+
+    assert len(regressions) == 1
+    assert 'completer.vector' in regressions[0]
+    assert compare(current, baseline, tolerance=1.0) == []
+
+
+def test_stored_baseline_covers_every_size():
+    baseline = load_baseline()
+    assert set(baseline['sizes']) == {'100', '10000', '100000'}
+
+
+def test_completer_sources_within_budget():
+    report = run(sizes=[100], traces=load_traces()[:2], engine=False)[100]
+    stats = report.percentiles()
+
+    assert set(stats) == {
+        'completer.pattern', 'completer.syntax', 'completer.history',
+        'completer.embed', 'completer.vector'
+    }
+    assert all(source['p95'] < BUDGET_MS for source in stats.values())
+
+
+def test_engine_replay_streams_every_keystroke():
+    traces = load_traces()[:1]
+    schema = build_schema(100)
+    embedder = HashingEmbedder()
+    report = LatencyReport(size=100)
+
+    asyncio.run(bench_engine(
+        report, build_completer(schema, embedder), embedder, schema, traces, time_scale=0.05
+    ))
+
+    keystrokes = len(traces[0].text)
+    assert report.counters['engine.keystrokes'] == keystrokes
+    assert len(report.samples['engine.fast']) + report.counters['engine.superseded'] >= keystrokes
+    assert report.percentiles()['engine.fast']['p95'] < BUDGET_MS
+
+
+@pytest.mark.slow
+def test_completer_sources_within_budget_at_10k_tables():
+    report = run(sizes=[10_000], engine=False)[10_000]
+    assert all(source['p95'] < BUDGET_MS for source in report.percentiles().values())
@@ -116,8 +116,9 @@ def test_delete_by_id(vector_db):
     result = vector_db.delete_by_id('test_id')
     assert result is True
 
-    entry = vector_db.get_by_id('test_id')
-    assert entry.metadata.get('_deleted') is True
+    assert vector_db.get_by_id('test_id') is None
+    assert vector_db.index.ntotal == 0
+    assert vector_db.search_similar(vector, k=1, threshold=0.0) == []
 
     # Try deleting non-existent
     result = vector_db.delete_by_id('nonexistent')
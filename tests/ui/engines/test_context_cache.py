@@ -0,0 +1,240 @@
+"""Tests for the bounded, single-flight context cache."""
+
+import asyncio
+import time
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from src.performance.cache import estimate_size
+from src.ui.engines.context_cache import ContextCache
+from src.ui.engines.context_suggestion import ContextAwareSuggestionEngine
+
+
+def counting_loader(value, delay=0.01):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+
+    return load, calls
+
+
+class TestContextCache:
+    """Test ContextCache."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_are_shared(self):
+        cache = ContextCache()
+        load, calls = counting_loader('value')
+
+        results = await asyncio.gather(*(cache.get_or_load('key', load) for _ in range(10)))
+
+        assert results == ['value'] * 10
+        assert len(calls) == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.shared_loads == 9
+
+        assert await cache.get_or_load('key', load) == 'value'
+        assert cache.stats.hits == 1
+        assert cache.stats.hit_rate == pytest.approx(10 / 11)
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_reloaded(self):
+        cache = ContextCache(ttl=300)
+        cache['key'] = ('old', time.time() - 400)
+        load, calls = counting_loader('new', delay=0)
+
+        assert await cache.get_or_load('key', load) == 'new'
+        assert len(calls) == 1
+        assert cache.stats.expirations == 1
+        assert cache['key'][0] == 'new'
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_keeps_load_running(self):
+        cache = ContextCache()
+        load, calls = counting_loader('value', delay=0.05)
+
+        first = asyncio.ensure_future(cache.get_or_load('key', load))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_load('key', load))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == 'value'
+        assert len(calls) == 1
+        assert 'key' in cache
+
+    @pytest.mark.asyncio
+    async def test_failed_load_is_not_cached(self):
+        cache = ContextCache()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise RuntimeError('metadata unavailable')
+
+        results = await asyncio.gather(
+            cache.get_or_load('key', fail),
+            cache.get_or_load('key', fail),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert 'key' not in cache
+        assert cache.stats.load_errors == 1
+        assert cache.get_stats()['pending_loads'] == 0
+
+    @pytest.mark.asyncio
+    async def test_put_during_load_wins(self):
+        cache = ContextCache()
+        load, _ = counting_loader('stale', delay=0.02)
+
+        pending = asyncio.ensure_future(cache.get_or_load('key', load))
+        await asyncio.sleep(0)
+        cache.put('key', 'fresh')
+
+        assert await pending == 'stale'
+        assert cache['key'][0] == 'fresh'
+
+    def test_lru_eviction_by_entries(self):
+        cache = ContextCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.put('c', 3)
+
+        assert list(cache) == ['b', 'c']
+        assert cache.stats.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_hit_refreshes_recency(self):
+        cache = ContextCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        load, _ = counting_loader(None)
+        await cache.get_or_load('a', load)
+        cache.put('c', 3)
+
+        assert list(cache) == ['a', 'c']
+
+    def test_memory_bound(self):
+        value = list(range(1000))
+        size = estimate_size(value)
+        cache = ContextCache(max_bytes=int(size * 2.5))
+
+        for key in 'abcd':
+            cache.put(key, list(range(1000)))
+
+        assert len(cache) == 2
+        assert cache.size_bytes <= cache.max_bytes
+        assert cache.size_bytes == 2 * size
+
+        del cache['d']
+        assert cache.size_bytes == size
+
+    def test_oversized_value_is_not_cached(self):
+        cache = ContextCache(max_bytes=1000)
+
+        assert not cache.put('big', list(range(10_000)))
+        assert 'big' not in cache
+        assert cache.size_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_pinned_entry_is_never_evicted_or_expired(self):
+        cache = ContextCache(ttl=0, max_entries=2, max_bytes=1000)
+        load, calls = counting_loader('loaded')
+
+        cache.pin('objects', list(range(10_000)))
+        for key in 'abcd':
+            cache.put(key, key)
+
+        assert await cache.get_or_load('objects', load) == list(range(10_000))
+        assert calls == []
+        assert 'objects' in cache
+        assert cache.size_bytes <= cache.max_bytes
+        assert cache.get_stats()['pinned'] == 1
+
+        cache.put('objects', 'replaced')
+        assert cache.get_stats()['pinned'] == 0
+        del cache['objects']
+        assert 'objects' not in cache
+
+    def test_estimate_size_is_deep(self):
+        rows = [(i, f'name_{i}') for i in range(100)]
+
+        assert estimate_size(rows) > estimate_size([None] * 100) + 100 * estimate_size((0, ''))
+        # Same measurement as the query cache's memory cap
+        assert ContextCache().sizer is estimate_size
+
+    def test_mapping_interface(self):
+        cache = ContextCache()
+
+        assert cache == {}
+        cache.put('key', 'value', timestamp=1.0)
+        assert cache == {'key': ('value', 1.0)}
+        assert cache.pop('key') == ('value', 1.0)
+        assert cache.pop('key', None) is None
+        assert cache.size_bytes == 0
+
+
+class TestEngineContextCache:
+    """Test the context cache inside the suggestion engine."""
+
+    @pytest.fixture
+    def engine(self):
+        model = Mock()
+        model.encode = Mock(return_value=np.zeros(8, dtype=np.float32))
+        return ContextAwareSuggestionEngine(
+            completer=Mock(),
+            embedding_model=model,
+            cache_max_entries=4
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_keystrokes_fetch_once(self, engine):
+        fetch = Mock(side_effect=lambda: time.sleep(0.02) or {'tables': ['users']})
+
+        results = await asyncio.gather(
+            *(engine._get_cached_or_fetch('database_objects', fetch) for _ in range(5))
+        )
+
+        assert all(result == {'tables': ['users']} for result in results)
+        assert fetch.call_count == 1
+        stats = engine.get_cache_stats()
+        assert stats['misses'] == 1
+        assert stats['shared_loads'] == 4
+        assert stats['entries'] == 1
+        assert stats['size_bytes'] > 0
+
+    def test_cache_is_bounded(self, engine):
+        for i in range(10):
+            engine._context_cache.put(f'key{i}', i)
+
+        assert len(engine._context_cache) == 4
+
+    @pytest.mark.asyncio
+    async def test_pushed_objects_larger_than_cache_are_kept(self):
+        engine = ContextAwareSuggestionEngine(
+            completer=Mock(),
+            embedding_model=Mock(),
+            cache_max_entries=2,
+            cache_max_bytes=10_000
+        )
+        tables = [f'table_{i}' for i in range(5000)]
+        columns = {table: ['id', 'name', 'created_at'] for table in tables}
+
+        engine.set_database_objects(tables, columns)
+        for i in range(10):
+            engine._context_cache.put(f'key{i}', i)
+        context = await engine.gather_context('SELECT * FROM ')
+
+        assert estimate_size(context['database_objects']) > engine._context_cache.max_bytes
+        assert context['database_objects']['tables'] == tables
+        assert context['database_objects']['columns'] is columns
+
+    def test_cache_ttl_is_forwarded(self, engine):
+        engine.cache_ttl = 5
+
+        assert engine._context_cache.ttl == 5
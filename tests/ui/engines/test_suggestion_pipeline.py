@@ -0,0 +1,175 @@
+"""Tests for the tiered, cancellable keystroke suggestion pipeline."""
+
+import asyncio
+import time
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from src.ui.engines.context_suggestion import ContextAwareSuggestionEngine, SuggestionUpdate
+from src.vector.autocomplete import CompletionCandidate
+
+
+def candidate(text, score, source='vector'):
+    return CompletionCandidate(text=text, score=score, metadata={'type': 'table'}, source=source)
+
+
+@pytest.fixture
+def completer():
+    completer = Mock()
+    completer.get_fast_completions = Mock(return_value=[candidate('SELECT', 0.95, 'pattern')])
+    completer.get_vector_completions = Mock(return_value=[
+        candidate('users', 0.8), candidate('user_roles', 0.7), candidate('orders', 0.6)
+    ])
+    return completer
+
+
+@pytest.fixture
+def model():
+    model = Mock()
+    model.encode = Mock(return_value=np.zeros(8, dtype=np.float32))
+    return model
+
+
+@pytest.fixture
+def engine(completer, model):
+    return ContextAwareSuggestionEngine(completer=completer, embedding_model=model)
+
+
+async def collect(engine, query, **kwargs):
+    return [update async for update in engine.stream_suggestions(query, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_streams_tiers_in_order(completer, model):
+    async def llm(query, context):
+        return [candidate('user_accounts', 0.99, 'llm')]
+
+    engine = ContextAwareSuggestionEngine(completer=completer, embedding_model=model, llm_suggester=llm)
+
+    updates = await collect(engine, 'SELECT * FROM u')
+
+    assert [u.tier for u in updates] == ['fast', 'vector', 'llm']
+    assert [u.final for u in updates] == [False, False, True]
+    assert [c.text for c in updates[0].candidates] == ['SELECT']
+    assert 'users' in [c.text for c in updates[1].candidates]
+    assert 'user_accounts' in [c.text for c in updates[2].candidates]
+
+
+@pytest.mark.asyncio
+async def test_extending_the_word_narrows_previous_vector_result(engine, completer, model):
+    await collect(engine, 'SELECT * FROM u')
+    updates = await collect(engine, 'SELECT * FROM use')
+
+    vector = updates[-1]
+    assert vector.reused
+    assert {c.text for c in vector.candidates} >= {'users', 'user_roles'}
+    assert 'orders' not in [c.text for c in vector.candidates]
+    assert model.encode.call_count == 1
+    assert completer.get_fast_completions.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_new_word_recomputes(engine, model):
+    await collect(engine, 'SELECT * FROM users')
+    updates = await collect(engine, 'SELECT * FROM users WHERE')
+
+    assert not updates[-1].reused
+    assert model.encode.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_narrowing_to_nothing_recomputes(engine, model):
+    await collect(engine, 'SELECT * FROM u')
+    updates = await collect(engine, 'SELECT * FROM ux')
+
+    assert not updates[-1].reused
+    assert model.encode.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_vector_tier_is_dropped_after_budget(completer, model):
+    model.encode = Mock(side_effect=lambda text: time.sleep(0.3) or np.zeros(8, dtype=np.float32))
+    engine = ContextAwareSuggestionEngine(completer=completer, embedding_model=model, budget_ms=50)
+
+    start = time.perf_counter()
+    updates = await collect(engine, 'SELECT * FROM u')
+
+    assert time.perf_counter() - start < 0.25
+    assert [c.text for c in updates[-1].candidates] == ['SELECT']
+    assert engine.pipeline_stats['timeouts'] == 1
+
+
+@pytest.mark.asyncio
+async def test_superseded_stream_skips_vector_search(completer, model):
+    model.encode = Mock(side_effect=lambda text: time.sleep(0.1) or np.zeros(8, dtype=np.float32))
+    engine = ContextAwareSuggestionEngine(completer=completer, embedding_model=model, budget_ms=1000)
+
+    stale = engine.stream_suggestions('SELECT * FROM u')
+    await stale.__anext__()
+    stale_vector = asyncio.create_task(stale.__anext__())
+    await asyncio.sleep(0.02)
+    await collect(engine, 'SELECT * FROM o')
+
+    with pytest.raises(StopAsyncIteration):
+        await stale_vector
+    # The stale encode was already running; its search was never started
+    assert model.encode.call_count == 2
+    assert completer.get_vector_completions.call_count == 1
+    assert engine.pipeline_stats['stale_skips'] == 1
+
+
+@pytest.mark.asyncio
+async def test_submit_cancels_superseded_keystroke(completer, model):
+    started = []
+
+    async def llm(query, context):
+        started.append(query)
+        await asyncio.sleep(10)
+        return []
+
+    engine = ContextAwareSuggestionEngine(completer=completer, embedding_model=model, llm_suggester=llm)
+    received = []
+
+    first = engine.submit('SELECT * FROM u', received.append)
+    while not started:
+        await asyncio.sleep(0.01)
+    second = engine.submit('SELECT * FROM o', received.append)
+    await asyncio.sleep(0.05)
+
+    assert first.cancelled()
+    assert not second.done()
+    assert engine.pipeline_stats['superseded'] == 1
+    assert all(isinstance(update, SuggestionUpdate) for update in received)
+    second.cancel()
+
+
+@pytest.mark.asyncio
+async def test_superseded_stream_stops_yielding(engine):
+    stale = engine.stream_suggestions('SELECT * FROM u')
+    first = await stale.__anext__()
+    assert first.tier == 'fast'
+
+    await collect(engine, 'SELECT * FROM o')
+
+    with pytest.raises(StopAsyncIteration):
+        await stale.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_engine_from_llm_manager_encodes_through_service(completer, model):
+    service = Mock()
+
+    async def encode_async(query):
+        return np.zeros(8, dtype=np.float32)
+    service.encode_async = Mock(side_effect=encode_async)
+    manager = Mock(embedding_model=model, embedding_service=service)
+
+    engine = ContextAwareSuggestionEngine.from_llm_manager(completer, manager, budget_ms=500)
+    updates = await collect(engine, 'SELECT * FROM u')
+
+    assert engine.embedding_service is service
+    assert 'vector' in [u.tier for u in updates]
+    service.encode_async.assert_called_once_with('SELECT * FROM u')
+    model.encode.assert_not_called()
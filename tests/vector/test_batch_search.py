@@ -0,0 +1,107 @@
+"""Tests for multi-query search in VectorDatabase.search_many."""
+
+import numpy as np
+import pytest
+
+from src.vector.store import SearchResults, VectorDatabase
+
+
+DIM = 32
+
+
+def random_vectors(n: int, dim: int = DIM, seed: int = 0) -> np.ndarray:
+    """Create n random normalized float32 vectors."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def db():
+    db = VectorDatabase(dimension=DIM, partition_keys=('connection_id',), brute_force_limit=100)
+    n = 600
+    db.add_objects(
+        [f'obj_{i}' for i in range(n)],
+        random_vectors(n),
+        ['column' if i % 2 else 'table' for i in range(n)],
+        [{'connection_id': f'db{i % 3}'} for i in range(n)]
+    )
+    return db
+
+
+def assert_same_hits(batch, single):
+    assert [entry.id for entry, _ in batch] == [entry.id for entry, _ in single]
+    assert np.allclose([d for _, d in batch], [d for _, d in single], atol=1e-5)
+
+
+@pytest.mark.parametrize("filters", [None, {'connection_id': 'db1'}])
+def test_matches_search_similar(db, filters):
+    queries = random_vectors(20, seed=7)
+
+    results = db.search_many(queries, k=5, threshold=0.0, filters=filters)
+
+    assert len(results) == 20
+    for i, query in enumerate(queries):
+        assert_same_hits(
+            results.for_query(i),
+            db.search_similar(query, k=5, threshold=0.0, filters=filters)
+        )
+
+
+def test_per_query_filters(db):
+    queries = random_vectors(4, seed=3)
+    filters = [{'connection_id': 'db0'}, None, {'connection_id': 'db2'}, {'connection_id': 'db0'}]
+
+    results = db.search_many(queries, k=3, object_type='table', threshold=0.0, filters=filters)
+
+    for i, (query, query_filters) in enumerate(zip(queries, filters)):
+        hits = results.for_query(i)
+        assert_same_hits(
+            hits,
+            db.search_similar(query, k=3, object_type='table', threshold=0.0, filters=query_filters)
+        )
+        assert all(entry.object_type == 'table' for entry, _ in hits)
+
+
+def test_brute_force_subset_uses_one_call_per_filter(db):
+    # 'db1' tables are few enough to be scored exactly
+    queries = random_vectors(8, seed=11)
+
+    results = db.search_many(
+        queries, k=4, object_type='table', threshold=0.0, filters={'connection_id': 'db1'}
+    )
+
+    assert len(results.ids) == 32
+    assert {entry.metadata['connection_id'] for entry in results.entries} == {'db1'}
+
+
+def test_columns_are_aligned(db):
+    results = db.search_many(random_vectors(3, seed=5), k=2, threshold=0.0)
+
+    assert results.offsets.tolist() == [0, 2, 4, 6]
+    assert results.query_indices.tolist() == [0, 0, 1, 1, 2, 2]
+    assert results.ids == [entry.id for entry in results.entries]
+    assert results.distances.dtype == np.float32
+    assert [len(hits) for hits in results.to_lists()] == [2, 2, 2]
+
+
+def test_unmatched_filters_and_empty_database():
+    db = VectorDatabase(dimension=DIM)
+    assert len(db.search_many(random_vectors(2), k=3)) == 2
+    assert db.search_many(random_vectors(2), k=3).ids == []
+
+    db.add_object('a', random_vectors(1)[0], 'table', {'connection_id': 'x'})
+    results = db.search_many(random_vectors(2), k=3, threshold=0.0, filters=[{'connection_id': 'y'}, None])
+    assert results.for_query(0) == []
+    assert [entry.id for entry, _ in results.for_query(1)] == ['a']
+
+
+def test_filter_count_must_match_queries(db):
+    with pytest.raises(ValueError):
+        db.search_many(random_vectors(3), filters=[None, None])
+
+
+def test_from_hits_round_trip(db):
+    hits = db.search_many(random_vectors(2, seed=1), k=3, threshold=0.0).to_lists()
+
+    assert SearchResults.from_hits(hits).to_lists() == hits
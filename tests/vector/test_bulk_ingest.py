@@ -0,0 +1,104 @@
+"""Tests for bulk ingestion into VectorDatabase."""
+
+import numpy as np
+import pytest
+
+from src.vector.store import IngestStats, VectorDatabase
+
+
+DIM = 32
+
+
+def random_vectors(n: int, dim: int = DIM, seed: int = 0) -> np.ndarray:
+    """Create n random normalized float32 vectors."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def sample_tables(n_tables: int = 3, n_columns: int = 4):
+    """Table definitions in the format used by index_database_objects."""
+    return [
+        {
+            'name': f't{t}',
+            'description': f'table {t}',
+            'columns': [
+                {'name': f'c{c}', 'type': 'int', 'description': ''}
+                for c in range(n_columns)
+            ]
+        }
+        for t in range(n_tables)
+    ]
+
+
+def test_add_objects_single_append():
+    db = VectorDatabase(dimension=DIM)
+    vectors = random_vectors(100)
+
+    stats = db.add_objects(
+        [f'obj_{i}' for i in range(100)],
+        vectors,
+        'column',
+        [{'i': i} for i in range(100)]
+    )
+
+    assert isinstance(stats, IngestStats)
+    assert stats.objects == 100
+    assert db.index.ntotal == 100
+    assert db.get_by_id('obj_42').metadata == {'i': 42}
+    assert db.search_similar(vectors[42], k=1, threshold=0.0)[0][0].id == 'obj_42'
+    assert db.get_stats()['ingest']['objects'] == 100
+
+
+def test_add_objects_per_object_types():
+    db = VectorDatabase(dimension=DIM)
+
+    db.add_objects(['a', 'b'], random_vectors(2), ['table', 'column'])
+
+    assert db.get_stats()['type_counts'] == {'table': 1, 'column': 1}
+
+
+def test_add_objects_replaces_and_dedupes():
+    db = VectorDatabase(dimension=DIM)
+    vectors = random_vectors(3)
+    db.add_object('a', vectors[0], 'table')
+
+    db.add_objects(['a', 'b', 'b'], vectors, 'table')
+
+    assert db.index.ntotal == 2
+    assert np.allclose(db.get_by_id('a').vector, vectors[0])
+    assert np.allclose(db.get_by_id('b').vector, vectors[2])
+
+
+def test_add_objects_validates_shape():
+    db = VectorDatabase(dimension=DIM)
+
+    with pytest.raises(ValueError):
+        db.add_objects(['a'], random_vectors(1, dim=8), 'table')
+    with pytest.raises(ValueError):
+        db.add_objects(['a', 'b'], random_vectors(1), 'table')
+
+
+def test_index_database_objects_batches_model_calls():
+    db = VectorDatabase(dimension=DIM)
+    calls = []
+
+    def encode(texts):
+        calls.append(len(texts))
+        return random_vectors(len(texts), seed=len(calls))
+
+    stats = db.index_database_objects(
+        sample_tables(3, 4), batch_embedding_func=encode, batch_size=10
+    )
+
+    # 3 tables + 12 columns in batches of 10
+    assert calls == [10, 5]
+    assert stats.objects == 15
+    assert db.get_by_id('column:t2.c3').metadata['table'] == 't2'
+
+
+def test_index_database_objects_requires_embedding():
+    db = VectorDatabase(dimension=DIM)
+
+    with pytest.raises(ValueError):
+        db.index_database_objects(sample_tables())
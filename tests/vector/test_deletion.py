@@ -0,0 +1,127 @@
+"""Tests for ID-mapped deletion, tombstones and compaction in VectorDatabase."""
+
+import numpy as np
+import pytest
+
+from src.vector.store import VectorDatabase
+
+
+DIM = 32
+
+
+def random_vectors(n: int, dim: int = DIM, seed: int = 0) -> np.ndarray:
+    """Create n random normalized float32 vectors."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def populate(db: VectorDatabase, vectors: np.ndarray) -> None:
+    """Add vectors as obj_<i> entries."""
+    for i, vec in enumerate(vectors):
+        db.add_object(f'obj_{i}', vec, 'test')
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf_flat'])
+def test_delete_removes_vector_from_index(index_type):
+    db = VectorDatabase(dimension=DIM, index_type=index_type, background_retrain=False)
+    vectors = random_vectors(200)
+    populate(db, vectors)
+
+    assert db.delete_by_id('obj_5') is True
+
+    assert db.index.ntotal == 199
+    assert db.get_by_id('obj_5') is None
+    assert db.get_stats()['tombstones'] == 0
+    results = db.search_similar(vectors[5], k=3, threshold=0.0)
+    assert 'obj_5' not in [entry.id for entry, _ in results]
+
+
+def test_delete_many():
+    db = VectorDatabase(dimension=DIM)
+    populate(db, random_vectors(10))
+
+    deleted = db.delete_many(['obj_1', 'obj_2', 'obj_2', 'missing'])
+
+    assert deleted == 2
+    assert len(db.entries) == 8
+    assert db.index.ntotal == 8
+
+
+def test_readding_replaces_entry():
+    db = VectorDatabase(dimension=DIM)
+    vectors = random_vectors(2)
+
+    db.add_object('obj', vectors[0], 'test')
+    db.add_object('obj', vectors[1], 'test')
+
+    assert len(db.entries) == 1
+    assert db.index.ntotal == 1
+    assert np.allclose(db.get_by_id('obj').vector, vectors[1])
+
+
+def test_hnsw_tombstones_and_compaction():
+    db = VectorDatabase(
+        dimension=DIM,
+        index_type='hnsw',
+        background_retrain=False,
+        compaction_threshold=0.5
+    )
+    vectors = random_vectors(100)
+    populate(db, vectors)
+
+    db.delete_many([f'obj_{i}' for i in range(30)])
+
+    stats = db.get_stats()
+    assert stats['tombstones'] == 30
+    assert stats['tombstone_ratio'] == pytest.approx(0.3)
+
+    # Tombstoned neighbours never reach the caller and do not truncate results
+    results = db.search_similar(vectors[0], k=10, threshold=0.0)
+    assert len(results) == 10
+    assert all(int(entry.id.split('_')[1]) >= 30 for entry, _ in results)
+
+    # The search asks FAISS for k results, not k plus the tombstones
+    index_search = db.index.search
+    requested = []
+    db.index.search = lambda x, k, **kwargs: requested.append(k) or index_search(x, k, **kwargs)
+    db.search_similar(vectors[0], k=10, threshold=0.0)
+    assert requested == [10]
+    del db.index.search
+
+    db.compact()
+
+    stats = db.get_stats()
+    assert stats['tombstones'] == 0
+    assert stats['index_size'] == 70
+
+
+def test_compaction_triggers_automatically():
+    db = VectorDatabase(
+        dimension=DIM,
+        index_type='hnsw',
+        background_retrain=False,
+        compaction_threshold=0.2
+    )
+    populate(db, random_vectors(50))
+
+    db.delete_many([f'obj_{i}' for i in range(10)])
+
+    assert db.get_stats()['tombstones'] == 0
+    assert db.index.ntotal == 40
+
+
+def test_background_compaction_replays_concurrent_changes():
+    db = VectorDatabase(dimension=DIM, index_type='hnsw', compaction_threshold=1.0)
+    vectors = random_vectors(60)
+    populate(db, vectors[:50])
+    db.delete_many(['obj_0', 'obj_1'])
+
+    db.compact(background=True)
+    db.add_object('late', vectors[50], 'test')
+    db.delete_by_id('obj_2')
+    assert db.wait_for_retrain(timeout=30)
+
+    assert db.get_by_id('late') is not None
+    assert 'obj_2' not in [e.id for e, _ in db.search_similar(vectors[2], k=5, threshold=0.0)]
+    assert db.search_similar(vectors[50], k=1, threshold=0.0)[0][0].id == 'late'
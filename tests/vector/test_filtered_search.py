@@ -0,0 +1,98 @@
+"""Tests for filter pushdown in VectorDatabase.search_similar."""
+
+import numpy as np
+import pytest
+
+from src.vector.store import VectorDatabase
+
+
+DIM = 32
+
+
+def random_vectors(n: int, dim: int = DIM, seed: int = 0) -> np.ndarray:
+    """Create n random normalized float32 vectors."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build_db(index_type: str, n: int = 3000, brute_force_limit: int = 2048) -> VectorDatabase:
+    """Database where every 100th vector belongs to connection 'rare'."""
+    db = VectorDatabase(
+        dimension=DIM,
+        index_type=index_type,
+        background_retrain=False,
+        partition_keys=('connection_id',),
+        brute_force_limit=brute_force_limit
+    )
+    for i, vec in enumerate(random_vectors(n)):
+        db.add_object(
+            f'obj_{i}',
+            vec,
+            'column' if i % 2 else 'table',
+            {'connection_id': 'rare' if i % 100 == 0 else 'common', 'name': f'n{i % 7}'}
+        )
+    return db
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf_flat', 'hnsw'])
+@pytest.mark.parametrize("brute_force_limit", [0, 2048])
+def test_selective_filter_returns_full_k(index_type, brute_force_limit):
+    db = build_db(index_type, brute_force_limit=brute_force_limit)
+    query = random_vectors(1, seed=99)[0]
+
+    results = db.search_similar(
+        query, k=10, threshold=0.0, filters={'connection_id': 'rare'}
+    )
+
+    assert len(results) == 10
+    assert all(entry.metadata['connection_id'] == 'rare' for entry, _ in results)
+    distances = [dist for _, dist in results]
+    assert distances == sorted(distances)
+
+
+def test_filtered_results_match_exact_scan():
+    db = build_db('flat')
+    query = random_vectors(1, seed=7)[0]
+
+    results = db.search_similar(
+        query, k=5, object_type='table', threshold=0.0, filters={'connection_id': 'rare'}
+    )
+
+    expected = sorted(
+        (float(np.sum((entry.vector - query) ** 2)), entry.id)
+        for entry in db.entries
+        if entry.object_type == 'table' and entry.metadata['connection_id'] == 'rare'
+    )[:5]
+    assert [entry.id for entry, _ in results] == [entry_id for _, entry_id in expected]
+
+
+def test_filter_on_unpartitioned_key():
+    db = build_db('flat', n=300)
+    query = random_vectors(1, seed=3)[0]
+
+    results = db.search_similar(query, k=5, threshold=0.0, filters={'name': 'n3'})
+
+    assert len(results) == 5
+    assert all(entry.metadata['name'] == 'n3' for entry, _ in results)
+
+
+def test_filter_without_matches():
+    db = build_db('flat', n=100)
+
+    results = db.search_similar(
+        random_vectors(1)[0], k=5, threshold=0.0, filters={'connection_id': 'missing'}
+    )
+
+    assert results == []
+
+
+def test_deleted_entries_leave_partitions():
+    db = build_db('flat', n=300)
+    rare_ids = [entry.id for entry in db.entries if entry.metadata['connection_id'] == 'rare']
+
+    db.delete_many(rare_ids)
+
+    assert db.search_similar(
+        random_vectors(1)[0], k=5, threshold=0.0, filters={'connection_id': 'rare'}
+    ) == []
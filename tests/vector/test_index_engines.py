@@ -0,0 +1,144 @@
+"""Tests for pluggable FAISS index engines and automatic tier selection."""
+
+import numpy as np
+import pytest
+
+from src.vector.engines import (
+    FLAT_MAX_VECTORS,
+    IVF_FLAT_MAX_VECTORS,
+    IndexEngine,
+    IndexType,
+    SearchParams,
+    create_engine,
+    select_index_type,
+)
+from src.vector.store import VectorDatabase
+
+
+DIM = 32
+
+
+def random_vectors(n: int, dim: int = DIM, seed: int = 0) -> np.ndarray:
+    """Create n random normalized float32 vectors."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestSelectIndexType:
+    """Tests for size-based index selection."""
+
+    def test_small_collections_use_flat(self):
+        assert select_index_type(0) == IndexType.FLAT
+        assert select_index_type(FLAT_MAX_VECTORS - 1) == IndexType.FLAT
+
+    def test_medium_collections_use_ivf_flat(self):
+        assert select_index_type(FLAT_MAX_VECTORS) == IndexType.IVF_FLAT
+
+    def test_large_collections_use_ivf_pq(self):
+        assert select_index_type(IVF_FLAT_MAX_VECTORS) == IndexType.IVF_PQ
+
+
+class TestIndexEngines:
+    """Tests for building each engine."""
+
+    @pytest.mark.parametrize("index_type", list(IndexType))
+    def test_build_and_search(self, index_type):
+        vectors = random_vectors(2000)
+        engine = create_engine(index_type, DIM)
+
+        index = engine.build(vectors)
+
+        assert index.ntotal == 2000
+        distances, labels = index.search(vectors[:5], 1)
+        # Every engine should find (most) exact self-matches
+        assert (labels[:, 0] == np.arange(5)).sum() >= 4
+
+    def test_ivf_respects_nprobe(self):
+        engine = create_engine(IndexType.IVF_FLAT, DIM, SearchParams(nprobe=4))
+        index = engine.build(random_vectors(2000))
+
+        assert index.nprobe == 4
+
+    def test_hnsw_respects_ef_search(self):
+        engine = create_engine(IndexType.HNSW, DIM, SearchParams(ef_search=128))
+        index = engine.build(random_vectors(100))
+
+        assert IndexEngine.unwrap(index).hnsw.efSearch == 128
+
+    def test_untrainable_collection(self):
+        engine = create_engine(IndexType.IVF_PQ, DIM)
+
+        assert not engine.can_build(10)
+        assert engine.can_build(1000)
+
+
+class TestVectorDatabaseTiers:
+    """Tests for index tiers inside VectorDatabase."""
+
+    def test_defaults_to_flat(self):
+        db = VectorDatabase(dimension=DIM)
+
+        assert db.get_stats()['index_type'] == 'flat'
+
+    def test_unknown_index_type(self):
+        with pytest.raises(ValueError):
+            VectorDatabase(dimension=DIM, index_type='bogus')
+
+    def test_explicit_ivf_starts_flat_until_trainable(self):
+        db = VectorDatabase(dimension=DIM, index_type='ivf_flat', background_retrain=False)
+        vectors = random_vectors(500)
+
+        db.add_object('obj_0', vectors[0], 'test')
+        assert db.get_stats()['index_type'] == 'flat'
+
+        for i, vec in enumerate(vectors[1:], start=1):
+            db.add_object(f'obj_{i}', vec, 'test')
+
+        stats = db.get_stats()
+        assert stats['index_type'] == 'ivf_flat'
+        assert stats['index_size'] == 500
+
+        results = db.search_similar(vectors[42], k=1, threshold=0.0)
+        assert results[0][0].id == 'obj_42'
+
+    def test_explicit_hnsw(self):
+        db = VectorDatabase(dimension=DIM, index_type='hnsw', ef_search=32)
+        vectors = random_vectors(50)
+        for i, vec in enumerate(vectors):
+            db.add_object(f'obj_{i}', vec, 'test')
+
+        assert db.get_stats()['index_type'] == 'hnsw'
+        assert db.search_similar(vectors[7], k=1, threshold=0.0)[0][0].id == 'obj_7'
+
+    def test_set_search_params(self):
+        db = VectorDatabase(dimension=DIM, index_type='ivf_flat', background_retrain=False)
+        for i, vec in enumerate(random_vectors(500)):
+            db.add_object(f'obj_{i}', vec, 'test')
+
+        db.set_search_params(nprobe=2)
+
+        assert db.get_stats()['nprobe'] == 2
+        assert db.index.nprobe == 2
+
+    def test_background_retrain_keeps_all_vectors(self):
+        db = VectorDatabase(dimension=DIM, index_type='ivf_flat')
+        vectors = random_vectors(1000)
+        for i, vec in enumerate(vectors):
+            db.add_object(f'obj_{i}', vec, 'test')
+
+        assert db.wait_for_retrain(timeout=30)
+        db.retrain(background=False)
+
+        assert db.get_stats()['index_type'] == 'ivf_flat'
+        assert db.index.ntotal == 1000
+
+    def test_search_with_fewer_entries_than_k(self):
+        db = VectorDatabase(dimension=DIM)
+        vectors = random_vectors(3)
+        for i, vec in enumerate(vectors):
+            db.add_object(f'obj_{i}', vec, 'test')
+
+        results = db.search_similar(vectors[0], k=5, threshold=0.0)
+
+        assert sorted(entry.id for entry, _ in results) == ['obj_0', 'obj_1', 'obj_2']
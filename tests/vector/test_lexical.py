@@ -0,0 +1,93 @@
+"""Tests for the lexical name index."""
+
+from src.vector.lexical import LexicalIndex, reciprocal_rank_fusion, trigrams
+
+
+def make_index() -> LexicalIndex:
+    index = LexicalIndex()
+    for name in ('users', 'user_sessions', 'orders', 'order_items', 'products'):
+        index.add(f'db:public.{name}', name, aliases=(f'public.{name}',), metadata={'connection_id': 'db'})
+    index.add('other:public.users', 'users', metadata={'connection_id': 'other'})
+    return index
+
+
+def test_trigrams_split_words():
+    assert trigrams('created_at') == trigrams('Created At')
+
+
+def test_exact_lookup_by_name_and_alias():
+    index = make_index()
+
+    assert index.lookup('USERS') == ['db:public.users', 'other:public.users']
+    assert index.lookup('"public.orders"') == ['db:public.orders']
+    assert index.lookup('users', filters={'connection_id': 'other'}) == ['other:public.users']
+
+
+def test_search_ranks_exact_before_fuzzy():
+    hits = make_index().search('orders', k=3, filters={'connection_id': 'db'})
+
+    assert hits[0].id == 'db:public.orders'
+    assert hits[0].exact and hits[0].similarity == 1.0
+    assert hits[1].id == 'db:public.order_items'
+    assert not hits[1].exact and 0.0 < hits[1].similarity < 1.0
+
+
+def test_search_tolerates_typos():
+    hits = make_index().search('prodcts', k=1)
+
+    assert hits[0].id == 'db:public.products'
+
+
+def test_remove():
+    index = make_index()
+
+    assert index.remove('db:public.orders') is True
+    assert index.remove('db:public.orders') is False
+
+    assert index.lookup('orders') == []
+    assert 'db:public.orders' not in [hit.id for hit in index.search('orders', k=10)]
+    assert len(index) == 5
+
+
+def test_filtered_search_scores_only_matching_partition():
+    index = make_index()
+    for i in range(50):
+        index.add(f'big:public.users_{i}', f'users_{i}', metadata={'connection_id': 'big'})
+
+    hits = index.search('user', k=3, filters={'connection_id': 'other'})
+
+    assert [hit.id for hit in hits] == ['other:public.users']
+    assert index.search('user', k=3, filters={'connection_id': 'missing'}) == []
+
+
+def test_common_trigrams_do_not_add_candidates():
+    index = LexicalIndex(max_gram_candidates=3)
+    for name in ('user_id', 'account_id', 'product_id', 'invoice_id', 'session_id'):
+        index.add(name, name)
+
+    hits = index.search('user_id', k=5)
+
+    # " id" and "id " are shared by every name; only user_id has the rarer trigrams
+    assert [hit.id for hit in hits] == ['user_id']
+
+    index.max_gram_candidates = 10
+    assert len(index.search('user_id', k=5)) == 5
+
+
+def test_remove_updates_lengths_and_partitions():
+    index = make_index()
+    total = index._total_length
+
+    index.add('db:public.orders', 'orders', metadata={'connection_id': 'db'})
+    assert index._total_length == total
+
+    for object_id in list(index._docs):
+        index.remove(object_id)
+    assert index._total_length == 0
+    assert not index._postings and not index._partitions
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['c', 'b', 'd']])
+
+    assert [object_id for object_id, _ in fused] == ['c', 'b', 'a', 'd']
@@ -0,0 +1,152 @@
+"""Tests for the native on-disk vector store format."""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.vector.persistence import (
+    INDEX_FILE,
+    MANIFEST_FILE,
+    VECTORS_FILE,
+    VectorStoreFormatError,
+    read_attachment,
+)
+from src.vector.store import VectorDatabase
+
+
+DIM = 32
+
+
+def random_vectors(n: int, dim: int = DIM, seed: int = 0) -> np.ndarray:
+    """Create n random normalized float32 vectors."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build_db(index_type: str, n: int = 1000) -> VectorDatabase:
+    """Database with n objects split across three connections."""
+    db = VectorDatabase(
+        dimension=DIM,
+        index_type=index_type,
+        background_retrain=False,
+        partition_keys=('connection_id',)
+    )
+    db.add_objects(
+        [f'obj_{i}' for i in range(n)],
+        random_vectors(n),
+        'column',
+        [{'connection_id': f'db{i % 3}'} for i in range(n)]
+    )
+    return db
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf_flat', 'hnsw'])
+def test_round_trip_is_memory_mapped(tmp_path, index_type):
+    db = build_db(index_type)
+    db.delete_many(['obj_1', 'obj_2'])
+    vectors = random_vectors(1000)
+
+    db.save(tmp_path / 'store')
+    loaded = VectorDatabase.load(tmp_path / 'store', partition_keys=('connection_id',))
+
+    stats = loaded.get_stats()
+    assert stats['memory_mapped'] is True
+    assert stats['index_type'] == index_type
+    assert stats['total_entries'] == 998
+    assert loaded.get_by_id('obj_1') is None
+    assert loaded.get_by_id('obj_5').metadata == {'connection_id': 'db2'}
+    assert loaded.search_similar(vectors[5], k=1, threshold=0.0)[0][0].id == 'obj_5'
+
+    results = loaded.search_similar(
+        vectors[5], k=10, threshold=0.0, filters={'connection_id': 'db0'}
+    )
+    assert len(results) == 10
+    assert all(entry.metadata['connection_id'] == 'db0' for entry, _ in results)
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf_flat', 'hnsw'])
+def test_writes_copy_mapped_index(tmp_path, index_type):
+    build_db(index_type).save(tmp_path / 'store')
+    loaded = VectorDatabase.load(tmp_path / 'store')
+    extra = random_vectors(1, seed=42)[0]
+
+    loaded.add_object('new', extra, 'column')
+    loaded.delete_by_id('obj_3')
+
+    assert loaded.get_stats()['memory_mapped'] is False
+    assert loaded.search_similar(extra, k=1, threshold=0.0)[0][0].id == 'new'
+    assert loaded.get_by_id('obj_3') is None
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf_flat', 'hnsw'])
+def test_resave_mapped_store(tmp_path, index_type):
+    build_db(index_type).save(tmp_path / 'store')
+    loaded = VectorDatabase.load(tmp_path / 'store')
+
+    loaded.save(tmp_path / 'store')
+    reloaded = VectorDatabase.load(tmp_path / 'store')
+
+    assert loaded.get_stats()['memory_mapped'] is True
+    assert reloaded.search_similar(random_vectors(1000)[5], k=1, threshold=0.0)[0][0].id == 'obj_5'
+    assert loaded.search_similar(random_vectors(1000)[7], k=1, threshold=0.0)[0][0].id == 'obj_7'
+
+
+def test_save_replaces_store_in_use(tmp_path):
+    db = build_db('flat', n=100)
+    db.save(tmp_path / 'store')
+    loaded = VectorDatabase.load(tmp_path / 'store')
+
+    db.delete_many([f'obj_{i}' for i in range(50)])
+    db.save(tmp_path / 'store')
+
+    assert len(loaded.entries) == 100
+    assert len(VectorDatabase.load(tmp_path / 'store').entries) == 50
+    assert [p.name for p in tmp_path.iterdir()] == ['store']
+
+
+def test_attachments(tmp_path):
+    build_db('flat', n=10).save(tmp_path / 'store', attachments={'catalog': {'tables': 3}})
+
+    assert read_attachment(tmp_path / 'store', 'catalog') == {'tables': 3}
+    with pytest.raises(VectorStoreFormatError):
+        read_attachment(tmp_path / 'store', 'missing')
+
+
+def test_detects_corruption(tmp_path):
+    build_db('flat', n=100).save(tmp_path / 'store')
+    vectors_file = tmp_path / 'store' / VECTORS_FILE
+    data = bytearray(vectors_file.read_bytes())
+    data[-1] ^= 0xFF
+    vectors_file.write_bytes(bytes(data))
+
+    # Lazy loads only check sizes; a verified load checksums every file
+    VectorDatabase.load(tmp_path / 'store')
+    with pytest.raises(VectorStoreFormatError):
+        VectorDatabase.load(tmp_path / 'store', verify=True)
+
+
+def test_detects_truncation(tmp_path):
+    build_db('flat', n=100).save(tmp_path / 'store')
+    index_file = tmp_path / 'store' / INDEX_FILE
+    index_file.write_bytes(index_file.read_bytes()[:-16])
+
+    with pytest.raises(VectorStoreFormatError):
+        VectorDatabase.load(tmp_path / 'store')
+
+
+def test_rejects_newer_format(tmp_path):
+    build_db('flat', n=10).save(tmp_path / 'store')
+    manifest_file = tmp_path / 'store' / MANIFEST_FILE
+    manifest = json.loads(manifest_file.read_text())
+    manifest['format_version'] += 1
+    manifest_file.write_text(json.dumps(manifest))
+
+    with pytest.raises(VectorStoreFormatError):
+        VectorDatabase.load(tmp_path / 'store')
+
+
+def test_missing_store(tmp_path):
+    with pytest.raises(VectorStoreFormatError):
+        VectorDatabase.load(tmp_path / 'missing')
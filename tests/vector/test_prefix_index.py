@@ -0,0 +1,124 @@
+"""Tests for the prefix index and prefix-indexed completion sources."""
+
+import time
+
+import numpy as np
+import pytest
+
+from src.vector.autocomplete import IntelligentCompleter
+from src.vector.prefix import PrefixIndex
+from src.vector.store import VectorDatabase
+
+
+def brute_force(entries, prefix, k):
+    matching = [(text, score) for text, score in entries.items() if text.lower().startswith(prefix.lower())]
+    return sorted(matching, key=lambda item: -item[1])[:k]
+
+
+def test_complete_matches_brute_force():
+    rng = np.random.default_rng(0)
+    words = ['select', 'selection', 'set', 'seq', 'from', 'fromage', 'f', 'update', 'up']
+    entries = {}
+    index = PrefixIndex(top_k=4)
+    for i in range(300):
+        text = f"{words[i % len(words)]} {i % 37}"
+        entries[text] = float(rng.random())
+        index.update(text, entries[text])
+
+    for prefix in ['', 's', 'se', 'sel', 'selection 1', 'f', 'fro', 'up', 'x', 'select 9']:
+        for k in (3, 10):
+            expected = brute_force(entries, prefix, k)
+            got = [(entry.text, entry.score) for entry in index.complete(prefix, k)]
+            assert got == expected, (prefix, k)
+
+
+def test_update_and_remove_keep_caches_consistent():
+    index = PrefixIndex(top_k=2)
+    for text, score in [('abc', 1.0), ('abd', 2.0), ('ab', 3.0), ('b', 0.5)]:
+        index.update(text, score)
+
+    index.update('abc', 5.0)
+    assert [e.text for e in index.complete('ab', 2)] == ['abc', 'ab']
+
+    assert index.remove('abc') is True
+    assert index.remove('abc') is False
+    assert [e.text for e in index.complete('a', 2)] == ['ab', 'abd']
+
+    index.remove('ab')
+    assert [e.text for e in index.complete('ab', 2)] == ['abd']
+    assert [e.text for e in index.complete('abd', 2)] == ['abd']
+    assert len(index) == 2
+
+
+def test_case_insensitive():
+    index = PrefixIndex()
+    index.update('SELECT * FROM users', 1.0)
+
+    assert 'select * from USERS' in index
+    assert [e.text for e in index.complete('sElEcT')] == ['SELECT * FROM users']
+
+
+@pytest.fixture
+def completer():
+    return IntelligentCompleter(VectorDatabase(dimension=8))
+
+
+def test_history_ranks_by_frecency(completer):
+    for _ in range(5):
+        completer.add_to_history('SELECT * FROM orders')
+    completer.add_to_history('SELECT * FROM users')
+    completer.add_to_history('SELECT * FROM items')
+
+    texts = [c.text for c in sorted(
+        completer._get_history_completions('select'), key=lambda c: c.score, reverse=True
+    )]
+
+    assert texts[0] == 'SELECT * FROM orders'
+    assert texts.index('SELECT * FROM items') < texts.index('SELECT * FROM users')
+
+
+def test_history_eviction_updates_index(completer):
+    completer.max_history = 3
+    for text in ['a1', 'a2', 'a1', 'a3', 'a4']:
+        completer.add_to_history(text)
+
+    assert completer.completion_history == ['a1', 'a3', 'a4']
+    assert 'a2' not in completer.history_index
+    assert completer.history_index.get('a1').data == 1
+    assert {c.text for c in completer._get_history_completions('a')} == {'a1', 'a3', 'a4'}
+
+
+def test_registered_patterns_complete_current_word(completer):
+    completer.register_pattern('CUSTOM', ['CUSTOM1', 'CUSTOM2'])
+    completer.register_pattern('CUSTOMER_VIEW', ['CUSTOMER_VIEW_V2'])
+
+    texts = [
+        c.text for c in completer._get_pattern_completions('SELECT * FROM cust', {})
+        if 'pattern' in c.metadata
+    ]
+
+    assert texts == ['CUSTOM1', 'CUSTOM2', 'CUSTOMER_VIEW_V2']
+    assert not any(
+        'pattern' in c.metadata
+        for c in completer._get_pattern_completions('SELECT * FROM cust ', {})
+    )
+
+
+def test_history_completion_time_is_flat(completer):
+    completer.max_history = 100_000
+
+    def lookup_seconds():
+        start = time.perf_counter()
+        for _ in range(200):
+            completer._get_history_completions('SELECT * FROM t')
+        return time.perf_counter() - start
+
+    for i in range(1_000):
+        completer.add_to_history(f'SELECT * FROM t{i} WHERE id = {i}')
+    small = lookup_seconds()
+    for i in range(1_000, 100_000):
+        completer.add_to_history(f'SELECT * FROM t{i} WHERE id = {i}')
+    large = lookup_seconds()
+
+    assert len(completer.completion_history) == 100_000
+    assert large < small * 5 + 0.05
@@ -0,0 +1,158 @@
+"""Tests for the sharded vector index."""
+
+import numpy as np
+import pytest
+
+from src.vector.persistence import read_attachment
+from src.vector.shards import ShardedVectorIndex
+from src.vector.store import VectorDatabase
+
+
+DIM = 16
+
+
+def random_vectors(n: int, seed: int = 0) -> np.ndarray:
+    """Create n random normalized float32 vectors."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def fill(shards: ShardedVectorIndex, key: str, n: int = 50, seed: int = 0) -> np.ndarray:
+    """Add n objects to a shard and return their vectors."""
+    vectors = random_vectors(n, seed)
+    with shards.writing(key) as db:
+        db.add_objects([f'{key}:{i}' for i in range(n)], vectors, 'column', [{'shard': key}] * n)
+    return vectors
+
+
+@pytest.fixture
+def shards(tmp_path):
+    index = ShardedVectorIndex(DIM, store_dir=tmp_path / 'shards')
+    yield index
+    index.close()
+
+
+def test_search_merges_shards_like_a_single_index(shards):
+    reference = VectorDatabase(dimension=DIM)
+    for seed, key in enumerate(('a', 'b', 'c')):
+        vectors = fill(shards, key, seed=seed)
+        reference.add_objects([f'{key}:{i}' for i in range(50)], vectors, 'column')
+    query = random_vectors(1, seed=99)[0]
+
+    merged = shards.search(query, k=10, threshold=0.0)
+    expected = reference.search_similar(query, k=10, threshold=0.0)
+
+    assert [entry.id for entry, _ in merged] == [entry.id for entry, _ in expected]
+    assert shards.stats.parallel_searches == 1
+
+
+def test_search_selected_shards(shards):
+    fill(shards, 'a')
+    fill(shards, 'b', seed=1)
+
+    results = shards.search(random_vectors(1, seed=5)[0], k=5, keys=['b', 'missing'], threshold=0.0)
+
+    assert len(results) == 5
+    assert {entry.metadata['shard'] for entry, _ in results} == {'b'}
+
+
+def test_saved_shards_load_on_first_search(shards, tmp_path):
+    fill(shards, 'a')
+    fill(shards, 'db/with:odd chars', seed=1)
+    shards.save()
+
+    reopened = ShardedVectorIndex(DIM, store_dir=tmp_path / 'shards')
+    assert sorted(reopened.scan()) == ['a', 'db/with:odd chars']
+    assert reopened.get_stats()['loaded_shards'] == 0
+    assert reopened.get_stats()['total_entries'] == 100
+
+    results = reopened.search(random_vectors(1, seed=5)[0], k=3, keys=['a'], threshold=0.0)
+
+    assert len(results) == 3
+    assert reopened.is_loaded('a')
+    assert not reopened.is_loaded('db/with:odd chars')
+    assert reopened.stats.loads == 1
+
+
+def test_memory_budget_evicts_least_recently_used(tmp_path):
+    shards = ShardedVectorIndex(DIM, store_dir=tmp_path / 'shards')
+    vectors = {key: fill(shards, key, n=50, seed=seed) for seed, key in enumerate('abcd')}
+    # Room for two shards
+    budget = shards.get_stats()['per_shard']['d']['memory_bytes'] * 2
+    shards.memory_budget_bytes = budget
+
+    shards.search(vectors['a'][0], k=1, keys=['a'])
+    fill(shards, 'e', seed=9)
+
+    assert shards.memory_usage() <= budget
+    assert shards.is_loaded('e')
+    assert shards.is_loaded('a')
+    assert shards.stats.evictions >= 3
+    # Evicted shards were saved first and reload with their entries
+    entry = shards.get_by_id('b', 'b:7')
+    assert entry is not None
+    assert np.allclose(entry.vector, vectors['b'][7])
+
+
+def test_search_pins_its_shards_until_done(tmp_path):
+    shards = ShardedVectorIndex(DIM, store_dir=tmp_path / 'shards', max_workers=1)
+    vectors = {key: fill(shards, key, n=50, seed=seed) for seed, key in enumerate('abcd')}
+    shards.save()
+    for key in 'abcd':
+        shards.evict(key)
+    # Room for one shard
+    shards.memory_budget_bytes = 1
+
+    results = shards.search(vectors['c'][3], k=4)
+
+    assert results[0][0].id == 'c:3'
+    # Each shard was loaded once; none was evicted mid-search and reloaded
+    assert shards.stats.loads == 4
+    assert shards.get_stats()['loaded_shards'] <= 1
+    assert not shards._pinned
+
+
+def test_no_eviction_without_store_dir():
+    shards = ShardedVectorIndex(DIM, memory_budget_bytes=1)
+    fill(shards, 'a')
+    fill(shards, 'b', seed=1)
+
+    assert shards.is_loaded('a') and shards.is_loaded('b')
+    assert shards.stats.evictions == 0
+
+
+def test_unchanged_write_keeps_shard_clean(shards):
+    fill(shards, 'a')
+    shards.save()
+
+    with shards.writing('a') as db:
+        db.delete_many(['a:missing'])
+    assert shards.get_stats()['per_shard']['a']['dirty'] is False
+
+    with shards.writing('a') as db:
+        db.delete_many(['a:1'])
+    assert shards.get_stats()['per_shard']['a']['dirty'] is True
+
+
+def test_attachments_saved_with_shard(tmp_path):
+    shards = ShardedVectorIndex(
+        DIM, store_dir=tmp_path / 'shards', attachments=lambda key: {'catalog': {'key': key}}
+    )
+    fill(shards, 'a')
+
+    assert shards.save() == 1
+    assert shards.save() == 0  # Nothing changed since
+
+    assert read_attachment(shards.shard_dir('a'), 'catalog') == {'key': 'a'}
+
+
+def test_drop_removes_saved_store(shards):
+    fill(shards, 'a')
+    shards.save()
+
+    assert shards.drop('a') is True
+
+    assert not shards.shard_dir('a').exists()
+    assert shards.keys() == []
+    assert shards.drop('a') is False